@@ -0,0 +1,139 @@
+"""partition emails by month and add the email archive
+
+Rebuilds `emails` as a table range-partitioned on a new received_at column
+(backfilled from the quote's date_submitted), with monthly partitions from the
+oldest email through three months ahead plus a default partition. Also adds
+email_archive, the cold store the archival job moves closed RFQs' emails into.
+
+The rows are copied under an exclusive lock on emails, so run this in a quiet
+window on a large table.
+
+Revision ID: 2c6e9a4d7f13
+Revises: b8e3f1a6d027
+Create Date: 2026-10-19 17:02:44.381205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '2c6e9a4d7f13'
+down_revision: Union[str, Sequence[str], None] = 'b8e3f1a6d027'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same function as EMAIL_PARTITION_FUNCTION_DDL in app/models.py
+ENSURE_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_email_partitions(first_month date, last_month date) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    partition_month date := date_trunc('month', first_month);
+BEGIN
+    WHILE partition_month <= last_month LOOP
+        BEGIN
+            EXECUTE 'CREATE TABLE IF NOT EXISTS ' || quote_ident('emails_' || to_char(partition_month, 'YYYY_MM'))
+                || ' PARTITION OF emails FOR VALUES FROM ('
+                || quote_literal(partition_month::timestamp AT TIME ZONE 'UTC') || ') TO ('
+                || quote_literal((partition_month + interval '1 month')::timestamp AT TIME ZONE 'UTC') || ')';
+        EXCEPTION WHEN check_violation THEN
+            -- That month already has rows in the default partition; they stay there until archived
+            RAISE NOTICE 'skipped emails_%: rows already in emails_default', to_char(partition_month, 'YYYY_MM');
+        END;
+        partition_month := partition_month + interval '1 month';
+    END LOOP;
+END $$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("LOCK TABLE emails IN EXCLUSIVE MODE")  # Reads continue; writes wait for the swap
+    op.rename_table('emails', 'emails_unpartitioned')
+    op.create_table('emails',
+    sa.Column('id', postgresql.UUID(), nullable=False),
+    sa.Column('received_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('extracted_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('body_hash', sa.String(length=64), nullable=False),
+    sa.Column('quote_id', postgresql.UUID(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'received_at', name='emails_partitioned_pkey'),
+    postgresql_partition_by='RANGE (received_at)'
+    )
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+    op.execute("CREATE TABLE emails_default PARTITION OF emails DEFAULT")
+    op.execute("""
+        SELECT ensure_email_partitions(
+            coalesce((SELECT min(q.date_submitted)::date FROM emails_unpartitioned e JOIN quotes q ON q.id = e.quote_id), current_date),
+            (current_date + 93)::date
+        )
+    """)
+    op.execute("""
+        INSERT INTO emails (id, received_at, extracted_data, body_hash, quote_id)
+        SELECT e.id, coalesce(q.date_submitted, now()), e.extracted_data, e.body_hash, e.quote_id
+        FROM emails_unpartitioned e
+        JOIN quotes q ON q.id = e.quote_id
+    """)
+
+    op.drop_table('emails_unpartitioned')
+    op.execute("ALTER TABLE emails RENAME CONSTRAINT emails_partitioned_pkey TO emails_pkey")
+    op.create_foreign_key('emails_quote_id_fkey', 'emails', 'quotes', ['quote_id'], ['id'])
+    op.create_foreign_key('emails_body_hash_fkey', 'emails', 'email_bodies', ['body_hash'], ['content_hash'])
+    op.create_index('ix_emails_quote_id', 'emails', ['quote_id'], unique=False)
+    op.create_index('ix_emails_body_hash', 'emails', ['body_hash'], unique=False)
+
+    op.create_table('email_archive',
+    sa.Column('id', postgresql.UUID(), nullable=False),
+    sa.Column('received_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('quote_id', postgresql.UUID(), nullable=False),
+    sa.Column('raw_text', sa.Text(), nullable=False),
+    sa.Column('extracted_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['quote_id'], ['quotes.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_email_archive_quote_id'), 'email_archive', ['quote_id'], unique=False)
+    op.execute("ALTER TABLE email_archive SET (toast_tuple_target = 128)")
+    op.execute("""
+        DO $$
+        BEGIN
+            EXECUTE 'ALTER TABLE email_archive ALTER COLUMN raw_text SET COMPRESSION lz4, ALTER COLUMN extracted_data SET COMPRESSION lz4';
+        EXCEPTION WHEN OTHERS THEN
+            RAISE NOTICE 'lz4 column compression unavailable, keeping the server default: %', SQLERRM;
+        END $$
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema. Archived emails are moved back into the unpartitioned table."""
+    op.rename_table('emails', 'emails_partitioned')
+    op.create_table('emails',
+    sa.Column('id', postgresql.UUID(), nullable=False),
+    sa.Column('extracted_data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('body_hash', sa.String(length=64), nullable=False),
+    sa.Column('quote_id', postgresql.UUID(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name='emails_unpartitioned_pkey')
+    )
+    op.execute("""
+        INSERT INTO email_bodies (content_hash, raw_text)
+        SELECT encode(sha256(convert_to(raw_text, 'UTF8')), 'hex'), raw_text FROM email_archive
+        ON CONFLICT (content_hash) DO NOTHING
+    """)
+    op.execute("""
+        INSERT INTO emails (id, extracted_data, body_hash, quote_id)
+        SELECT id, extracted_data, body_hash, quote_id FROM emails_partitioned
+        UNION ALL
+        SELECT id, extracted_data, encode(sha256(convert_to(raw_text, 'UTF8')), 'hex'), quote_id FROM email_archive
+        ON CONFLICT (id) DO NOTHING
+    """)
+    op.drop_index(op.f('ix_email_archive_quote_id'), table_name='email_archive')
+    op.drop_table('email_archive')
+    op.drop_table('emails_partitioned')
+    op.execute("DROP FUNCTION IF EXISTS ensure_email_partitions(date, date)")
+
+    op.execute("ALTER TABLE emails RENAME CONSTRAINT emails_unpartitioned_pkey TO emails_pkey")
+    op.create_foreign_key('emails_quote_id_fkey', 'emails', 'quotes', ['quote_id'], ['id'])
+    op.create_foreign_key('emails_body_hash_fkey', 'emails', 'email_bodies', ['body_hash'], ['content_hash'])
+    op.create_index('ix_emails_quote_id', 'emails', ['quote_id'], unique=False)
+    op.create_index('ix_emails_body_hash', 'emails', ['body_hash'], unique=False)
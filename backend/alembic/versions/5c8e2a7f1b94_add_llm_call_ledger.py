@@ -0,0 +1,63 @@
+"""add llm call ledger
+
+Append-only record of every LLM call (tokens, latency, cost, outcome and the
+email/quote/RFQ/supplier it was for), written in batches by
+app/services/llm_ledger.py. A statement-level trigger refuses updates and deletes.
+
+Revision ID: 5c8e2a7f1b94
+Revises: 9b2f6c1e7d48
+Create Date: 2026-10-19 23:12:40.604518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8e2a7f1b94'
+down_revision: Union[str, Sequence[str], None] = '9b2f6c1e7d48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('llm_calls',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('call_id', postgresql.UUID(), nullable=False),
+    sa.Column('called_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('operation', sa.String(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('outcome', sa.String(), nullable=False),
+    sa.Column('input_tokens', sa.Integer(), nullable=False),
+    sa.Column('output_tokens', sa.Integer(), nullable=False),
+    sa.Column('latency_ms', sa.Float(), nullable=False),
+    sa.Column('cost_usd', sa.Numeric(precision=14, scale=8), nullable=False),
+    sa.Column('email_id', postgresql.UUID(), nullable=True),
+    sa.Column('quote_id', postgresql.UUID(), nullable=True),
+    sa.Column('rfq_id', postgresql.UUID(), nullable=True),
+    sa.Column('supplier_id', postgresql.UUID(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_llm_calls_called_at_brin', 'llm_calls', ['called_at'], unique=False, postgresql_using='brin')
+    op.create_index('ix_llm_calls_quote_id', 'llm_calls', ['quote_id'], unique=False)
+
+    # Mirrors LLM_CALLS_GUARD_FUNCTION_DDL / LLM_CALLS_GUARD_TRIGGER_DDL in app/models.py
+    op.execute("""
+        CREATE OR REPLACE FUNCTION reject_llm_call_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            RAISE EXCEPTION 'llm_calls is append-only';
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER llm_calls_append_only BEFORE UPDATE OR DELETE ON llm_calls
+            FOR EACH STATEMENT EXECUTE FUNCTION reject_llm_call_changes()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('llm_calls')
+    op.execute("DROP FUNCTION IF EXISTS reject_llm_call_changes()")
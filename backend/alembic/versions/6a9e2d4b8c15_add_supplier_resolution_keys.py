@@ -0,0 +1,45 @@
+"""add supplier resolution keys
+
+Adds two generated blocking-key columns to suppliers: the contact email's domain
+and the company name's words. Both are indexed so supplier resolution looks up a
+small candidate set instead of scanning every supplier. The indexes are built
+CONCURRENTLY; adding the stored columns rewrites suppliers once.
+
+Revision ID: 6a9e2d4b8c15
+Revises: 4f1c8b3e6a92
+Create Date: 2026-10-19 19:05:51.630284
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '6a9e2d4b8c15'
+down_revision: Union[str, Sequence[str], None] = '4f1c8b3e6a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('suppliers', sa.Column('email_domain', sa.String(), sa.Computed("lower(split_part(contact_email, '@', 2))", persisted=True), nullable=True))
+    op.add_column('suppliers', sa.Column(
+        'name_tokens',
+        postgresql.ARRAY(sa.Text()),
+        sa.Computed("regexp_split_to_array(trim(regexp_replace(lower(company_name), '[^a-z0-9]+', ' ', 'g')), ' ')", persisted=True),
+        nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_suppliers_email_domain', 'suppliers', ['email_domain'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_suppliers_name_tokens', 'suppliers', ['name_tokens'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_suppliers_name_tokens', table_name='suppliers', postgresql_using='gin')
+    op.drop_index('ix_suppliers_email_domain', table_name='suppliers')
+    op.drop_column('suppliers', 'name_tokens')
+    op.drop_column('suppliers', 'email_domain')
@@ -0,0 +1,107 @@
+"""uuid keys, step 1 of 2 (expand): shadow uuid columns, sync triggers, batched backfill
+
+Online conversion of every id / foreign key from hex varchar to native uuid.
+This step only adds things and never takes a long lock, so it runs while the
+previous release keeps serving traffic:
+
+  1. add a nullable `<column>__uuid` next to each id column (metadata-only),
+     plus a NOT VALID `IS NOT NULL` check on it
+  2. a BEFORE INSERT/UPDATE trigger keeps the shadow columns in sync with new writes
+  3. existing rows are backfilled in small autocommitted batches
+  4. unique indexes on the shadow columns are built CONCURRENTLY, and the
+     checks are validated (SHARE UPDATE EXCLUSIVE, doesn't block writes)
+
+Step 2 (9d4a6c1e2b57) swaps the columns in one short transaction.
+
+Revision ID: 7b2d5f8e0c36
+Revises: e5b0c7a2d914
+Create Date: 2026-10-19 15:02:19.664310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2d5f8e0c36'
+down_revision: Union[str, Sequence[str], None] = 'e5b0c7a2d914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10_000
+
+CONVERTED_COLUMNS = {
+    'certifications': ['id'],
+    'suppliers': ['id'],
+    'rfqs': ['id'],
+    'quotes': ['id', 'supplier_id', 'rfq_id'],
+    'emails': ['id', 'quote_id'],
+    'rfq_certifications': ['rfq_id', 'certification_id'],
+    'quote_certifications': ['quote_id', 'certification_id'],
+    'quote_price_rollups': ['supplier_id'],
+}
+
+# Built ahead of time so step 2 can promote them to primary keys / unique constraints without a scan
+SHADOW_UNIQUE_INDEXES = {
+    'certifications_pkey__uuid': ('certifications', ['id__uuid']),
+    'suppliers_pkey__uuid': ('suppliers', ['id__uuid']),
+    'rfqs_pkey__uuid': ('rfqs', ['id__uuid']),
+    'quotes_pkey__uuid': ('quotes', ['id__uuid']),
+    'emails_pkey__uuid': ('emails', ['id__uuid']),
+    'rfq_certifications_pkey__uuid': ('rfq_certifications', ['rfq_id__uuid', 'certification_id__uuid']),
+    'quote_certifications_pkey__uuid': ('quote_certifications', ['quote_id__uuid', 'certification_id__uuid']),
+    'quote_price_rollups_pkey__uuid': ('quote_price_rollups', ['item', 'country_of_origin', 'supplier_id__uuid', 'month']),
+    '_supplier_rfq_uc__uuid': ('quotes', ['supplier_id__uuid', 'rfq_id__uuid']),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, columns in CONVERTED_COLUMNS.items():
+        for column in columns:
+            op.add_column(table, sa.Column(f'{column}__uuid', postgresql.UUID(), nullable=True))
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}__uuid_not_null CHECK ({column}__uuid IS NOT NULL) NOT VALID")
+
+        assignments = " ".join(f"NEW.{column}__uuid := NEW.{column}::uuid;" for column in columns)
+        op.execute(f"""
+            CREATE FUNCTION {table}__sync_uuid() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                {assignments}
+                RETURN NEW;
+            END $$
+        """)
+        op.execute(f"CREATE TRIGGER {table}__sync_uuid BEFORE INSERT OR UPDATE ON {table} FOR EACH ROW EXECUTE FUNCTION {table}__sync_uuid()")
+
+    # Everything below commits as it goes, so no single transaction holds locks for long
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        for table, columns in CONVERTED_COLUMNS.items():
+            assignments = ", ".join(f"{column}__uuid = {column}::uuid" for column in columns)
+            pending = " OR ".join(f"({column}__uuid IS NULL AND {column} IS NOT NULL)" for column in columns)
+            while True:
+                result = connection.execute(sa.text(
+                    f"UPDATE {table} SET {assignments} "
+                    f"WHERE ctid IN (SELECT ctid FROM {table} WHERE {pending} LIMIT {BATCH_SIZE})"
+                ))
+                if result.rowcount == 0:
+                    break
+
+        for index_name, (table, columns) in SHADOW_UNIQUE_INDEXES.items():
+            op.create_index(index_name, table, columns, unique=True, postgresql_concurrently=True)
+
+        for table, columns in CONVERTED_COLUMNS.items():
+            for column in columns:
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}__uuid_not_null")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for index_name, (table, _columns) in SHADOW_UNIQUE_INDEXES.items():
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    for table, columns in CONVERTED_COLUMNS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {table}__sync_uuid ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}__sync_uuid()")
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {column}__uuid")
@@ -0,0 +1,58 @@
+"""add price conversion tables and quoted price columns
+
+Quotes keep the price as quoted (amount, currency, unit) next to the canonical
+price_per_pound, plus the conversion table version it was converted with.
+Existing prices were all USD per pound, so they are backfilled as such.
+
+Revision ID: 8e4b1d6a3c27
+Revises: 5c8e2a7f1b94
+Create Date: 2026-10-20 00:41:07.281734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b1d6a3c27'
+down_revision: Union[str, Sequence[str], None] = '5c8e2a7f1b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('conversion_table_versions',
+    sa.Column('version', sa.Integer(), sa.Identity(always=False), nullable=False),
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('published_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('version')
+    )
+    op.create_table('conversion_rates',
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=8), nullable=False),
+    sa.Column('code', sa.String(length=16), nullable=False),
+    sa.Column('factor', sa.Numeric(precision=24, scale=12), nullable=False),
+    sa.ForeignKeyConstraint(['version'], ['conversion_table_versions.version'], ),
+    sa.PrimaryKeyConstraint('version', 'kind', 'code')
+    )
+    op.add_column('quotes', sa.Column('price_amount', sa.Numeric(precision=14, scale=4), nullable=True))
+    op.add_column('quotes', sa.Column('price_currency', sa.String(length=8), nullable=True))
+    op.add_column('quotes', sa.Column('price_unit', sa.String(length=16), nullable=True))
+    op.add_column('quotes', sa.Column('conversion_version', sa.Integer(), nullable=True))
+
+    op.execute("""
+        UPDATE quotes SET price_amount = price_per_pound, price_currency = 'USD', price_unit = 'lb'
+        WHERE price_per_pound IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('quotes', 'conversion_version')
+    op.drop_column('quotes', 'price_unit')
+    op.drop_column('quotes', 'price_currency')
+    op.drop_column('quotes', 'price_amount')
+    op.drop_table('conversion_rates')
+    op.drop_table('conversion_table_versions')
@@ -0,0 +1,34 @@
+"""add email input token counts
+
+Records, per email, the estimated LLM input tokens of its extraction and how many
+tokens normalization (stripping quoted history and boilerplate) or a recognized
+price sheet saved. Both columns are nullable without
+a default, so adding them to the partitioned table is a catalog-only change.
+
+Revision ID: 9b2f6c1e7d48
+Revises: 6a9e2d4b8c15
+Create Date: 2026-10-19 20:41:12.518207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2f6c1e7d48'
+down_revision: Union[str, Sequence[str], None] = '6a9e2d4b8c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('emails', sa.Column('input_tokens', sa.Integer(), nullable=True))
+    op.add_column('emails', sa.Column('input_tokens_saved', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('emails', 'input_tokens_saved')
+    op.drop_column('emails', 'input_tokens')
@@ -0,0 +1,106 @@
+"""uuid keys, step 2 of 2 (contract): swap shadow uuid columns in place of the varchar ids
+
+Runs in one short transaction guarded by lock_timeout. Every expensive part
+was done by step 1: NOT NULL reuses the validated check constraints (no table
+scan), and primary keys / unique constraints are attached to the prebuilt
+indexes. Foreign keys are re-added NOT VALID and validated afterwards without
+blocking writes.
+
+Roll the application release that reads uuid columns out right after this
+step; the previous release binds ids as varchar.
+
+Revision ID: 9d4a6c1e2b57
+Revises: 7b2d5f8e0c36
+Create Date: 2026-10-19 15:02:48.107522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4a6c1e2b57'
+down_revision: Union[str, Sequence[str], None] = '7b2d5f8e0c36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONVERTED_COLUMNS = {
+    'certifications': ['id'],
+    'suppliers': ['id'],
+    'rfqs': ['id'],
+    'quotes': ['id', 'supplier_id', 'rfq_id'],
+    'emails': ['id', 'quote_id'],
+    'rfq_certifications': ['rfq_id', 'certification_id'],
+    'quote_certifications': ['quote_id', 'certification_id'],
+    'quote_price_rollups': ['supplier_id'],
+}
+
+PRIMARY_KEYS = {
+    'certifications': ['id'],
+    'suppliers': ['id'],
+    'rfqs': ['id'],
+    'quotes': ['id'],
+    'emails': ['id'],
+    'rfq_certifications': ['rfq_id', 'certification_id'],
+    'quote_certifications': ['quote_id', 'certification_id'],
+    'quote_price_rollups': ['item', 'country_of_origin', 'supplier_id', 'month'],
+}
+
+# (constraint name, table, column, referenced table)
+FOREIGN_KEYS = [
+    ('quotes_supplier_id_fkey', 'quotes', 'supplier_id', 'suppliers'),
+    ('quotes_rfq_id_fkey', 'quotes', 'rfq_id', 'rfqs'),
+    ('emails_quote_id_fkey', 'emails', 'quote_id', 'quotes'),
+    ('rfq_certifications_rfq_id_fkey', 'rfq_certifications', 'rfq_id', 'rfqs'),
+    ('rfq_certifications_certification_id_fkey', 'rfq_certifications', 'certification_id', 'certifications'),
+    ('quote_certifications_quote_id_fkey', 'quote_certifications', 'quote_id', 'quotes'),
+    ('quote_certifications_certification_id_fkey', 'quote_certifications', 'certification_id', 'certifications'),
+    ('quote_price_rollups_supplier_id_fkey', 'quote_price_rollups', 'supplier_id', 'suppliers'),
+]
+
+
+def _drop_keys() -> None:
+    for name, table, _column, _referenced in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+    op.drop_constraint('_supplier_rfq_uc', 'quotes', type_='unique')
+    for table in PRIMARY_KEYS:
+        op.drop_constraint(f'{table}_pkey', table, type_='primary')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fail fast instead of queueing behind a long transaction while holding locks
+    op.execute("SET LOCAL lock_timeout = '10s'")
+    _drop_keys()
+
+    for table, columns in CONVERTED_COLUMNS.items():
+        op.execute(f"DROP TRIGGER {table}__sync_uuid ON {table}")
+        op.execute(f"DROP FUNCTION {table}__sync_uuid()")
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column}__uuid SET NOT NULL")
+            op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {table}_{column}__uuid_not_null")
+            op.drop_column(table, column)
+            op.alter_column(table, f'{column}__uuid', new_column_name=column)
+
+    for table in PRIMARY_KEYS:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY USING INDEX {table}_pkey__uuid")
+    op.execute("ALTER TABLE quotes ADD CONSTRAINT _supplier_rfq_uc UNIQUE USING INDEX _supplier_rfq_uc__uuid")
+    for name, table, column, referenced in FOREIGN_KEYS:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {referenced} (id) NOT VALID")
+
+    with op.get_context().autocommit_block():
+        for name, table, _column, _referenced in FOREIGN_KEYS:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def downgrade() -> None:
+    """Downgrade schema. Rewrites the tables, so unlike the upgrade it is not online."""
+    _drop_keys()
+    for table, columns in CONVERTED_COLUMNS.items():
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE varchar USING replace({column}::text, '-', '')")
+    for table, columns in PRIMARY_KEYS.items():
+        op.create_primary_key(f'{table}_pkey', table, columns)
+    op.create_unique_constraint('_supplier_rfq_uc', 'quotes', ['supplier_id', 'rfq_id'])
+    for name, table, column, referenced in FOREIGN_KEYS:
+        op.create_foreign_key(name, table, referenced, [column], ['id'])
@@ -0,0 +1,30 @@
+"""add full-text search vector to emails
+
+Revision ID: a7d3e91c5f20
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-19 10:03:47.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e91c5f20'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d41b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('emails', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english', raw_text)", persisted=True), nullable=True))
+    op.create_index('ix_emails_search_vector', 'emails', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_emails_search_vector', table_name='emails', postgresql_using='gin')
+    op.drop_column('emails', 'search_vector')
@@ -0,0 +1,54 @@
+"""index foreign-key lookup columns
+
+Covers quotes by RFQ, emails by quote and by body, both certification
+association tables by certification, and price rollups by supplier.
+Built CONCURRENTLY so writes keep flowing while the indexes build.
+
+Revision ID: b8e3f1a6d027
+Revises: 9d4a6c1e2b57
+Create Date: 2026-10-19 16:11:37.520914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e3f1a6d027'
+down_revision: Union[str, Sequence[str], None] = '9d4a6c1e2b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column)
+INDEXES = [
+    ('ix_quotes_rfq_id', 'quotes', 'rfq_id'),
+    ('ix_emails_quote_id', 'emails', 'quote_id'),
+    ('ix_emails_body_hash', 'emails', 'body_hash'),
+    ('ix_rfq_certifications_certification_id', 'rfq_certifications', 'certification_id'),
+    ('ix_quote_certifications_certification_id', 'quote_certifications', 'certification_id'),
+    ('ix_quote_price_rollups_supplier_id', 'quote_price_rollups', 'supplier_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction block
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        for name, table, column in INDEXES:
+            # An interrupted concurrent build leaves an INVALID index behind; rebuild it rather than skip it
+            invalid = connection.execute(
+                sa.text("SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name AND NOT i.indisvalid"),
+                {"name": name},
+            ).first()
+            if invalid:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.create_index(name, table, [column], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _column in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,33 @@
+"""add per-tenant API keys
+
+Requests are authenticated by their tenant's API key instead of naming the
+tenant in a header. Existing tenants, the default one included, have no key
+until one is issued with scripts/create_tenant.py --new-key.
+
+Revision ID: c2e8f4a6b913
+Revises: f47b2c9e1a85
+Create Date: 2026-10-20 09:12:36.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8f4a6b913'
+down_revision: Union[str, Sequence[str], None] = 'f47b2c9e1a85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tenants', sa.Column('api_key_hash', sa.String(length=64), nullable=True))
+    op.create_unique_constraint('tenants_api_key_hash_key', 'tenants', ['api_key_hash'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('tenants_api_key_hash_key', 'tenants', type_='unique')
+    op.drop_column('tenants', 'api_key_hash')
@@ -0,0 +1,73 @@
+"""store email bodies content-addressed and compressed
+
+Revision ID: c41e8b2f9a63
+Revises: a7d3e91c5f20
+Create Date: 2026-10-19 11:26:05.918337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e8b2f9a63'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e91c5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same digest as EmailBody.hash_text: sha256 over the UTF-8 bytes, hex encoded
+CONTENT_HASH_SQL = "encode(sha256(convert_to(raw_text, 'UTF8')), 'hex')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('email_bodies',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('raw_text', sa.Text(), nullable=False),
+    sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english', raw_text)", persisted=True), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+    # Set storage options before loading data so existing bodies are written compressed.
+    # SET COMPRESSION needs Postgres 14+ built with lz4; older servers keep the default pglz.
+    op.execute("ALTER TABLE email_bodies SET (toast_tuple_target = 512)")
+    op.execute("""
+        DO $$
+        BEGIN
+            EXECUTE 'ALTER TABLE email_bodies ALTER COLUMN raw_text SET COMPRESSION lz4';
+        EXCEPTION WHEN OTHERS THEN
+            RAISE NOTICE 'lz4 column compression unavailable, keeping the server default: %', SQLERRM;
+        END $$
+    """)
+
+    op.execute(f"""
+        INSERT INTO email_bodies (content_hash, raw_text)
+        SELECT DISTINCT ON (content_hash) content_hash, raw_text
+        FROM (SELECT {CONTENT_HASH_SQL} AS content_hash, raw_text FROM emails) AS hashed
+        ON CONFLICT (content_hash) DO NOTHING
+    """)
+    op.create_index('ix_email_bodies_search_vector', 'email_bodies', ['search_vector'], unique=False, postgresql_using='gin')
+
+    op.add_column('emails', sa.Column('body_hash', sa.String(length=64), nullable=True))
+    op.execute(f"UPDATE emails SET body_hash = {CONTENT_HASH_SQL}")
+    op.alter_column('emails', 'body_hash', nullable=False)
+    op.create_foreign_key('emails_body_hash_fkey', 'emails', 'email_bodies', ['body_hash'], ['content_hash'])
+
+    op.drop_index('ix_emails_search_vector', table_name='emails', postgresql_using='gin')
+    op.drop_column('emails', 'search_vector')
+    op.drop_column('emails', 'raw_text')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('emails', sa.Column('raw_text', sa.Text(), nullable=True))
+    op.execute("UPDATE emails SET raw_text = email_bodies.raw_text FROM email_bodies WHERE email_bodies.content_hash = emails.body_hash")
+    op.alter_column('emails', 'raw_text', nullable=False)
+    op.add_column('emails', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('english', raw_text)", persisted=True), nullable=True))
+    op.create_index('ix_emails_search_vector', 'emails', ['search_vector'], unique=False, postgresql_using='gin')
+
+    op.drop_constraint('emails_body_hash_fkey', 'emails', type_='foreignkey')
+    op.drop_column('emails', 'body_hash')
+    op.drop_index('ix_email_bodies_search_vector', table_name='email_bodies', postgresql_using='gin')
+    op.drop_table('email_bodies')
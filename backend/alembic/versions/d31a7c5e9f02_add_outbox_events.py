@@ -0,0 +1,48 @@
+"""add outbox events
+
+Transactional outbox for webhook delivery: one row per event and endpoint,
+written with the change it describes and deleted once delivered by
+app/services/outbox.py.
+
+Revision ID: d31a7c5e9f02
+Revises: 8e4b1d6a3c27
+Create Date: 2026-10-20 02:06:18.447193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd31a7c5e9f02'
+down_revision: Union[str, Sequence[str], None] = '8e4b1d6a3c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_events',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('event_id', postgresql.UUID(), nullable=False),
+    sa.Column('endpoint', sa.String(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('rfq_id', postgresql.UUID(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_events_endpoint_id', 'outbox_events', ['endpoint', 'id'], unique=False)
+    op.create_index('ix_outbox_events_endpoint_rfq_id', 'outbox_events', ['endpoint', 'rfq_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_events_endpoint_rfq_id', table_name='outbox_events')
+    op.drop_index('ix_outbox_events_endpoint_id', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,67 @@
+"""add quote price rollups and BRIN index on quotes.date_submitted
+
+Revision ID: e5b0c7a2d914
+Revises: c41e8b2f9a63
+Create Date: 2026-10-19 13:48:52.377160
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b0c7a2d914'
+down_revision: Union[str, Sequence[str], None] = 'c41e8b2f9a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('quote_price_rollups',
+    sa.Column('item', sa.String(), nullable=False),
+    sa.Column('country_of_origin', sa.String(), nullable=False),
+    sa.Column('supplier_id', sa.String(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('quote_count', sa.Integer(), nullable=False),
+    sa.Column('price_sum', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('price_min', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('price_max', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('price_histogram', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'], ),
+    sa.PrimaryKeyConstraint('item', 'country_of_origin', 'supplier_id', 'month')
+    )
+    op.create_index('ix_quotes_date_submitted_brin', 'quotes', ['date_submitted'], unique=False, postgresql_using='brin')
+
+    # Backfill from existing quotes (mirrors price_analytics.REBUILD_SQL)
+    op.execute("""
+        INSERT INTO quote_price_rollups
+            (item, country_of_origin, supplier_id, month, quote_count, price_sum, price_min, price_max, price_histogram)
+        SELECT item, country_of_origin, supplier_id, month,
+               sum(bucket_count), sum(bucket_sum), min(bucket_min), max(bucket_max),
+               jsonb_object_agg(bucket, bucket_count)
+        FROM (
+            SELECT r.item,
+                   coalesce(q.country_of_origin, '') AS country_of_origin,
+                   q.supplier_id,
+                   date_trunc('month', q.date_submitted AT TIME ZONE 'UTC')::date AS month,
+                   floor(ln(q.price_per_pound::float8) / ln(1.05::float8))::int::text AS bucket,
+                   count(*) AS bucket_count,
+                   sum(q.price_per_pound) AS bucket_sum,
+                   min(q.price_per_pound) AS bucket_min,
+                   max(q.price_per_pound) AS bucket_max
+            FROM quotes q
+            JOIN rfqs r ON r.id = q.rfq_id
+            WHERE q.price_per_pound > 0 AND q.date_submitted IS NOT NULL
+            GROUP BY 1, 2, 3, 4, 5
+        ) AS buckets
+        GROUP BY item, country_of_origin, supplier_id, month
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_quotes_date_submitted_brin', table_name='quotes', postgresql_using='brin')
+    op.drop_table('quote_price_rollups')
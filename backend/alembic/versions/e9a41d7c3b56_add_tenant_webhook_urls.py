@@ -0,0 +1,36 @@
+"""add per-tenant webhook endpoints
+
+Each tenant's change events go only to its own endpoints (tenants.webhook_urls);
+WEBHOOK_URLS now names the default tenant's. Outbox claims are per tenant and
+endpoint, so their index leads with tenant_id.
+
+Revision ID: e9a41d7c3b56
+Revises: c2e8f4a6b913
+Create Date: 2026-10-20 10:41:08.773215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9a41d7c3b56'
+down_revision: Union[str, Sequence[str], None] = 'c2e8f4a6b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tenants', sa.Column('webhook_urls', postgresql.ARRAY(sa.String()), nullable=True))
+    op.create_index('ix_outbox_events_tenant_id_endpoint_id', 'outbox_events', ['tenant_id', 'endpoint', 'id'], unique=False)
+    op.drop_index('ix_outbox_events_endpoint_id', table_name='outbox_events')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_outbox_events_endpoint_id', 'outbox_events', ['endpoint', 'id'], unique=False)
+    op.drop_index('ix_outbox_events_tenant_id_endpoint_id', table_name='outbox_events')
+    op.drop_column('tenants', 'webhook_urls')
@@ -0,0 +1,174 @@
+"""add tenants and scope every table to one
+
+Adds the tenants table and a tenant_id column to every buyer-owned table;
+existing rows belong to the 'default' tenant. Names and contact emails become
+unique per tenant, rollups and idempotency keys are keyed by tenant first, and
+llm_calls is rebuilt hash-partitioned by tenant, with its ids moved from an
+identity column to a sequence (partitioned tables can't have identity columns
+before Postgres 17). The ledger rows are copied under an exclusive lock, so run
+this in a quiet window on a large ledger.
+
+Downgrading only works while every row still belongs to one tenant.
+
+Revision ID: f47b2c9e1a85
+Revises: d31a7c5e9f02
+Create Date: 2026-10-20 04:27:51.906314
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f47b2c9e1a85'
+down_revision: Union[str, Sequence[str], None] = 'd31a7c5e9f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TENANT_TABLES = [
+    'certifications', 'suppliers', 'rfqs', 'quotes', 'emails', 'email_archive',
+    'quote_price_rollups', 'outbox_events', 'idempotency_keys',
+]
+
+LLM_CALL_COLUMNS = (
+    'call_id, called_at, operation, model, outcome, input_tokens, output_tokens, latency_ms, cost_usd, '
+    'email_id, quote_id, rfq_id, supplier_id'
+)
+
+# Same as LLM_CALLS_PARTITIONS_DDL in app/models.py
+LLM_CALLS_PARTITIONS = """
+    DO $$
+    BEGIN
+        FOR remainder IN 0..7 LOOP
+            EXECUTE format('CREATE TABLE llm_calls_p%s PARTITION OF llm_calls FOR VALUES WITH (MODULUS 8, REMAINDER %s)',
+                           remainder, remainder);
+        END LOOP;
+    END $$
+"""
+
+# Mirrors LLM_CALLS_GUARD_TRIGGER_DDL in app/models.py; the function already exists
+LLM_CALLS_GUARD_TRIGGER = """
+    CREATE TRIGGER llm_calls_append_only BEFORE UPDATE OR DELETE ON llm_calls
+        FOR EACH STATEMENT EXECUTE FUNCTION reject_llm_call_changes()
+"""
+
+
+def _llm_call_columns(id_column: sa.Column) -> list:
+    return [
+        id_column,
+        sa.Column('call_id', postgresql.UUID(), nullable=False),
+        sa.Column('called_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('operation', sa.String(), nullable=False),
+        sa.Column('model', sa.String(), nullable=False),
+        sa.Column('outcome', sa.String(), nullable=False),
+        sa.Column('input_tokens', sa.Integer(), nullable=False),
+        sa.Column('output_tokens', sa.Integer(), nullable=False),
+        sa.Column('latency_ms', sa.Float(), nullable=False),
+        sa.Column('cost_usd', sa.Numeric(precision=14, scale=8), nullable=False),
+        sa.Column('email_id', postgresql.UUID(), nullable=True),
+        sa.Column('quote_id', postgresql.UUID(), nullable=True),
+        sa.Column('rfq_id', postgresql.UUID(), nullable=True),
+        sa.Column('supplier_id', postgresql.UUID(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tenants',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('llm_share', sa.Float(), nullable=True),
+    sa.Column('db_share', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO tenants (id, name) VALUES ('default', 'Default')")
+
+    for table in TENANT_TABLES:
+        # A constant default fills existing rows without rewriting the table
+        op.add_column(table, sa.Column('tenant_id', sa.String(length=64), server_default='default', nullable=False))
+        op.alter_column(table, 'tenant_id', server_default=None)
+        # NOT VALID skips the scan under the exclusive lock; validating takes a lock writes don't wait on
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_tenant_id_fkey FOREIGN KEY (tenant_id) REFERENCES tenants (id) NOT VALID")
+        op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_tenant_id_fkey")
+
+    op.drop_constraint('certifications_name_key', 'certifications', type_='unique')
+    op.create_unique_constraint('uq_certifications_tenant_id_name', 'certifications', ['tenant_id', 'name'])
+    op.drop_constraint('suppliers_company_name_key', 'suppliers', type_='unique')
+    op.drop_constraint('suppliers_contact_email_key', 'suppliers', type_='unique')
+    op.create_unique_constraint('uq_suppliers_tenant_id_company_name', 'suppliers', ['tenant_id', 'company_name'])
+    op.create_unique_constraint('uq_suppliers_contact_email_tenant_id', 'suppliers', ['contact_email', 'tenant_id'])
+    op.create_index('ix_rfqs_tenant_id_due_date', 'rfqs', ['tenant_id', 'due_date'], unique=False)
+    op.create_index('ix_quotes_tenant_id_date_submitted', 'quotes', ['tenant_id', 'date_submitted'], unique=False)
+
+    op.drop_constraint('quote_price_rollups_pkey', 'quote_price_rollups', type_='primary')
+    op.create_primary_key('quote_price_rollups_pkey', 'quote_price_rollups', ['tenant_id', 'item', 'country_of_origin', 'supplier_id', 'month'])
+    op.drop_constraint('idempotency_keys_pkey', 'idempotency_keys', type_='primary')
+    op.create_primary_key('idempotency_keys_pkey', 'idempotency_keys', ['tenant_id', 'key'])
+
+    # llm_calls: rebuilt hash-partitioned by tenant
+    op.execute("LOCK TABLE llm_calls IN EXCLUSIVE MODE")  # Reads continue; the ledger's writes wait for the swap
+    op.drop_index('ix_llm_calls_called_at_brin', table_name='llm_calls', postgresql_using='brin')
+    op.drop_index('ix_llm_calls_quote_id', table_name='llm_calls')
+    op.rename_table('llm_calls', 'llm_calls_unpartitioned')
+    op.create_table('llm_calls',
+    *_llm_call_columns(sa.Column('id', sa.BigInteger(), nullable=False)),
+    sa.Column('tenant_id', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'tenant_id', name='llm_calls_partitioned_pkey'),
+    postgresql_partition_by='HASH (tenant_id)'
+    )
+    op.execute(LLM_CALLS_PARTITIONS)
+    op.execute(f"""
+        INSERT INTO llm_calls (id, tenant_id, {LLM_CALL_COLUMNS})
+        SELECT id, 'default', {LLM_CALL_COLUMNS} FROM llm_calls_unpartitioned
+    """)
+    op.drop_table('llm_calls_unpartitioned')  # Drops its identity sequence too
+    op.execute("ALTER TABLE llm_calls RENAME CONSTRAINT llm_calls_partitioned_pkey TO llm_calls_pkey")
+    op.execute("CREATE SEQUENCE llm_calls_id_seq OWNED BY llm_calls.id")
+    op.execute("SELECT setval('llm_calls_id_seq', coalesce((SELECT max(id) FROM llm_calls), 0) + 1, false)")
+    op.execute("ALTER TABLE llm_calls ALTER COLUMN id SET DEFAULT nextval('llm_calls_id_seq')")
+    op.create_index('ix_llm_calls_tenant_id_called_at', 'llm_calls', ['tenant_id', 'called_at'], unique=False)
+    op.create_index('ix_llm_calls_quote_id', 'llm_calls', ['quote_id'], unique=False)
+    op.execute(LLM_CALLS_GUARD_TRIGGER)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("LOCK TABLE llm_calls IN EXCLUSIVE MODE")
+    op.drop_index('ix_llm_calls_quote_id', table_name='llm_calls')
+    op.drop_index('ix_llm_calls_tenant_id_called_at', table_name='llm_calls')
+    op.rename_table('llm_calls', 'llm_calls_partitioned')
+    op.create_table('llm_calls',
+    *_llm_call_columns(sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False)),
+    sa.PrimaryKeyConstraint('id', name='llm_calls_unpartitioned_pkey')
+    )
+    op.execute(f"""
+        INSERT INTO llm_calls (id, {LLM_CALL_COLUMNS})
+        SELECT id, {LLM_CALL_COLUMNS} FROM llm_calls_partitioned
+    """)
+    op.drop_table('llm_calls_partitioned')  # Drops its partitions and sequence too
+    op.execute("ALTER TABLE llm_calls RENAME CONSTRAINT llm_calls_unpartitioned_pkey TO llm_calls_pkey")
+    op.execute("SELECT setval(pg_get_serial_sequence('llm_calls', 'id'), coalesce((SELECT max(id) FROM llm_calls), 0) + 1, false)")
+    op.create_index('ix_llm_calls_called_at_brin', 'llm_calls', ['called_at'], unique=False, postgresql_using='brin')
+    op.create_index('ix_llm_calls_quote_id', 'llm_calls', ['quote_id'], unique=False)
+    op.execute(LLM_CALLS_GUARD_TRIGGER)
+
+    op.drop_constraint('idempotency_keys_pkey', 'idempotency_keys', type_='primary')
+    op.create_primary_key('idempotency_keys_pkey', 'idempotency_keys', ['key'])
+    op.drop_constraint('quote_price_rollups_pkey', 'quote_price_rollups', type_='primary')
+    op.create_primary_key('quote_price_rollups_pkey', 'quote_price_rollups', ['item', 'country_of_origin', 'supplier_id', 'month'])
+
+    op.drop_index('ix_quotes_tenant_id_date_submitted', table_name='quotes')
+    op.drop_index('ix_rfqs_tenant_id_due_date', table_name='rfqs')
+    op.drop_constraint('uq_suppliers_contact_email_tenant_id', 'suppliers', type_='unique')
+    op.drop_constraint('uq_suppliers_tenant_id_company_name', 'suppliers', type_='unique')
+    op.create_unique_constraint('suppliers_contact_email_key', 'suppliers', ['contact_email'])
+    op.create_unique_constraint('suppliers_company_name_key', 'suppliers', ['company_name'])
+    op.drop_constraint('uq_certifications_tenant_id_name', 'certifications', type_='unique')
+    op.create_unique_constraint('certifications_name_key', 'certifications', ['name'])
+
+    for table in reversed(TENANT_TABLES):
+        op.drop_column(table, 'tenant_id')  # Drops its foreign key too
+    op.drop_table('tenants')
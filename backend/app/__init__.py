@@ -1,24 +1,51 @@
 # app/__init__.py
 
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.config import config
-from app.services.database import sessionmanager
+# Nothing is imported at module level: every `import app.services.x` runs this file first, and the
+# sandboxed attachment parsers and mailbox parse workers must not pull in the web stack with it.
 
 def init_app(init_db=True):
+    from contextlib import asynccontextmanager
+
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from app.config import config
+    from app.services.database import sessionmanager
+    from app.services.quote_events import quote_event_broker
+    from app.services.tenancy import TenantMiddleware
+
     lifespan = None
 
     if init_db:
-        sessionmanager.init(config.DB_CONFIG)
+        sessionmanager.init(config.DB_CONFIG, pool_size=config.DB_POOL_SIZE, max_overflow=config.DB_MAX_OVERFLOW, pool_pre_ping=True)
 
         @asynccontextmanager
         async def lifespan(app: FastAPI):
+            from app.services.llm_client import init_llm_client, llm_limiter
+            from app.services.llm_ledger import llm_ledger
+            from app.services.outbox import outbox_dispatcher
+
+            init_llm_client()
+            llm_limiter.configure(config.LLM_WORKER_CONCURRENCY)
+            await sessionmanager.warm(config.DB_POOL_SIZE)
+            await quote_event_broker.start(config.DB_CONFIG)
+            llm_ledger.start()
+            outbox_dispatcher.start()  # Any tenant may have webhook endpoints
+            app.state.ready = True
             yield
+            app.state.ready = False
+            await llm_limiter.drain(config.SHUTDOWN_GRACE_SECONDS)
+            await llm_ledger.stop()  # After the drain, so the last calls' rows are written too
+            await outbox_dispatcher.stop()
+            await quote_event_broker.stop()
             if sessionmanager._engine is not None:
                 await sessionmanager.close()
 
     server = FastAPI(title="Waystation RFQ API", lifespan=lifespan)
+    server.state.ready = False  # Flipped by the lifespan once pools are warm; see /health/ready
+
+    # Every /api request runs as the tenant its API key belongs to (added first, so CORS wraps it and answers preflights)
+    server.add_middleware(TenantMiddleware)
     
     # Add CORS middleware to allow requests from your frontend
     server.add_middleware(
@@ -32,10 +59,13 @@ def init_app(init_db=True):
     )
     
     # Import and include all your routers
-    from app.views import quotes, rfqs, suppliers
+    from app.views import analytics, emails, health, quotes, rfqs, suppliers
 
+    server.include_router(health.router)
     server.include_router(suppliers.router, prefix="/api")
     server.include_router(rfqs.router, prefix="/api")
     server.include_router(quotes.router, prefix="/api")
+    server.include_router(emails.router, prefix="/api")
+    server.include_router(analytics.router, prefix="/api")
 
     return server
\ No newline at end of file
@@ -23,4 +23,95 @@ class Config:
         f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     )
 
+    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+
+    # --- Process layout (serve.py) ---
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0"))  # Worker processes; 0 = one per CPU
+    SHUTDOWN_GRACE_SECONDS = float(os.getenv("SHUTDOWN_GRACE_SECONDS", "90"))  # Long enough for an in-flight LLM call
+
+    # --- Per-process pool sizes. serve.py derives them from the deployment-wide budgets below ---
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "80"))  # Across all workers; keep under Postgres max_connections
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))  # Across all workers; the provider's rate limit
+    LLM_WORKER_CONCURRENCY = LLM_MAX_CONCURRENCY
+    DB_CONNECTIONS_OUTSIDE_POOL = 1  # Per worker: the quote event broker's LISTEN connection
+
+    @classmethod
+    def size_for_workers(cls, workers: int) -> None:
+        """Splits the deployment-wide DB connection and LLM budgets evenly across worker processes."""
+        cls.DB_POOL_SIZE = max(1, cls.DB_MAX_CONNECTIONS // workers - cls.DB_CONNECTIONS_OUTSIDE_POOL)
+        cls.DB_MAX_OVERFLOW = 0  # Overflow would let the workers together exceed the budget
+        cls.LLM_WORKER_CONCURRENCY = max(1, cls.LLM_MAX_CONCURRENCY // workers)
+
+    # --- Tenants (app/services/tenancy.py): each buyer organization sees only its own data ---
+    DEFAULT_TENANT_ID = os.getenv("DEFAULT_TENANT_ID", "default")  # Scripts and pre-tenancy rows; API requests are the tenant of their API key
+    TENANT_LLM_SHARE = float(os.getenv("TENANT_LLM_SHARE", "0.5"))  # Of this worker's LLM concurrency one tenant may hold; tenants.llm_share overrides
+    TENANT_DB_SHARE = float(os.getenv("TENANT_DB_SHARE", "0.5"))  # Of this worker's DB connections one tenant may hold; tenants.db_share overrides
+    TENANT_CACHE_SECONDS = float(os.getenv("TENANT_CACHE_SECONDS", "60"))  # How long a tenant's settings are reused before re-reading them
+
+    # --- LLM model cascade (app/services/llm_cascade.py): cheapest tier first, escalate when unsure ---
+    LLM_MODEL_TIERS = [m.strip() for m in os.getenv(
+        "LLM_MODEL_TIERS", "models/gemini-1.5-flash-8b,models/gemini-1.5-flash,models/gemini-1.5-pro"
+    ).split(",") if m.strip()]
+    LLM_ESCALATION_CONFIDENCE = float(os.getenv("LLM_ESCALATION_CONFIDENCE", "0.8"))  # Below this a stronger tier is asked
+    LLM_TIER_TIMEOUT_SECONDS = float(os.getenv("LLM_TIER_TIMEOUT_SECONDS", "30"))  # Per attempt; counts as a failure
+    LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))  # Consecutive failures that open a tier's circuit
+    LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))  # Before a probe call is let through
+
+    # --- Request hedging (app/services/hedging.py): a duplicate call when one runs past the usual latency ---
+    LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))  # Of the tier's recent latency; 0 turns hedging off
+    LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "50"))  # Calls a tier needs before its percentile is trusted
+    LLM_HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0.05"))  # Extra calls per call at most, across all tiers
+    LLM_HEDGE_HOLDBACK = float(os.getenv("LLM_HEDGE_HOLDBACK", "0.05"))  # Share of calls never hedged, to measure the gain against
+
+    # --- LLM call ledger (app/services/llm_ledger.py): every model call, written in the background ---
+    LLM_LEDGER_BATCH_SIZE = int(os.getenv("LLM_LEDGER_BATCH_SIZE", "200"))  # Rows per insert
+    LLM_LEDGER_FLUSH_SECONDS = float(os.getenv("LLM_LEDGER_FLUSH_SECONDS", "2"))  # Longest a recorded call waits to be written
+    LLM_LEDGER_MAX_PENDING = int(os.getenv("LLM_LEDGER_MAX_PENDING", "10000"))  # Unwritten rows kept while the database is down
+
+    # --- Webhook outbox (app/services/outbox.py): quote and RFQ changes pushed to downstream systems ---
+    WEBHOOK_URLS = [u.strip() for u in os.getenv("WEBHOOK_URLS", "").split(",") if u.strip()]  # The default tenant's endpoints; other tenants' are tenants.webhook_urls
+    WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "100"))  # Events per delivery
+    WEBHOOK_POLL_SECONDS = float(os.getenv("WEBHOOK_POLL_SECONDS", "1"))  # For events committed by other processes; local commits wake the dispatcher
+    WEBHOOK_TIMEOUT_SECONDS = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10"))  # Per delivery
+    WEBHOOK_RETRY_BASE_SECONDS = float(os.getenv("WEBHOOK_RETRY_BASE_SECONDS", "1"))  # Doubles with every failed attempt...
+    WEBHOOK_RETRY_MAX_SECONDS = float(os.getenv("WEBHOOK_RETRY_MAX_SECONDS", "300"))  # ...up to this; events are retried until delivered
+
+    # --- Response cache: memory:// (per-process LRU) or redis://host:port/db (shared) ---
+    RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "memory://")
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+
+    # --- Supplier resolution: reuse an existing supplier when a new contact writes in ---
+    SUPPLIER_MATCH_THRESHOLD = float(os.getenv("SUPPLIER_MATCH_THRESHOLD", "0.8"))  # Minimum confidence to reuse a supplier
+    SUPPLIER_CANDIDATE_LIMIT = int(os.getenv("SUPPLIER_CANDIDATE_LIMIT", "50"))  # Suppliers scored per lookup
+
+    # --- Idempotency-Key handling ---
+    IDEMPOTENCY_KEY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))  # Completed responses replay for this long
+    IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS = float(os.getenv("IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS", "300"))  # Then a crashed request's claim is taken over
+
+    # --- Email normalization before the LLM (app/services/email_normalizer.py) ---
+    LLM_INPUT_TOKEN_BUDGET = int(os.getenv("LLM_INPUT_TOKEN_BUDGET", "1500"))  # Email text per extraction call, after stripping history
+
+    # --- Attachments (CSV/XLSX/PDF price sheets), parsed in sandboxed worker processes ---
+    ATTACHMENT_WORKERS = int(os.getenv("ATTACHMENT_WORKERS", "2"))  # Concurrent parsing processes per web worker
+    ATTACHMENT_TIMEOUT_SECONDS = float(os.getenv("ATTACHMENT_TIMEOUT_SECONDS", "15"))
+    ATTACHMENT_MEMORY_LIMIT_MB = int(os.getenv("ATTACHMENT_MEMORY_LIMIT_MB", "512"))
+    ATTACHMENT_MAX_BYTES = int(os.getenv("ATTACHMENT_MAX_BYTES", str(10 * 1024 * 1024)))  # Larger files are skipped unread
+    ATTACHMENT_MAX_ROWS = int(os.getenv("ATTACHMENT_MAX_ROWS", "5000"))  # Per sheet
+    ATTACHMENT_MAX_PDF_PAGES = int(os.getenv("ATTACHMENT_MAX_PDF_PAGES", "30"))
+    ATTACHMENT_MAX_TEXT_CHARS = int(os.getenv("ATTACHMENT_MAX_TEXT_CHARS", "20000"))  # Attachment text sent to the LLM
+
+    # --- Mailbox ingestion (scripts/ingest_mailbox.py) ---
+    MAIL_INGEST_BATCH_SIZE = int(os.getenv("MAIL_INGEST_BATCH_SIZE", "50"))  # Messages parsed, extracted and checkpointed together
+    MAIL_INGEST_WORKERS = int(os.getenv("MAIL_INGEST_WORKERS", "0"))  # MIME parsing processes; 0 = one per CPU
+
+    # --- Email archival (scripts/archive_emails.py) ---
+    EMAIL_ARCHIVE_GRACE_DAYS = int(os.getenv("EMAIL_ARCHIVE_GRACE_DAYS", "30"))  # After an RFQ's due_date
+    EMAIL_HOT_MONTHS = int(os.getenv("EMAIL_HOT_MONTHS", "12"))  # Older monthly partitions are archived whole
+    EMAIL_PARTITIONS_AHEAD = int(os.getenv("EMAIL_PARTITIONS_AHEAD", "3"))
+    EMAIL_ARCHIVE_BATCH_SIZE = int(os.getenv("EMAIL_ARCHIVE_BATCH_SIZE", "1000"))
+
 config = Config
\ No newline at end of file
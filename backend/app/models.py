@@ -3,49 +3,151 @@
 from __future__ import annotations
 
 import datetime
-from uuid import uuid4
+import hashlib
+import re
+from uuid import UUID, uuid4
 
 from sqlalchemy import (
+    DDL,
+    BigInteger,
     Column,
+    Computed,
+    Date,
     DateTime,
     Float,
     ForeignKey,
+    Identity,
+    Index,
     Integer,
     Numeric,
+    Sequence,
     String,
     Table,
     Text,
+    TypeDecorator,
     UniqueConstraint,
+    event,
+    func,
+    literal,
     select,
+    union_all,
 )
-from sqlalchemy.dialects.postgresql import JSONB  # For storing structured LLM output
+from sqlalchemy.dialects.postgresql import (
+    ARRAY,
+    JSONB,  # For storing structured LLM output
+    TSVECTOR,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import relationship, selectinload
+from sqlalchemy.orm import Session, declared_attr, relationship, selectinload, with_loader_criteria
 
+from app.config import config
 from app.services.database import Base
+from app.services.tenancy import current_tenant, tenant_filter, tenant_key
+
+
+HEX_ID = re.compile(r"[0-9a-f]{32}")  # The API's id format: what generate_uuid() returns
 
 
 def generate_uuid():
     return uuid4().hex
 
+
+class HexUUID(TypeDecorator):
+    """
+    Native Postgres uuid column (16 bytes, binary comparisons) that keeps the API's
+    32-character hex string format on the Python side.
+    """
+    impl = PG_UUID(as_uuid=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, UUID):
+            return value
+        # Only the canonical spelling: the views key caches, ETags and event streams by the id as given,
+        # so a dashed or uppercase alias must 404 rather than find the row under keys nothing updates.
+        # A malformed id can't match any row; binding NULL lets lookups fall through to the usual 404
+        if not isinstance(value, str) or not HEX_ID.fullmatch(value):
+            return None
+        return UUID(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else value.hex
+
+
+class Tenant(Base):
+    """A buyer organization. Every TenantScoped row belongs to one; see app/services/tenancy.py."""
+    __tablename__ = "tenants"
+    id = Column(String(64), primary_key=True)  # e.g. "acme-foods"
+    name = Column(String, nullable=False)
+    api_key_hash = Column(String(64), unique=True)  # hash_api_key() of the key its requests authenticate with; None: no API access
+    llm_share = Column(Float)  # Overrides config.TENANT_LLM_SHARE for this tenant
+    db_share = Column(Float)  # Overrides config.TENANT_DB_SHARE for this tenant
+    webhook_urls = Column(ARRAY(String))  # Receive this tenant's change events (app/services/outbox.py); None: no webhooks
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    @classmethod
+    async def create(cls, db: AsyncSession, **kwargs) -> Tenant:
+        tenant = cls(**kwargs)
+        db.add(tenant)
+        await db.commit()
+        return tenant
+
+
+# Rows written before tenants existed, and scripts run without --tenant, belong to the default tenant
+DEFAULT_TENANT_DDL = f"INSERT INTO tenants (id, name) VALUES ('{config.DEFAULT_TENANT_ID}', 'Default')"
+
+event.listen(Tenant.__table__, "after_create", DDL(DEFAULT_TENANT_DDL))
+
+
+class TenantScoped:
+    """
+    Mixin for rows owned by one tenant. New rows get the current tenant, and ORM queries only
+    see its rows (_scope_to_tenant below); raw SQL has to filter on tenant_id itself.
+    """
+
+    @declared_attr
+    def tenant_id(cls):
+        return Column(String(64), ForeignKey("tenants.id"), nullable=False, default=current_tenant)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_to_tenant(state) -> None:
+    """Adds `tenant_id = <current tenant>` for every TenantScoped entity a SELECT, UPDATE or DELETE touches."""
+    if not (state.is_select or state.is_update or state.is_delete):
+        return
+    if state.is_column_load or state.is_relationship_load:
+        return  # Already carry the criteria of the query that loaded the parent
+    tenant_id = tenant_filter()
+    if tenant_id is None:
+        return
+    state.statement = state.statement.options(
+        with_loader_criteria(TenantScoped, lambda cls: cls.tenant_id == tenant_id, include_aliases=True)
+    )
+
+
 # Association table for RFQ -> Certification (Many-to-Many)
 rfq_certification_association = Table(
     'rfq_certifications', Base.metadata,
-    Column('rfq_id', String, ForeignKey('rfqs.id'), primary_key=True),
-    Column('certification_id', String, ForeignKey('certifications.id'), primary_key=True)
+    Column('rfq_id', HexUUID, ForeignKey('rfqs.id'), primary_key=True),
+    Column('certification_id', HexUUID, ForeignKey('certifications.id'), primary_key=True, index=True)
 )
 
 # Association table for Quote -> Certification (Many-to-Many)
 quote_certification_association = Table(
     'quote_certifications', Base.metadata,
-    Column('quote_id', String, ForeignKey('quotes.id'), primary_key=True),
-    Column('certification_id', String, ForeignKey('certifications.id'), primary_key=True)
+    Column('quote_id', HexUUID, ForeignKey('quotes.id'), primary_key=True),
+    Column('certification_id', HexUUID, ForeignKey('certifications.id'), primary_key=True, index=True)
 )
 
-class Certification(Base):
+class Certification(TenantScoped, Base):
     __tablename__ = "certifications"
-    id = Column(String, primary_key=True, default=generate_uuid)
-    name = Column(String, nullable=False, unique=True)
+    id = Column(HexUUID, primary_key=True, default=generate_uuid)
+    name = Column(String, nullable=False)
+
+    __table_args__ = (UniqueConstraint("tenant_id", "name", name="uq_certifications_tenant_id_name"),)
 
     @classmethod
     async def find_by_names(cls, db: AsyncSession, names: list[str]) -> list[Certification]:
@@ -55,22 +157,40 @@ class Certification(Base):
         result = await db.execute(select(cls).where(cls.name.in_(names)))
         return result.scalars().all()
 
-class Supplier(Base):
+class Supplier(TenantScoped, Base):
     __tablename__ = "suppliers"
-    id = Column(String, primary_key=True, default=generate_uuid)
-    company_name = Column(String, nullable=False, unique=True)
+    id = Column(HexUUID, primary_key=True, default=generate_uuid)
+    company_name = Column(String, nullable=False)
     contact_name = Column(String)
-    contact_email = Column(String, nullable=False, unique=True)
+    contact_email = Column(String, nullable=False)
     contact_phone = Column(String)
     hq_address = Column(String)
     payment_terms = Column(String)
-    
+
+    # Blocking keys for supplier resolution (app/services/supplier_resolver.py), maintained by Postgres.
+    # name_tokens must tokenize the way supplier_resolver.name_tokens does.
+    email_domain = Column(String, Computed("lower(split_part(contact_email, '@', 2))", persisted=True))
+    name_tokens = Column(
+        ARRAY(Text),
+        Computed("regexp_split_to_array(trim(regexp_replace(lower(company_name), '[^a-z0-9]+', ' ', 'g')), ' ')", persisted=True),
+    )
+
+    __table_args__ = (
+        # Unique per tenant. The tenant leads the name key, which also serves listing a tenant's suppliers;
+        # the email leads its own, since supplier resolution looks senders up by email among OR'ed keys
+        UniqueConstraint("tenant_id", "company_name", name="uq_suppliers_tenant_id_company_name"),
+        UniqueConstraint("contact_email", "tenant_id", name="uq_suppliers_contact_email_tenant_id"),
+        Index("ix_suppliers_email_domain", "email_domain"),
+        Index("ix_suppliers_name_tokens", "name_tokens", postgresql_using="gin"),
+    )
+
     quotes = relationship("Quote", back_populates="supplier")
 
     @classmethod
     async def create(cls, db: AsyncSession, **kwargs) -> Supplier:
         supplier = cls(**kwargs)
         db.add(supplier)
+        await ResourceVersion.bump(db, ResourceVersion.SUPPLIERS)
         await db.commit()
         await db.refresh(supplier)
         return supplier
@@ -89,17 +209,21 @@ class Supplier(Base):
         if supplier:
             for key, value in kwargs.items():
                 setattr(supplier, key, value)
+            await ResourceVersion.bump(db, ResourceVersion.SUPPLIERS)
             await db.commit()
             await db.refresh(supplier)
         return supplier
 
-class RFQ(Base):
+class RFQ(TenantScoped, Base):
     __tablename__ = "rfqs"
-    id = Column(String, primary_key=True, default=generate_uuid)
+    id = Column(HexUUID, primary_key=True, default=generate_uuid)
     item = Column(String, nullable=False)
     due_date = Column(DateTime(timezone=True)) 
     amount_required_lbs = Column(Float)
     ship_to_location = Column(String)
+
+    # A tenant's RFQs, in due date order (the list endpoint, open RFQs for routing)
+    __table_args__ = (Index("ix_rfqs_tenant_id_due_date", "tenant_id", "due_date"),)
     
     required_certifications = relationship("Certification", secondary=rfq_certification_association)
 
@@ -109,6 +233,8 @@ class RFQ(Base):
     async def create(cls, db: AsyncSession, **kwargs) -> RFQ:
         rfq = cls(**kwargs)
         db.add(rfq)
+        await db.flush()
+        await ResourceVersion.bump(db, ResourceVersion.RFQS, ResourceVersion.rfq_key(rfq.id))
         await db.commit()
         await db.refresh(rfq)
         return rfq
@@ -118,16 +244,34 @@ class RFQ(Base):
         query = select(cls).options(selectinload(cls.required_certifications))
         return (await db.execute(query)).scalars().all()
 
-class Quote(Base):
+    @classmethod
+    async def find_open(cls, db: AsyncSession, as_of: datetime.datetime) -> list[RFQ]:
+        """Every RFQ still open at `as_of`, closing soonest first."""
+        query = (
+            select(cls)
+            .where((cls.due_date.is_(None)) | (cls.due_date >= as_of))
+            .order_by(cls.due_date.asc().nulls_last(), cls.id)
+        )
+        return list((await db.execute(query)).scalars().all())
+
+
+class Quote(TenantScoped, Base):
     __tablename__ = "quotes"
-    id = Column(String, primary_key=True, default=generate_uuid)
-    date_submitted = Column(DateTime(timezone=True), default=datetime.datetime.now(datetime.UTC))
-    supplier_id = Column(String, ForeignKey("suppliers.id"), nullable=False)
-    price_per_pound = Column(Numeric(10, 2))
+    id = Column(HexUUID, primary_key=True, default=generate_uuid)
+    date_submitted = Column(DateTime(timezone=True), default=lambda: datetime.datetime.now(datetime.UTC))
+    supplier_id = Column(HexUUID, ForeignKey("suppliers.id"), nullable=False)
+    price_per_pound = Column(Numeric(10, 2))  # Canonical USD/lb, converted from the price as quoted below
     country_of_origin = Column(String)
     min_order_quantity = Column(Integer)
+
+    # The price as the supplier quoted it (e.g. 850 EUR per mt), and the conversion table version
+    # price_per_pound was computed with; see app/services/price_conversion.py
+    price_amount = Column(Numeric(14, 4))
+    price_currency = Column(String(8))
+    price_unit = Column(String(16))
+    conversion_version = Column(Integer)
     
-    rfq_id = Column(String, ForeignKey("rfqs.id"), nullable=False)
+    rfq_id = Column(HexUUID, ForeignKey("rfqs.id"), nullable=False, index=True)  # The unique (supplier_id, rfq_id) index can't serve rfq-only lookups
 
     certifications = relationship("Certification", secondary=quote_certification_association)
     
@@ -135,7 +279,13 @@ class Quote(Base):
     rfq = relationship("RFQ", back_populates="quotes")
     emails = relationship("Email", back_populates="quote") # Relationship to the Email log
 
-    __table_args__ = (UniqueConstraint('supplier_id', 'rfq_id', name='_supplier_rfq_uc'),)
+    __table_args__ = (
+        UniqueConstraint('supplier_id', 'rfq_id', name='_supplier_rfq_uc'),
+        # Quotes are appended roughly in submission order, so a tiny BRIN index serves date range scans
+        Index("ix_quotes_date_submitted_brin", "date_submitted", postgresql_using="brin"),
+        # A tenant's quotes, newest first (the master list)
+        Index("ix_quotes_tenant_id_date_submitted", "tenant_id", "date_submitted"),
+    )
     
     @classmethod
     async def get_by_rfq_id(cls, db: AsyncSession, rfq_id: str) -> list[Quote]:
@@ -147,11 +297,419 @@ class Quote(Base):
         result = await db.execute(query)
         return result.scalars().all()
 
-class Email(Base):
+class EmailBody(Base):
+    """
+    Content-addressed email text. Identical bodies are stored once and shared by
+    every Email that references them; Postgres compresses large bodies with lz4.
+    """
+    __tablename__ = "email_bodies"
+    content_hash = Column(String(64), primary_key=True)  # sha256 hex of the UTF-8 text
+    raw_text = Column(Text, nullable=False)
+
+    # Maintained by Postgres on every write; backs full-text search over email bodies
+    search_vector = Column(TSVECTOR, Computed("to_tsvector('english', raw_text)", persisted=True))
+
+    __table_args__ = (Index("ix_email_bodies_search_vector", "search_vector", postgresql_using="gin"),)
+
+    @staticmethod
+    def hash_text(raw_text: str) -> str:
+        return hashlib.sha256(raw_text.encode("utf-8")).hexdigest()
+
+    @classmethod
+    async def get_or_create(cls, db: AsyncSession, raw_text: str) -> EmailBody:
+        """Stores the body unless an identical one already exists. Safe under concurrent inserts."""
+        content_hash = cls.hash_text(raw_text)
+        stmt = pg_insert(cls).values(content_hash=content_hash, raw_text=raw_text)
+        await db.execute(stmt.on_conflict_do_nothing(index_elements=[cls.content_hash]))
+        # KEY SHARE keeps the archival job from deleting the body as an orphan before our email references it
+        query = select(cls).where(cls.content_hash == content_hash).with_for_update(key_share=True)
+        return (await db.execute(query)).scalar_one()
+
+    @classmethod
+    async def storage_report(cls, db: AsyncSession) -> dict:
+        """Compares what the email log would occupy without sharing or compression against what is actually stored."""
+        references = await db.execute(
+            select(func.count(Email.id), func.coalesce(func.sum(func.octet_length(cls.raw_text)), 0))
+            .join(cls, cls.content_hash == Email.body_hash)
+        )
+        email_count, logical_bytes = references.one()
+        bodies = await db.execute(
+            select(
+                func.count(cls.content_hash),
+                func.coalesce(func.sum(func.octet_length(cls.raw_text)), 0),
+                func.coalesce(func.sum(func.pg_column_size(cls.raw_text)), 0),  # On-disk size, after compression
+            ).where(cls.content_hash.in_(select(Email.body_hash)))  # Bodies are shared across tenants; count this one's
+        )
+        body_count, unique_bytes, stored_bytes = bodies.one()
+        return {
+            "email_count": email_count,
+            "unique_body_count": body_count,
+            "logical_bytes": logical_bytes,
+            "deduplicated_bytes": unique_bytes,
+            "stored_bytes": stored_bytes,
+            "saved_bytes": logical_bytes - stored_bytes,
+        }
+
+
+def lz4_compression_ddl(table: str, *columns: str) -> str:
+    """
+    SET COMPRESSION needs Postgres 14+ built with lz4, so it is attempted dynamically and skipped otherwise.
+    Returned as DDL() text: the %% is unescaped to % when the DDL is compiled.
+    """
+    alterations = ", ".join(f"ALTER COLUMN {column} SET COMPRESSION lz4" for column in columns)
+    return f"""
+DO $$
+BEGIN
+    EXECUTE 'ALTER TABLE {table} {alterations}';
+EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'lz4 column compression unavailable, keeping the server default: %%', SQLERRM;
+END $$
+"""
+
+
+# Prefer lz4 and compress bodies from 512 bytes up (default is ~2kB, which most emails never reach).
+EMAIL_BODY_TOAST_DDL = "ALTER TABLE email_bodies SET (toast_tuple_target = 512)"
+EMAIL_BODY_COMPRESSION_DDL = lz4_compression_ddl("email_bodies", "raw_text")
+
+event.listen(EmailBody.__table__, "after_create", DDL(EMAIL_BODY_TOAST_DDL))
+event.listen(EmailBody.__table__, "after_create", DDL(EMAIL_BODY_COMPRESSION_DDL))
+
+
+def _shared_body_required(raw_text: str) -> EmailBody:
+    # A fresh EmailBody would collide with an identical stored one on its content-hash key
+    raise TypeError("Email bodies are shared: add emails with Email.create(db, raw_text, ...) instead of setting raw_text")
+
+
+class Email(TenantScoped, Base):
+    """
+    One ingested supplier email. The table is range-partitioned by month on received_at, so
+    the partition key is part of the primary key; old months are archived by app/services/email_archive.py.
+    """
     __tablename__ = "emails"
-    id = Column(String, primary_key=True, default=generate_uuid)
+    id = Column(HexUUID, primary_key=True, default=generate_uuid)
+    received_at = Column(DateTime(timezone=True), primary_key=True, default=lambda: datetime.datetime.now(datetime.UTC))
+    extracted_data = Column(JSONB)
+    # Estimated LLM input tokens for this email, and how many normalization (or a price sheet) saved
+    input_tokens = Column(Integer)
+    input_tokens_saved = Column(Integer)
+
+    body_hash = Column(String(64), ForeignKey("email_bodies.content_hash"), nullable=False, index=True)
+    body = relationship("EmailBody", lazy="joined")
+    # Reads the shared body transparently; writes go through Email.create, which reuses an identical stored body
+    raw_text = association_proxy("body", "raw_text", creator=_shared_body_required)
+
+    quote_id = Column(HexUUID, ForeignKey("quotes.id"), nullable=False, index=True)
+    quote = relationship("Quote", back_populates="emails")
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (received_at)"}
+
+    @classmethod
+    async def create(cls, db: AsyncSession, raw_text: str, **kwargs) -> Email:
+        """Adds an email to the session, storing its body only if no identical one exists yet."""
+        email = cls(body=await EmailBody.get_or_create(db, raw_text), **kwargs)
+        db.add(email)
+        return email
+
+    @classmethod
+    async def audit_trail(cls, db: AsyncSession, quote_id: str) -> list[dict]:
+        """Every email behind a quote, oldest first, whether it is still hot or already archived."""
+        hot = (
+            select(cls.id, cls.received_at, EmailBody.raw_text, cls.extracted_data, literal("hot").label("storage"))
+            .join(EmailBody, EmailBody.content_hash == cls.body_hash)
+            .where(cls.quote_id == quote_id)
+        )
+        cold = select(
+            ArchivedEmail.id, ArchivedEmail.received_at, ArchivedEmail.raw_text, ArchivedEmail.extracted_data, literal("archived")
+        ).where(ArchivedEmail.quote_id == quote_id)
+        rows = (await db.execute(union_all(hot, cold).order_by("received_at", "id"))).mappings().all()
+
+        # A partition being archived is briefly in both places; prefer the hot copy
+        trail: dict[str, dict] = {}
+        for row in rows:
+            if row["id"] not in trail or row["storage"] == "hot":
+                trail[row["id"]] = dict(row)
+        return list(trail.values())
+
+
+# Monthly partitions are created ahead of time by ensure_email_partitions() (the archival job keeps
+# a few months ready); the default partition only catches stragglers such as very old imported mail.
+EMAIL_PARTITION_FUNCTION_DDL = """
+CREATE OR REPLACE FUNCTION ensure_email_partitions(first_month date, last_month date) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    partition_month date := date_trunc('month', first_month);
+BEGIN
+    WHILE partition_month <= last_month LOOP
+        BEGIN
+            EXECUTE 'CREATE TABLE IF NOT EXISTS ' || quote_ident('emails_' || to_char(partition_month, 'YYYY_MM'))
+                || ' PARTITION OF emails FOR VALUES FROM ('
+                || quote_literal(partition_month::timestamp AT TIME ZONE 'UTC') || ') TO ('
+                || quote_literal((partition_month + interval '1 month')::timestamp AT TIME ZONE 'UTC') || ')';
+        EXCEPTION WHEN check_violation THEN
+            -- That month already has rows in the default partition; they stay there until archived
+            RAISE NOTICE 'skipped emails_%%: rows already in emails_default', to_char(partition_month, 'YYYY_MM');
+        END;
+        partition_month := partition_month + interval '1 month';
+    END LOOP;
+END $$
+"""
+EMAIL_DEFAULT_PARTITION_DDL = "CREATE TABLE IF NOT EXISTS emails_default PARTITION OF emails DEFAULT"
+EMAIL_INITIAL_PARTITIONS_DDL = "SELECT ensure_email_partitions((current_date - 31)::date, (current_date + 93)::date)"
+
+event.listen(Email.__table__, "after_create", DDL(EMAIL_PARTITION_FUNCTION_DDL))
+event.listen(Email.__table__, "after_create", DDL(EMAIL_DEFAULT_PARTITION_DDL))
+event.listen(Email.__table__, "after_create", DDL(EMAIL_INITIAL_PARTITIONS_DDL))
+
+
+class ArchivedEmail(TenantScoped, Base):
+    """
+    Cold storage for emails of closed RFQs and of partitions past the hot window.
+    Rows carry their own body instead of sharing email_bodies, and are lz4-compressed.
+    """
+    __tablename__ = "email_archive"
+    id = Column(HexUUID, primary_key=True)
+    received_at = Column(DateTime(timezone=True), nullable=False)
+    quote_id = Column(HexUUID, ForeignKey("quotes.id"), nullable=False, index=True)
     raw_text = Column(Text, nullable=False)
     extracted_data = Column(JSONB)
-    
-    quote_id = Column(String, ForeignKey("quotes.id"), nullable=False)
-    quote = relationship("Quote", back_populates="emails")
\ No newline at end of file
+    archived_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+# Archived rows are rarely read, so compress anything over the 128-byte minimum
+EMAIL_ARCHIVE_TOAST_DDL = "ALTER TABLE email_archive SET (toast_tuple_target = 128)"
+
+event.listen(ArchivedEmail.__table__, "after_create", DDL(EMAIL_ARCHIVE_TOAST_DDL))
+event.listen(ArchivedEmail.__table__, "after_create", DDL(lz4_compression_ddl("email_archive", "raw_text", "extracted_data")))
+
+
+class QuotePriceRollup(TenantScoped, Base):
+    """
+    Pre-aggregated price_per_pound statistics per (tenant, RFQ item, country of origin, supplier, month).
+
+    Maintained incrementally by the quote processor; see app/services/price_analytics.py.
+    Unknown countries are stored as "" so the grouping key can be the primary key.
+    """
+    __tablename__ = "quote_price_rollups"
+    tenant_id = Column(String(64), ForeignKey("tenants.id"), primary_key=True, default=current_tenant)  # Leads the key: every read is one tenant's
+    item = Column(String, primary_key=True)
+    country_of_origin = Column(String, primary_key=True)
+    supplier_id = Column(HexUUID, ForeignKey("suppliers.id"), primary_key=True, index=True)  # Not leading in the key, so filtering by supplier alone needs its own index
+    month = Column(Date, primary_key=True)
+
+    quote_count = Column(Integer, nullable=False)
+    price_sum = Column(Numeric(14, 2), nullable=False)
+    price_min = Column(Numeric(10, 2), nullable=False)
+    price_max = Column(Numeric(10, 2), nullable=False)
+    price_histogram = Column(JSONB, nullable=False)  # Log-scale bucket index -> count, for percentiles
+
+
+class ConversionTableVersion(Base):
+    """One published set of conversion rates. Versions are never edited; new rates are a new version."""
+    __tablename__ = "conversion_table_versions"
+    version = Column(Integer, Identity(), primary_key=True)
+    source = Column(String, nullable=False)  # Where the FX rates came from, e.g. "ECB reference rates 2026-10-19"
+    published_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class ConversionRate(Base):
+    """
+    A conversion factor of one table version: USD per unit of a currency (kind "currency"),
+    or pounds per unit of weight (kind "unit").
+    """
+    __tablename__ = "conversion_rates"
+    version = Column(Integer, ForeignKey("conversion_table_versions.version"), primary_key=True)
+    kind = Column(String(8), primary_key=True)
+    code = Column(String(16), primary_key=True)
+    factor = Column(Numeric(24, 12), nullable=False)
+
+
+llm_call_ids = Sequence("llm_calls_id_seq")
+
+
+class LLMCall(TenantScoped, Base):
+    """
+    Append-only ledger of LLM calls, written in batches by app/services/llm_ledger.py. A call that
+    served several quotes has a row per quote sharing its call_id, with the tokens and cost split.
+    The ids carry no foreign keys: the ledger outlives archived emails and must not slow the writers.
+
+    The table is hash-partitioned by tenant (LLM_CALLS_PARTITIONS), so a tenant's cost reports read
+    one partition. Partitioned tables can't have identity columns before Postgres 17; ids come from
+    a plain sequence.
+    """
+    __tablename__ = "llm_calls"
+    id = Column(BigInteger, llm_call_ids, server_default=llm_call_ids.next_value(), primary_key=True)
+    tenant_id = Column(String(64), primary_key=True, default=current_tenant)  # The partition key must be in the primary key
+    call_id = Column(HexUUID, nullable=False)
+    called_at = Column(DateTime(timezone=True), nullable=False)
+    operation = Column(String, nullable=False)  # extract, extract_items, clarify
+    model = Column(String, nullable=False)
+    outcome = Column(String, nullable=False)  # served, rejected, invalid, error, timeout, cancelled
+    input_tokens = Column(Integer, nullable=False)
+    output_tokens = Column(Integer, nullable=False)
+    latency_ms = Column(Float, nullable=False)
+    cost_usd = Column(Numeric(14, 8), nullable=False)
+
+    email_id = Column(HexUUID)
+    quote_id = Column(HexUUID)
+    rfq_id = Column(HexUUID)
+    supplier_id = Column(HexUUID)
+
+    __table_args__ = (
+        # Every report is one tenant's calls over a date range. A BRIN index on called_at alone
+        # would be no use once tenants' rows interleave within a partition.
+        Index("ix_llm_calls_tenant_id_called_at", "tenant_id", "called_at"),
+        Index("ix_llm_calls_quote_id", "quote_id"),
+        {"postgresql_partition_by": "HASH (tenant_id)"},
+    )
+
+    REPORT_DIMENSIONS = ("model", "operation", "outcome", "rfq_id", "supplier_id", "day")
+
+    @classmethod
+    async def cost_report(
+        cls,
+        db: AsyncSession,
+        group_by: list[str],
+        start: datetime.datetime | None = None,
+        end: datetime.datetime | None = None,
+        **filters: str | None,
+    ) -> list[dict]:
+        """
+        Calls, tokens, cost and latency per group of `group_by` (any of REPORT_DIMENSIONS),
+        for calls in [start, end) matching `filters` (model, operation, outcome, rfq_id, supplier_id).
+        """
+        dimensions = {name: getattr(cls, name) for name in cls.REPORT_DIMENSIONS if name != "day"}
+        dimensions["day"] = func.date(func.timezone("UTC", cls.called_at))
+        grouped = [dimensions[name].label(name) for name in group_by]
+        query = select(
+            *grouped,
+            func.count(func.distinct(cls.call_id)).label("calls"),
+            func.sum(cls.input_tokens).label("input_tokens"),
+            func.sum(cls.output_tokens).label("output_tokens"),
+            func.sum(cls.cost_usd).label("cost_usd"),
+            func.avg(cls.latency_ms).label("latency_mean_ms"),
+            func.percentile_cont(0.5).within_group(cls.latency_ms).label("latency_p50_ms"),
+            func.percentile_cont(0.95).within_group(cls.latency_ms).label("latency_p95_ms"),
+        )
+        if start:
+            query = query.where(cls.called_at >= start)
+        if end:
+            query = query.where(cls.called_at < end)
+        for name, value in filters.items():
+            if value is not None:
+                query = query.where(dimensions[name] == value)
+        if grouped:
+            query = query.group_by(*grouped).order_by(*grouped)
+        return [dict(row) for row in (await db.execute(query)).mappings().all()]
+
+
+# The ledger is an audit record: updates and deletes are refused (retention would drop whole old ranges)
+LLM_CALLS_GUARD_FUNCTION_DDL = """
+CREATE OR REPLACE FUNCTION reject_llm_call_changes() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    RAISE EXCEPTION 'llm_calls is append-only';
+END $$
+"""
+LLM_CALLS_GUARD_TRIGGER_DDL = """
+CREATE TRIGGER llm_calls_append_only BEFORE UPDATE OR DELETE ON llm_calls
+    FOR EACH STATEMENT EXECUTE FUNCTION reject_llm_call_changes()
+"""
+
+LLM_CALLS_PARTITIONS = 8
+LLM_CALLS_PARTITIONS_DDL = f"""
+DO $$
+BEGIN
+    FOR remainder IN 0..{LLM_CALLS_PARTITIONS - 1} LOOP
+        EXECUTE format('CREATE TABLE llm_calls_p%%s PARTITION OF llm_calls FOR VALUES WITH (MODULUS {LLM_CALLS_PARTITIONS}, REMAINDER %%s)',
+                       remainder, remainder);
+    END LOOP;
+END $$
+"""
+
+event.listen(LLMCall.__table__, "after_create", DDL(LLM_CALLS_PARTITIONS_DDL))
+event.listen(LLMCall.__table__, "after_create", DDL(LLM_CALLS_GUARD_FUNCTION_DDL))
+event.listen(LLMCall.__table__, "after_create", DDL(LLM_CALLS_GUARD_TRIGGER_DDL))
+
+
+class OutboxEvent(TenantScoped, Base):
+    """
+    A change event waiting for delivery to one of its tenant's webhook endpoints (app/services/outbox.py).
+    Written in the transaction that made the change, and deleted once the endpoint has acknowledged it.
+    """
+    __tablename__ = "outbox_events"
+    id = Column(BigInteger, Identity(), primary_key=True)  # Delivery order within an RFQ
+    event_id = Column(HexUUID, nullable=False)  # Shared by an event's copies for each endpoint; receivers dedupe on it
+    endpoint = Column(String, nullable=False)
+    event_type = Column(String, nullable=False)  # quote.created, quote.updated, rfq.created
+    rfq_id = Column(HexUUID, nullable=False)  # Ordering key
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    attempts = Column(Integer, nullable=False, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # Also the lease while a delivery is in flight
+    last_error = Column(Text)
+
+    __table_args__ = (
+        # Claiming scans a (tenant, endpoint) pair's rows in id order and checks each RFQ's earlier rows
+        Index("ix_outbox_events_tenant_id_endpoint_id", "tenant_id", "endpoint", "id"),
+        Index("ix_outbox_events_endpoint_rfq_id", "endpoint", "rfq_id", "id"),
+    )
+
+
+class IdempotencyKey(TenantScoped, Base):
+    """
+    Outcome of a request sent with an Idempotency-Key header, so a retry replays it instead of redoing
+    the work. A row without a status_code is a claim held by a request that is still in progress.
+    """
+    __tablename__ = "idempotency_keys"
+    tenant_id = Column(String(64), ForeignKey("tenants.id"), primary_key=True, default=current_tenant)  # Tenants pick keys independently
+    key = Column(String(300), primary_key=True)  # "<scope>:<client key>"
+    request_hash = Column(String(64), nullable=False)  # sha256 of the request; reusing a key for a different request is an error
+    status_code = Column(Integer)
+    response_body = Column(JSONB)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    completed_at = Column(DateTime(timezone=True))
+
+
+class ResourceVersion(Base):
+    """
+    Monotonic change counter per resource key (e.g. "suppliers", "rfq:<id>").
+
+    Writers bump the relevant keys inside their own transaction, so a reader
+    can tell whether anything changed with a single primary-key lookup.
+    Keys are stored per tenant ("<tenant>/suppliers"), except GLOBAL_KEYS.
+    """
+    __tablename__ = "resource_versions"
+    key = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    SUPPLIERS = "suppliers"
+    RFQS = "rfqs"
+    QUOTES = "quotes"
+    CONVERSION_RATES = "conversion_rates"
+
+    GLOBAL_KEYS = frozenset({CONVERSION_RATES})  # Shared by every tenant
+
+    @classmethod
+    def scoped_key(cls, key: str) -> str:
+        """The key as stored: in the current tenant's namespace unless it is global."""
+        return key if key in cls.GLOBAL_KEYS else tenant_key(key)
+
+    @staticmethod
+    def rfq_key(rfq_id: str) -> str:
+        """Key covering the quotes submitted against a single RFQ."""
+        return f"rfq:{rfq_id}"
+
+    @classmethod
+    async def get_many(cls, db: AsyncSession, keys: list[str]) -> dict[str, int]:
+        """Returns the current version of each key; keys never written report 0."""
+        stored = {key: cls.scoped_key(key) for key in keys}
+        result = await db.execute(select(cls.key, cls.version).where(cls.key.in_(stored.values())))
+        versions = dict(result.all())
+        return {key: versions.get(stored[key], 0) for key in keys}
+
+    @classmethod
+    async def bump(cls, db: AsyncSession, *keys: str) -> None:
+        """Increments the given keys. Does not commit; the caller's transaction owns the write."""
+        for key in sorted({cls.scoped_key(key) for key in keys}):  # Stable order so concurrent writers lock rows the same way
+            stmt = pg_insert(cls).values(key=key, version=1)
+            stmt = stmt.on_conflict_do_update(index_elements=[cls.key], set_={"version": cls.version + 1})
+            await db.execute(stmt)
@@ -0,0 +1,197 @@
+# app/services/attachment_parsers.py
+"""
+Turns a supplier attachment (CSV, XLSX or a PDF with a text layer) into either price rows or
+plain text. Runs inside app.services.sandbox workers, so it imports nothing from the app
+beyond the standard library; openpyxl and pypdf are loaded only when such a file shows up
+(pip install '.[attachments]').
+
+A table is read as price rows when a header row names a product column and a price column
+whose unit is stated (per lb or per kg, in the header or in a unit column). Anything else
+comes back as text for the LLM.
+"""
+
+import csv
+import io
+import re
+from dataclasses import dataclass
+from pathlib import PurePath
+from typing import Any, Optional
+
+KG_PER_LB = 0.45359237
+HEADER_SEARCH_ROWS = 10
+
+COLUMN_NAMES = {
+    "product": {"product", "item", "description", "commodity", "product name", "item description", "product description"},
+    "country_of_origin": {"origin", "country", "country of origin", "coo", "source country"},
+    "minimum_order_quantity": {"moq", "min order", "minimum order", "minimum order quantity", "min qty", "minimum quantity"},
+    "certifications": {"certifications", "certification", "certs", "certificates"},
+    "unit": {"unit", "uom", "unit of measure"},
+}
+PRICE_WORDS = ("price", "cost", "usd", "$", "rate")
+UNIT_WORDS = {"lb", "lbs", "pound", "pounds", "kg", "kgs", "usd", "in", "per"}
+
+
+@dataclass
+class Attachment:
+    filename: str
+    content_type: str
+    data: bytes
+
+
+def attachment_kind(filename: str, content_type: str, data: bytes) -> Optional[str]:
+    """"csv", "xlsx", "pdf" or None for anything this pipeline doesn't read."""
+    suffix = PurePath(filename or "").suffix.lower()
+    content_type = (content_type or "").lower()
+    if data[:5] == b"%PDF-" or suffix == ".pdf" or content_type == "application/pdf":
+        return "pdf"
+    if suffix in (".xlsx", ".xlsm") or "spreadsheetml" in content_type:
+        return "xlsx"
+    if suffix in (".csv", ".tsv") or content_type in ("text/csv", "text/tab-separated-values"):
+        return "csv"
+    return None
+
+
+def _normalize_header(value: Any) -> str:
+    text = re.sub(r"[^a-z0-9$/%]+", " ", str(value or "").lower())
+    return " ".join(text.split())
+
+
+def _header_base(value: Any) -> str:
+    """A header without its unit annotations: "MOQ (kg)" -> "moq", "Price/lb" -> "price"."""
+    text = re.sub(r"\(.*?\)|\[.*?\]", " ", str(value or "").lower()).split("/")[0]
+    words = re.sub(r"[^a-z0-9]+", " ", text).split()
+    return " ".join(word for word in words if word not in UNIT_WORDS)
+
+
+def _unit_factor(text: str) -> Optional[float]:
+    """Multiplier turning a per-unit figure into per-lb (prices) or lbs (quantities)."""
+    text = f" {text} "
+    if re.search(r"(/|\bper\b|\s)(lb|lbs|pound|pounds)\b", text):
+        return 1.0
+    if re.search(r"(/|\bper\b|\s)(kg|kgs|kilo|kilos|kilogram|kilograms)\b", text):
+        return KG_PER_LB
+    return None
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"-?\d[\d,]*(?:\.\d+)?", str(value or ""))
+    return float(match.group().replace(",", "")) if match else None
+
+
+def _find_columns(header: list[Any]) -> Optional[dict[str, Any]]:
+    """Maps fields to column indexes if `header` looks like a price-sheet header."""
+    names = [_normalize_header(cell) for cell in header]
+    columns: dict[str, Any] = {}
+    for index, name in enumerate(names):
+        base = _header_base(header[index])
+        field = next((field for field, synonyms in COLUMN_NAMES.items() if base in synonyms), None)
+        if field and field not in columns:
+            columns[field] = index
+        elif not field and "price" not in columns and any(word in name for word in PRICE_WORDS):
+            columns["price"] = index
+            columns["price_factor"] = _unit_factor(name)
+    if "product" not in columns or "price" not in columns:
+        return None
+    if columns["price_factor"] is None and "unit" not in columns:
+        return None  # A price without a unit can't be turned into price_per_pound safely
+    if "minimum_order_quantity" in columns:
+        moq_unit = _unit_factor(names[columns["minimum_order_quantity"]])
+        columns["moq_factor"] = 1 / moq_unit if moq_unit else 1.0  # kg -> lbs
+    return columns
+
+
+def table_to_rows(table: list[list[Any]]) -> Optional[list[dict]]:
+    """Price rows (ExtractedDataSchema fields) from a table, or None if its structure isn't recognized."""
+    for header_index, header in enumerate(table[:HEADER_SEARCH_ROWS]):
+        columns = _find_columns(header)
+        if columns:
+            break
+    else:
+        return None
+
+    def cell(row: list[Any], field: str) -> Any:
+        index = columns.get(field)
+        return row[index] if index is not None and index < len(row) else None
+
+    rows = []
+    for row in table[header_index + 1:]:
+        product = str(cell(row, "product") or "").strip()
+        price = _number(cell(row, "price"))
+        factor = columns["price_factor"] or _unit_factor(str(cell(row, "unit") or ""))
+        if not product or price is None or factor is None:
+            continue
+        moq = _number(cell(row, "minimum_order_quantity"))
+        certifications = str(cell(row, "certifications") or "")
+        origin = str(cell(row, "country_of_origin") or "").strip()
+        rows.append({
+            "product": product,
+            "price_per_pound": round(price * factor, 4),
+            "country_of_origin": origin or None,
+            "minimum_order_quantity": round(moq * columns["moq_factor"]) if moq is not None else None,
+            "certifications": [c.strip() for c in re.split(r"[,;/|]", certifications) if c.strip()],
+        })
+    return rows or None
+
+
+def _table_text(table: list[list[Any]], max_rows: int) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in table[:max_rows]:
+        writer.writerow(["" if value is None else value for value in row])
+    return buffer.getvalue()
+
+
+def read_csv(data: bytes, max_rows: int) -> list[list[Any]]:
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = data.decode("latin-1")
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    return [row for _, row in zip(range(max_rows), csv.reader(io.StringIO(text), dialect))]
+
+
+def read_xlsx(data: bytes, max_rows: int) -> list[list[list[Any]]]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        return [[list(row) for _, row in zip(range(max_rows), sheet.iter_rows(values_only=True))] for sheet in workbook.worksheets]
+    finally:
+        workbook.close()
+
+
+def read_pdf_text(data: bytes, max_pages: int) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join((page.extract_text() or "") for page in reader.pages[:max_pages]).strip()
+
+
+def parse_attachment(filename: str, content_type: str, data: bytes, max_rows: int, max_pages: int) -> dict:
+    """
+    {"filename", "kind", "rows", "text"}: recognized price rows, and text for whatever wasn't
+    recognized. `kind` is None for unsupported files.
+    """
+    kind = attachment_kind(filename, content_type, data)
+    result = {"filename": filename, "kind": kind, "rows": [], "text": ""}
+    if kind == "pdf":
+        result["text"] = read_pdf_text(data, max_pages)
+        return result
+    if kind is None:
+        return result
+
+    tables = [read_csv(data, max_rows)] if kind == "csv" else read_xlsx(data, max_rows)
+    texts = []
+    for table in tables:
+        rows = table_to_rows(table)
+        if rows:
+            result["rows"].extend(rows)
+        elif table:
+            texts.append(_table_text(table, max_rows))
+    result["text"] = "\n".join(texts).strip()
+    return result
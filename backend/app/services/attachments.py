@@ -0,0 +1,142 @@
+# app/services/attachments.py
+"""
+Attachment stage of quote extraction.
+
+Price sheets are parsed in sandboxed worker processes (app.services.sandbox) with the
+ATTACHMENT_* time and memory limits. When a sheet's columns are recognized, the quote is
+built straight from its rows and the LLM isn't called at all; only unstructured content
+(PDF text, tables whose layout wasn't recognized) is appended to the text the LLM reads.
+The email itself reaches the LLM normalized (app.services.email_normalizer).
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Protocol
+
+from app.config import config
+from app.services.attachment_parsers import attachment_kind, parse_attachment
+from app.services.email_normalizer import NormalizedEmail, estimate_tokens, normalize_email
+from app.services.llm_client import ExtractedDataSchema
+from app.services.sandbox import ProcessSandbox, SandboxError
+
+EMAIL_ADDRESS = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+attachment_sandbox = ProcessSandbox(
+    workers=config.ATTACHMENT_WORKERS,
+    timeout=config.ATTACHMENT_TIMEOUT_SECONDS,
+    memory_limit_mb=config.ATTACHMENT_MEMORY_LIMIT_MB,
+    preload=["app.services.attachment_parsers"],
+)
+
+
+class AttachmentLike(Protocol):
+    filename: str
+    content_type: str
+    data: bytes
+
+
+@dataclass
+class PreparedExtraction:
+    extracted: Optional[ExtractedDataSchema]  # Built from a recognized price sheet; None means ask the LLM
+    llm_text: str  # The normalized email plus any unstructured attachment text
+    attachments: list[dict] = field(default_factory=list)  # parse_attachment results, with "error" on failure
+    normalized: Optional[NormalizedEmail] = None
+
+    @property
+    def input_tokens(self) -> Optional[int]:
+        """Estimated tokens the LLM reads for this email; None when a price sheet made the call unnecessary."""
+        return None if self.extracted else estimate_tokens(self.llm_text)
+
+    @property
+    def input_tokens_saved(self) -> int:
+        """Estimated tokens of the email the LLM didn't have to read."""
+        if self.normalized is None:
+            return 0
+        return self.normalized.tokens_before if self.extracted else self.normalized.tokens_saved
+
+
+async def parse_attachments(attachments: Iterable[AttachmentLike]) -> list[dict]:
+    """Parses every attachment in the sandbox. A file that fails, times out or is too big is reported, not raised."""
+
+    async def parse_one(attachment: AttachmentLike) -> dict:
+        result = {"filename": attachment.filename, "kind": attachment_kind(attachment.filename, attachment.content_type, attachment.data), "rows": [], "text": ""}
+        if result["kind"] is None:
+            return result
+        if len(attachment.data) > config.ATTACHMENT_MAX_BYTES:
+            return {**result, "error": f"larger than {config.ATTACHMENT_MAX_BYTES} bytes"}
+        try:
+            return await attachment_sandbox.run(
+                parse_attachment, attachment.filename, attachment.content_type, attachment.data,
+                config.ATTACHMENT_MAX_ROWS, config.ATTACHMENT_MAX_PDF_PAGES,
+            )
+        except SandboxError as e:
+            print(f"⚠️ Could not parse attachment {attachment.filename!r}: {e}")
+            return {**result, "error": str(e)}
+
+    return list(await asyncio.gather(*(parse_one(attachment) for attachment in attachments)))
+
+
+def _words(text: str) -> set[str]:
+    # Crude singular form, so "Almond" finds "Almonds"
+    return {word[:-1] if len(word) > 3 and word.endswith("s") else word for word in re.findall(r"[a-z0-9]+", text.lower())}
+
+
+def product_matches(product: str, item: str) -> bool:
+    """True when every word of the RFQ item appears in the sheet's product name."""
+    item_words = _words(item)
+    return bool(item_words) and item_words <= _words(product)
+
+
+def select_row(rows: list[dict], items: Iterable[str]) -> Optional[dict]:
+    """The first row quoting one of `items`; with no items to go by, the row only if it is the sole one."""
+    items = list(items)
+    if not items:
+        return rows[0] if len(rows) == 1 else None
+    for item in items:
+        for row in rows:
+            if product_matches(row["product"], item):
+                return row
+    return None
+
+
+async def prepare_extraction(
+    raw_text: str,
+    attachments: Iterable[AttachmentLike],
+    items: Iterable[str] = (),
+    sender_email: Optional[str] = None,
+) -> PreparedExtraction:
+    """
+    Decides what the LLM has to see for this email. `items` are the RFQ items the quote may be
+    for; `sender_email` is the envelope sender, if known.
+    """
+    normalized = normalize_email(raw_text)
+    attachments = list(attachments)
+    if not attachments:
+        return PreparedExtraction(None, normalized.text, normalized=normalized)
+
+    results = await parse_attachments(attachments)
+    row = select_row([row for result in results for row in result["rows"]], items)
+    # Quoted history is gone from the normalized text, so this can't pick up the buyer's own address
+    addresses = EMAIL_ADDRESS.findall(normalized.text)
+    supplier_email = sender_email or normalized.signature_email or (addresses[0] if addresses else None)
+    if row and supplier_email:
+        extracted = ExtractedDataSchema(
+            **row, company_name=None, contact_name=None, supplier_email=supplier_email, supplier_phone=normalized.signature_phone
+        )
+        return PreparedExtraction(extracted, normalized.text, results, normalized)
+
+    # No row fit (or no supplier to attach it to): the LLM gets the sheets' rows as well as their loose text
+    texts = []
+    for result in results:
+        rows_text = "\n".join(
+            f"{row['product']}: ${row['price_per_pound']}/lb, origin {row['country_of_origin'] or '-'}, "
+            f"MOQ {row['minimum_order_quantity'] or '-'} lbs, certifications {', '.join(row['certifications']) or '-'}"
+            for row in result["rows"]
+        )
+        content = "\n".join(part for part in (rows_text, result["text"]) if part)
+        if content:
+            texts.append(f"--- Attachment: {result['filename']} ---\n{content}")
+    attachment_text = "\n\n".join(texts)[: config.ATTACHMENT_MAX_TEXT_CHARS]
+    llm_text = f"{normalized.text}\n\n{attachment_text}" if attachment_text else normalized.text
+    return PreparedExtraction(None, llm_text, results, normalized)
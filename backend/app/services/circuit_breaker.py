@@ -0,0 +1,69 @@
+# app/services/circuit_breaker.py
+
+import time
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+CALL = object()  # The permit for a call made while the circuit is closed
+
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency that keeps failing. After `failure_threshold` failures in a row
+    the circuit opens and calls are refused outright, instead of each one waiting for its own
+    timeout; once `cooldown_seconds` have passed a single probe call is let through, and its
+    outcome closes the circuit again or reopens it for another cooldown.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probe: object | None = None  # The permit of the half-open probe in flight
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return CLOSED
+        if self._probe is not None or self.clock() - self.opened_at >= self.cooldown_seconds:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> object | None:
+        """
+        A permit for a call that may go ahead now, or None if it may not. In half-open state only
+        one probe is let through at a time. Pass the permit back with the call's outcome: only the
+        probe's own outcome closes or reopens a half-open circuit.
+        """
+        state = self.state
+        if state == CLOSED:
+            return CALL
+        if state == HALF_OPEN and self._probe is None:
+            self._probe = object()
+            return self._probe
+        return None
+
+    def release(self, permit: object | None = None) -> None:
+        """Ends a call that has no outcome to record (e.g. it was cancelled); if it was the probe, the next one may go."""
+        if permit is not None and permit is self._probe:
+            self._probe = None
+
+    def record_success(self, permit: object | None = None) -> None:
+        """Any success shows the dependency answers again, so it closes the circuit whichever call it was."""
+        self.failures = 0
+        self.opened_at = None
+        self._probe = None
+
+    def record_failure(self, permit: object | None = None) -> None:
+        self.failures += 1
+        if permit is not None and permit is self._probe:
+            self.opened_at = self.clock()  # The probe failed: another cooldown
+            self._probe = None
+        elif self.opened_at is None and self.failures >= self.failure_threshold:
+            self.opened_at = self.clock()
+        # Otherwise a call let through before the circuit opened failed late: it neither restarts the cooldown nor ends the probe
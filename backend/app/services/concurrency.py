@@ -0,0 +1,51 @@
+# app/services/concurrency.py
+
+import asyncio
+import time
+
+
+class ConcurrencyLimiter:
+    """
+    Caps how many calls run at once in this process and tracks the ones in flight,
+    so shutdown can wait for them to finish instead of cutting them off.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._semaphore: asyncio.Semaphore | None = None
+        self._idle: asyncio.Event | None = None
+
+    def configure(self, limit: int) -> None:
+        """Sets the limit. Call before the first use (e.g. in the lifespan, after forking)."""
+        self.limit = limit
+        self._semaphore = None
+
+    async def __aenter__(self):
+        if self._semaphore is None:
+            # Created lazily so the primitives bind to the worker's event loop, not the one that imported us
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._idle = asyncio.Event()
+            self._idle.set()
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        self._idle.clear()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+        self._semaphore.release()
+
+    async def drain(self, timeout: float) -> bool:
+        """Waits up to `timeout` seconds for in-flight calls to finish. Returns False if some are still running."""
+        if self._idle is None or self.in_flight == 0:
+            return True
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except TimeoutError:
+            print(f"⚠️ {self.in_flight} call(s) still in flight after {time.monotonic() - started:.1f}s")
+            return False
+        return True
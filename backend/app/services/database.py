@@ -1,7 +1,9 @@
 # app/services/database.py
+import asyncio
 import contextlib
 from typing import AsyncIterator
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
     AsyncEngine,
@@ -11,6 +13,8 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.orm import declarative_base
 
+from app.services.tenancy import tenant_limits
+
 Base = declarative_base()
 
 class DatabaseSessionManager:
@@ -18,8 +22,8 @@ class DatabaseSessionManager:
         self._engine: AsyncEngine | None = None
         self._sessionmaker: async_sessionmaker | None = None
 
-    def init(self, host: str):
-        self._engine = create_async_engine(host)
+    def init(self, host: str, **engine_kwargs):
+        self._engine = create_async_engine(host, **engine_kwargs)
         self._sessionmaker = async_sessionmaker(autocommit=False, bind=self._engine)
 
     async def close(self):
@@ -29,6 +33,16 @@ class DatabaseSessionManager:
         self._engine = None
         self._sessionmaker = None
 
+    async def warm(self, connections: int):
+        """Opens `connections` pooled connections up front so the first requests don't pay for the handshakes."""
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+
+        async with contextlib.AsyncExitStack() as stack:
+            opened = await asyncio.gather(*(stack.enter_async_context(self._engine.connect()) for _ in range(connections)))
+            for connection in opened:
+                await connection.execute(text("SELECT 1"))
+
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
         if self._engine is None:
@@ -46,14 +60,16 @@ class DatabaseSessionManager:
         if self._sessionmaker is None:
             raise Exception("DatabaseSessionManager is not initialized")
 
-        session = self._sessionmaker()
-        try:
-            yield session
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+        # A request's sessions count against its tenant's share of the pool
+        async with tenant_limits.db_slot():
+            session = self._sessionmaker()
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
 
     # Used for testing
     async def create_all(self, connection: AsyncConnection):
@@ -0,0 +1,163 @@
+# app/services/email_archive.py
+"""
+Keeps the hot, month-partitioned `emails` table down to the working set.
+
+Each run is safe to repeat (scripts/archive_emails.py, e.g. nightly):
+  A. makes sure the next few monthly partitions exist
+  B. moves the emails of RFQs whose due_date passed more than EMAIL_ARCHIVE_GRACE_DAYS ago
+     into email_archive, in small batches
+  C. copies monthly partitions older than EMAIL_HOT_MONTHS into the archive whole, then
+     detaches and drops them
+Bodies no hot email references any more are deleted from email_bodies, which also shrinks
+the full-text index. Email.audit_trail reads hot and archived rows together.
+The SQL below is raw, so it works across every tenant; archived rows keep their tenant_id.
+"""
+
+import datetime
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import config
+
+PARTITION_NAME = re.compile(r"^emails_(\d{4})_(\d{2})$")
+
+MOVE_CLOSED_RFQ_EMAILS_SQL = text("""
+WITH batch AS (
+    SELECT e.id, e.received_at
+    FROM emails e
+    JOIN quotes q ON q.id = e.quote_id
+    JOIN rfqs r ON r.id = q.rfq_id
+    WHERE r.due_date < :cutoff
+    LIMIT :batch_size
+),
+moved AS (
+    DELETE FROM emails e
+    USING batch
+    WHERE e.id = batch.id AND e.received_at = batch.received_at
+    RETURNING e.id, e.received_at, e.tenant_id, e.quote_id, e.body_hash, e.extracted_data
+),
+archived AS (
+    INSERT INTO email_archive (id, received_at, tenant_id, quote_id, raw_text, extracted_data)
+    SELECT m.id, m.received_at, m.tenant_id, m.quote_id, b.raw_text, m.extracted_data
+    FROM moved m
+    JOIN email_bodies b ON b.content_hash = m.body_hash
+    ON CONFLICT (id) DO NOTHING
+)
+SELECT count(*) AS moved, coalesce(array_agg(DISTINCT body_hash), '{}') AS body_hashes FROM moved
+""")
+
+# Partition names come from the catalog and are checked against PARTITION_NAME before being interpolated
+COPY_PARTITION_SQL = """
+INSERT INTO email_archive (id, received_at, tenant_id, quote_id, raw_text, extracted_data)
+SELECT p.id, p.received_at, p.tenant_id, p.quote_id, b.raw_text, p.extracted_data
+FROM {partition} p
+JOIN email_bodies b ON b.content_hash = p.body_hash
+WHERE NOT EXISTS (SELECT 1 FROM email_archive a WHERE a.id = p.id)
+"""
+
+DELETE_ORPHANED_BODIES_SQL = text("""
+DELETE FROM email_bodies b
+WHERE b.content_hash = ANY(:body_hashes)
+  AND NOT EXISTS (SELECT 1 FROM emails e WHERE e.body_hash = b.content_hash)
+""")
+
+LIST_PARTITIONS_SQL = text("""
+SELECT c.relname
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'emails'::regclass
+""")
+
+
+@dataclass
+class ArchiveReport:
+    archived_emails: int = 0
+    deleted_bodies: int = 0
+    dropped_partitions: list[str] = field(default_factory=list)
+
+
+def add_months(month: datetime.date, count: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+async def ensure_partitions(db: AsyncSession, today: datetime.date) -> None:
+    """Creates monthly partitions from last month through EMAIL_PARTITIONS_AHEAD months ahead. Commits."""
+    this_month = today.replace(day=1)
+    await ensure_partitions_between(db, add_months(this_month, -1), add_months(this_month, config.EMAIL_PARTITIONS_AHEAD))
+
+
+async def ensure_partitions_between(db: AsyncSession, first_month: datetime.date, last_month: datetime.date) -> None:
+    """Creates the monthly partitions covering first_month..last_month that don't exist yet. Commits."""
+    await db.execute(
+        text("SELECT ensure_email_partitions(:first_month, :last_month)"),
+        {"first_month": first_month, "last_month": last_month},
+    )
+    await db.commit()
+
+
+async def archive_closed_rfqs(db: AsyncSession, now: datetime.datetime, report: ArchiveReport) -> None:
+    """Moves the emails of closed RFQs to the archive, one committed batch at a time."""
+    cutoff = now - datetime.timedelta(days=config.EMAIL_ARCHIVE_GRACE_DAYS)
+    while True:
+        result = await db.execute(MOVE_CLOSED_RFQ_EMAILS_SQL, {"cutoff": cutoff, "batch_size": config.EMAIL_ARCHIVE_BATCH_SIZE})
+        moved, body_hashes = result.one()
+        await db.commit()
+        if not moved:
+            return
+        report.archived_emails += moved
+        await delete_orphaned_bodies(db, body_hashes, report)
+
+
+async def archive_old_partitions(db: AsyncSession, today: datetime.date, report: ArchiveReport) -> None:
+    """Copies partitions older than the hot window into the archive, then detaches and drops them."""
+    oldest_hot_month = add_months(today.replace(day=1), -config.EMAIL_HOT_MONTHS)
+    partitions = (await db.execute(LIST_PARTITIONS_SQL)).scalars().all()
+    for name in sorted(partitions):
+        match = PARTITION_NAME.match(name)
+        if not match or datetime.date(int(match[1]), int(match[2]), 1) >= oldest_hot_month:
+            continue
+
+        # A. Bulk copy while the partition stays attached, so the audit trail never has a gap
+        copied = await db.execute(text(COPY_PARTITION_SQL.format(partition=name)))
+        body_hashes = (await db.execute(text(f"SELECT coalesce(array_agg(DISTINCT body_hash), '{{}}') FROM {name}"))).scalar()
+        await db.commit()
+
+        # B. Detach under a short lock, catching rows written since the copy, and drop
+        await db.execute(text("SET LOCAL lock_timeout = '5s'"))
+        await db.execute(text(f"ALTER TABLE emails DETACH PARTITION {name}"))
+        late = await db.execute(text(COPY_PARTITION_SQL.format(partition=name)))
+        await db.execute(text(f"DROP TABLE {name}"))
+        await db.commit()
+
+        report.archived_emails += copied.rowcount + late.rowcount
+        report.dropped_partitions.append(name)
+        await delete_orphaned_bodies(db, body_hashes, report)
+
+
+async def delete_orphaned_bodies(db: AsyncSession, body_hashes: list[str], report: ArchiveReport) -> None:
+    """Deletes the given bodies unless a hot email still references them. Commits."""
+    if not body_hashes:
+        return
+    try:
+        result = await db.execute(DELETE_ORPHANED_BODIES_SQL, {"body_hashes": body_hashes})
+        await db.commit()
+        report.deleted_bodies += result.rowcount
+    except IntegrityError:
+        # A new email picked up one of these bodies mid-delete; the next run retries whatever is still orphaned
+        await db.rollback()
+
+
+async def archive_emails(db: AsyncSession, now: Optional[datetime.datetime] = None) -> ArchiveReport:
+    """Runs every archival pass. Commits as it goes, so keep the session to itself."""
+    now = now or datetime.datetime.now(datetime.UTC)
+    report = ArchiveReport()
+    await ensure_partitions(db, now.date())
+    await archive_closed_rfqs(db, now, report)
+    await archive_old_partitions(db, now.date(), report)
+    return report
@@ -0,0 +1,176 @@
+# app/services/email_normalizer.py
+"""
+Shrinks a supplier email to what the LLM needs before extraction.
+
+  A. HTML is flattened to text
+  B. Quoted history is cut: "> " lines, and everything from an "On ... wrote:" or
+     "-----Original Message-----" style header down (unless the message is a bare forward,
+     in which case the forwarded message is the content)
+  C. Boilerplate paragraphs (confidentiality notices, "Sent from my iPhone", ...) are dropped
+  D. The signature is split off and kept apart, since it carries the supplier's contact
+     name, company, email and phone
+  E. Whitespace is collapsed
+  F. The body is cut to LLM_INPUT_TOKEN_BUDGET tokens; the signature always survives
+
+The original text is not touched: callers keep storing it in Email.raw_text for audit.
+Token counts are estimates (about four characters per token), good enough for budgeting
+and for reporting what normalization saved.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from app.config import config
+from app.services.mailbox_parser import html_to_text
+
+CHARS_PER_TOKEN = 4
+SIGNATURE_MAX_LINES = 10
+CONTACT_LINE_MAX_CHARS = 60
+FORWARD_MIN_CHARS = 40  # Less than this above a forwarded message means the forward is the content
+TRUNCATION_MARK = "[...]"
+
+HTML_HINT = re.compile(r"<(html|body|div|p|br|table)\b", re.IGNORECASE)
+REPLY_HEADERS = [
+    re.compile(r"^On\b[^\n]{0,200}(?:\n[^\n]{0,100})?\bwrote:\s*$", re.IGNORECASE | re.MULTILINE),  # Gmail, Apple Mail; may wrap
+    re.compile(r"^-{2,}\s*Original Message\s*-{2,}$", re.IGNORECASE | re.MULTILINE),
+    re.compile(r"^_{10,}$", re.MULTILINE),  # Outlook's rule above the quoted header block
+    re.compile(r"^From:\s.+$(?:\n^(?:To|Cc|Date|Subject):.*$)*\n^(?:Sent|Date):\s", re.IGNORECASE | re.MULTILINE),
+]
+FORWARD_HEADERS = [
+    re.compile(r"^-{2,}\s*Forwarded message\s*-{2,}$", re.IGNORECASE | re.MULTILINE),
+    re.compile(r"^Begin forwarded message:\s*$", re.IGNORECASE | re.MULTILINE),
+]
+# Only paragraphs without figures are dropped, so a "pricing is confidential" line in the offer stays
+BOILERPLATE = re.compile(
+    r"confidentiality notice|(this|the) (e-?mail|message)[^.]{0,80}confidential|intended (solely )?for the (use of the )?(addressee|recipient)"
+    r"|if you (have )?received this (e-?mail|message) in error|please consider the environment"
+    r"|sent from my (iphone|ipad|android|mobile|galaxy)|get outlook for (ios|android)|virus[- ]free|unsubscribe",
+    re.IGNORECASE,
+)
+SIGNATURE_DELIMITER = re.compile(r"^-- ?$")
+SIGN_OFF = re.compile(
+    r"^(best|kind|warm|many thanks|thanks|thank you|regards|best regards|kind regards|warm regards|cheers|sincerely|yours|all the best)\b[\w ]{0,12}[,.!]?$",
+    re.IGNORECASE,
+)
+EMAIL_ADDRESS = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE = re.compile(r"\+?\d[\d\s().-]{6,}\d")
+
+
+@dataclass
+class NormalizedEmail:
+    body: str  # What is left of the message itself
+    signature: str  # The sign-off block, or "" if none was found
+    tokens_before: int  # Estimated tokens in the original text
+    truncated: bool = False  # The body was cut to fit the token budget
+
+    @property
+    def text(self) -> str:
+        """The text the LLM reads: the body, then the signature under its own heading."""
+        return f"{self.body}\n\nSignature:\n{self.signature}" if self.signature else self.body
+
+    @property
+    def tokens_after(self) -> int:
+        return estimate_tokens(self.text)
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_before - self.tokens_after)
+
+    @property
+    def signature_email(self) -> Optional[str]:
+        found = EMAIL_ADDRESS.search(self.signature)
+        return found.group() if found else None
+
+    @property
+    def signature_phone(self) -> Optional[str]:
+        found = PHONE.search(self.signature)
+        return found.group().strip() if found else None
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _first_match(patterns: list[re.Pattern], text: str) -> Optional[re.Match]:
+    matches = [match for pattern in patterns if (match := pattern.search(text))]
+    return min(matches, key=lambda match: match.start()) if matches else None
+
+
+def strip_quoted_history(text: str) -> str:
+    """The newest message in a thread, without what it replies to or quotes."""
+    text = "\n".join(line for line in text.splitlines() if not line.lstrip().startswith(">"))
+
+    forward = _first_match(FORWARD_HEADERS, text)
+    if forward and len(text[: forward.start()].strip()) < FORWARD_MIN_CHARS:
+        # A bare forward: the quote is the forwarded message. Drop its header block, keep the rest.
+        forwarded = text[forward.end():].lstrip("\n")
+        header = re.match(r"(?:^[A-Z][\w-]*:.*\n)+", forwarded, re.MULTILINE)
+        return strip_quoted_history(forwarded[header.end():] if header else forwarded)
+
+    reply = _first_match(REPLY_HEADERS + FORWARD_HEADERS, text)
+    if reply and text[: reply.start()].strip():
+        return text[: reply.start()]
+    return text  # Nothing above the header: it's this message's own header block, not quoted history
+
+
+def strip_boilerplate(text: str) -> str:
+    paragraphs = re.split(r"\n\s*\n", text)
+    return "\n\n".join(p for p in paragraphs if not (BOILERPLATE.search(p) and not re.search(r"\d", p)))
+
+
+def split_signature(text: str) -> tuple[str, str]:
+    """
+    (body, signature). The signature starts at a "-- " line, else at the last sign-off near
+    the end, else at a trailing contact block.
+    """
+    lines = text.splitlines()
+    tail_start = max(0, len(lines) - SIGNATURE_MAX_LINES)
+    for index in range(tail_start, len(lines)):
+        if SIGNATURE_DELIMITER.match(lines[index]):
+            return "\n".join(lines[:index]), "\n".join(lines[index + 1:])
+    for index in range(len(lines) - 1, tail_start - 1, -1):
+        if SIGN_OFF.match(lines[index].strip()):
+            return "\n".join(lines[:index]), "\n".join(lines[index:])
+
+    # No sign-off: a trailing run of short lines that gives an email address or phone number
+    index = len(lines)
+    while index > tail_start and _contact_line(lines[index - 1]):
+        index -= 1
+    block = lines[index:]
+    if 0 < index and any(EMAIL_ADDRESS.search(line) or PHONE.search(line) for line in block):
+        return "\n".join(lines[:index]), "\n".join(block)
+    return text, ""
+
+
+def _contact_line(line: str) -> bool:
+    line = line.strip()
+    return bool(line) and len(line) <= CONTACT_LINE_MAX_CHARS and "$" not in line and len(line.split()) <= 8
+
+
+def collapse_whitespace(text: str) -> str:
+    lines = (re.sub(r"[ \t\xa0]+", " ", line).strip() for line in text.splitlines())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def normalize_email(raw_text: str, token_budget: Optional[int] = None) -> NormalizedEmail:
+    """Runs steps A-F above on one email."""
+    token_budget = token_budget or config.LLM_INPUT_TOKEN_BUDGET
+    tokens_before = estimate_tokens(raw_text)
+
+    text = html_to_text(raw_text) if HTML_HINT.search(raw_text) else raw_text
+    text = text.replace("\r\n", "\n")
+    text = strip_quoted_history(text)
+    text = strip_boilerplate(text)
+    body, signature = split_signature(text)
+    body, signature = collapse_whitespace(body), collapse_whitespace(signature)
+    if not body and not signature:
+        body = collapse_whitespace(raw_text)  # Everything looked like noise; let the LLM see the original
+
+    normalized = NormalizedEmail(body, signature, tokens_before)
+    if normalized.tokens_after > token_budget:
+        # Quotes lead with the offer, so keep the head of the body
+        room = token_budget * CHARS_PER_TOKEN - (len(normalized.text) - len(body)) - len(TRUNCATION_MARK) - 1
+        normalized.body = f"{body[: max(0, room)].rstrip()}\n{TRUNCATION_MARK}"
+        normalized.truncated = True
+    return normalized
@@ -0,0 +1,275 @@
+# app/services/extraction_eval.py
+"""
+Offline evaluation of quote extraction (scripts/evaluate_extraction.py).
+
+A corpus is a JSON-lines file of labeled emails (tests/fixtures/extraction/corpus.jsonl
+starts from the seed.py samples):
+
+    {"id": "...", "email": "...", "rfq_item": "Almonds", "expected": {"price_per_pound": 4.2, ...}}
+
+Fields left out of "expected" are fields the email doesn't state, so a backend that fills
+them in anyway is charged a false positive. Per field, a correct value is a true positive,
+a missing one a false negative, and a wrong one both a false positive and a false negative;
+certifications are scored per certification.
+
+Every case runs through one extraction backend, `concurrency` at a time, and the report
+(per-field precision/recall, latency percentiles, token counts, which model tier answered
+and the per-case mismatches) is plain JSON, so two runs can be compared with compare_reports().
+"""
+
+import asyncio
+import datetime
+import json
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from app.services import llm_client
+from app.services.attachments import prepare_extraction, product_matches
+from app.services.concurrency import ConcurrencyLimiter
+from app.services.llm_client import ExtractedDataSchema
+from app.services.price_conversion import BUILTIN_TABLE, normalize_price
+from app.services.rule_extractor import CERTIFICATIONS, COUNTRIES, extract_quote_data_by_rules
+from app.services.supplier_resolver import normalize_company_name
+
+# The price as quoted is scored through the price_per_pound it converts to
+RAW_PRICE_FIELDS = {"price_amount", "price_currency", "price_unit"}
+FIELDS = [name for name in ExtractedDataSchema.model_fields if name not in RAW_PRICE_FIELDS]
+LATENCY_PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+
+COUNTRY_NAMES = {alias: country.lower() for country, aliases in COUNTRIES.items() for alias in aliases + [country.lower()]}
+CERTIFICATION_NAMES = {alias: name.lower() for name, aliases in CERTIFICATIONS.items() for alias in aliases + [name.lower()]}
+
+
+@dataclass
+class LabeledEmail:
+    id: str
+    email: str
+    expected: dict
+    rfq_item: Optional[str] = None
+
+
+@dataclass
+class BackendResult:
+    extracted: ExtractedDataSchema
+    input_tokens: int = 0
+    output_tokens: int = 0
+    model: Optional[str] = None  # The model tier that answered, for LLM backends
+
+
+Backend = Callable[[LabeledEmail], Awaitable[BackendResult]]
+
+
+@dataclass
+class FieldScore:
+    tp: int = 0
+    fp: int = 0
+    fn: int = 0
+
+    def add(self, tp: int, fp: int, fn: int) -> None:
+        self.tp, self.fp, self.fn = self.tp + tp, self.fp + fp, self.fn + fn
+
+    def as_dict(self) -> dict:
+        precision = self.tp / (self.tp + self.fp) if self.tp + self.fp else 1.0
+        recall = self.tp / (self.tp + self.fn) if self.tp + self.fn else 1.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        return {"tp": self.tp, "fp": self.fp, "fn": self.fn, "precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4)}
+
+
+@dataclass
+class CaseResult:
+    id: str
+    latency_ms: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+    model: Optional[str] = None
+    error: Optional[str] = None
+    mismatches: dict[str, dict] = field(default_factory=dict)  # field -> {"expected", "got"}
+
+
+def load_corpus(path: Path) -> list[LabeledEmail]:
+    corpus = []
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                case = json.loads(line)
+                corpus.append(LabeledEmail(case["id"], case["email"], case.get("expected", {}), case.get("rfq_item")))
+    return corpus
+
+
+# --- Backends ---
+
+def _converted(extracted: ExtractedDataSchema) -> ExtractedDataSchema:
+    """price_per_pound as the quote processor would store it. Offline, so only USD prices convert (BUILTIN_TABLE)."""
+    extracted.price_per_pound = normalize_price(extracted, BUILTIN_TABLE).price_per_pound
+    return extracted
+
+
+async def llm_backend(case: LabeledEmail) -> BackendResult:
+    """The production path: normalized email, then the LLM."""
+    prepared = await prepare_extraction(case.email, [], items=[case.rfq_item] if case.rfq_item else [])
+    extracted, usage = await llm_client.extract_quote_data_with_usage(prepared.llm_text)
+    return BackendResult(_converted(extracted), usage.input_tokens, usage.output_tokens, usage.model)
+
+
+async def llm_raw_backend(case: LabeledEmail) -> BackendResult:
+    """The LLM on the email as received, to measure what normalization costs or gains."""
+    extracted, usage = await llm_client.extract_quote_data_with_usage(case.email)
+    return BackendResult(_converted(extracted), usage.input_tokens, usage.output_tokens, usage.model)
+
+
+async def rules_backend(case: LabeledEmail) -> BackendResult:
+    """Regular expressions only (app.services.rule_extractor); free and instant, the baseline."""
+    return BackendResult(extract_quote_data_by_rules(case.email, [case.rfq_item] if case.rfq_item else []))
+
+
+BACKENDS: dict[str, Backend] = {"llm": llm_backend, "llm-raw": llm_raw_backend, "rules": rules_backend}
+LLM_BACKENDS = {"llm", "llm-raw"}
+
+
+# --- Scoring ---
+
+def _text(value: Any) -> str:
+    return " ".join(str(value).casefold().split())
+
+
+def _digits(value: Any) -> str:
+    return re.sub(r"\D", "", str(value))
+
+
+def values_match(field_name: str, expected: Any, got: Any) -> bool:
+    """Whether `got` counts as the labeled value; lenient where formatting legitimately varies."""
+    if field_name == "price_per_pound":
+        return abs(float(got) - float(expected)) <= max(0.01, 0.005 * float(expected))
+    if field_name == "minimum_order_quantity":
+        return abs(float(got) - float(expected)) <= max(1.0, 0.01 * float(expected))  # kg conversions round differently
+    if field_name == "product":
+        return product_matches(str(got), str(expected)) or product_matches(str(expected), str(got))
+    if field_name == "country_of_origin":
+        return COUNTRY_NAMES.get(_text(got), _text(got)) == COUNTRY_NAMES.get(_text(expected), _text(expected))
+    if field_name == "company_name":
+        return normalize_company_name(got) == normalize_company_name(expected)
+    if field_name == "supplier_phone":
+        got_digits, expected_digits = _digits(got), _digits(expected)
+        return len(got_digits) >= 7 and (got_digits.endswith(expected_digits) or expected_digits.endswith(got_digits))
+    return _text(got) == _text(expected)
+
+
+def _certification_set(values: Optional[list]) -> set[str]:
+    return {CERTIFICATION_NAMES.get(_text(value), _text(value)) for value in values or []}
+
+
+def score_field(field_name: str, expected: Any, got: Any) -> tuple[int, int, int]:
+    """(true positives, false positives, false negatives) for one field of one email."""
+    if field_name == "certifications":
+        expected_set, got_set = _certification_set(expected), _certification_set(got)
+        return len(expected_set & got_set), len(got_set - expected_set), len(expected_set - got_set)
+    has_expected = expected not in (None, "")
+    has_got = got not in (None, "")
+    if has_expected and has_got and values_match(field_name, expected, got):
+        return 1, 0, 0
+    return 0, int(has_got), int(has_expected)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Linear interpolation between closest ranks, like numpy's default."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+# --- Running ---
+
+async def _run_case(case: LabeledEmail, backend: Backend, limiter: ConcurrencyLimiter) -> tuple[CaseResult, Optional[ExtractedDataSchema]]:
+    async with limiter:
+        started = time.perf_counter()
+        try:
+            result = await backend(case)
+        except Exception as e:
+            detail = getattr(e, "detail", None) or f"{type(e).__name__}: {e}"
+            return CaseResult(case.id, (time.perf_counter() - started) * 1000, error=str(detail)), None
+        latency_ms = (time.perf_counter() - started) * 1000
+    return CaseResult(case.id, latency_ms, result.input_tokens, result.output_tokens, result.model), result.extracted
+
+
+async def evaluate(corpus: list[LabeledEmail], backend_name: str, concurrency: int = 8) -> dict:
+    """Runs every case through the backend and scores it. Failed cases count as extracting nothing."""
+    backend = BACKENDS[backend_name]
+    limiter = ConcurrencyLimiter(concurrency)
+    started_at = datetime.datetime.now(datetime.UTC)
+    wall_started = time.perf_counter()
+    outcomes = await asyncio.gather(*(_run_case(case, backend, limiter) for case in corpus))
+    wall_seconds = time.perf_counter() - wall_started
+
+    scores = {name: FieldScore() for name in FIELDS}
+    exact = 0
+    cases = []
+    for case, (result, extracted) in zip(corpus, outcomes):
+        got = extracted.model_dump() if extracted else {}
+        for name in FIELDS:
+            expected, value = case.expected.get(name), got.get(name)
+            tp, fp, fn = score_field(name, expected, value)
+            scores[name].add(tp, fp, fn)
+            if fp or fn:
+                result.mismatches[name] = {"expected": expected, "got": value}
+        exact += extracted is not None and not result.mismatches
+        cases.append(result)
+
+    totals = FieldScore()
+    for score in scores.values():
+        totals.add(score.tp, score.fp, score.fn)
+    latencies = [case.latency_ms for case in cases if case.error is None]
+    input_tokens = sum(case.input_tokens for case in cases)
+    output_tokens = sum(case.output_tokens for case in cases)
+    served_by = Counter(case.model for case in cases if case.model)
+    return {
+        "backend": backend_name,
+        "started_at": started_at.isoformat(),
+        "concurrency": concurrency,
+        "emails": len(corpus),
+        "errors": sum(case.error is not None for case in cases),
+        "exact_match_rate": round(exact / len(corpus), 4) if corpus else 0.0,
+        "overall": totals.as_dict(),
+        "fields": {name: score.as_dict() for name, score in scores.items()},
+        "latency_ms": {
+            **{f"p{round(q * 100)}": round(percentile(latencies, q), 2) for q in LATENCY_PERCENTILES},
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "max": round(max(latencies), 2) if latencies else 0.0,
+        },
+        "wall_seconds": round(wall_seconds, 3),
+        "tokens": {
+            "input": input_tokens,
+            "output": output_tokens,
+            "input_per_email": round(input_tokens / len(corpus), 1) if corpus else 0.0,
+        },
+        "served_by": dict(served_by.most_common()),
+        "cases": [case.__dict__ for case in cases],
+    }
+
+
+def compare_reports(baseline: dict, current: dict) -> dict:
+    """What changed from `baseline` to `current`: positive F1 deltas are improvements, positive latency/token deltas regressions."""
+    before = {case["id"]: set(case["mismatches"]) for case in baseline["cases"]}
+    after = {case["id"]: set(case["mismatches"]) for case in current["cases"]}
+    shared = before.keys() & after.keys()
+    return {
+        "baseline": baseline["backend"],
+        "current": current["backend"],
+        "f1": {
+            name: round(current["fields"][name]["f1"] - baseline["fields"][name]["f1"], 4)
+            for name in current["fields"] if name in baseline["fields"]
+        },
+        "overall_f1": round(current["overall"]["f1"] - baseline["overall"]["f1"], 4),
+        "exact_match_rate": round(current["exact_match_rate"] - baseline["exact_match_rate"], 4),
+        "latency_ms": {key: round(current["latency_ms"][key] - baseline["latency_ms"][key], 2) for key in current["latency_ms"]},
+        "input_tokens_per_email": round(current["tokens"]["input_per_email"] - baseline["tokens"]["input_per_email"], 1),
+        "newly_wrong": sorted(f"{id}.{name}" for id in shared for name in after[id] - before[id]),
+        "fixed": sorted(f"{id}.{name}" for id in shared for name in before[id] - after[id]),
+    }
@@ -0,0 +1,185 @@
+# app/services/hedging.py
+"""
+Request hedging: when a call hasn't answered by the time most calls have (a percentile of
+recent latency), a duplicate is sent, the first answer wins and the other call is cancelled.
+
+  A. HedgeBudget bounds the extra load. Every call earns `ratio` of a hedge (up to `burst`)
+     and every hedge spends one, so over time at most `ratio` extra calls go out per call,
+     whatever the latency does.
+  B. HedgeStats shows what the hedges buy. A `holdback` share of the calls is never hedged;
+     the p99 of those against the p99 of the rest is the tail latency gained, and hedges per
+     call is what it cost.
+
+A failed attempt doesn't end a hedged call while the other attempt may still answer. Each
+attempt is billed whether or not its answer is used, so hedged() can report every attempt it
+launched (HedgeAttempt) for the caller to account for.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+LATENCY_WINDOW = 1000  # Recent calls per arm the p99s are taken over
+
+# Outcomes of an attempt
+WON = "won"  # Its answer was returned
+LOST = "lost"  # Answered too, but after the winner
+FAILED = "failed"
+CANCELLED = "cancelled"  # Still running when the call ended
+
+
+@dataclass
+class HedgeAttempt:
+    """One call() that hedged() launched. `result` is set for WON and LOST, `error` for FAILED."""
+    index: int  # 0 for the original call, 1 for the hedge
+    outcome: str
+    latency_ms: float
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+class HedgeBudget:
+    """A token bucket of hedges, shared by every caller in the process."""
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.credit = 0.0
+
+    def earn(self) -> None:
+        self.credit = min(self.burst, self.credit + self.ratio)
+
+    def spend(self) -> bool:
+        if self.credit < 1:
+            return False
+        self.credit -= 1
+        return True
+
+
+def _p99(values: deque) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+
+
+@dataclass
+class HedgeStats:
+    holdback: float = 0.05  # Share of hedgeable calls that never are, as the baseline
+    calls: int = 0  # Calls that could be hedged (their delay was known)
+    hedged: int = 0  # Duplicates sent: the extra calls spent
+    hedge_won: int = 0  # Duplicates that answered first
+    denied: int = 0  # Calls past the delay that the budget didn't cover
+    hedged_ms: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    holdback_ms: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def record(self, latency_ms: float, held_back: bool) -> None:
+        self.calls += 1
+        (self.holdback_ms if held_back else self.hedged_ms).append(latency_ms)
+
+    def report(self) -> dict:
+        hedged_p99, holdback_p99 = _p99(self.hedged_ms), _p99(self.holdback_ms)
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_won": self.hedge_won,
+            "denied_by_budget": self.denied,
+            "extra_calls_pct": round(100 * self.hedged / self.calls, 2) if self.calls else 0.0,
+            "p99_ms": {
+                "hedged": round(hedged_p99, 1),
+                "holdback": round(holdback_p99, 1),
+                "gain": round(holdback_p99 - hedged_p99, 1) if self.hedged_ms and self.holdback_ms else None,
+            },
+            "samples": {"hedged": len(self.hedged_ms), "holdback": len(self.holdback_ms)},
+        }
+
+
+async def _first_success(attempts: list[asyncio.Future]) -> tuple[object, int]:
+    """(result, index) of the first attempt to succeed; the last error if they all fail."""
+    pending = set(attempts)
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        winners = [attempt for attempt in done if attempt.exception() is None]
+        error = next((attempt.exception() for attempt in done if attempt.exception() is not None), error)
+        if winners:
+            winner = min(winners, key=attempts.index)
+            return winner.result(), attempts.index(winner)
+    raise error
+
+
+def _report(attempts: list[asyncio.Future], spans: list[list], winner: Optional[int]) -> list[HedgeAttempt]:
+    now = time.perf_counter()
+    reports = []
+    for index, (attempt, (started, finished)) in enumerate(zip(attempts, spans)):
+        latency_ms = ((finished or now) - started) * 1000
+        if index == winner:
+            reports.append(HedgeAttempt(index, WON, latency_ms, result=attempt.result()))
+        elif not attempt.done() or attempt.cancelled():
+            reports.append(HedgeAttempt(index, CANCELLED, latency_ms))
+        elif attempt.exception() is not None:
+            reports.append(HedgeAttempt(index, FAILED, latency_ms, error=attempt.exception()))
+        else:
+            reports.append(HedgeAttempt(index, LOST, latency_ms, result=attempt.result()))
+    return reports
+
+
+async def hedged(
+    call: Callable[[], Awaitable[T]],
+    delay: Optional[float],
+    budget: HedgeBudget,
+    stats: HedgeStats,
+    attempts_out: Optional[list[HedgeAttempt]] = None,
+) -> T:
+    """
+    Awaits call(), sending a second call() if the first hasn't answered after `delay` seconds
+    and the budget allows it. A `delay` of None means no hedging (and no stats) for this call.
+    Every attempt launched is appended to `attempts_out`, also when the call fails or is cancelled.
+    """
+    budget.earn()
+    held_back = delay is not None and random.random() < stats.holdback
+    started = time.perf_counter()
+    attempts: list[asyncio.Future] = []
+    spans: list[list] = []  # [started, finished] of each attempt
+    winner: Optional[int] = None
+
+    def launch() -> None:
+        span = [time.perf_counter(), None]
+        spans.append(span)
+
+        async def attempt():
+            try:
+                return await call()
+            finally:
+                span[1] = time.perf_counter()
+
+        attempts.append(asyncio.ensure_future(attempt()))
+
+    launch()
+    try:
+        if delay is None or held_back:
+            result = await attempts[0]
+            winner = 0
+        else:
+            done, _ = await asyncio.wait(attempts, timeout=delay)
+            if not done:
+                if budget.spend():
+                    stats.hedged += 1
+                    launch()
+                else:
+                    stats.denied += 1
+            result, winner = await _first_success(attempts)
+            stats.hedge_won += winner > 0
+    finally:
+        if attempts_out is not None:
+            attempts_out.extend(_report(attempts, spans, winner))
+        for attempt in attempts:
+            attempt.cancel()  # The slower attempt; a no-op on finished ones
+    if delay is not None:
+        stats.record((time.perf_counter() - started) * 1000, held_back)
+    return result
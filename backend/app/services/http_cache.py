@@ -0,0 +1,51 @@
+# app/services/http_cache.py
+
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ResourceVersion
+
+
+def build_etag(versions: dict[str, int]) -> str:
+    """Builds a strong ETag from resource versions. Key names are hashed in so different resources never collide."""
+    fingerprint = "|".join(f"{key}={versions[key]}" for key in sorted(versions))
+    return f'"{hashlib.blake2b(fingerprint.encode(), digest_size=8).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Checks the request's If-None-Match header against an ETag (weak comparison, as RFC 9110 specifies for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+async def resource_etag(db: AsyncSession, *keys: str) -> str:
+    """The current ETag for the given resource keys, read with one small lookup."""
+    versions = await ResourceVersion.get_many(db, list(keys))
+    # Stored key names, so two tenants at the same versions still get different ETags
+    return build_etag({ResourceVersion.scoped_key(key): version for key, version in versions.items()})
+
+
+def check_etag(request: Request, response: Response, etag: str) -> Response | None:
+    """Sets the ETag on the outgoing response, and returns a ready 304 response when the client already holds it."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # no-cache = always revalidate, never serve blind
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+async def conditional_get(request: Request, response: Response, db: AsyncSession, *keys: str) -> Response | None:
+    """
+    Resolves the current ETag for the given resource keys with one small lookup.
+
+    Sets the ETag on the outgoing response and returns a ready 304 response when the
+    client already holds the current representation, so the caller can skip its query.
+    """
+    return check_etag(request, response, await resource_etag(db, *keys))
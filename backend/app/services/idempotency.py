@@ -0,0 +1,73 @@
+# app/services/idempotency.py
+
+import datetime
+import hashlib
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import config
+from app.models import IdempotencyKey
+
+
+def request_fingerprint(*parts: str) -> str:
+    """Identifies a request by its content, to tell a genuine retry from a reused key."""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+async def claim(db: AsyncSession, key: str, request_hash: str) -> Optional[IdempotencyKey]:
+    """
+    Claims `key` for this request and commits the claim.
+
+    Returns None when the caller now owns the key and should do the work, or the stored
+    record when the request already completed and should be replayed. Raises 422 if the
+    key was used for a different request and 409 if that request is still running (or keeps
+    failing and releasing the key as we try to claim it).
+    """
+    ttl = datetime.timedelta(hours=config.IDEMPOTENCY_KEY_TTL_HOURS)
+    claim_timeout = datetime.timedelta(seconds=config.IDEMPOTENCY_CLAIM_TIMEOUT_SECONDS)
+    stmt = pg_insert(IdempotencyKey).values(key=key, request_hash=request_hash)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.tenant_id, IdempotencyKey.key],
+        set_={"request_hash": request_hash, "status_code": None, "response_body": None, "created_at": func.now(), "completed_at": None},
+        # Take over only expired keys and claims abandoned by a crashed request
+        where=or_(
+            IdempotencyKey.created_at < func.now() - ttl,
+            IdempotencyKey.status_code.is_(None) & (IdempotencyKey.created_at < func.now() - claim_timeout),
+        ),
+    )
+    for _ in range(2):
+        claimed = (await db.execute(stmt.returning(IdempotencyKey.key))).first()
+        await db.commit()
+        if claimed:
+            return None
+        record = (await db.execute(select(IdempotencyKey).where(IdempotencyKey.key == key))).scalar_one_or_none()
+        if record:
+            break
+        # The holder failed and released the key between our upsert and this read: try to claim it again
+    else:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed.", headers={"Retry-After": "5"})
+
+    if record.request_hash != request_hash:
+        raise HTTPException(status_code=422, detail="This Idempotency-Key was already used for a different request.")
+    if record.status_code is None:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed.", headers={"Retry-After": "5"})
+    return record
+
+
+async def complete(db: AsyncSession, key: str, status_code: int, response_body: dict) -> None:
+    """Stores the response. Call inside the transaction that does the work, so both commit together."""
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key)
+        .values(status_code=status_code, response_body=response_body, completed_at=func.now())
+    )
+
+
+async def release(db: AsyncSession, key: str) -> None:
+    """Drops an unfinished claim after a failure, so the client can retry with the same key. Commits."""
+    await db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)))
+    await db.commit()
@@ -0,0 +1,121 @@
+# app/services/llm_cascade.py
+"""
+Model tiers for extraction (LLM_MODEL_TIERS, cheapest first). llm_client asks the first tier
+whose circuit is closed and moves up a tier when:
+
+  - the call fails or times out (which also counts against that tier's circuit breaker), or
+  - the answer doesn't hold up: invalid JSON, a supplier email that isn't in the text, no
+    price although the text quotes one, an implausible price, or a model confidence (from
+    the response's average token log-probability) below LLM_ESCALATION_CONFIDENCE.
+
+The last tier's answer is taken as it is. Each tier keeps in-process counters (served,
+escalated, failed, skipped while open, latency, tokens and cost), shown at /health/llm.
+"""
+
+import math
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from app.services.circuit_breaker import CircuitBreaker
+
+# USD per million tokens (input, output): list prices for prompts up to 128k tokens
+MODEL_PRICES_PER_MILLION = {
+    "models/gemini-1.5-flash-8b": (0.0375, 0.15),
+    "models/gemini-1.5-flash": (0.075, 0.30),
+    "models/gemini-1.5-pro": (1.25, 5.00),
+}
+LATENCY_WINDOW = 1000  # Recent calls per tier the latency percentiles are taken over
+MAX_PLAUSIBLE_PRICE_PER_POUND = 1000.0
+
+EMAIL_ADDRESS = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PRICE_MENTION = re.compile(r"(?:\$|€|£|usd|eur|gbp|cad)\s?\d|\d\s?(?:usd|eur|gbp|cad|dollars|euros)\b", re.IGNORECASE)
+
+
+@dataclass
+class TierStats:
+    attempts: int = 0
+    served: int = 0
+    escalated: int = 0
+    failed: int = 0
+    skipped_open: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    latencies_ms: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def latency_percentile(self, q: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class ModelTier:
+    name: str
+    model: Any  # google.generativeai.GenerativeModel
+    breaker: CircuitBreaker
+    stats: TierStats = field(default_factory=TierStats)
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        """USD for a call; 0 for models without a known price."""
+        input_price, output_price = MODEL_PRICES_PER_MILLION.get(self.name, (0.0, 0.0))
+        return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+    def record(self, latency_ms: float, input_tokens: int = 0, output_tokens: int = 0) -> None:
+        self.stats.attempts += 1
+        self.stats.latencies_ms.append(latency_ms)
+        self.charge(input_tokens, output_tokens)
+
+    def charge(self, input_tokens: int, output_tokens: int = 0) -> None:
+        """Counts tokens billed outside a recorded attempt (a hedge's other attempt), leaving latency stats alone."""
+        self.stats.input_tokens += input_tokens
+        self.stats.output_tokens += output_tokens
+        self.stats.cost_usd += self.cost(input_tokens, output_tokens)
+
+    def report(self) -> dict:
+        stats = self.stats
+        return {
+            "model": self.name,
+            "circuit": self.breaker.state,
+            "attempts": stats.attempts,
+            "served": stats.served,
+            "escalated": stats.escalated,
+            "failed": stats.failed,
+            "skipped_open": stats.skipped_open,
+            "latency_ms": {"p50": round(stats.latency_percentile(0.5), 1), "p95": round(stats.latency_percentile(0.95), 1)},
+            "input_tokens": stats.input_tokens,
+            "output_tokens": stats.output_tokens,
+            "cost_usd": round(stats.cost_usd, 6),
+        }
+
+
+def response_confidence(response: Any) -> Optional[float]:
+    """exp(average token log-probability) of the first candidate, if the provider reported it."""
+    candidates = getattr(response, "candidates", None) or []
+    avg_logprobs = getattr(candidates[0], "avg_logprobs", None) if candidates else None
+    return math.exp(avg_logprobs) if isinstance(avg_logprobs, (int, float)) and avg_logprobs else None
+
+
+def assess_extraction(parsed: BaseModel, email_text: str) -> list[str]:
+    """Reasons not to trust an extraction (ExtractedDataSchema or MultiItemExtractionSchema); empty if none."""
+    problems = []
+    text = email_text.lower()
+    supplier_email = getattr(parsed, "supplier_email", None)
+    if supplier_email and supplier_email.strip().lower() not in text:
+        problems.append("supplier email not in the text")
+    elif not supplier_email and EMAIL_ADDRESS.search(email_text):
+        problems.append("supplier email missed")
+
+    lines = getattr(parsed, "items", None)
+    lines = lines if lines is not None else [parsed]
+    if PRICE_MENTION.search(email_text) and all(line.price_per_pound is None and getattr(line, "price_amount", None) is None for line in lines):
+        problems.append("price missed")
+    prices = [line.price_per_pound for line in lines]
+    if any(price is not None and not 0 < price <= MAX_PLAUSIBLE_PRICE_PER_POUND for price in prices):
+        problems.append("implausible price")
+    return problems
@@ -1,31 +1,73 @@
 # app/services/llm_client.py
 
-import os
-from typing import Any, Dict, List, Optional
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-import google.generativeai as genai
 from fastapi import HTTPException
-from google.generativeai import GenerativeModel
 from pydantic import BaseModel, Field, ValidationError
 
-# --- OPTIMIZED PATTERN: Initialize model once on application startup ---
-gemini_model: Optional[GenerativeModel] = None
+from app.config import config
+from app.services import llm_ledger
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.concurrency import ConcurrencyLimiter
+from app.services.email_normalizer import estimate_tokens
+from app.services.hedging import CANCELLED, FAILED, WON, HedgeAttempt, HedgeBudget, HedgeStats, hedged
+from app.services.llm_cascade import ModelTier, assess_extraction, response_confidence
+from app.services.tenancy import tenant_limits
+
+if TYPE_CHECKING:
+    from google.generativeai import GenerativeModel
+
+# --- Created by init_llm_client() during the app lifespan, never at import time ---
+# The SDK import alone costs more than the rest of the app's startup, and tests, Alembic
+# and scripts that only need the schemas below shouldn't pay for it.
+gemini_model: Optional[GenerativeModel] = None  # The first (cheapest) tier; None means the LLM is unavailable
+tiers: List[ModelTier] = []  # config.LLM_MODEL_TIERS, cheapest first
+
+# This worker's share of the deployment-wide LLM concurrency budget; shutdown drains it
+llm_limiter = ConcurrencyLimiter(config.LLM_WORKER_CONCURRENCY)
+
+# Hedged calls: one budget for every tier, so the extra load stays a fixed share of the calls
+hedge_budget = HedgeBudget(config.LLM_HEDGE_BUDGET)
+hedge_stats = HedgeStats(holdback=config.LLM_HEDGE_HOLDBACK)
 
-# GEMINI_API_KEY HERE!
-try:
-    # Had an .env issue so i just hardcoded it (very aware this is bad practice but it was quicklest/simplest )
-    api_key = "" 
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY environment variable not found.")
+# Open RFQ items named in the multi-item prompt; more would mostly spend tokens
+MULTI_ITEM_PROMPT_MAX_ITEMS = 200
 
-    genai.configure(api_key=api_key)
 
-    gemini_model = genai.GenerativeModel("models/gemini-1.5-flash")
-    print("✅ Google GenAI Client initialized successfully.")
+def load_sdk():
+    """Imports the Gemini SDK (once; later calls hit the module cache). serve.py calls this before forking."""
+    import google.generativeai as genai
+
+    return genai
+
+
+def init_llm_client() -> None:
+    """Configures the Gemini client and the model tiers. Failures leave gemini_model unset, so LLM endpoints answer 503."""
+    global gemini_model, tiers
+    try:
+        if not config.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY environment variable not found.")
+        if not config.LLM_MODEL_TIERS:
+            raise ValueError("LLM_MODEL_TIERS names no models.")
 
-except (ValueError, ImportError) as e:
-    # This will be printed on startup if the configuration fails.
-    print(f"⚠️ Warning: Google GenAI Client could not be initialized. Error: {e}")
+        genai = load_sdk()
+        genai.configure(api_key=config.GEMINI_API_KEY)
+
+        tiers = [
+            ModelTier(name, genai.GenerativeModel(name), CircuitBreaker(config.LLM_BREAKER_FAILURES, config.LLM_BREAKER_COOLDOWN_SECONDS))
+            for name in config.LLM_MODEL_TIERS
+        ]
+        gemini_model = tiers[0].model
+        print(f"✅ Google GenAI Client initialized successfully ({' → '.join(config.LLM_MODEL_TIERS)}).")
+
+    except (ValueError, ImportError) as e:
+        # This will be printed on startup if the configuration fails.
+        print(f"⚠️ Warning: Google GenAI Client could not be initialized. Error: {e}")
 
 
 class ExtractedDataSchema(BaseModel):
@@ -37,6 +79,11 @@ class ExtractedDataSchema(BaseModel):
     certifications: List[str] = Field(default_factory=list, description="A list of any mentioned product certifications.")
     minimum_order_quantity: Optional[int] = Field(description="The MOQ in pounds. Extract only the numerical value.")
 
+    # The price exactly as quoted; app/services/price_conversion.py turns it into price_per_pound
+    price_amount: Optional[float] = Field(default=None, description="The quoted price as written, without converting it, e.g. 850 for '€850/MT'.")
+    price_currency: Optional[str] = Field(default=None, description="The currency of price_amount as an ISO 4217 code, e.g. 'USD', 'EUR', 'CAD'.")
+    price_unit: Optional[str] = Field(default=None, description="The weight unit price_amount is quoted per, e.g. 'lb', 'kg', 'MT'.")
+
     company_name: Optional[str] = Field(description="The supplier's company name from the signature.")
     contact_name: Optional[str] = Field(description="The supplier's contact person name from the signature.")
 
@@ -44,53 +91,298 @@ class ExtractedDataSchema(BaseModel):
     supplier_phone: Optional[str] = Field(description="The supplier's contact phone number, typically from the email signature.")
 
 
+@dataclass
+class LLMUsage:
+    """What one extraction cost, summed over every call it made (tiers tried and their hedges); `model` and `tier` name the one that answered."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    model: Optional[str] = None
+    tier: Optional[int] = None  # Index into `tiers`
+    latency_ms: float = 0.0
+    cost_usd: float = 0.0
+
+    @classmethod
+    def from_response(cls, response: Any) -> "LLMUsage":
+        usage = getattr(response, "usage_metadata", None)
+        return cls(
+            input_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+        )
+
+
 async def extract_quote_data_from_email(email_text: str) -> ExtractedDataSchema:
     """
     Uses Gemini to extract structured data from raw email text into a Pydantic model.
     """
-    if not gemini_model:
-        # This will be triggered if the model failed to initialize on startup
-        raise HTTPException(status_code=503, detail="Gemini client is not available. Check server logs for initialization errors.")
+    parsed_data, _ = await extract_quote_data_with_usage(email_text)
+    return parsed_data
+
 
+async def extract_quote_data_with_usage(email_text: str) -> tuple[ExtractedDataSchema, LLMUsage]:
+    """extract_quote_data_from_email, also returning the tokens the call used."""
     # --- SIMPLIFIED PROMPT: More effective and less token-heavy ---
-    prompt = "Analyze the following email and extract the relevant quote and supplier information."
+    prompt = (
+        "Analyze the following email and extract the relevant quote and supplier information. "
+        "Give the price as quoted, in its own currency and unit; fill price_per_pound only if it is quoted in USD per pound."
+    )
+    return await _generate_structured(prompt, email_text, ExtractedDataSchema, llm_ledger.EXTRACT)
+
+
+class QuoteLineItemSchema(BaseModel):
+    """One product quoted in an email."""
+
+    product: Optional[str] = Field(description="The name of the quoted product, e.g., 'Almonds'.")
+    price_per_pound: Optional[float] = Field(description="The price per pound in USD. Extract only the numerical value.")
+    country_of_origin: Optional[str] = Field(description="The country where the product was sourced.")
+    certifications: List[str] = Field(default_factory=list, description="A list of the certifications mentioned for this product.")
+    minimum_order_quantity: Optional[int] = Field(description="The MOQ in pounds. Extract only the numerical value.")
+
+    price_amount: Optional[float] = Field(default=None, description="The quoted price as written, without converting it, e.g. 850 for '€850/MT'.")
+    price_currency: Optional[str] = Field(default=None, description="The currency of price_amount as an ISO 4217 code, e.g. 'USD', 'EUR', 'CAD'.")
+    price_unit: Optional[str] = Field(default=None, description="The weight unit price_amount is quoted per, e.g. 'lb', 'kg', 'MT'.")
+
+
+class MultiItemExtractionSchema(BaseModel):
+    """Every product quoted in one email, with the supplier details they share."""
+
+    items: List[QuoteLineItemSchema] = Field(default_factory=list, description="One entry per quoted product.")
+
+    company_name: Optional[str] = Field(description="The supplier's company name from the signature.")
+    contact_name: Optional[str] = Field(description="The supplier's contact person name from the signature.")
+
+    supplier_email: Optional[str] = Field(description="The supplier's contact email, typically from the email signature.")
+    supplier_phone: Optional[str] = Field(description="The supplier's contact phone number, typically from the email signature.")
+
+    @classmethod
+    def from_single(cls, extracted: ExtractedDataSchema) -> MultiItemExtractionSchema:
+        return cls(
+            items=[QuoteLineItemSchema(**extracted.model_dump(include=set(QuoteLineItemSchema.model_fields)))],
+            **extracted.model_dump(exclude=set(QuoteLineItemSchema.model_fields)),
+        )
+
+    def to_quotes(self) -> list[ExtractedDataSchema]:
+        """One ExtractedDataSchema per line item, each carrying the shared supplier details."""
+        supplier = self.model_dump(exclude={"items"})
+        return [ExtractedDataSchema(**item.model_dump(), **supplier) for item in self.items]
+
+
+async def extract_quote_items_from_email(email_text: str, open_items: List[str]) -> tuple[MultiItemExtractionSchema, LLMUsage]:
+    """
+    Extracts every quoted product from an email in a single call. `open_items` are the items of
+    the open RFQs; the LLM is asked to use those names, which is what line items are matched on.
+    """
+    prompt = (
+        "Analyze the following email and extract the supplier information and every product it quotes, one entry per product. "
+        "Give each price as quoted, in its own currency and unit; fill price_per_pound only if it is quoted in USD per pound. "
+        "We have open requests for quotes for these items; when a quoted product is one of them, use the item name exactly as written here: "
+        + "; ".join(open_items[:MULTI_ITEM_PROMPT_MAX_ITEMS])
+    )
+    return await _generate_structured(prompt, email_text, MultiItemExtractionSchema, llm_ledger.EXTRACT_ITEMS)
+
+
+def _hedge_delay(tier: ModelTier) -> Optional[float]:
+    """Seconds before a call to `tier` is hedged; None while hedging is off or the tier has too little history."""
+    if not config.LLM_HEDGE_PERCENTILE or len(tier.stats.latencies_ms) < config.LLM_HEDGE_MIN_SAMPLES:
+        return None
+    return tier.stats.latency_percentile(config.LLM_HEDGE_PERCENTILE) / 1000
+
+
+async def _call_tier(
+    tier: ModelTier,
+    contents: list,
+    operation: str,
+    generation_config: Optional[Dict[str, Any]] = None,
+    usage: Optional[LLMUsage] = None,
+    permit: Optional[object] = None,
+) -> tuple[Any, float]:
+    """
+    One attempt on one tier, under the concurrency limits and the per-attempt timeout, hedged
+    when it runs slow (app/services/hedging.py). Returns (response, latency in ms). The caller
+    must have been let through by `tier.breaker.allow()`; this records the call's outcome against the
+    `permit` it returned.
 
+    The caller records the ledger row of the attempt it gets the response of (or, on failure, of
+    the call); the hedge's other attempt is billed too, so this records it under `operation`,
+    charges it to the tier and adds its tokens and cost to `usage`.
+    """
+    attempts: list[HedgeAttempt] = []
+    # The tenant's share first, so a tenant waiting on its own share doesn't hold a worker-wide slot
     try:
-        generation_config: Dict[str, Any] = {
-            "response_mime_type": "application/json",
-            "response_schema": ExtractedDataSchema,
-        }
+        async with tenant_limits.llm_slot(), llm_limiter:
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    hedged(
+                        lambda: tier.model.generate_content_async(contents=contents, generation_config=generation_config),
+                        _hedge_delay(tier), hedge_budget, hedge_stats, attempts,
+                    ),
+                    config.LLM_TIER_TIMEOUT_SECONDS,
+                )
+            except Exception:
+                tier.record((time.perf_counter() - started) * 1000)
+                tier.stats.failed += 1
+                tier.breaker.record_failure(permit)
+                raise
+    except BaseException:
+        # Cancelled while waiting for a slot or mid-call: no outcome, but a half-open probe must not hold the circuit forever
+        tier.breaker.release(permit)
+        raise
+    finally:
+        _record_other_attempts(tier, contents, operation, attempts, usage)
+    latency_ms = (time.perf_counter() - started) * 1000
+    response_usage = LLMUsage.from_response(response)
+    tier.breaker.record_success(permit)
+    tier.record(latency_ms, response_usage.input_tokens, response_usage.output_tokens)
+    return response, latency_ms
+
+
+def _record_other_attempts(tier: ModelTier, contents: list, operation: str, attempts: list[HedgeAttempt], usage: Optional[LLMUsage]) -> None:
+    """Ledger rows and charges for the attempts _call_tier's caller doesn't record: all but the winner, or the first."""
+    winner = next((attempt for attempt in attempts if attempt.outcome == WON), None)
+    # A cancelled attempt reports no usage; it sent the same prompt as the one that answered, else it's estimated
+    prompt_tokens = (
+        LLMUsage.from_response(winner.result).input_tokens if winner
+        else sum(estimate_tokens(part) for part in contents if isinstance(part, str))
+    )
+    for attempt in attempts:
+        if attempt is winner or (winner is None and attempt.index == 0):
+            continue
+        if attempt.outcome == CANCELLED:
+            outcome, call_usage = llm_ledger.CANCELLED, LLMUsage(input_tokens=prompt_tokens)
+        elif attempt.outcome == FAILED:
+            outcome, call_usage = _failure_outcome(attempt.error), LLMUsage()
+        else:  # Answered after the winner: billed in full, not used
+            outcome, call_usage = llm_ledger.REJECTED, LLMUsage.from_response(attempt.result)
+        cost = tier.cost(call_usage.input_tokens, call_usage.output_tokens)
+        llm_ledger.record_call(operation, tier.name, outcome, attempt.latency_ms, call_usage.input_tokens, call_usage.output_tokens, cost)
+        tier.charge(call_usage.input_tokens, call_usage.output_tokens)
+        if usage is not None:
+            usage.input_tokens += call_usage.input_tokens
+            usage.output_tokens += call_usage.output_tokens
+            usage.cost_usd += cost
+
+
+def _failure_outcome(error: Exception) -> str:
+    return llm_ledger.TIMEOUT if isinstance(error, TimeoutError) else llm_ledger.ERROR
+
+
+async def _generate_structured(prompt: str, email_text: str, schema: type[BaseModel], operation: str) -> tuple[Any, LLMUsage]:
+    """
+    One structured-output extraction: `schema` is both the response schema and the validator.
+    Tries the tiers cheapest first and escalates as described in app/services/llm_cascade.py.
+    Every attempt is recorded in the LLM call ledger under `operation`.
+    """
+    if not gemini_model:
+        # This will be triggered if the model failed to initialize on startup
+        raise HTTPException(status_code=503, detail="Gemini client is not available. Check server logs for initialization errors.")
 
-        response = await gemini_model.generate_content_async(contents=[prompt, email_text], generation_config=generation_config)
+    generation_config: Dict[str, Any] = {
+        "response_mime_type": "application/json",
+        "response_schema": schema,
+    }
+    usage = LLMUsage()
+    answer: Optional[tuple[Any, int]] = None  # (parsed, tier index) of the best answer so far
+    attempts: list[tuple[int, str, float, LLMUsage]] = []  # (tier index, outcome, latency, usage) for the ledger
+    last_error: Optional[Exception] = None
+    attempted = False
+    try:
+        for index, tier in enumerate(tiers):
+            permit = tier.breaker.allow()
+            if not permit:
+                tier.stats.skipped_open += 1
+                continue
+            attempted = True
+            started = time.perf_counter()
+            try:
+                response, latency_ms = await _call_tier(tier, [prompt, email_text], operation, generation_config, usage, permit)
+            except Exception as e:
+                # This catches other potential errors (e.g., network issues, API key problems, timeouts).
+                print(f"An unexpected error occurred with the Gemini API ({tier.name}): {e!r}")
+                attempts.append((index, _failure_outcome(e), (time.perf_counter() - started) * 1000, LLMUsage()))
+                last_error = e
+                continue
 
-        parsed_data = ExtractedDataSchema.model_validate_json(response.text)
-        return parsed_data
+            call_usage = LLMUsage.from_response(response)
+            usage.input_tokens += call_usage.input_tokens
+            usage.output_tokens += call_usage.output_tokens
+            usage.latency_ms += latency_ms
+            usage.cost_usd += tier.cost(call_usage.input_tokens, call_usage.output_tokens)
+            try:
+                parsed_data = schema.model_validate_json(response.text)
+            except (ValidationError, AttributeError, ValueError) as e:
+                # This block catches errors if the LLM's JSON doesn't match the Pydantic schema.
+                print(f"--- LLM Validation Error ({tier.name}) --- \n{e}")
+                print(f"--- Raw LLM Response --- \n{getattr(response, 'text', 'No response text')}")
+                attempts.append((index, llm_ledger.INVALID, latency_ms, call_usage))
+                problems = ["invalid response"]
+            else:
+                attempts.append((index, llm_ledger.REJECTED, latency_ms, call_usage))
+                answer = (parsed_data, index)
+                problems = assess_extraction(parsed_data, email_text)
+                confidence = response_confidence(response)
+                if confidence is not None and confidence < config.LLM_ESCALATION_CONFIDENCE:
+                    problems.append(f"confidence {confidence:.2f}")
+                if not problems:
+                    break
+            if index < len(tiers) - 1:
+                tier.stats.escalated += 1
+                print(f"🪜 Escalating past {tier.name}: {', '.join(problems)}")
+    finally:
+        for index, outcome, latency_ms, call_usage in attempts:
+            if answer is not None and index == answer[1] and outcome == llm_ledger.REJECTED:
+                outcome = llm_ledger.SERVED
+            tier = tiers[index]
+            llm_ledger.record_call(
+                operation, tier.name, outcome, latency_ms,
+                call_usage.input_tokens, call_usage.output_tokens, tier.cost(call_usage.input_tokens, call_usage.output_tokens),
+            )
 
-    except (ValidationError, AttributeError) as e:
-        # This block catches errors if the LLM's JSON doesn't match the Pydantic schema.
-        print(f"--- LLM Validation Error --- \n{e}")
-        print(f"--- Raw LLM Response --- \n{response.text if 'response' in locals() else 'No response object'}")
+    if answer is None:
+        if not attempted:
+            raise HTTPException(status_code=503, detail="Every LLM tier is failing; their circuits are open. Try again shortly.")
+        if last_error is not None:
+            raise HTTPException(status_code=502, detail=f"An error occurred with the LLM service: {str(last_error)}")
         raise HTTPException(
             status_code=502,  # Bad Gateway: The upstream LLM service returned an invalid response
             detail="The LLM response could not be validated. Check server logs for the raw response.",
         )
-    except Exception as e:
-        # This catches other potential errors (e.g., network issues, API key problems).
-        print(f"An unexpected error occurred with the Gemini API: {e}")
-        raise HTTPException(status_code=502, detail=f"An error occurred with the LLM service: {str(e)}")
+
+    parsed_data, index = answer
+    tiers[index].stats.served += 1
+    usage.model, usage.tier = tiers[index].name, index
+    return parsed_data, usage
 
 
 async def generate_clarification_email(prompt: str) -> str:
     """
     Uses Gemini to generate a text-based response from a detailed prompt.
+    Falls through to the next tier when one fails or its circuit is open.
     """
     if not gemini_model:
         raise HTTPException(status_code=503, detail="Gemini client is not available. Check server logs for initialization errors.")
 
-    try:
-        response = await gemini_model.generate_content_async(contents=[prompt])
+    last_error: Optional[Exception] = None
+    for tier in tiers:
+        permit = tier.breaker.allow()
+        if not permit:
+            tier.stats.skipped_open += 1
+            continue
+        started = time.perf_counter()
+        try:
+            response, latency_ms = await _call_tier(tier, [prompt], llm_ledger.CLARIFY, permit=permit)
+        except Exception as e:
+            # This catches other potential errors (e.g., network issues, API key problems).
+            print(f"An unexpected error occurred with the Gemini API ({tier.name}): {e!r}")
+            llm_ledger.record_call(llm_ledger.CLARIFY, tier.name, _failure_outcome(e), (time.perf_counter() - started) * 1000)
+            last_error = e
+            continue
+        usage = LLMUsage.from_response(response)
+        llm_ledger.record_call(
+            llm_ledger.CLARIFY, tier.name, llm_ledger.SERVED, latency_ms,
+            usage.input_tokens, usage.output_tokens, tier.cost(usage.input_tokens, usage.output_tokens),
+        )
         return response.text
-    except Exception as e:
-        # This catches other potential errors (e.g., network issues, API key problems).
-        print(f"An unexpected error occurred with the Gemini API: {e}")
-        raise HTTPException(status_code=502, detail=f"An error occurred with the LLM service: {str(e)}")
\ No newline at end of file
+    if last_error is None:
+        raise HTTPException(status_code=503, detail="Every LLM tier is failing; their circuits are open. Try again shortly.")
+    raise HTTPException(status_code=502, detail=f"An error occurred with the LLM service: {str(last_error)}")
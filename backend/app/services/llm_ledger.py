@@ -0,0 +1,203 @@
+# app/services/llm_ledger.py
+"""
+Append-only ledger of every LLM call (the llm_calls table): operation, model, outcome,
+prompt and response tokens, latency and cost, and the email/quote/RFQ/supplier it was for.
+
+  A. llm_client records each call with record_call(). Nothing is written on the request path:
+     rows go into an in-memory buffer that a background task inserts in batches every
+     LLM_LEDGER_FLUSH_SECONDS, or sooner once LLM_LEDGER_BATCH_SIZE rows are waiting.
+  B. The ids a call was for are usually only known after it: the quote is saved from what the
+     LLM extracted. Code running inside recording() collects its calls in a CallGroup, and
+     process_quote_from_email_data attributes the group to the email and quote it saves. An
+     extraction that fed several quotes is split across them (tokens and cost shared out, one
+     call_id), so sums per RFQ or supplier add up to what was spent.
+  C. If the database is unreachable the buffer keeps up to LLM_LEDGER_MAX_PENDING rows and
+     drops the oldest beyond that, counting what it dropped.
+
+Calls are only recorded while the ledger runs (the app lifespan, or a script that starts it).
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import datetime
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import insert
+
+from app.config import config
+from app.models import LLMCall, generate_uuid
+from app.services.database import sessionmanager
+from app.services.tenancy import current_tenant
+
+# Outcomes of a call
+SERVED = "served"  # Its answer was used
+REJECTED = "rejected"  # Valid, but escalated past or outdone by another tier's answer
+INVALID = "invalid"  # The response didn't match the schema
+ERROR = "error"
+TIMEOUT = "timeout"
+CANCELLED = "cancelled"  # A hedged call's slower attempt, cancelled once the other answered; its input is billed
+
+# Operations
+EXTRACT = "extract"
+EXTRACT_ITEMS = "extract_items"
+CLARIFY = "clarify"
+
+ATTRIBUTION_FIELDS = ("email_id", "quote_id", "rfq_id", "supplier_id")
+
+
+@dataclass
+class CallGroup:
+    """The LLM calls made for one piece of work, and the records they ended up serving."""
+
+    calls: list[dict] = field(default_factory=list)
+    attributions: list[dict] = field(default_factory=list)
+    closed: bool = False
+
+    def attribute(self, **ids: Optional[str]) -> None:
+        self.attributions.append({name: ids.get(name) for name in ATTRIBUTION_FIELDS})
+
+    def rows(self) -> list[dict]:
+        """One row per call and attribution, tokens and cost shared out across the attributions."""
+        attributions = self.attributions or [dict.fromkeys(ATTRIBUTION_FIELDS)]
+        count = len(attributions)
+        rows = []
+        for call in self.calls:
+            for index, ids in enumerate(attributions):
+                rows.append({
+                    **call,
+                    **ids,
+                    "input_tokens": call["input_tokens"] // count + (index < call["input_tokens"] % count),
+                    "output_tokens": call["output_tokens"] // count + (index < call["output_tokens"] % count),
+                    "cost_usd": call["cost_usd"] / count,
+                })
+        return rows
+
+    def close(self) -> None:
+        """Hands the group's rows to the ledger. Later calls and attributions are ignored."""
+        if not self.closed:
+            self.closed = True
+            llm_ledger.append(self.rows())
+
+
+_current_group: contextvars.ContextVar[Optional[CallGroup]] = contextvars.ContextVar("llm_call_group", default=None)
+
+
+@contextlib.contextmanager
+def recording(group: Optional[CallGroup] = None) -> Iterator[CallGroup]:
+    """
+    Collects the LLM calls and attributions made inside the block in `group` (a new one if not
+    given). A group this creates is closed on exit; one passed in is left for the caller to close.
+    """
+    current = group or CallGroup()
+    token = _current_group.set(current)
+    try:
+        yield current
+    finally:
+        _current_group.reset(token)
+        if group is None:
+            current.close()
+
+
+def record_call(
+    operation: str,
+    model: str,
+    outcome: str,
+    latency_ms: float,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+    cost_usd: float = 0.0,
+) -> None:
+    """Adds a call to the current group, or straight to the ledger outside recording()."""
+    if not llm_ledger.running:
+        return
+    call = {
+        "call_id": generate_uuid(),
+        "tenant_id": current_tenant(),  # Captured now: the rows are written from a background task
+        "called_at": datetime.datetime.now(datetime.UTC),
+        "operation": operation,
+        "model": model,
+        "outcome": outcome,
+        "latency_ms": round(latency_ms, 1),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cost_usd": cost_usd,
+    }
+    group = _current_group.get()
+    if group is not None and not group.closed:
+        group.calls.append(call)
+    else:
+        llm_ledger.append(CallGroup(calls=[call]).rows())
+
+
+def attribute(**ids: Optional[str]) -> None:
+    """Marks the current group's calls as spent on these records (email_id, quote_id, rfq_id, supplier_id)."""
+    group = _current_group.get()
+    if group is not None and not group.closed:
+        group.attribute(**ids)
+
+
+class LLMLedger:
+    """Buffers ledger rows and inserts them in batches from a background task."""
+
+    def __init__(self, batch_size: int, flush_seconds: float, max_pending: int):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.pending: list[dict] = []
+        self.written = 0
+        self.dropped = 0
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_forever())
+
+    async def stop(self) -> None:
+        """Stops the background task and writes what is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+    def append(self, rows: list[dict]) -> None:
+        if not rows or not self.running:
+            return
+        self.pending.extend(rows)
+        if len(self.pending) > self.max_pending:
+            excess = len(self.pending) - self.max_pending
+            del self.pending[:excess]
+            self.dropped += excess
+        if len(self.pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        while self.pending:
+            batch = self.pending[: self.batch_size]
+            try:
+                async with sessionmanager.session() as db:
+                    await db.execute(insert(LLMCall), batch)
+                    await db.commit()
+            except Exception as e:
+                print(f"⚠️ Could not write {len(batch)} LLM ledger row(s), keeping them for the next flush: {e}")
+                return
+            del self.pending[: len(batch)]
+            self.written += len(batch)
+
+    async def _flush_forever(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_seconds)
+            self._wakeup.clear()
+            await self.flush()
+
+
+llm_ledger = LLMLedger(config.LLM_LEDGER_BATCH_SIZE, config.LLM_LEDGER_FLUSH_SECONDS, config.LLM_LEDGER_MAX_PENDING)
@@ -0,0 +1,250 @@
+# app/services/mailbox_ingest.py
+"""
+Feeds a whole mailbox through the extraction pipeline (scripts/ingest_mailbox.py).
+
+  A. Raw messages stream out of the mailbox in batches of MAIL_INGEST_BATCH_SIZE, and a
+     process pool parses the next batch while the current one waits on the LLM
+  B. Messages the checkpoint already settled are skipped
+  C. The rest are extracted concurrently (llm_limiter caps the calls; recognized price-sheet
+     attachments skip the LLM), routed to an RFQ and saved, each in its own transaction
+  D. The batch's outcomes are appended to the checkpoint, so a run that is interrupted
+     resumes after the last finished batch
+
+A message goes to the RFQ given on the command line, else to the RFQ of the message it
+replies to, else to the open RFQ whose item matches the extracted product (see match_open_rfq).
+"""
+
+import asyncio
+import datetime
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.config import config
+from app.models import RFQ
+from app.services import llm_ledger
+from app.services.attachments import PreparedExtraction, prepare_extraction
+from app.services.database import sessionmanager
+from app.services.email_archive import ensure_partitions_between
+from app.services.llm_client import ExtractedDataSchema, extract_quote_data_from_email
+from app.services.mailbox_parser import ParsedEmail, iter_raw_messages, parse_batch
+from app.services.quote_processor import match_open_rfq, process_quote_from_email_data
+from app.services.sandbox import without_main_reimport
+
+SAVED = "saved"
+UNROUTED = "unrouted"  # No RFQ to attach the quote to
+REJECTED = "rejected"  # The pipeline refused it, e.g. no supplier email anywhere
+INVALID = "invalid"  # Couldn't be parsed
+FAILED = "failed"  # LLM or database error; retried on the next run
+SETTLED = {SAVED, UNROUTED, REJECTED, INVALID}
+
+
+@dataclass
+class IngestReport:
+    seen: int = 0
+    already_done: int = 0
+    saved: int = 0
+    unrouted: int = 0
+    rejected: int = 0
+    invalid: int = 0
+    failed: int = 0
+
+
+class Checkpoint:
+    """
+    Append-only JSON-lines log of what happened to each Message-ID. Rereading it on start is
+    what makes a run resumable; the last line for a Message-ID wins.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.records: dict[str, dict] = {}
+        self._pending: list[dict] = []
+        if self.path.exists():
+            with self.path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A line torn by a crash mid-write; that message is simply redone
+                    self.records[record["message_id"]] = record
+
+    def is_settled(self, message_id: str) -> bool:
+        record = self.records.get(message_id)
+        return record is not None and record["status"] in SETTLED
+
+    def rfq_for_thread(self, message_ids: Iterable[str]) -> Optional[str]:
+        """The RFQ the nearest already-ingested message in the thread went to."""
+        for message_id in message_ids:
+            record = self.records.get(message_id)
+            if record and record.get("rfq_id"):
+                return record["rfq_id"]
+        return None
+
+    def note(self, record: dict) -> None:
+        """Records an outcome in memory; flush() makes it durable."""
+        self.records[record["message_id"]] = record
+        self._pending.append(record)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        with self.path.open("ab+") as f:
+            if f.tell() and (f.seek(-1, os.SEEK_END), f.read(1))[1] != b"\n":
+                f.write(b"\n")  # Don't glue the first record onto a torn line
+            f.writelines((json.dumps(record) + "\n").encode("utf-8") for record in self._pending)
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending = []
+
+
+def _batches(messages: Iterator[bytes], size: int) -> Iterator[list[bytes]]:
+    while batch := list(islice(messages, size)):
+        yield batch
+
+
+class MailboxIngester:
+    def __init__(self, checkpoint: Checkpoint, rfq_id: Optional[str] = None, batch_size: Optional[int] = None, workers: Optional[int] = None):
+        self.checkpoint = checkpoint
+        self.rfq_id = rfq_id
+        self.batch_size = batch_size or config.MAIL_INGEST_BATCH_SIZE
+        self.workers = workers or config.MAIL_INGEST_WORKERS or os.cpu_count() or 1
+        self.items: list[str] = []
+
+    async def run(self, source: Path) -> IngestReport:
+        async with sessionmanager.session() as db:
+            if self.rfq_id:
+                rfq = await db.get(RFQ, self.rfq_id)
+                if not rfq:
+                    raise ValueError(f"RFQ {self.rfq_id} not found")
+                self.items = [rfq.item]
+            else:
+                # What price-sheet rows are matched against; routing then picks the RFQ
+                self.items = (await db.execute(select(RFQ.item).distinct())).scalars().all()
+
+        report = IngestReport()
+        loop = asyncio.get_running_loop()
+        batches = _batches(iter_raw_messages(source), self.batch_size)
+
+        async def parse_next() -> Optional[list[ParsedEmail]]:
+            raw = await asyncio.to_thread(next, batches, None)  # Disk reads stay off the event loop
+            if not raw:
+                return None
+            with without_main_reimport():  # Submitting starts the pool's workers on demand
+                parsed = loop.run_in_executor(pool, parse_batch, raw)
+            return await parsed
+
+        # Spawned, not forked: this process already runs threads. Workers import only the parser
+        # (app.services.mailbox_parser, stdlib-only), not this script's stack
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            upcoming = asyncio.ensure_future(parse_next())
+            try:
+                while (parsed := await upcoming) is not None:
+                    upcoming = asyncio.ensure_future(parse_next())
+                    await self._ingest_batch(parsed, report)
+                    print(f"📬 {report.seen} messages: {report.saved} saved, {report.failed} failed, {report.already_done} already done")
+            finally:
+                upcoming.cancel()
+        return report
+
+    async def _ingest_batch(self, parsed: list[ParsedEmail], report: IngestReport) -> None:
+        # B. Skip what earlier runs (or earlier copies in this batch) settled
+        todo: dict[str, ParsedEmail] = {}
+        for message in parsed:
+            report.seen += 1
+            if self.checkpoint.is_settled(message.message_id) or message.message_id in todo:
+                report.already_done += 1
+            elif message.error:
+                self._record(report, message, INVALID, error=message.error)
+            else:
+                todo[message.message_id] = message
+
+        # C. Extract concurrently, then save in mailbox order so replies find their thread's RFQ
+        messages = list(todo.values())
+        calls = [llm_ledger.CallGroup() for _ in messages]  # Each message's LLM calls, booked against the quote it becomes
+        extractions = await asyncio.gather(
+            *(self._extract(message, group) for message, group in zip(messages, calls)), return_exceptions=True
+        )
+        await self._ensure_partitions(messages)
+        for message, extraction, group in zip(messages, extractions, calls):
+            if isinstance(extraction, Exception):
+                detail = extraction.detail if isinstance(extraction, HTTPException) else str(extraction)
+                self._record(report, message, FAILED, error=detail)
+            else:
+                with llm_ledger.recording(group):
+                    await self._save(message, extraction, report)
+            group.close()
+
+        # D. Make the batch's outcomes durable before moving on
+        self.checkpoint.flush()
+
+    async def _extract(self, message: ParsedEmail, calls: llm_ledger.CallGroup) -> tuple[ExtractedDataSchema, PreparedExtraction]:
+        prepared = await prepare_extraction(message.body, message.attachments, self.items, message.sender_email)
+        with llm_ledger.recording(calls):
+            extracted = prepared.extracted or await extract_quote_data_from_email(message.extraction_text(prepared.llm_text))
+        return extracted, prepared
+
+    async def _save(self, message: ParsedEmail, extraction: tuple[ExtractedDataSchema, PreparedExtraction], report: IngestReport) -> None:
+        extracted, prepared = extraction
+        if not extracted.supplier_email and message.sender_email:
+            extracted.supplier_email = message.sender_email  # The envelope sender beats no email at all
+
+        async with sessionmanager.session() as db:
+            rfq = await self._route(db, message, extracted)
+            if rfq is None:
+                self._record(report, message, UNROUTED)
+                return
+            try:
+                quote = await process_quote_from_email_data(
+                    db=db,
+                    rfq_id=rfq.id,
+                    rfq_item_name=rfq.item,
+                    extracted_data=extracted,
+                    raw_text=message.body,
+                    received_at=message.received_at,
+                    input_tokens=prepared.input_tokens,
+                    input_tokens_saved=prepared.input_tokens_saved,
+                )
+                await db.commit()
+            except ValueError as e:
+                await db.rollback()
+                self._record(report, message, REJECTED, rfq_id=rfq.id, error=str(e))
+                return
+            except Exception as e:
+                await db.rollback()
+                self._record(report, message, FAILED, error=str(e))
+                return
+            self._record(report, message, SAVED, rfq_id=rfq.id, quote_id=quote.id, input_tokens_saved=prepared.input_tokens_saved)
+
+    async def _route(self, db, message: ParsedEmail, extracted: ExtractedDataSchema) -> Optional[RFQ]:
+        if self.rfq_id:
+            return await db.get(RFQ, self.rfq_id)
+        thread_rfq_id = self.checkpoint.rfq_for_thread(message.thread_ids)
+        if thread_rfq_id and (rfq := await db.get(RFQ, thread_rfq_id)):
+            return rfq
+        if extracted.product:
+            as_of = message.received_at or datetime.datetime.now(datetime.UTC)
+            rfq = match_open_rfq(extracted.product, await RFQ.find_open(db, as_of))
+            if rfq:
+                extracted.product = rfq.item  # The RFQ's name for it, not the sheet's "California Almonds, Nonpareil 23/25"
+            return rfq
+        return None
+
+    async def _ensure_partitions(self, messages: list[ParsedEmail]) -> None:
+        """Old mail gets its own monthly partitions instead of piling up in emails_default."""
+        months = [message.received_at.date().replace(day=1) for message in messages if message.received_at]
+        if months:
+            async with sessionmanager.session() as db:
+                await ensure_partitions_between(db, min(months), max(months))
+
+    def _record(self, report: IngestReport, message: ParsedEmail, status: str, **details) -> None:
+        setattr(report, status, getattr(report, status) + 1)
+        self.checkpoint.note({"message_id": message.message_id, "status": status, **details})
@@ -0,0 +1,179 @@
+# app/services/mailbox_parser.py
+"""
+Reads raw messages out of a mailbox and parses them into what the extraction pipeline needs.
+
+Sources: an mbox file, a Maildir (a directory with cur/, new/ and tmp/), a directory of
+.eml files (searched recursively) or a single .eml file. Messages are yielded one at a time,
+so memory stays flat however big the mailbox is.
+
+Parsing is pure and CPU-bound; mailbox_ingest runs parse_batch in a process pool. Keep this
+module free of database and LLM imports so pool workers don't load them. Attachments are
+only collected here; the attachment stage parses them later, under its own limits.
+"""
+
+import datetime
+import email
+import hashlib
+import html
+import mailbox
+import re
+from dataclasses import dataclass, field
+from email import policy
+from email.message import EmailMessage
+from email.utils import parseaddr, parsedate_to_datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Iterator, Optional
+
+from app.services.attachment_parsers import Attachment, attachment_kind
+
+MESSAGE_ID = re.compile(r"<[^<>\s]+>")
+
+
+@dataclass
+class ParsedEmail:
+    message_id: str
+    sender_email: Optional[str] = None
+    sender_name: Optional[str] = None
+    subject: str = ""
+    in_reply_to: Optional[str] = None
+    references: list[str] = field(default_factory=list)
+    received_at: Optional[datetime.datetime] = None
+    body: str = ""
+    attachments: list[Attachment] = field(default_factory=list)  # Only the kinds the attachment stage reads
+    error: Optional[str] = None  # Set when the message couldn't be parsed
+
+    @property
+    def thread_ids(self) -> list[str]:
+        """Message-IDs this message replies to, nearest ancestor first."""
+        ids = [self.in_reply_to] if self.in_reply_to else []
+        ids += [ref for ref in reversed(self.references) if ref not in ids]
+        return ids
+
+    def extraction_text(self, body: Optional[str] = None) -> str:
+        """The body (or a normalized version of it) with the envelope headers the LLM can use to identify the supplier."""
+        sender = f"{self.sender_name} <{self.sender_email}>" if self.sender_name else (self.sender_email or "")
+        return f"From: {sender}\nSubject: {self.subject}\n\n{self.body if body is None else body}"
+
+
+class _TextExtractor(HTMLParser):
+    BLOCK_TAGS = {"p", "div", "br", "tr", "li", "h1", "h2", "h3", "h4", "h5", "h6", "table", "blockquote"}
+    SKIPPED_TAGS = {"script", "style", "head"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self.skipping += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self.skipping = max(0, self.skipping - 1)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.parts.append(data)
+
+
+def html_to_text(markup: str) -> str:
+    extractor = _TextExtractor()
+    extractor.feed(markup)
+    extractor.close()
+    text = html.unescape("".join(extractor.parts))
+    lines = (re.sub(r"[ \t\xa0]+", " ", line).strip() for line in text.splitlines())
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _part_text(part: EmailMessage) -> str:
+    try:
+        return part.get_content()
+    except (LookupError, UnicodeError):
+        # Unknown or lying charset: decode what's there rather than lose the message
+        payload = part.get_payload(decode=True) or b""
+        return payload.decode("utf-8", errors="replace")
+
+
+def _message_ids(value: Optional[str]) -> list[str]:
+    return MESSAGE_ID.findall(str(value or ""))
+
+
+def iter_raw_messages(source: Path) -> Iterator[bytes]:
+    """Yields each message in `source` as raw RFC 5322 bytes."""
+    source = Path(source)
+    if source.is_dir():
+        if all((source / sub).is_dir() for sub in ("cur", "new", "tmp")):
+            box = mailbox.Maildir(source, factory=None, create=False)
+            for key in box.iterkeys():
+                yield box.get_bytes(key)
+        else:
+            for path in sorted(source.rglob("*.eml")):
+                yield path.read_bytes()
+    elif source.suffix.lower() == ".eml":
+        yield source.read_bytes()
+    else:
+        box = mailbox.mbox(source, create=False)
+        try:
+            for key in box.iterkeys():
+                yield box.get_bytes(key)
+        finally:
+            box.close()
+
+
+def parse_message(raw: bytes) -> ParsedEmail:
+    """Parses one message. Never raises: a broken message comes back with `error` set."""
+    # Messages without a Message-ID still need a stable identity for checkpointing
+    fallback_id = f"<{hashlib.sha256(raw).hexdigest()[:32]}@ingest.local>"
+    try:
+        message = email.message_from_bytes(raw, policy=policy.default)
+        ids = _message_ids(message["Message-ID"])
+        sender_name, sender_email = parseaddr(str(message["From"] or ""))
+
+        received_at = None
+        if message["Date"]:
+            try:
+                received_at = parsedate_to_datetime(str(message["Date"]))
+                if received_at.tzinfo is None:
+                    received_at = received_at.replace(tzinfo=datetime.UTC)
+            except (TypeError, ValueError):
+                pass
+
+        body = ""
+        part = message.get_body(preferencelist=("plain", "html"))
+        if part is not None:
+            body = _part_text(part)
+            if part.get_content_subtype() == "html":
+                body = html_to_text(body)
+
+        attachments = []
+        for attachment in message.iter_attachments():
+            filename = attachment.get_filename() or ""
+            data = attachment.get_payload(decode=True) or b""
+            if attachment_kind(filename, attachment.get_content_type(), data):
+                attachments.append(Attachment(filename, attachment.get_content_type(), data))
+
+        in_reply_to = _message_ids(message["In-Reply-To"])
+        return ParsedEmail(
+            message_id=ids[0] if ids else fallback_id,
+            sender_email=sender_email.lower() or None,
+            sender_name=sender_name or None,
+            subject=str(message["Subject"] or ""),
+            in_reply_to=in_reply_to[0] if in_reply_to else None,
+            references=_message_ids(message["References"]),
+            received_at=received_at,
+            body=body.replace("\r\n", "\n").strip(),
+            attachments=attachments,
+        )
+    except Exception as e:
+        return ParsedEmail(message_id=fallback_id, error=f"{type(e).__name__}: {e}")
+
+
+def parse_batch(raw_messages: list[bytes]) -> list[ParsedEmail]:
+    """Entry point for pool workers: one round trip per batch instead of per message."""
+    return [parse_message(raw) for raw in raw_messages]
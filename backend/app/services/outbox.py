@@ -0,0 +1,253 @@
+# app/services/outbox.py
+"""
+Transactional outbox: quote and RFQ changes are pushed to downstream webhooks (ERP, BI) instead of
+those systems polling GET /api/quotes.
+
+  A. enqueue_event() inserts one outbox_events row per webhook endpoint of the current tenant
+     (tenants.webhook_urls; WEBHOOK_URLS too for the default tenant) in the caller's transaction,
+     so an event exists exactly when the change it describes was committed.
+  B. OutboxDispatcher (one per process, started by the app lifespan) finds the (tenant, endpoint)
+     pairs with due rows, claims each pair's rows in id order and POSTs them as one gzip-compressed
+     JSON batch. A 2xx deletes them; anything else puts the batch back with exponential backoff and
+     jitter, and pauses that pair as long.
+  C. Ordering per RFQ: writers enqueue after bumping the RFQ's resource version, whose row lock
+     serializes them, so ids follow commit order within an RFQ. A row is only claimed while no
+     earlier row of its RFQ for that endpoint is backing off or in flight, and claims for a
+     (tenant, endpoint) pair are serialized across processes with an advisory lock.
+  D. A claim is a lease: next_attempt_at moves past the delivery timeout while the batch is in
+     flight, so rows held by a process that died are retried by another once it lapses.
+
+Delivery is at least once; receivers deduplicate on event_id. A batch only ever holds one tenant's
+events, sent to that tenant's own endpoints, even when two tenants register the same URL. The
+dispatcher delivers for all tenants (its SQL is raw, so no tenant filter applies).
+"""
+
+import asyncio
+import contextlib
+import gzip
+import json
+import random
+from typing import Any, Optional
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import config
+from app.models import OutboxEvent, generate_uuid
+from app.services.database import sessionmanager
+from app.services.tenancy import current_tenant, tenant_registry
+
+RFQ_CREATED = "rfq.created"
+
+_PENDING_WAKE = "outbox.pending_wake"
+
+CLAIM_SQL = text("""
+    WITH due AS (
+        SELECT o.id FROM outbox_events o
+        WHERE o.endpoint = :endpoint AND o.tenant_id = :tenant_id
+          AND o.next_attempt_at <= now()
+          AND NOT EXISTS (
+              SELECT 1 FROM outbox_events earlier
+              WHERE earlier.endpoint = o.endpoint AND earlier.tenant_id = o.tenant_id AND earlier.rfq_id = o.rfq_id
+                AND earlier.id < o.id AND earlier.next_attempt_at > now()
+          )
+        ORDER BY o.id
+        LIMIT :batch_size
+    )
+    UPDATE outbox_events o
+    SET next_attempt_at = now() + make_interval(secs => :lease_seconds), attempts = o.attempts + 1
+    FROM due
+    WHERE o.id = due.id
+    RETURNING o.id, o.event_id, o.tenant_id, o.event_type, o.rfq_id, o.payload, o.created_at, o.attempts
+""").columns(  # Typed, so ids come back as hex strings and the payload as a dict
+    OutboxEvent.id, OutboxEvent.event_id, OutboxEvent.tenant_id, OutboxEvent.event_type, OutboxEvent.rfq_id,
+    OutboxEvent.payload, OutboxEvent.created_at, OutboxEvent.attempts,
+)
+RETRY_SQL = text("""
+    UPDATE outbox_events SET next_attempt_at = now() + make_interval(secs => :delay_seconds), last_error = :error
+    WHERE id = ANY(:ids)
+""")
+DELETE_SQL = text("DELETE FROM outbox_events WHERE id = ANY(:ids)")
+# The outbox only holds undelivered events, so this scan stays small
+DUE_TARGETS_SQL = text("SELECT DISTINCT tenant_id, endpoint FROM outbox_events WHERE next_attempt_at <= now()")
+
+
+async def enqueue_event(db: AsyncSession, event_type: str, rfq_id: str, data: dict[str, Any]) -> None:
+    """
+    Queues an event for each of the current tenant's webhook endpoints on the caller's transaction.
+    `data` must be JSON-ready. Call it after bumping the RFQ's resource version, which keeps each
+    RFQ's events in commit order.
+    """
+    endpoints = await tenant_registry.webhook_urls(current_tenant())
+    if not endpoints:
+        return
+    event_id = generate_uuid()
+    await db.execute(insert(OutboxEvent), [
+        {"event_id": event_id, "endpoint": endpoint, "event_type": event_type, "rfq_id": rfq_id, "payload": data}
+        for endpoint in endpoints
+    ])
+    db.info[_PENDING_WAKE] = True
+
+
+def retry_delay(attempts: int, base_seconds: float, max_seconds: float) -> float:
+    """Exponential backoff with jitter: up to base × 2^(attempts - 1), capped, and never under half of it."""
+    delay = min(max_seconds, base_seconds * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def batch_body(rows: list) -> bytes:
+    """The gzip-compressed JSON a delivery POSTs: {"events": [...]}, oldest first."""
+    events = [
+        {
+            "event_id": row.event_id,
+            "sequence": row.id,  # Increases within an RFQ
+            "tenant_id": row.tenant_id,
+            "type": row.event_type,
+            "rfq_id": row.rfq_id,
+            "occurred_at": row.created_at.isoformat(),
+            "data": row.payload,
+        }
+        for row in rows
+    ]
+    return gzip.compress(json.dumps({"events": events}, separators=(",", ":")).encode())
+
+
+class OutboxDispatcher:
+    """Delivers outbox events to each tenant's webhook endpoints from a background task."""
+
+    def __init__(
+        self,
+        batch_size: int,
+        poll_seconds: float,
+        timeout_seconds: float,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+    ):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.timeout_seconds = timeout_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.delivered = 0
+        self.failed_deliveries = 0
+        self._paused_until: dict[tuple[str, str], float] = {}  # (tenant id, endpoint) -> loop time
+        self._client = None
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        import httpx  # Only processes that deliver webhooks pay for the import
+
+        self._client = httpx.AsyncClient(timeout=self.timeout_seconds)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._dispatch_forever())
+
+    async def stop(self) -> None:
+        """Stops delivering. Undelivered events stay in the outbox for the next process."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def deliver(self, endpoint: str, body: bytes) -> Optional[str]:
+        """POSTs one batch. Returns None once the endpoint acknowledged it, else why it failed."""
+        try:
+            response = await self._client.post(
+                endpoint,
+                content=body,
+                headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            )
+        except Exception as e:  # Any transport failure is retried the same way
+            return f"{type(e).__name__}: {e}"
+        if response.is_success:
+            return None
+        return f"HTTP {response.status_code}: {response.text[:200]}"
+
+    async def dispatch_endpoint(self, tenant_id: str, endpoint: str) -> int:
+        """Claims and delivers one batch of the tenant's events for the endpoint. Returns how many events it delivered."""
+        loop = asyncio.get_running_loop()
+        target = (tenant_id, endpoint)
+        if self._paused_until.get(target, 0) > loop.time():
+            return 0
+
+        async with sessionmanager.session() as db:
+            # Interleaved claims could pass over an RFQ's row another process is claiming; see C above
+            lock_key = f"outbox:{tenant_id}:{endpoint}"
+            if not (await db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"), {"key": lock_key})).scalar():
+                return 0
+            rows = (await db.execute(CLAIM_SQL, {
+                "endpoint": endpoint, "tenant_id": tenant_id, "batch_size": self.batch_size, "lease_seconds": self.timeout_seconds * 2,
+            })).all()
+            await db.commit()
+        if not rows:
+            return 0
+
+        rows.sort(key=lambda row: row.id)
+        ids = [row.id for row in rows]
+        error = await self.deliver(endpoint, batch_body(rows))
+        async with sessionmanager.session() as db:
+            if error is None:
+                await db.execute(DELETE_SQL, {"ids": ids})
+            else:
+                delay = retry_delay(max(row.attempts for row in rows), self.retry_base_seconds, self.retry_max_seconds)
+                await db.execute(RETRY_SQL, {"ids": ids, "delay_seconds": delay, "error": error})
+                self._paused_until[target] = loop.time() + delay
+            await db.commit()
+
+        if error is not None:
+            self.failed_deliveries += 1
+            print(f"⚠️ Webhook delivery of {len(rows)} event(s) for {tenant_id} to {endpoint} failed, retrying: {error}")
+            return 0
+        self.delivered += len(rows)
+        return len(rows)
+
+    async def dispatch_once(self) -> int:
+        """One batch per (tenant, endpoint) pair with due events, concurrently. Returns how many events were delivered."""
+        async with sessionmanager.session() as db:
+            targets = (await db.execute(DUE_TARGETS_SQL)).all()
+        return sum(await asyncio.gather(*(self.dispatch_endpoint(tenant_id, endpoint) for tenant_id, endpoint in targets)))
+
+    async def _dispatch_forever(self) -> None:
+        while True:
+            try:
+                delivered = await self.dispatch_once()
+            except Exception as e:
+                print(f"⚠️ Outbox dispatch failed: {e}")
+                delivered = 0
+            if delivered:
+                continue  # More may be waiting
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            self._wakeup.clear()
+
+    def _after_commit(self, session: Session) -> None:
+        if session.info.pop(_PENDING_WAKE, False):
+            self.wake()
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_PENDING_WAKE, None)
+
+
+outbox_dispatcher = OutboxDispatcher(
+    config.WEBHOOK_BATCH_SIZE,
+    config.WEBHOOK_POLL_SECONDS,
+    config.WEBHOOK_TIMEOUT_SECONDS,
+    config.WEBHOOK_RETRY_BASE_SECONDS,
+    config.WEBHOOK_RETRY_MAX_SECONDS,
+)
+
+event.listen(Session, "after_commit", outbox_dispatcher._after_commit)
+event.listen(Session, "after_rollback", outbox_dispatcher._after_rollback)
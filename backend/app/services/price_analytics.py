@@ -0,0 +1,256 @@
+# app/services/price_analytics.py
+
+import datetime
+import math
+from decimal import ROUND_HALF_UP, Decimal
+from typing import NamedTuple, Optional
+
+from sqlalchemy import Integer, and_, delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import RFQ as RFQModel
+from app.models import Quote as QuoteModel
+from app.models import QuotePriceRollup
+from app.services.tenancy import tenant_filter
+
+# Histogram buckets grow by 5% each, so a percentile read from a bucket midpoint is within ~2.5% of the true value
+BUCKET_GROWTH = 1.05
+UNKNOWN_COUNTRY = ""
+CENTS = Decimal("0.01")
+
+
+class PriceObservation(NamedTuple):
+    """One quote's contribution to a rollup group."""
+    item: str
+    country_of_origin: str
+    supplier_id: str
+    month: datetime.date
+    price: Decimal
+
+    @property
+    def bucket(self) -> str:
+        return price_bucket(self.price)
+
+    def group_filter(self):
+        return and_(
+            QuotePriceRollup.item == self.item,
+            QuotePriceRollup.country_of_origin == self.country_of_origin,
+            QuotePriceRollup.supplier_id == self.supplier_id,
+            QuotePriceRollup.month == self.month,
+        )
+
+
+def price_bucket(price: Decimal) -> str:
+    # Must match BUCKET_SQL, which the full rebuild uses
+    return str(math.floor(math.log(float(price)) / math.log(BUCKET_GROWTH)))
+
+
+def bucket_midpoint(bucket: str) -> float:
+    return BUCKET_GROWTH ** (int(bucket) + 0.5)
+
+
+def month_of(moment: datetime.datetime) -> datetime.date:
+    return moment.astimezone(datetime.UTC).date().replace(day=1)
+
+
+def observe_quote(quote: QuoteModel, rfq_item: str) -> Optional[PriceObservation]:
+    """Snapshot of the quote's rollup contribution, or None if it has no usable price."""
+    if quote.price_per_pound is None or quote.date_submitted is None:
+        return None
+    price = Decimal(str(quote.price_per_pound)).quantize(CENTS, ROUND_HALF_UP)  # Same rounding as the Numeric(10, 2) column
+    if price <= 0:
+        return None
+    return PriceObservation(
+        item=rfq_item,
+        country_of_origin=quote.country_of_origin or UNKNOWN_COUNTRY,
+        supplier_id=quote.supplier_id,
+        month=month_of(quote.date_submitted),
+        price=price,
+    )
+
+
+async def record_price_change(db: AsyncSession, before: Optional[PriceObservation], after: Optional[PriceObservation]) -> None:
+    """
+    Moves a quote's contribution from its old rollup group to its new one.
+    Call after the quote change is flushed; does not commit.
+    """
+    if before == after:
+        return
+    if before is not None:
+        await _remove(db, before)
+    if after is not None:
+        await _add(db, after)
+
+
+async def _add(db: AsyncSession, obs: PriceObservation) -> None:
+    rollup = QuotePriceRollup.__table__.c
+    bucket_count = func.coalesce(rollup.price_histogram[obs.bucket].astext.cast(Integer), 0)
+    stmt = pg_insert(QuotePriceRollup).values(
+        item=obs.item,
+        country_of_origin=obs.country_of_origin,
+        supplier_id=obs.supplier_id,
+        month=obs.month,
+        quote_count=1,
+        price_sum=obs.price,
+        price_min=obs.price,
+        price_max=obs.price,
+        price_histogram={obs.bucket: 1},
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[rollup.tenant_id, rollup.item, rollup.country_of_origin, rollup.supplier_id, rollup.month],
+        set_={
+            "quote_count": rollup.quote_count + 1,
+            "price_sum": rollup.price_sum + stmt.excluded.price_sum,
+            "price_min": func.least(rollup.price_min, stmt.excluded.price_min),
+            "price_max": func.greatest(rollup.price_max, stmt.excluded.price_max),
+            "price_histogram": rollup.price_histogram.op("||")(func.jsonb_build_object(obs.bucket, bucket_count + 1)),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def _remove(db: AsyncSession, obs: PriceObservation) -> None:
+    rollup = QuotePriceRollup.__table__.c
+    bucket_count = func.coalesce(rollup.price_histogram[obs.bucket].astext.cast(Integer), 0)
+    result = await db.execute(
+        update(QuotePriceRollup)
+        .where(obs.group_filter())
+        .values(
+            quote_count=rollup.quote_count - 1,
+            price_sum=rollup.price_sum - obs.price,
+            price_histogram=rollup.price_histogram.op("||")(func.jsonb_build_object(obs.bucket, bucket_count - 1)),
+        )
+        .returning(rollup.quote_count, rollup.price_min, rollup.price_max)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return
+    if row.quote_count <= 0:
+        await db.execute(delete(QuotePriceRollup).where(obs.group_filter()))
+        return
+    if obs.price in (row.price_min, row.price_max):
+        # min/max can't be decremented; rescan just this group's quotes (a handful of rows)
+        await _recompute_extremes(db, obs)
+
+
+async def _recompute_extremes(db: AsyncSession, obs: PriceObservation) -> None:
+    month_start = datetime.datetime.combine(obs.month, datetime.time(), tzinfo=datetime.UTC)
+    next_month = (obs.month + datetime.timedelta(days=32)).replace(day=1)
+    month_end = datetime.datetime.combine(next_month, datetime.time(), tzinfo=datetime.UTC)
+    country = QuoteModel.country_of_origin == obs.country_of_origin
+    if obs.country_of_origin == UNKNOWN_COUNTRY:
+        country = or_(QuoteModel.country_of_origin.is_(None), country)
+    extremes = (
+        select(func.min(QuoteModel.price_per_pound), func.max(QuoteModel.price_per_pound))
+        .join(RFQModel, RFQModel.id == QuoteModel.rfq_id)
+        .where(
+            RFQModel.item == obs.item,
+            country,
+            QuoteModel.supplier_id == obs.supplier_id,
+            QuoteModel.date_submitted >= month_start,
+            QuoteModel.date_submitted < month_end,
+            QuoteModel.price_per_pound > 0,
+        )
+    )
+    price_min, price_max = (await db.execute(extremes)).one()
+    await db.execute(update(QuotePriceRollup).where(obs.group_filter()).values(price_min=price_min, price_max=price_max))
+
+
+# --- Full rebuild (seeding, backfills, bulk price corrections) ---
+
+BUCKET_SQL = "floor(ln(q.price_per_pound::float8) / ln(1.05::float8))::int::text"
+
+REBUILD_SQL_TEMPLATE = f"""
+INSERT INTO quote_price_rollups
+    (tenant_id, item, country_of_origin, supplier_id, month, quote_count, price_sum, price_min, price_max, price_histogram)
+SELECT tenant_id, item, country_of_origin, supplier_id, month,
+       sum(bucket_count), sum(bucket_sum), min(bucket_min), max(bucket_max),
+       jsonb_object_agg(bucket, bucket_count)
+FROM (
+    SELECT q.tenant_id,
+           r.item,
+           coalesce(q.country_of_origin, '') AS country_of_origin,
+           q.supplier_id,
+           date_trunc('month', q.date_submitted AT TIME ZONE 'UTC')::date AS month,
+           {BUCKET_SQL} AS bucket,
+           count(*) AS bucket_count,
+           sum(q.price_per_pound) AS bucket_sum,
+           min(q.price_per_pound) AS bucket_min,
+           max(q.price_per_pound) AS bucket_max
+    FROM quotes q
+    JOIN rfqs r ON r.id = q.rfq_id
+    WHERE q.price_per_pound > 0 AND q.date_submitted IS NOT NULL {{filters}}
+    GROUP BY 1, 2, 3, 4, 5, 6
+) AS buckets
+GROUP BY tenant_id, item, country_of_origin, supplier_id, month
+"""
+
+TENANT_FILTER = "AND q.tenant_id = :tenant_id"
+ITEMS_FILTER = "AND r.item = ANY(:items)"
+
+
+async def rebuild_price_rollups(db: AsyncSession, items: Optional[list[str]] = None) -> None:
+    """
+    Recomputes the current tenant's rollups of `items` (default: all of them) from the quotes table
+    in one set-based pass; inside all_tenants(), every tenant's. Does not commit.
+    """
+    if items is not None and not items:
+        return
+    filters, params = [], {}
+    tenant_id = tenant_filter()
+    if tenant_id is not None:
+        filters.append(TENANT_FILTER)
+        params["tenant_id"] = tenant_id
+    stale = delete(QuotePriceRollup)  # An ORM delete, so limited to the current tenant like the rebuild
+    if items is not None:
+        filters.append(ITEMS_FILTER)
+        params["items"] = items
+        stale = stale.where(QuotePriceRollup.item.in_(items))
+    await db.execute(stale)
+    await db.execute(text(REBUILD_SQL_TEMPLATE.format(filters=" ".join(filters))), params)
+
+
+# --- Reading ---
+
+class PriceStats(NamedTuple):
+    quote_count: int
+    average: float
+    minimum: float
+    maximum: float
+    p50: float
+    p90: float
+    p95: float
+
+
+def merge_rollups(rollups: list[QuotePriceRollup]) -> PriceStats:
+    """Combines rollup rows into summary statistics; percentiles come from the merged histogram."""
+    count = sum(r.quote_count for r in rollups)
+    histogram: dict[str, int] = {}
+    for r in rollups:
+        for bucket, bucket_count in r.price_histogram.items():
+            histogram[bucket] = histogram.get(bucket, 0) + bucket_count
+    minimum = float(min(r.price_min for r in rollups))
+    maximum = float(max(r.price_max for r in rollups))
+    return PriceStats(
+        quote_count=count,
+        average=round(float(sum(r.price_sum for r in rollups)) / count, 4),
+        minimum=minimum,
+        maximum=maximum,
+        p50=_percentile(histogram, count, 0.50, minimum, maximum),
+        p90=_percentile(histogram, count, 0.90, minimum, maximum),
+        p95=_percentile(histogram, count, 0.95, minimum, maximum),
+    )
+
+
+def _percentile(histogram: dict[str, int], count: int, fraction: float, minimum: float, maximum: float) -> float:
+    rank = max(1, math.ceil(fraction * count))
+    seen = 0
+    estimate = maximum
+    for bucket in sorted(histogram, key=int):
+        seen += histogram[bucket]
+        if seen >= rank:
+            estimate = bucket_midpoint(bucket)
+            break
+    # A bucket midpoint can fall just outside the observed range; the exact extremes are known
+    return round(min(max(estimate, minimum), maximum), 2)
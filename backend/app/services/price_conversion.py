@@ -0,0 +1,254 @@
+# app/services/price_conversion.py
+"""
+Turns a price as quoted ("€850/MT", "CAD 2.10/lb", "$9.26 per kg") into the canonical USD
+per pound stored in quotes.price_per_pound.
+
+  A. Extraction captures the price as written: price_amount, price_currency, price_unit.
+     Codes are canonicalized here ("€" -> EUR, "tonnes" -> mt); a missing currency means
+     USD and a missing unit means lb, which is what price_per_pound always assumed.
+  B. Factors come from a versioned conversion table (conversion_rates): USD per unit of each
+     currency and pounds per unit of each weight unit. New FX rates are published as a new
+     version (scripts/publish_conversion_rates.py); every quote records the version it was
+     converted with. Until any version is published, BUILTIN_TABLE converts USD prices only.
+  C. Each process caches the newest table and reloads it only when the conversion_rates
+     resource version moves, so converting a quote costs one primary-key lookup.
+  D. renormalize_quotes() re-converts stored quotes (one RFQ, or all of them) in a single
+     UPDATE ... FROM join against the table, then rebuilds the affected price rollups the same
+     set-based way. No row passes through Python.
+
+Python and SQL use the same formula and rounding: round(amount × usd_per_currency ÷ pounds_per_unit, 2).
+"""
+
+import re
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models import RFQ as RFQModel
+from app.models import ConversionRate, ConversionTableVersion, ResourceVersion
+from app.models import Quote as QuoteModel
+from app.services.price_analytics import rebuild_price_rollups
+from app.services.response_cache import response_cache
+
+CURRENCY = "currency"
+UNIT = "unit"
+CENTS = Decimal("0.01")
+
+# Pounds per unit. Physical constants, copied into every published version so SQL can join on them.
+POUNDS_PER_UNIT = {
+    "lb": Decimal("1"),
+    "kg": Decimal("2.204622621849"),
+    "g": Decimal("0.002204622622"),
+    "oz": Decimal("0.0625"),
+    "mt": Decimal("2204.622621849"),  # Metric ton
+    "short_ton": Decimal("2000"),
+    "long_ton": Decimal("2240"),
+    "cwt": Decimal("100"),  # US hundredweight
+}
+UNIT_ALIASES = {
+    "lb": ["lb", "lbs", "pound", "pounds", "#"],
+    "kg": ["kg", "kgs", "kilo", "kilos", "kilogram", "kilograms", "kilogramme", "kilogrammes"],
+    "g": ["g", "gr", "gram", "grams"],
+    "oz": ["oz", "ounce", "ounces"],
+    # Commodity quotes outside the US mean metric tons by "ton"
+    "mt": ["mt", "t", "tonne", "tonnes", "metric ton", "metric tons", "metric tonne", "ton", "tons"],
+    "short_ton": ["short ton", "short tons", "us ton", "us tons"],
+    "long_ton": ["long ton", "long tons", "imperial ton"],
+    "cwt": ["cwt", "hundredweight"],
+}
+CURRENCY_ALIASES = {
+    "USD": ["$", "us$", "usd", "us dollar", "us dollars", "dollar", "dollars"],
+    "EUR": ["€", "eur", "euro", "euros"],
+    "GBP": ["£", "gbp", "pound sterling", "sterling"],
+    "CAD": ["c$", "ca$", "cad", "canadian dollar", "canadian dollars"],
+    "AUD": ["a$", "au$", "aud", "australian dollar", "australian dollars"],
+    "NZD": ["nz$", "nzd"],
+    "MXN": ["mx$", "mxn", "peso", "pesos"],
+    "BRL": ["r$", "brl", "real", "reais"],
+    "INR": ["₹", "inr", "rupee", "rupees"],
+    "CNY": ["cny", "rmb", "yuan"],
+    "JPY": ["jpy", "yen"],
+    "CHF": ["chf", "franc", "francs"],
+}
+UNIT_NAMES = {alias: unit for unit, aliases in UNIT_ALIASES.items() for alias in aliases}
+CURRENCY_NAMES = {alias: code for code, aliases in CURRENCY_ALIASES.items() for alias in aliases}
+ISO_CODE = re.compile(r"^[A-Za-z]{3}$")
+
+
+def canonical_unit(text: Optional[str]) -> Optional[str]:
+    """"per Tonne" -> "mt"; None if the unit isn't a weight we know."""
+    if not text:
+        return None
+    cleaned = re.sub(r"^(?:/|per\b|a\b)\s*", "", " ".join(text.strip().lower().replace(".", "").split()))
+    return UNIT_NAMES.get(cleaned)
+
+
+def canonical_currency(text: Optional[str]) -> Optional[str]:
+    """"€" -> "EUR", "cad" -> "CAD"; any other three-letter code is taken as ISO 4217."""
+    if not text:
+        return None
+    cleaned = " ".join(text.strip().lower().split())
+    if cleaned in CURRENCY_NAMES:
+        return CURRENCY_NAMES[cleaned]
+    return cleaned.upper() if ISO_CODE.match(cleaned) else None
+
+
+@dataclass
+class ConversionTable:
+    version: Optional[int]  # None: the built-in table, no version published yet
+    usd_per_currency: dict[str, Decimal]
+    pounds_per_unit: dict[str, Decimal] = field(default_factory=lambda: dict(POUNDS_PER_UNIT))
+
+    def convert(self, amount: Decimal | float, currency: str, unit: str) -> Optional[Decimal]:
+        """USD per pound, rounded to cents as price_per_pound is stored; None without a factor for either code."""
+        usd, pounds = self.usd_per_currency.get(currency), self.pounds_per_unit.get(unit)
+        if usd is None or pounds is None:
+            return None
+        return (Decimal(str(amount)) * usd / pounds).quantize(CENTS, ROUND_HALF_UP)
+
+
+BUILTIN_TABLE = ConversionTable(version=None, usd_per_currency={"USD": Decimal("1")})
+
+
+@dataclass
+class NormalizedPrice:
+    price_per_pound: Optional[float]
+    price_amount: Optional[float] = None
+    price_currency: Optional[str] = None
+    price_unit: Optional[str] = None
+    conversion_version: Optional[int] = None
+
+
+def normalize_price(extracted, table: ConversionTable) -> NormalizedPrice:
+    """
+    The canonical price of an extraction (ExtractedDataSchema or a line item). A price as quoted
+    wins over the model's own price_per_pound; one that can't be converted yet (no rate for its
+    currency) keeps its raw fields and no price_per_pound, for renormalize_quotes() to fill in.
+    """
+    amount = extracted.price_amount
+    if amount is not None:
+        amount = float(Decimal(str(amount)).quantize(Decimal("0.0001"), ROUND_HALF_UP))  # As the column stores it, for renormalization to agree
+    if amount is None:
+        if extracted.price_per_pound is None:
+            return NormalizedPrice(None)
+        return NormalizedPrice(extracted.price_per_pound, extracted.price_per_pound, "USD", "lb", table.version)
+
+    currency = canonical_currency(extracted.price_currency) if extracted.price_currency else "USD"
+    unit = canonical_unit(extracted.price_unit) if extracted.price_unit else "lb"
+    # Unknown codes are kept as written (trimmed to the column sizes); they can't convert until the table knows them
+    raw_currency = currency or extracted.price_currency.strip()[:8]
+    raw_unit = unit or extracted.price_unit.strip().lower()[:16]
+    converted = table.convert(amount, currency, unit) if currency and unit else None
+    if converted is None:
+        return NormalizedPrice(None, amount, raw_currency, raw_unit)
+    return NormalizedPrice(float(converted), amount, currency, unit, table.version)
+
+
+async def load_table(db: AsyncSession, version: Optional[int] = None) -> ConversionTable:
+    """The given version, or the newest; BUILTIN_TABLE if none has been published."""
+    if version is None:
+        version = (await db.execute(select(func.max(ConversionTableVersion.version)))).scalar()
+        if version is None:
+            return BUILTIN_TABLE
+    rows = (await db.execute(select(ConversionRate).where(ConversionRate.version == version))).scalars().all()
+    if not rows:
+        raise ValueError(f"Conversion table version {version} does not exist.")
+    return ConversionTable(
+        version=version,
+        usd_per_currency={row.code: row.factor for row in rows if row.kind == CURRENCY},
+        pounds_per_unit={row.code: row.factor for row in rows if row.kind == UNIT},
+    )
+
+
+class ConversionTableCache:
+    """The newest conversion table, reloaded when a new version is published (by any process)."""
+
+    def __init__(self):
+        self._table: ConversionTable = BUILTIN_TABLE
+        self._resource_version: Optional[int] = None
+
+    async def current(self, db: AsyncSession) -> ConversionTable:
+        versions = await ResourceVersion.get_many(db, [ResourceVersion.CONVERSION_RATES])
+        resource_version = versions[ResourceVersion.CONVERSION_RATES]
+        if resource_version != self._resource_version:
+            self._table = await load_table(db)
+            self._resource_version = resource_version
+        return self._table
+
+    def clear(self) -> None:
+        self._table = BUILTIN_TABLE
+        self._resource_version = None
+
+
+conversion_tables = ConversionTableCache()
+
+
+async def publish_table(db: AsyncSession, usd_per_currency: dict[str, Decimal | float | str], source: str) -> int:
+    """
+    Stores a new table version: these FX rates (USD per unit of each currency) and the weight
+    units. Returns the version. Does not commit; processes pick it up once the caller does.
+    """
+    rates = {"USD": Decimal("1")}
+    for text, rate in usd_per_currency.items():
+        code = canonical_currency(text)
+        if code is None or Decimal(str(rate)) <= 0:
+            raise ValueError(f"Invalid FX rate: {text} = {rate}")
+        rates[code] = Decimal(str(rate))
+    rates["USD"] = Decimal("1")
+
+    version = (await db.execute(pg_insert(ConversionTableVersion).values(source=source).returning(ConversionTableVersion.version))).scalar_one()
+    await db.execute(pg_insert(ConversionRate), [
+        *({"version": version, "kind": CURRENCY, "code": code, "factor": rate} for code, rate in rates.items()),
+        *({"version": version, "kind": UNIT, "code": unit, "factor": pounds} for unit, pounds in POUNDS_PER_UNIT.items()),
+    ])
+    await ResourceVersion.bump(db, ResourceVersion.CONVERSION_RATES)
+    return version
+
+
+async def renormalize_quotes(db: AsyncSession, version: Optional[int] = None, rfq_id: Optional[str] = None) -> int:
+    """
+    Re-converts the current tenant's quotes' prices as quoted (of one RFQ, or all) with a table
+    version (default: the newest) and rebuilds the affected price rollups. Returns how many quotes
+    were converted. Quotes whose currency or unit the version lacks keep their price. Does not commit.
+    """
+    table = await load_table(db, version)
+    if table.version is None:
+        raise ValueError("No conversion table has been published yet.")
+
+    currency, unit = aliased(ConversionRate), aliased(ConversionRate)
+    stmt = (
+        update(QuoteModel)
+        .where(
+            QuoteModel.price_amount.is_not(None),
+            currency.version == table.version, currency.kind == CURRENCY, currency.code == QuoteModel.price_currency,
+            unit.version == table.version, unit.kind == UNIT, unit.code == QuoteModel.price_unit,
+        )
+        .values(
+            price_per_pound=func.round(QuoteModel.price_amount * currency.factor / unit.factor, 2),
+            conversion_version=table.version,
+        )
+        .returning(QuoteModel.rfq_id)
+        .execution_options(synchronize_session=False)
+    )
+    if rfq_id:
+        stmt = stmt.where(QuoteModel.rfq_id == rfq_id)
+    converted = (await db.execute(stmt)).scalars().all()  # One rfq_id per converted quote
+    if not converted:
+        return 0
+
+    # Rollups are keyed by item; rebuild the touched items' groups (all of them for a full pass)
+    if rfq_id:
+        items = (await db.execute(select(RFQModel.item).where(RFQModel.id == rfq_id))).scalars().all()
+        await rebuild_price_rollups(db, items=list(items))
+    else:
+        await rebuild_price_rollups(db)
+
+    rfq_keys = [ResourceVersion.rfq_key(id) for id in set(converted)]
+    await ResourceVersion.bump(db, ResourceVersion.QUOTES, *rfq_keys)
+    response_cache.invalidate_on_commit(db, *rfq_keys)
+    return len(converted)
@@ -0,0 +1,118 @@
+# app/services/quote_events.py
+
+import asyncio
+import contextlib
+import json
+from typing import Iterator
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+CHANNEL = "quote_events"
+
+QUOTE_CREATED = "quote.created"
+QUOTE_UPDATED = "quote.updated"
+RESYNC = "resync"  # Sent to subscribers after a listener reconnect, since events may have been missed
+
+
+async def publish_quote_event(db: AsyncSession, event_type: str, rfq_id: str, quote_id: str) -> None:
+    """
+    Queues a NOTIFY on the caller's transaction.
+
+    Postgres only delivers notifications once the transaction commits and drops
+    them on rollback, so listeners on every replica never see uncommitted quotes.
+    """
+    payload = json.dumps({"type": event_type, "rfq_id": rfq_id, "quote_id": quote_id})
+    await db.execute(select(func.pg_notify(CHANNEL, payload)))
+
+
+class QuoteEventBroker:
+    """
+    Holds one LISTEN connection per process and fans notifications out to the
+    SSE subscribers of the matching RFQ.
+    """
+
+    def __init__(self, queue_size: int = 100, reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0):
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.listening = asyncio.Event()  # Set while the LISTEN connection is up
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._task: asyncio.Task | None = None
+
+    async def start(self, database_url: str) -> None:
+        # asyncpg wants a plain libpq URL, not the SQLAlchemy driver-qualified one
+        dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._task = asyncio.create_task(self._listen_forever(dsn))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    @contextlib.contextmanager
+    def subscribe(self, rfq_id: str) -> Iterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(rfq_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(rfq_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[rfq_id]
+
+    def dispatch(self, payload: str) -> None:
+        event = json.loads(payload)
+        for queue in self._subscribers.get(event["rfq_id"], ()):
+            self._offer(queue, event)
+
+    def _broadcast(self, event: dict) -> None:
+        for subscribers in self._subscribers.values():
+            for queue in subscribers:
+                self._offer(queue, event)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict) -> None:
+        if queue.full():
+            # A slow client only needs to know something changed; collapse its backlog into a resync
+            while not queue.empty():
+                queue.get_nowait()
+            event = {"type": RESYNC}
+        queue.put_nowait(event)
+
+    async def _listen_forever(self, dsn: str) -> None:
+        first_connect = True
+        delay = self.reconnect_delay
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(CHANNEL, lambda _conn, _pid, _channel, payload: self.dispatch(payload))
+                if not first_connect:
+                    self._broadcast({"type": RESYNC})
+                first_connect = False
+                delay = self.reconnect_delay
+                self.listening.set()
+                await lost.wait()
+                print("⚠️ Quote event listener lost its connection")
+            except Exception as e:
+                # Anything short of cancellation (stop()) reconnects: subscribers would otherwise wait forever
+                print(f"⚠️ Quote event listener disconnected: {type(e).__name__}: {e}")
+            finally:
+                self.listening.clear()
+                if connection is not None and not connection.is_closed():
+                    with contextlib.suppress(Exception):
+                        await connection.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+
+quote_event_broker = QuoteEventBroker()
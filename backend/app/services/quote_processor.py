@@ -1,38 +1,75 @@
 # app/services/quote_processor.py
 
+import datetime
+from dataclasses import dataclass
+from typing import Collection, Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from fastapi import HTTPException
 
 # Import your data schemas and database models
-from app.services.llm_client import ExtractedDataSchema
+from app.services import llm_ledger
+from app.services.attachments import product_matches
+from app.services.llm_client import ExtractedDataSchema, MultiItemExtractionSchema
+from app.services.outbox import enqueue_event
+from app.services.price_analytics import observe_quote, record_price_change
+from app.services.price_conversion import conversion_tables, normalize_price
+from app.services.quote_events import QUOTE_CREATED, QUOTE_UPDATED, publish_quote_event
+from app.services.response_cache import response_cache
+from app.services.supplier_resolver import resolve_supplier
 from app.models import (
     Supplier as SupplierModel,
     Certification as CertificationModel,
     Quote as QuoteModel,
     Email as EmailModel,
-    RFQ as RFQModel
+    EmailBody as EmailBodyModel,
+    RFQ as RFQModel,
+    ResourceVersion,
+    generate_uuid,
 )
 
+def quote_event_data(quote: QuoteModel, supplier: SupplierModel) -> dict:
+    """The quote as webhook receivers get it: what changed, without a follow-up GET."""
+    def number(value):
+        return float(value) if value is not None else None
+
+    return {
+        "quote_id": quote.id,
+        "supplier_id": supplier.id,
+        "supplier_name": supplier.company_name,
+        "price_per_pound": number(quote.price_per_pound),
+        "price_amount": number(quote.price_amount),
+        "price_currency": quote.price_currency,
+        "price_unit": quote.price_unit,
+        "country_of_origin": quote.country_of_origin,
+        "min_order_quantity": quote.min_order_quantity,
+        "certifications": sorted(cert.name for cert in quote.certifications),
+    }
+
+
 async def process_quote_from_email_data(
     db: AsyncSession,
     rfq_id: str,
     rfq_item_name: str,
     extracted_data: ExtractedDataSchema,
-    raw_text: str
+    raw_text: str,
+    received_at: Optional[datetime.datetime] = None,
+    input_tokens: Optional[int] = None,
+    input_tokens_saved: Optional[int] = None,
 ) -> QuoteModel:
     """
     Handles the business logic of finding/creating records based on LLM output.
     This function contains all the database logic that was previously in the view.
+    `received_at` dates the logged email (e.g. from its Date header); it defaults to now.
+    `input_tokens` and `input_tokens_saved` record what extracting it cost (see PreparedExtraction).
     """
     try:
-        # A. Handle Supplier: Find or Create
+        # A. Handle Supplier: Find (by email, email domain or a similar company name) or Create
         supplier = None
-        if extracted_data.supplier_email:
-            supplier_result = await db.execute(
-                select(SupplierModel).where(SupplierModel.contact_email == extracted_data.supplier_email)
-            )
-            supplier = supplier_result.scalar_one_or_none()
+        match = await resolve_supplier(db, extracted_data.supplier_email, extracted_data.company_name)
+        if match:
+            supplier = match.supplier
         
         if not supplier and extracted_data.supplier_email:
             # Use the extracted company name, or create a UNIQUE placeholder as a fallback.
@@ -46,6 +83,7 @@ async def process_quote_from_email_data(
             )
             db.add(supplier)
             await db.flush()  # Ensures supplier.id is available for the quote
+            await ResourceVersion.bump(db, ResourceVersion.SUPPLIERS)
         
         if not supplier:
             # The service layer should raise exceptions that the view layer can catch.
@@ -70,40 +108,148 @@ async def process_quote_from_email_data(
             select(QuoteModel).where(QuoteModel.rfq_id == rfq_id, QuoteModel.supplier_id == supplier.id)
         )
         quote = quote_result.scalar_one_or_none()
+        is_existing_quote = quote is not None
+        price_before = observe_quote(quote, rfq_item_name) if is_existing_quote else None
         
+        # The price as quoted, converted to USD/lb with the current conversion table
+        price = normalize_price(extracted_data, await conversion_tables.current(db))
         quote_data_dict = {
-            "price_per_pound": extracted_data.price_per_pound,
+            "price_per_pound": price.price_per_pound,
             "country_of_origin": extracted_data.country_of_origin,
             "min_order_quantity": extracted_data.minimum_order_quantity,
         }
+        # Replaced together, so price_per_pound never outlives the quoted price it came from
+        price_data_dict = {
+            "price_amount": price.price_amount,
+            "price_currency": price.price_currency,
+            "price_unit": price.price_unit,
+            "conversion_version": price.conversion_version,
+        }
 
         if quote:  # Update existing quote
             for key, value in quote_data_dict.items():
                 if value is not None:
                     setattr(quote, key, value)
+            if price.price_amount is not None:
+                quote.price_per_pound = price.price_per_pound
+                for key, value in price_data_dict.items():
+                    setattr(quote, key, value)
             quote.certifications = quote_certs
         else:  # Create new quote
             quote = QuoteModel(
                 rfq_id=rfq_id,
                 supplier_id=supplier.id,
                 certifications=quote_certs,
-                **quote_data_dict
+                **quote_data_dict,
+                **price_data_dict,
             )
             db.add(quote)
             # Flush the session to get the new quote's ID from the DB
             await db.flush()
 
-        # D. Log the raw email and link it to the quote
+        # Keep the price analytics rollups in step with this quote (needs the change flushed)
+        await db.flush()
+        await record_price_change(db, price_before, observe_quote(quote, rfq_item_name))
+
+        # D. Log the raw email and link it to the quote. Identical bodies are stored once and shared.
+        email_body = await EmailBodyModel.get_or_create(db, raw_text)
         email_log = EmailModel(
-            raw_text=raw_text,
+            id=generate_uuid(),  # Known now, so the LLM call ledger can reference the email
+            body=email_body,
             quote=quote,
-            extracted_data=extracted_data.model_dump()
+            extracted_data=extracted_data.model_dump(),
+            input_tokens=input_tokens,
+            input_tokens_saved=input_tokens_saved,
         )
+        if received_at:
+            email_log.received_at = received_at
         db.add(email_log)
+        llm_ledger.attribute(email_id=email_log.id, quote_id=quote.id, rfq_id=rfq_id, supplier_id=supplier.id)
+
+        # E. Bump change counters in the same transaction so cached readers revalidate,
+        # and drop the cached comparison once this transaction commits
+        await ResourceVersion.bump(db, ResourceVersion.QUOTES, ResourceVersion.rfq_key(rfq_id))
+        response_cache.invalidate_on_commit(db, ResourceVersion.rfq_key(rfq_id))
+
+        # F. Notify live subscribers; Postgres holds the NOTIFY until the endpoint commits
+        await publish_quote_event(db, QUOTE_UPDATED if is_existing_quote else QUOTE_CREATED, rfq_id, quote.id)
+
+        # G. Queue the change for the webhook endpoints; it is delivered only if this transaction commits
+        await enqueue_event(db, QUOTE_UPDATED if is_existing_quote else QUOTE_CREATED, rfq_id, quote_event_data(quote, supplier))
 
         # The commit will be handled by the endpoint context to ensure atomicity
         return quote
 
     except Exception as e:
         # Re-raise exceptions to be handled by the endpoint's try/except block
-        raise e
\ No newline at end of file
+        raise e
+
+
+@dataclass
+class LineItemMatch:
+    extracted: ExtractedDataSchema
+    rfq: Optional[RFQModel]  # None: no open RFQ for this product, or another line already took it
+
+
+def match_open_rfq(product: Optional[str], open_rfqs: list[RFQModel], taken: Collection[str] = ()) -> Optional[RFQModel]:
+    """
+    The open RFQ a quoted product is for. An exact item name wins; otherwise the RFQ whose
+    item words all appear in the product, the most specific one first ("Organic Pea Protein"
+    over "Pea Protein"), then the one closing soonest (`open_rfqs` order). RFQs whose ids are
+    in `taken` are skipped.
+    """
+    product = (product or "").strip().lower()
+    candidates = [
+        rfq for rfq in open_rfqs
+        if rfq.id not in taken and product and (rfq.item.strip().lower() == product or product_matches(product, rfq.item))
+    ]
+    return max(
+        candidates,
+        key=lambda rfq: (rfq.item.strip().lower() == product, len(rfq.item.split()), -open_rfqs.index(rfq)),
+        default=None,
+    )
+
+
+def match_line_items(extraction: MultiItemExtractionSchema, open_rfqs: list[RFQModel]) -> list[LineItemMatch]:
+    """
+    Pairs each quoted line item with an open RFQ (see match_open_rfq). Each RFQ takes at most
+    one line, the first quoting it.
+    """
+    taken: set[str] = set()
+    matches = []
+    for extracted in extraction.to_quotes():
+        rfq = match_open_rfq(extracted.product, open_rfqs, taken)
+        if rfq:
+            taken.add(rfq.id)
+        matches.append(LineItemMatch(extracted, rfq))
+    return matches
+
+
+async def process_quote_items_from_email_data(
+    db: AsyncSession,
+    matches: list[LineItemMatch],
+    raw_text: str,
+    received_at: Optional[datetime.datetime] = None,
+    input_tokens: Optional[int] = None,
+    input_tokens_saved: Optional[int] = None,
+) -> list[QuoteModel]:
+    """
+    Saves a quote for every matched line item of one email, in the caller's transaction, so
+    they commit (or fail) together. The extraction's tokens are split across the logged emails.
+    """
+    matched = [match for match in matches if match.rfq is not None]
+    quotes = []
+    for index, match in enumerate(matched):
+        share = None if input_tokens is None else input_tokens // len(matched) + (index < input_tokens % len(matched))
+        quotes.append(await process_quote_from_email_data(
+            db=db,
+            rfq_id=match.rfq.id,
+            rfq_item_name=match.rfq.item,
+            extracted_data=match.extracted,
+            raw_text=raw_text,
+            received_at=received_at,
+            input_tokens=share,
+            input_tokens_saved=input_tokens_saved if index == 0 else None,
+        ))
+        await db.flush()  # The next line item may resolve to the supplier this one just created
+    return quotes
@@ -0,0 +1,220 @@
+# app/services/response_cache.py
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import config
+from app.services.http_cache import etag_matches
+from app.services.tenancy import tenant_key
+
+_PENDING_KEYS = "response_cache.pending_keys"
+_PENDING_PREFIXES = "response_cache.pending_prefixes"
+
+
+# --- Backends ---
+
+class CacheBackend:
+    """Interface for response cache storage. Values are opaque bytes."""
+
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process LRU bounded by entry count and total bytes. Each API worker holds its own copy."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._size = 0
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return  # Never let one oversized body evict the whole cache
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._size += len(value)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._remove(key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            self._remove(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared cache for multi-replica deployments. Accepts any client exposing the
+    redis.asyncio API (get/set/delete/scan_iter), so tests can pass a local fake.
+    """
+
+    def __init__(self, client: Any, ttl_seconds: float, namespace: str = "waystation:responses:"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+
+    @classmethod
+    def from_url(cls, url: str, ttl_seconds: float) -> "RedisCacheBackend":
+        try:
+            import redis.asyncio as redis  # Optional dependency, only needed for this backend
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_URL points at Redis but the 'redis' package is not installed.") from e
+        return cls(redis.from_url(url), ttl_seconds)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.namespace + key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.client.set(self.namespace + key, value, ex=int(self.ttl_seconds))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.namespace + key for key in keys))
+
+    async def delete_prefix(self, prefix: str) -> None:
+        stale = [key async for key in self.client.scan_iter(match=f"{self.namespace}{prefix}*")]
+        if stale:
+            await self.client.delete(*stale)
+
+    async def clear(self) -> None:
+        await self.delete_prefix("")
+
+
+def build_backend(url: str) -> CacheBackend:
+    """Creates a backend from a URL: memory:// for the in-process LRU, redis:// or rediss:// for Redis."""
+    if url.startswith(("redis://", "rediss://")):
+        return RedisCacheBackend.from_url(url, config.RESPONSE_CACHE_TTL_SECONDS)
+    if url.startswith("memory://"):
+        return LRUCacheBackend(
+            max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=config.RESPONSE_CACHE_MAX_BYTES,
+            ttl_seconds=config.RESPONSE_CACHE_TTL_SECONDS,
+        )
+    raise ValueError(f"Unsupported RESPONSE_CACHE_URL: {url}")
+
+
+# --- Cache facade ---
+
+class CachedResponse:
+    def __init__(self, etag: str, body: bytes):
+        self.etag = etag
+        self.body = body
+
+    def headers(self) -> dict[str, str]:
+        return {"ETag": self.etag, "Cache-Control": "no-cache"}
+
+    def to_response(self, request: Request) -> Response:
+        if etag_matches(request, self.etag):
+            return Response(status_code=304, headers=self.headers())
+        return Response(content=self.body, media_type="application/json", headers=self.headers())
+
+
+class ResponseCache:
+    """
+    Caches serialized JSON responses together with their ETag.
+
+    An entry is only served while its ETag is still the current one (http_cache.resource_etag),
+    so a commit in any worker or replica retires it at once, whichever backend holds it. Writers
+    also mark keys stale on their session, so the entries are dropped once it commits, to free
+    their space early. Keys are the current tenant's.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._tasks: set[asyncio.Task] = set()
+
+    async def get(self, key: str, etag: str) -> CachedResponse | None:
+        """The cached response for `key` if it was stored at `etag`, the resource's current ETag."""
+        value = await self.backend.get(tenant_key(key))
+        if value is None:
+            return None
+        stored_etag, _, body = value.partition(b"\n")
+        if stored_etag.decode() != etag:
+            return None  # Stored before a write this process may never hear about
+        return CachedResponse(etag, body)
+
+    async def store(self, key: str, response: Response, adapter: TypeAdapter, data: Any) -> Response:
+        """
+        Serializes data with the endpoint's response schema, caches it under the response's ETag, and returns it.
+        The ETag must be read before the data: data newer than its ETag is then never served, as that ETag is already stale.
+        """
+        body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+        cached = CachedResponse(response.headers["etag"], body)
+        await self.backend.set(tenant_key(key), cached.etag.encode() + b"\n" + body)
+        return Response(content=body, media_type="application/json", headers=cached.headers())
+
+    def invalidate_on_commit(self, db: AsyncSession, *keys: str, prefix: str | None = None) -> None:
+        db.info.setdefault(_PENDING_KEYS, set()).update(tenant_key(key) for key in keys)
+        if prefix is not None:
+            db.info.setdefault(_PENDING_PREFIXES, set()).add(tenant_key(prefix))
+
+    async def invalidate(self, keys: set[str], prefixes: set[str]) -> None:
+        await self.backend.delete(*keys)
+        for prefix in prefixes:
+            await self.backend.delete_prefix(prefix)
+
+    def _after_commit(self, session: Session) -> None:
+        keys = session.info.pop(_PENDING_KEYS, set())
+        prefixes = session.info.pop(_PENDING_PREFIXES, set())
+        if not keys and not prefixes:
+            return
+        task = asyncio.get_running_loop().create_task(self.invalidate(keys, prefixes))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_PENDING_KEYS, None)
+        session.info.pop(_PENDING_PREFIXES, None)
+
+
+response_cache = ResponseCache(build_backend(config.RESPONSE_CACHE_URL))
+
+event.listen(Session, "after_commit", response_cache._after_commit)
+event.listen(Session, "after_rollback", response_cache._after_rollback)
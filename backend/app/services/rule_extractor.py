@@ -0,0 +1,134 @@
+# app/services/rule_extractor.py
+"""
+Pulls the quote fields out of an email with regular expressions: no LLM call, no tokens.
+
+It only knows the common phrasings ("$4.20/lb", "USD 9.26 per kg", "MOQ 500 lbs", "from
+Spain", a signature with a phone number), so it misses what an LLM would catch. That makes
+it the baseline of the extraction evaluation (scripts/evaluate_extraction.py), and the
+harness tells how far a shortcut like this is from the LLM before anyone relies on it.
+"""
+
+import re
+from typing import Iterable, Optional
+
+from app.services.attachment_parsers import KG_PER_LB
+from app.services.attachments import product_matches
+from app.services.email_normalizer import EMAIL_ADDRESS, NormalizedEmail, normalize_email
+from app.services.llm_client import ExtractedDataSchema
+from app.services.supplier_resolver import LEGAL_SUFFIXES, name_tokens
+
+UNIT = r"(?P<unit>lbs?|pounds?|kgs?|kilos?|kilograms?)\b"
+PRICE_PATTERNS = [
+    re.compile(r"(?:\$|usd)\s?(?P<amount>\d+(?:[.,]\d+)?)\s*(?:usd\s*)?(?:/|per|a)\s*" + UNIT, re.IGNORECASE),
+    re.compile(r"(?P<amount>\d+(?:\.\d+)?)\s*(?:\$|usd|dollars)\s*(?:/|per|a)\s*" + UNIT, re.IGNORECASE),
+]
+MOQ_PATTERN = re.compile(
+    r"\b(?:moq|minimum order(?: quantity)?|min\.? order(?: qty| quantity)?)\b\s*(?:is|of|:)?\s*(?P<amount>\d[\d,]*)\s*(?:" + UNIT + ")?",
+    re.IGNORECASE,
+)
+
+# Canonical name -> the ways suppliers write it
+COUNTRIES = {
+    "USA": ["usa", "u.s.a.", "united states", "united states of america", "us"],
+    "Canada": ["canada"], "Mexico": ["mexico"], "Brazil": ["brazil"], "Argentina": ["argentina"],
+    "Chile": ["chile"], "Peru": ["peru"], "Ecuador": ["ecuador"], "Colombia": ["colombia"],
+    "Spain": ["spain", "españa", "espana"], "Italy": ["italy"], "France": ["france"], "Germany": ["germany"],
+    "Netherlands": ["netherlands", "holland"], "Ireland": ["ireland"], "United Kingdom": ["united kingdom", "uk"],
+    "Poland": ["poland"], "Turkey": ["turkey", "türkiye"], "Greece": ["greece"], "Portugal": ["portugal"],
+    "India": ["india"], "China": ["china"], "Vietnam": ["vietnam", "viet nam"], "Thailand": ["thailand"],
+    "Indonesia": ["indonesia"], "Philippines": ["philippines"], "Australia": ["australia"],
+    "New Zealand": ["new zealand"], "South Africa": ["south africa"], "Egypt": ["egypt"], "Kenya": ["kenya"],
+    "Ivory Coast": ["ivory coast", "côte d'ivoire", "cote d'ivoire"], "Ghana": ["ghana"],
+}
+CERTIFICATIONS = {
+    "Organic": ["organic", "usda organic", "eu organic"], "Non-GMO": ["non-gmo", "non gmo", "gmo-free", "gmo free"],
+    "Halal": ["halal"], "Kosher": ["kosher"], "Allergen Free": ["allergen free", "allergen-free"],
+    "Gluten Free": ["gluten free", "gluten-free"], "Fair Trade": ["fair trade", "fairtrade"],
+    "Rainforest Alliance": ["rainforest alliance"], "BRC": ["brc", "brcgs"], "SQF": ["sqf"],
+    "FSSC 22000": ["fssc 22000", "fssc22000"], "ISO 22000": ["iso 22000"], "HACCP": ["haccp"],
+}
+
+
+def _alternatives(names: list[str]) -> re.Pattern:
+    return re.compile(r"(?<![\w-])(?:" + "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True)) + r")(?![\w-])", re.IGNORECASE)
+
+
+COUNTRY_PATTERNS = {country: _alternatives(aliases) for country, aliases in COUNTRIES.items()}
+CERTIFICATION_PATTERNS = {name: _alternatives(aliases) for name, aliases in CERTIFICATIONS.items()}
+# "US" alone is too ambiguous ("let us know"); it has to be in capitals
+US_UPPERCASE = re.compile(r"\bU\.?S\.?\b")
+
+
+def _per_pound(amount: str, unit: str) -> float:
+    value = float(amount.replace(",", "."))
+    return round(value * KG_PER_LB, 4) if unit.lower().startswith("k") else value
+
+
+def extract_price(text: str) -> Optional[float]:
+    for pattern in PRICE_PATTERNS:
+        if found := pattern.search(text):
+            return _per_pound(found["amount"], found["unit"])
+    return None
+
+
+def extract_moq(text: str) -> Optional[int]:
+    found = MOQ_PATTERN.search(text)
+    if not found:
+        return None
+    amount = float(found["amount"].replace(",", ""))
+    return round(amount / KG_PER_LB) if (found["unit"] or "").lower().startswith("k") else round(amount)
+
+
+def extract_country(text: str) -> Optional[str]:
+    matches = []
+    for country, pattern in COUNTRY_PATTERNS.items():
+        for found in pattern.finditer(text):
+            if country == "USA" and found.group().lower() == "us" and not US_UPPERCASE.fullmatch(found.group()):
+                continue
+            matches.append((found.start(), country))
+            break
+    return min(matches)[1] if matches else None
+
+
+def extract_certifications(text: str) -> list[str]:
+    found = [(match.start(), name) for name, pattern in CERTIFICATION_PATTERNS.items() if (match := pattern.search(text))]
+    return [name for _, name in sorted(found)]
+
+
+def _looks_like_name(line: str) -> bool:
+    words = line.split()
+    return 1 < len(words) <= 4 and all(word[:1].isupper() and word.replace(".", "").replace("-", "").isalpha() for word in words)
+
+
+def extract_contacts(normalized: NormalizedEmail) -> dict:
+    """contact_name, company_name, supplier_email and supplier_phone from the signature."""
+    contact_name = company_name = None
+    for line in normalized.signature.splitlines():
+        for part in (part.strip() for part in re.split(r"[|•,]", line)):
+            if not part or EMAIL_ADDRESS.search(part):
+                continue
+            if company_name is None and set(name_tokens(part)) & LEGAL_SUFFIXES:
+                company_name = part
+            elif contact_name is None and _looks_like_name(part):
+                contact_name = part
+    addresses = EMAIL_ADDRESS.findall(normalized.text)
+    return {
+        "contact_name": contact_name,
+        "company_name": company_name,
+        "supplier_email": normalized.signature_email or (addresses[0] if addresses else None),
+        "supplier_phone": normalized.signature_phone,
+    }
+
+
+def extract_quote_data_by_rules(email_text: str, items: Iterable[str] = ()) -> ExtractedDataSchema:
+    """The ExtractedDataSchema fields these rules can find; `items` are the RFQ items the product may be."""
+    normalized = normalize_email(email_text)
+    body = normalized.body
+    return ExtractedDataSchema(
+        product=next((item for item in items if product_matches(body, item)), None),
+        price_per_pound=extract_price(body),
+        country_of_origin=extract_country(body),
+        certifications=extract_certifications(body),
+        minimum_order_quantity=extract_moq(body),
+        **extract_contacts(normalized),
+    )
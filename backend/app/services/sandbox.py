@@ -0,0 +1,114 @@
+# app/services/sandbox.py
+"""
+Runs untrusted, CPU-heavy work (parsing supplier attachments) in a throwaway child process
+with a wall-clock timeout and an address-space cap, so a hostile or pathological file can
+slow down or crash only its own worker, never the web process.
+
+Each call gets a fresh process forked from a forkserver that has already imported the
+modules in `preload`, which keeps the per-call cost to a fork. Children carry only those
+modules and their target's, never the web stack: app/__init__.py imports nothing, and the
+parent's main script isn't re-run in them (without_main_reimport).
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import sys
+import types
+from typing import Any, Callable, Iterable, Iterator
+
+from app.services.concurrency import ConcurrencyLimiter
+
+try:
+    import resource
+except ImportError:  # Not on Windows; the wall-clock timeout still applies there
+    resource = None
+
+
+@contextlib.contextmanager
+def without_main_reimport() -> Iterator[None]:
+    """
+    Starts child processes without re-running the parent's main script in them.
+
+    spawn and forkserver children import the script the parent was started as (serve.py,
+    scripts/ingest_mailbox.py) before running their target, and with it everything that script
+    imports. Their targets live in importable modules, so the script is hidden while they start.
+    """
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")  # No __file__ or __spec__: nothing to re-run
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+class SandboxError(Exception):
+    """The sandboxed call failed, was killed, or ran out of memory."""
+
+
+class SandboxTimeout(SandboxError):
+    pass
+
+
+def _child(conn, fn: Callable, args: tuple, memory_limit_bytes: int, cpu_seconds: int) -> None:
+    try:
+        if resource is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))  # Backstop if the parent goes away
+        result = ("ok", fn(*args))
+    except MemoryError:
+        result = ("error", f"exceeded the {memory_limit_bytes // (1024 * 1024)} MB memory limit")
+    except Exception as e:
+        result = ("error", f"{type(e).__name__}: {e}")
+    try:
+        conn.send(result)
+    finally:
+        conn.close()
+
+
+class ProcessSandbox:
+    def __init__(self, workers: int, timeout: float, memory_limit_mb: int, preload: Iterable[str] = ()):
+        self.timeout = timeout
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        self.limiter = ConcurrencyLimiter(workers)
+        self.preload = list(preload)
+        self._context = None
+
+    def _get_context(self):
+        if self._context is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                self._context = multiprocessing.get_context("forkserver")
+                self._context.set_forkserver_preload(self.preload)
+            else:
+                self._context = multiprocessing.get_context("spawn")
+        return self._context
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Runs fn(*args) in a child process and returns its (picklable) result."""
+        context = self._get_context()
+        async with self.limiter:
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_child,
+                args=(sender, fn, args, self.memory_limit_bytes, int(self.timeout) + 1),
+                daemon=True,
+            )
+            with without_main_reimport():
+                process.start()
+            sender.close()
+            try:
+                if not await asyncio.to_thread(receiver.poll, self.timeout):
+                    raise SandboxTimeout(f"timed out after {self.timeout:g}s")
+                status, payload = receiver.recv()
+            except EOFError:
+                status, payload = "died", None  # Closed without a result: killed, e.g. for exceeding RLIMIT_CPU
+            finally:
+                if process.is_alive():
+                    process.kill()
+                await asyncio.to_thread(process.join)
+                receiver.close()
+        if status == "died":
+            raise SandboxError(f"worker died (exit code {process.exitcode})")
+        if status != "ok":
+            raise SandboxError(payload)
+        return payload
@@ -0,0 +1,29 @@
+# app/services/single_flight.py
+
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key onto one execution: the first caller starts it,
+    everyone who arrives while it is running awaits the same result (or exception).
+    Once it finishes the key is forgotten, so later calls run afresh.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, asyncio.Task] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._flights
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            # A task of its own, so one caller disconnecting doesn't cancel the work for the others
+            flight = asyncio.ensure_future(fn())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda _: self._flights.pop(key, None))
+        return await asyncio.shield(flight)
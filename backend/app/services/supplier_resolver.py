@@ -0,0 +1,152 @@
+# app/services/supplier_resolver.py
+"""
+Matches the sender of a quote email to an existing supplier, so a new salesperson at a
+known supplier doesn't create a duplicate.
+
+Matching runs in two steps:
+  A. Blocking: fetch only the suppliers that share the exact contact email, the email
+     domain (unless it is a shared mail provider) or a distinctive company-name token.
+     Postgres maintains both keys on `suppliers` and indexes them, so this is a couple of
+     index lookups however many suppliers there are.
+  B. Scoring: rank that small candidate set by trigram similarity of the normalized
+     company names, the same measure pg_trgm uses, and report a confidence per match.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import config
+from app.models import Supplier
+
+# Addresses at these domains say nothing about the employer
+SHARED_MAIL_DOMAINS = frozenset({
+    "gmail.com", "googlemail.com", "yahoo.com", "hotmail.com", "outlook.com", "live.com", "msn.com",
+    "icloud.com", "me.com", "aol.com", "proton.me", "protonmail.com", "gmx.com", "gmx.de", "mail.com",
+    "yandex.com", "zoho.com", "qq.com", "163.com", "126.com",
+})
+
+# Ignored when comparing names: "Costa Nuts, Inc." and "Costa Nuts LLC" are the same company
+LEGAL_SUFFIXES = frozenset({
+    "inc", "incorporated", "llc", "llp", "ltd", "limited", "co", "corp", "corporation", "company",
+    "gmbh", "ag", "sa", "sas", "srl", "spa", "bv", "nv", "plc", "pty", "pvt", "oy", "ab", "as", "kg",
+})
+
+# Too common to narrow the search; they still count towards name similarity
+COMMON_NAME_WORDS = LEGAL_SUFFIXES | frozenset({
+    "the", "and", "of", "group", "holdings", "international", "intl", "global", "trading", "traders",
+    "foods", "food", "ingredients", "supply", "supplies", "supplier", "suppliers", "industries",
+    "enterprises", "products", "farms", "export", "exports", "import", "imports",
+})
+
+# Confidence by what matched; a domain match is strong evidence on its own
+EMAIL_CONFIDENCE = 1.0
+DOMAIN_CONFIDENCE = 0.9
+NAME_CONFIDENCE_SCALE = 0.95  # Name similarity alone never outranks a domain match
+
+
+@dataclass
+class SupplierMatch:
+    supplier: Supplier
+    confidence: float  # 0..1
+    matched_on: str  # "email", "domain" or "name"
+
+
+def email_domain(email: Optional[str]) -> Optional[str]:
+    """The domain of `email`, lowercased. Mirrors Supplier.email_domain."""
+    if not email or "@" not in email:
+        return None
+    return email.rsplit("@", 1)[1].strip().lower() or None
+
+
+def name_tokens(company_name: Optional[str]) -> list[str]:
+    """Lowercase alphanumeric words of a company name. Mirrors Supplier.name_tokens."""
+    return re.sub(r"[^a-z0-9]+", " ", (company_name or "").lower()).split()
+
+
+def normalize_company_name(company_name: Optional[str]) -> str:
+    return " ".join(token for token in name_tokens(company_name) if token not in LEGAL_SUFFIXES)
+
+
+def blocking_tokens(company_name: Optional[str]) -> list[str]:
+    """The name tokens distinctive enough to look candidates up by."""
+    return sorted({token for token in name_tokens(company_name) if token not in COMMON_NAME_WORDS and len(token) > 1})
+
+
+def trigrams(text: str) -> set[str]:
+    """pg_trgm's trigrams: each word padded with two spaces in front and one behind."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def name_similarity(a: Optional[str], b: Optional[str]) -> float:
+    """Trigram similarity (shared / total trigrams) of two normalized company names."""
+    grams_a, grams_b = trigrams(normalize_company_name(a)), trigrams(normalize_company_name(b))
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def score_candidate(supplier: Supplier, email: Optional[str], company_name: Optional[str]) -> Optional[SupplierMatch]:
+    """How likely it is that whoever sent `email` as `company_name` is `supplier`. None for no evidence at all."""
+    similarity = name_similarity(company_name, supplier.company_name) if company_name else 0.0
+
+    if email and supplier.contact_email and email.strip().lower() == supplier.contact_email.lower():
+        return SupplierMatch(supplier, EMAIL_CONFIDENCE, "email")
+
+    domain = email_domain(email)
+    if domain and domain not in SHARED_MAIL_DOMAINS and domain == email_domain(supplier.contact_email):
+        # Several suppliers can share a domain (e.g. divisions); the name tells them apart
+        confidence = DOMAIN_CONFIDENCE + (1 - DOMAIN_CONFIDENCE) * similarity if company_name else DOMAIN_CONFIDENCE
+        return SupplierMatch(supplier, round(confidence, 4), "domain")
+
+    if similarity > 0:
+        return SupplierMatch(supplier, round(similarity * NAME_CONFIDENCE_SCALE, 4), "name")
+    return None
+
+
+def rank_candidates(candidates: Iterable[Supplier], email: Optional[str], company_name: Optional[str]) -> list[SupplierMatch]:
+    """Scores every candidate, best match first."""
+    matches = [match for supplier in candidates if (match := score_candidate(supplier, email, company_name))]
+    return sorted(matches, key=lambda match: match.confidence, reverse=True)
+
+
+async def find_candidates(db: AsyncSession, email: Optional[str], company_name: Optional[str]) -> list[Supplier]:
+    """Fetches the suppliers sharing a blocking key with the sender (step A)."""
+    conditions = []
+    if email:
+        conditions.append(Supplier.contact_email == email.strip())
+    domain = email_domain(email)
+    if domain and domain not in SHARED_MAIL_DOMAINS:
+        conditions.append(Supplier.email_domain == domain)
+    tokens = blocking_tokens(company_name)
+    if tokens:
+        conditions.append(Supplier.name_tokens.overlap(tokens))
+    if not conditions:
+        return []
+
+    query = select(Supplier).where(or_(*conditions)).limit(config.SUPPLIER_CANDIDATE_LIMIT)
+    if tokens and len(conditions) > 1:
+        # Stronger keys first, so an oversized name block can't crowd out the email or domain match
+        query = query.order_by(*(condition.desc().nulls_last() for condition in conditions[:-1]))
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+async def rank_suppliers(db: AsyncSession, email: Optional[str], company_name: Optional[str]) -> list[SupplierMatch]:
+    """Every plausible existing supplier for this sender with its confidence, best first."""
+    return rank_candidates(await find_candidates(db, email, company_name), email, company_name)
+
+
+async def resolve_supplier(db: AsyncSession, email: Optional[str], company_name: Optional[str]) -> Optional[SupplierMatch]:
+    """The best match if it is confident enough (SUPPLIER_MATCH_THRESHOLD) to reuse, else None."""
+    matches = await rank_suppliers(db, email, company_name)
+    if matches and matches[0].confidence >= config.SUPPLIER_MATCH_THRESHOLD:
+        return matches[0]
+    return None
@@ -0,0 +1,253 @@
+# app/services/tenancy.py
+"""
+Tenant scoping: every supplier, RFQ, quote, email and certification belongs to one buyer
+organization (a tenant), and each request only sees its own.
+
+  A. TenantMiddleware resolves the tenant of each /api request from its API key, sent as
+     `Authorization: Bearer <key>`, and runs the request inside tenant_scope(). Every tenant has
+     its own key (scripts/create_tenant.py), stored only as a hash; a request without a key that
+     belongs to some tenant gets a 401, so callers can't pick their tenant.
+  B. app/models.py adds `tenant_id = <current tenant>` to every ORM SELECT, UPDATE and DELETE on a
+     TenantScoped model, and fills tenant_id on insert. Raw SQL must filter on tenant_id itself.
+  C. Keys of shared stores (resource versions, the response cache) are prefixed with tenant_key().
+  D. A tenant's requests may hold only a share of this worker's LLM concurrency and DB connections
+     (tenant_limits), so one busy organization can't starve the others.
+
+Code running outside any scope (scripts, background tasks, tests) acts as the default tenant;
+maintenance that must see every tenant's rows runs inside all_tenants().
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import re
+import secrets
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, Optional
+
+from sqlalchemy import select
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import JSONResponse
+
+from app.config import config
+from app.services.concurrency import ConcurrencyLimiter
+
+TENANT_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+_tenant: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("tenant", default=None)
+_all_tenants: contextvars.ContextVar[bool] = contextvars.ContextVar("all_tenants", default=False)
+_limited: contextvars.ContextVar[bool] = contextvars.ContextVar("tenant_limited", default=False)
+_holding_db_slot: contextvars.ContextVar[bool] = contextvars.ContextVar("holding_db_slot", default=False)
+
+
+def current_tenant() -> str:
+    """The tenant the running code acts for. Raises inside all_tenants(), where there is no single one."""
+    if _all_tenants.get():
+        raise ValueError("No single tenant in scope: this runs across all tenants.")
+    return _tenant.get() or config.DEFAULT_TENANT_ID
+
+
+def tenant_filter() -> Optional[str]:
+    """The tenant queries are restricted to, or None inside all_tenants()."""
+    return None if _all_tenants.get() else current_tenant()
+
+
+def tenant_key(key: str) -> str:
+    """`key` in the current tenant's namespace, for stores shared by every tenant."""
+    return f"{current_tenant()}/{key}"
+
+
+@contextlib.contextmanager
+def tenant_scope(tenant_id: str, limited: bool = False) -> Iterator[str]:
+    """
+    Runs the block as `tenant_id`. With `limited`, its LLM calls and DB sessions count against the
+    tenant's shares; requests are limited, scripts run alone in their process and aren't.
+    """
+    tokens = (_tenant.set(tenant_id), _all_tenants.set(False), _limited.set(limited))
+    try:
+        yield tenant_id
+    finally:
+        for var, token in zip((_tenant, _all_tenants, _limited), tokens):
+            var.reset(token)
+
+
+@contextlib.contextmanager
+def all_tenants() -> Iterator[None]:
+    """Lifts the tenant filter for the block, e.g. for maintenance across tenants. Inserts inside it must set tenant_id."""
+    token = _all_tenants.set(True)
+    try:
+        yield
+    finally:
+        _all_tenants.reset(token)
+
+
+# --- Resource shares ---
+
+@dataclass(frozen=True)
+class TenantShares:
+    llm: float  # Fraction of this worker's LLM concurrency
+    db: float  # Fraction of this worker's DB connections
+
+
+class TenantLimits:
+    """
+    Caps how much of this worker's LLM concurrency and DB connection pool one tenant's requests hold
+    at once. Shares come from config, overridden per tenant by the tenants table (TenantRegistry).
+    """
+
+    def __init__(self, llm_share: float, db_share: float):
+        self.default_shares = TenantShares(llm_share, db_share)
+        self._shares: dict[str, TenantShares] = {}
+        self._llm: dict[str, ConcurrencyLimiter] = {}
+        self._db: dict[str, ConcurrencyLimiter] = {}
+
+    def set_shares(self, tenant_id: str, llm_share: Optional[float] = None, db_share: Optional[float] = None) -> None:
+        self._shares[tenant_id] = TenantShares(
+            llm_share if llm_share is not None else self.default_shares.llm,
+            db_share if db_share is not None else self.default_shares.db,
+        )
+
+    def llm_limit(self, tenant_id: str) -> int:
+        share = self._shares.get(tenant_id, self.default_shares).llm
+        return max(1, round(share * config.LLM_WORKER_CONCURRENCY))
+
+    def db_limit(self, tenant_id: str) -> int:
+        share = self._shares.get(tenant_id, self.default_shares).db
+        return max(1, round(share * (config.DB_POOL_SIZE + config.DB_MAX_OVERFLOW)))
+
+    @staticmethod
+    def _limiter(limiters: dict[str, ConcurrencyLimiter], tenant_id: str, limit: int) -> ConcurrencyLimiter:
+        limiter = limiters.get(tenant_id)
+        if limiter is None or limiter.limit != limit:
+            # A changed share takes effect for new calls; ones in flight release the old limiter
+            limiter = limiters[tenant_id] = ConcurrencyLimiter(limit)
+        return limiter
+
+    @contextlib.asynccontextmanager
+    async def llm_slot(self) -> AsyncIterator[None]:
+        """Holds one of the current tenant's LLM call slots for the block (no-op outside a limited scope)."""
+        tenant_id = _tenant.get()
+        if tenant_id is None or not _limited.get():
+            yield
+            return
+        async with self._limiter(self._llm, tenant_id, self.llm_limit(tenant_id)):
+            yield
+
+    @contextlib.asynccontextmanager
+    async def db_slot(self) -> AsyncIterator[None]:
+        """
+        Holds one of the current tenant's DB connection slots for the block. Reentrant: a request
+        opening a second session while holding a slot doesn't wait on its own tenant's share.
+        """
+        tenant_id = _tenant.get()
+        if tenant_id is None or not _limited.get() or _holding_db_slot.get():
+            yield
+            return
+        async with self._limiter(self._db, tenant_id, self.db_limit(tenant_id)):
+            token = _holding_db_slot.set(True)
+            try:
+                yield
+            finally:
+                _holding_db_slot.reset(token)
+
+
+tenant_limits = TenantLimits(config.TENANT_LLM_SHARE, config.TENANT_DB_SHARE)
+
+
+def new_api_key() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def hash_api_key(api_key: str) -> str:
+    """What the tenants table stores of an API key. Keys are random, so a plain SHA-256 is enough."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class TenantRegistry:
+    """Which tenants exist and whose API keys are whose, read from the tenants table and cached for TENANT_CACHE_SECONDS."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._known: dict[str, float] = {}  # tenant id -> when to re-read it
+        self._keys: dict[str, tuple[str, float]] = {}  # API key hash -> (tenant id, when to re-read it)
+        self._webhook_urls: dict[str, list[str]] = {}  # tenant id -> its webhook endpoints, read with the tenant
+
+    async def exists(self, tenant_id: str) -> bool:
+        if self._known.get(tenant_id, 0) > time.monotonic():
+            return True
+        return await self._load(id=tenant_id) is not None
+
+    async def authenticate(self, api_key: str) -> Optional[str]:
+        """The id of the tenant `api_key` belongs to, or None. A replaced key keeps working for up to TENANT_CACHE_SECONDS."""
+        key_hash = hash_api_key(api_key)
+        tenant_id, expires = self._keys.get(key_hash, (None, 0))
+        if expires > time.monotonic():
+            return tenant_id
+        tenant_id = await self._load(api_key_hash=key_hash)
+        if tenant_id is not None:
+            self._keys[key_hash] = (tenant_id, time.monotonic() + self.ttl_seconds)
+        return tenant_id
+
+    async def webhook_urls(self, tenant_id: str) -> list[str]:
+        """The endpoints that receive `tenant_id`'s change events. The default tenant's also come from WEBHOOK_URLS."""
+        urls = self._webhook_urls.get(tenant_id, []) if await self.exists(tenant_id) else []
+        if tenant_id == config.DEFAULT_TENANT_ID:
+            urls = list(dict.fromkeys([*config.WEBHOOK_URLS, *urls]))
+        return urls
+
+    async def _load(self, **criteria) -> Optional[str]:
+        """Reads the tenant matching `criteria` and caches its settings; returns its id, or None if there is none."""
+        # Imported here: the models and the session manager import this module
+        from app.models import Tenant
+        from app.services.database import sessionmanager
+
+        async with sessionmanager.session() as db:
+            tenant = (await db.execute(select(Tenant).filter_by(**criteria))).scalar_one_or_none()
+        if tenant is None:
+            return None  # Not cached, so a tenant created a moment ago is found on the next request
+        tenant_limits.set_shares(tenant.id, tenant.llm_share, tenant.db_share)
+        self._webhook_urls[tenant.id] = list(tenant.webhook_urls or [])
+        self._known[tenant.id] = time.monotonic() + self.ttl_seconds
+        return tenant.id
+
+    def clear(self) -> None:
+        self._known.clear()
+        self._keys.clear()
+        self._webhook_urls.clear()
+
+
+tenant_registry = TenantRegistry(config.TENANT_CACHE_SECONDS)
+
+
+def request_api_key(scope) -> Optional[str]:
+    """
+    The API key of a request: the bearer token of its Authorization header, else its `api_key`
+    query parameter, for the SSE stream (EventSource can't set headers).
+    """
+    scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token.strip():
+        return token.strip()
+    return QueryParams(scope["query_string"]).get("api_key") or None
+
+
+class TenantMiddleware:
+    """Runs each /api request as the tenant its API key belongs to; requests without a valid key get a 401."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api"):
+            await self.app(scope, receive, send)
+            return
+
+        api_key = request_api_key(scope)
+        tenant_id = await tenant_registry.authenticate(api_key) if api_key else None
+        if tenant_id is None:
+            detail = "Invalid API key" if api_key else "Missing API key"
+            response = JSONResponse({"detail": detail}, status_code=401, headers={"WWW-Authenticate": "Bearer"})
+            await response(scope, receive, send)
+            return
+        with tenant_scope(tenant_id, limited=True):
+            await self.app(scope, receive, send)
@@ -0,0 +1,153 @@
+# app/views/analytics.py
+
+import datetime
+from collections import defaultdict
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import LLMCall, QuotePriceRollup
+from app.services.database import get_db
+from app.services.price_analytics import UNKNOWN_COUNTRY, merge_rollups
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+GroupField = Literal["item", "country_of_origin", "supplier_id", "month"]
+LLMGroupField = Literal["model", "operation", "outcome", "rfq_id", "supplier_id", "day"]
+
+
+class PriceStatsSchema(BaseModel):
+    """price_per_pound statistics for one group. Dimensions that were not grouped on are omitted."""
+
+    item: Optional[str] = None
+    country_of_origin: Optional[str] = None
+    supplier_id: Optional[str] = None
+    month: Optional[datetime.date] = None
+    quote_count: int
+    average: float
+    minimum: float
+    maximum: float
+    p50: float
+    p90: float
+    p95: float
+
+
+class LLMCostSchema(BaseModel):
+    """LLM spend and latency for one group. Dimensions that were not grouped on are omitted."""
+
+    model: Optional[str] = None
+    operation: Optional[str] = None
+    outcome: Optional[str] = None
+    rfq_id: Optional[str] = None
+    supplier_id: Optional[str] = None
+    day: Optional[datetime.date] = None
+    calls: int
+    input_tokens: int
+    output_tokens: int
+    cost_usd: float
+    latency_mean_ms: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+
+
+async def _load_rollups(
+    db: AsyncSession,
+    item: Optional[str],
+    country_of_origin: Optional[str],
+    supplier_id: Optional[str],
+    start_month: Optional[datetime.date],
+    end_month: Optional[datetime.date],
+) -> list[QuotePriceRollup]:
+    query = select(QuotePriceRollup)
+    if item:
+        query = query.where(QuotePriceRollup.item == item)
+    if country_of_origin:
+        query = query.where(QuotePriceRollup.country_of_origin == country_of_origin)
+    if supplier_id:
+        query = query.where(QuotePriceRollup.supplier_id == supplier_id)
+    if start_month:
+        query = query.where(QuotePriceRollup.month >= start_month.replace(day=1))
+    if end_month:
+        query = query.where(QuotePriceRollup.month <= end_month.replace(day=1))
+    return (await db.execute(query)).scalars().all()
+
+
+def _summarize(rollups: list[QuotePriceRollup], group_by: list[GroupField]) -> list[PriceStatsSchema]:
+    groups: dict[tuple, list[QuotePriceRollup]] = defaultdict(list)
+    for rollup in rollups:
+        groups[tuple(getattr(rollup, field) for field in group_by)].append(rollup)
+
+    results = []
+    for key in sorted(groups):
+        dimensions = dict(zip(group_by, key))
+        if dimensions.get("country_of_origin") == UNKNOWN_COUNTRY:
+            dimensions["country_of_origin"] = None
+        results.append(PriceStatsSchema(**dimensions, **merge_rollups(groups[key])._asdict()))
+    return results
+
+
+@router.get("/prices", response_model=list[PriceStatsSchema])
+async def get_price_stats(
+    group_by: list[GroupField] = Query(default=["item"]),
+    item: Optional[str] = None,
+    country_of_origin: Optional[str] = None,
+    supplier_id: Optional[str] = None,
+    start_month: Optional[datetime.date] = None,
+    end_month: Optional[datetime.date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Average, min, max and percentiles of price_per_pound, grouped by any mix of
+    item, country_of_origin, supplier_id and month. Answered from the pre-aggregated
+    rollups, never from the quotes table.
+    """
+    rollups = await _load_rollups(db, item, country_of_origin, supplier_id, start_month, end_month)
+    return _summarize(rollups, list(dict.fromkeys(group_by)))
+
+
+@router.get("/prices/trend", response_model=list[PriceStatsSchema])
+async def get_price_trend(
+    item: str,
+    country_of_origin: Optional[str] = None,
+    supplier_id: Optional[str] = None,
+    start_month: Optional[datetime.date] = None,
+    end_month: Optional[datetime.date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Month-by-month price statistics for one item, for trend charts."""
+    rollups = await _load_rollups(db, item, country_of_origin, supplier_id, start_month, end_month)
+    return _summarize(rollups, ["item", "month"])
+
+
+@router.get("/llm-costs", response_model=list[LLMCostSchema])
+async def get_llm_costs(
+    group_by: list[LLMGroupField] = Query(default=["model"]),
+    start_day: Optional[datetime.date] = None,
+    end_day: Optional[datetime.date] = None,
+    model: Optional[str] = None,
+    operation: Optional[str] = None,
+    outcome: Optional[str] = None,
+    rfq_id: Optional[str] = None,
+    supplier_id: Optional[str] = None,
+    sort: Literal["group", "cost"] = "group",
+    limit: Optional[int] = Query(default=None, ge=1),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    LLM calls, tokens, cost (USD) and latency from the call ledger, grouped by any mix of model,
+    operation, outcome, rfq_id, supplier_id and day (UTC), over [start_day, end_day].
+    Calls that never led to a saved quote have no rfq_id or supplier_id. sort=cost lists the
+    most expensive groups first, e.g. group_by=supplier_id&sort=cost&limit=10.
+    """
+    start = datetime.datetime.combine(start_day, datetime.time(), datetime.UTC) if start_day else None
+    end = datetime.datetime.combine(end_day + datetime.timedelta(days=1), datetime.time(), datetime.UTC) if end_day else None
+    rows = await LLMCall.cost_report(
+        db, list(dict.fromkeys(group_by)), start, end,
+        model=model, operation=operation, outcome=outcome, rfq_id=rfq_id, supplier_id=supplier_id,
+    )
+    if sort == "cost":
+        rows.sort(key=lambda row: row["cost_usd"] or 0, reverse=True)
+    return [LLMCostSchema(**row) for row in rows[:limit]]
@@ -0,0 +1,113 @@
+# app/views/emails.py
+
+import base64
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Email as EmailModel
+from app.models import EmailBody as EmailBodyModel
+from app.models import Quote as QuoteModel
+from app.services.database import get_db
+
+router = APIRouter(prefix="/emails", tags=["Emails"])
+
+SEARCH_CONFIG = "english"  # Must match the configuration in the email_bodies.search_vector expression
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=8"
+
+
+class EmailSearchHit(BaseModel):
+    id: str
+    quote_id: str
+    rfq_id: str
+    supplier_id: str
+    rank: float
+    highlight: str
+
+
+class EmailSearchResponse(BaseModel):
+    results: list[EmailSearchHit]
+    next_cursor: Optional[str] = None
+
+
+class EmailStorageReport(BaseModel):
+    email_count: int
+    unique_body_count: int
+    logical_bytes: int = Field(description="Body bytes as if every email stored its own uncompressed copy.")
+    deduplicated_bytes: int = Field(description="Uncompressed bytes of the distinct bodies.")
+    stored_bytes: int = Field(description="On-disk bytes of the distinct bodies after compression.")
+    saved_bytes: int
+
+
+def _encode_cursor(rank: float, email_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([rank, email_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[float, str]:
+    try:
+        rank, email_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), str(email_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+@router.get("/search", response_model=EmailSearchResponse)
+async def search_emails(
+    q: str = Query(..., min_length=1, description="Web-search style query, e.g. 'halal whey ireland' or '\"soy isolate\" -organic'."),
+    quote_id: Optional[str] = None,
+    rfq_id: Optional[str] = None,
+    supplier_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Full-text search over ingested supplier emails, ranked by relevance.
+    Pages with an opaque keyset cursor on (rank, id), so deep pages cost the same as the first.
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(EmailBodyModel.search_vector, tsquery)
+
+    # Bodies are shared, so one matching body yields a hit for every email that references it
+    page_query = (
+        select(EmailModel.id, EmailModel.quote_id, QuoteModel.rfq_id, QuoteModel.supplier_id, rank.label("rank"))
+        .join(EmailBodyModel, EmailBodyModel.content_hash == EmailModel.body_hash)
+        .join(QuoteModel, QuoteModel.id == EmailModel.quote_id)
+        .where(EmailBodyModel.search_vector.op("@@")(tsquery))
+    )
+    if quote_id:
+        page_query = page_query.where(EmailModel.quote_id == quote_id)
+    if rfq_id:
+        page_query = page_query.where(QuoteModel.rfq_id == rfq_id)
+    if supplier_id:
+        page_query = page_query.where(QuoteModel.supplier_id == supplier_id)
+    if cursor:
+        last_rank, last_id = _decode_cursor(cursor)
+        page_query = page_query.where(or_(rank < last_rank, and_(rank == last_rank, EmailModel.id > last_id)))
+
+    # Fetch one extra row to know whether another page exists
+    page = page_query.order_by(rank.desc(), EmailModel.id).limit(limit + 1).subquery()
+
+    # Highlighting re-parses the body, so only do it for the rows on this page
+    headline = func.ts_headline(SEARCH_CONFIG, EmailBodyModel.raw_text, tsquery, HEADLINE_OPTIONS)
+    query = (
+        select(page, headline.label("highlight"))
+        .join(EmailModel, EmailModel.id == page.c.id)
+        .join(EmailBodyModel, EmailBodyModel.content_hash == EmailModel.body_hash)
+        .order_by(page.c.rank.desc(), page.c.id)
+    )
+    rows = (await db.execute(query)).mappings().all()
+
+    hits = [EmailSearchHit(**row) for row in rows[:limit]]
+    next_cursor = _encode_cursor(hits[-1].rank, hits[-1].id) if len(rows) > limit else None
+    return EmailSearchResponse(results=hits, next_cursor=next_cursor)
+
+
+@router.get("/storage-report", response_model=EmailStorageReport)
+async def get_email_storage_report(db: AsyncSession = Depends(get_db)):
+    """Reports how much space body deduplication and compression save across the email log."""
+    return await EmailBodyModel.storage_report(db)
@@ -0,0 +1,32 @@
+# app/views/health.py
+
+from fastapi import APIRouter, Request, Response
+
+from app.services import llm_client
+
+# Mounted outside /api so load balancers and orchestrators can probe it directly
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+async def liveness():
+    """The process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness(request: Request, response: Response):
+    """Ready for traffic: pools are warm and the worker isn't draining for shutdown."""
+    if not request.app.state.ready:
+        response.status_code = 503
+        return {"status": "unavailable"}
+    return {"status": "ready"}
+
+
+@router.get("/llm")
+async def llm_tiers():
+    """
+    Each model tier's circuit state, and which tier has been serving extractions at what latency
+    and cost; plus how many calls were hedged and what that did to the p99.
+    """
+    return {"tiers": [tier.report() for tier in llm_client.tiers], "hedging": llm_client.hedge_stats.report()}
@@ -1,16 +1,20 @@
 # /Users/duncan/dev/personal-projects/waystation/backend/app/views/quotes.py
 import datetime
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.models import Email as EmailModel
 from app.models import Quote as QuoteModel
 from app.models import RFQ as RFQModel
+from app.models import ResourceVersion
+from app.services import llm_ledger
 from app.services.database import get_db
+from app.services.http_cache import conditional_get
 from app.services.llm_client import generate_clarification_email
 from app.views.rfqs import CertificationSchema, SupplierComparisonSchema
 
@@ -33,12 +37,25 @@ class QuoteWithDetailsSchema(BaseModel):
     price_per_pound: Optional[float] = None
     country_of_origin: Optional[str] = None
     min_order_quantity: Optional[int] = None
+    price_amount: Optional[float] = None  # The price as quoted, e.g. 850 EUR per mt
+    price_currency: Optional[str] = None
+    price_unit: Optional[str] = None
     certifications: list[CertificationSchema] = []
     supplier: SupplierComparisonSchema
     rfq: RFQInfoSchema
     model_config = ConfigDict(from_attributes=True)
 
 
+class EmailAuditSchema(BaseModel):
+    """One email in a quote's audit trail."""
+
+    id: str
+    received_at: datetime.datetime
+    raw_text: str
+    extracted_data: Optional[dict] = None
+    storage: Literal["hot", "archived"]
+
+
 class ClarificationEmailResponse(BaseModel):
     """Schema for the clarification email response."""
 
@@ -46,11 +63,17 @@ class ClarificationEmailResponse(BaseModel):
 
 
 @router.get("", response_model=list[QuoteWithDetailsSchema])
-async def get_all_quotes(db: AsyncSession = Depends(get_db)):
+async def get_all_quotes(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """
     Retrieve a list of all quotes, including their associated supplier,
     certifications, and RFQ details, for a master list view.
     """
+    not_modified = await conditional_get(
+        request, response, db, ResourceVersion.QUOTES, ResourceVersion.SUPPLIERS, ResourceVersion.RFQS
+    )
+    if not_modified:
+        return not_modified
+
     query = (
         select(QuoteModel)
         .options(
@@ -65,6 +88,14 @@ async def get_all_quotes(db: AsyncSession = Depends(get_db)):
     return quotes
 
 
+@router.get("/{quote_id}/emails", response_model=list[EmailAuditSchema])
+async def get_quote_emails(quote_id: str, db: AsyncSession = Depends(get_db)):
+    """The emails a quote was extracted from, oldest first, whether still hot or already archived."""
+    if await db.get(QuoteModel, quote_id) is None:
+        raise HTTPException(status_code=404, detail="Quote not found")
+    return await EmailModel.audit_trail(db, quote_id)
+
+
 @router.post("/{quote_id}/generate-clarification-email", response_model=ClarificationEmailResponse)
 async def generate_quote_clarification_email(quote_id: str, db: AsyncSession = Depends(get_db)):
     """
@@ -125,7 +156,9 @@ async def generate_quote_clarification_email(quote_id: str, db: AsyncSession = D
 
     # Call the LLM service
     try:
-        generated_email = await generate_clarification_email(prompt)
+        with llm_ledger.recording() as calls:
+            calls.attribute(quote_id=quote.id, rfq_id=quote.rfq_id, supplier_id=quote.supplier_id)
+            generated_email = await generate_clarification_email(prompt)
         return ClarificationEmailResponse(email_text=generated_email)
     except HTTPException as e:
         raise e
@@ -1,10 +1,14 @@
 # app/views/rfqs.py
 
+import asyncio
 import datetime
-from typing import Optional, List
+import hashlib
+import json
+from typing import Awaitable, Callable, Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, ConfigDict, Field
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import Base64Bytes, BaseModel, ConfigDict, Field, TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy import select
@@ -14,15 +18,27 @@ from app.models import (
     Certification as CertificationModel,
     Quote as QuoteModel,
     RFQ as RFQModel,
+    ResourceVersion,
 )
-from app.services.database import get_db
+from app.services import idempotency, llm_ledger
+from app.services.attachments import prepare_extraction
+from app.services.database import get_db, sessionmanager
+from app.services.http_cache import check_etag, conditional_get, resource_etag
+from app.services.idempotency import request_fingerprint
+from app.services.outbox import RFQ_CREATED, enqueue_event
+from app.services.quote_events import quote_event_broker
+from app.services.response_cache import response_cache
+from app.services.single_flight import SingleFlight
+from app.services.tenancy import tenant_key
 
 # Import the services for LLM extraction and business logic processing
-from app.services.llm_client import extract_quote_data_from_email
-from app.services.quote_processor import process_quote_from_email_data
+from app.services.llm_client import MultiItemExtractionSchema, extract_quote_data_from_email, extract_quote_items_from_email
+from app.services.quote_processor import match_line_items, process_quote_from_email_data, process_quote_items_from_email_data
 
 router = APIRouter(prefix="/rfqs", tags=["RFQs"])
 
+extract_flights = SingleFlight()
+
 # --- Pydantic Schemas ---
 class CertificationSchema(BaseModel):
     id: str
@@ -57,14 +73,26 @@ class QuoteComparisonSchema(BaseModel):
     price_per_pound: Optional[float] = None
     country_of_origin: Optional[str] = None
     min_order_quantity: Optional[int] = None
+    price_amount: Optional[float] = None  # The price as quoted, e.g. 850 EUR per mt
+    price_currency: Optional[str] = None
+    price_unit: Optional[str] = None
     certifications: list[CertificationSchema] = []
     supplier: SupplierComparisonSchema  # Nest the detailed supplier schema
 
     model_config = ConfigDict(from_attributes=True)
 
+_rfq_list_adapter = TypeAdapter(list[RFQSchema])
+_quote_comparison_adapter = TypeAdapter(list[QuoteComparisonSchema])
+
+class EmailAttachmentSchema(BaseModel):
+    filename: str
+    content_type: str = ""
+    data: Base64Bytes = Field(..., description="The file's bytes, base64-encoded.")
+
 class EmailExtractRequest(BaseModel):
     """Schema for the incoming request body."""
     raw_text: str = Field(..., description="The raw text content of the supplier's email.")
+    attachments: list[EmailAttachmentSchema] = Field(default_factory=list, description="Attached price sheets (CSV, XLSX, PDF).")
 
 class RFQEmailResponse(BaseModel):
     """Schema for the successful response, returning the new/updated quote."""
@@ -74,9 +102,23 @@ class RFQEmailResponse(BaseModel):
     price_per_pound: Optional[float] = None
     country_of_origin: Optional[str] = None
     min_order_quantity: Optional[int] = None
+    price_amount: Optional[float] = None  # The price as quoted, e.g. 850 EUR per mt
+    price_currency: Optional[str] = None
+    price_unit: Optional[str] = None
     certifications: list[CertificationSchema] = []
     model_config = ConfigDict(from_attributes=True)
 
+class UnmatchedLineItemSchema(BaseModel):
+    """A quoted product with no open RFQ to attach it to."""
+    product: Optional[str] = None
+    price_per_pound: Optional[float] = None
+
+class MultiQuoteEmailResponse(BaseModel):
+    """Schema for the multi-item extraction response: every quote saved from the email."""
+    quotes: list[RFQEmailResponse]
+    unmatched: list[UnmatchedLineItemSchema] = []
+    llm_calls: int
+
 
 # --- Standard CRUD Endpoints ---
 
@@ -101,6 +143,10 @@ async def create_rfq(rfq_in: RFQSchemaCreate, db: AsyncSession = Depends(get_db)
     new_rfq.required_certifications = final_certs
     
     db.add(new_rfq)
+    await db.flush()
+    await ResourceVersion.bump(db, ResourceVersion.RFQS, ResourceVersion.rfq_key(new_rfq.id))
+    response_cache.invalidate_on_commit(db, ResourceVersion.RFQS)
+    await enqueue_event(db, RFQ_CREATED, new_rfq.id, {"rfq_id": new_rfq.id, **rfq_in.model_dump(mode="json")})
     await db.commit()
     await db.refresh(new_rfq) 
 
@@ -115,59 +161,223 @@ async def create_rfq(rfq_in: RFQSchemaCreate, db: AsyncSession = Depends(get_db)
     return RFQSchema.model_validate(rfq_with_relationships)
 
 @router.get("", response_model=list[RFQSchema])
-async def get_rfqs(db: AsyncSession = Depends(get_db)):
+async def get_rfqs(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """Retrieve all RFQs."""
-    return await RFQModel.get_all(db)
+    not_modified = await conditional_get(request, response, db, ResourceVersion.RFQS)
+    if not_modified:
+        return not_modified
+    cached = await response_cache.get(ResourceVersion.RFQS, response.headers["etag"])
+    if cached:
+        return cached.to_response(request)
+
+    rfqs = await RFQModel.get_all(db)
+    return await response_cache.store(ResourceVersion.RFQS, response, _rfq_list_adapter, rfqs)
 
 @router.get("/{rfq_id}/quotes", response_model=list[QuoteComparisonSchema])
-async def get_quotes_for_rfq(rfq_id: str, db: AsyncSession = Depends(get_db)):
+async def get_quotes_for_rfq(rfq_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """Retrieve all quotes submitted for a specific RFQ."""
+    # Hot comparisons cost one version lookup; quotes and suppliers are only read on a miss.
+    # Quotes embed supplier details, so supplier edits also change this representation.
+    cache_key = ResourceVersion.rfq_key(rfq_id)
+    etag = await resource_etag(db, cache_key, ResourceVersion.SUPPLIERS)
+    cached = await response_cache.get(cache_key, etag)
+    if cached:
+        return cached.to_response(request)  # Only existing RFQs' comparisons are cached
+
+    # Checked before the ETag: a client's stale If-None-Match must not turn a missing RFQ into a 304
     rfq = await db.get(RFQModel, rfq_id)
     if not rfq:
         raise HTTPException(status_code=404, detail="RFQ not found")
-    return await QuoteModel.get_by_rfq_id(db, rfq_id=rfq_id)
+    not_modified = check_etag(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    quotes = await QuoteModel.get_by_rfq_id(db, rfq_id=rfq_id)
+    return await response_cache.store(cache_key, response, _quote_comparison_adapter, quotes)
+
+@router.get("/{rfq_id}/quotes/events")
+async def stream_quote_events(rfq_id: str, request: Request):
+    """
+    Server-Sent Events stream of quote created/updated events for one RFQ.
+    Events are fanned out from Postgres LISTEN/NOTIFY, so a write on any replica reaches every subscriber.
+    """
+    # A session of its own, closed before streaming: neither a pooled connection nor one of the
+    # tenant's connection slots stays pinned for the lifetime of the stream
+    async with sessionmanager.session() as db:
+        rfq = await db.get(RFQModel, rfq_id)
+    if not rfq:
+        raise HTTPException(status_code=404, detail="RFQ not found")
+
+    async def event_stream():
+        with quote_event_broker.subscribe(rfq_id) as queue:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except TimeoutError:
+                    yield ": keep-alive\n\n"  # Comment line keeps proxies from closing an idle stream
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # --- Optimized LLM-driven Endpoint ---
 @router.post("/{rfq_id}/extract-quote-from-email", response_model=RFQEmailResponse)
 async def extract_and_save_quote(
     rfq_id: str,
     request: EmailExtractRequest,
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
     """
     Extracts quote data from an email, processes it, and persists it to the database.
     This endpoint coordinates calls to the LLM service and the data processing service.
+
+    Send an Idempotency-Key header to make retries safe: a repeat of a completed request
+    replays its stored response (marked Idempotent-Replayed: true) without calling the LLM again.
     """
-    # 1. Verify RFQ exists
-    rfq = await db.get(RFQModel, rfq_id)
-    if not rfq:
-        raise HTTPException(status_code=404, detail="RFQ not found")
+    # Identical requests arriving together share one extraction. The RFQ is looked up inside it, so no
+    # session sits idle in a transaction while the LLM runs
+    fingerprint = request_fingerprint(rfq_id, request.raw_text, *(hashlib.sha256(a.data).hexdigest() for a in request.attachments))
+    flight_key = tenant_key(f"{idempotency_key}:{fingerprint}" if idempotency_key else fingerprint)  # Never shared across tenants
+    body, replayed = await extract_flights.run(
+        flight_key,
+        lambda: _extract_and_save_quote(rfq_id, request, idempotency_key, fingerprint),
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return body
 
-    # 2. Call the LLM service to get structured data
-    extracted_data = await extract_quote_data_from_email(request.raw_text)
-    
-    # 3. Call the business logic service to handle the database transaction
-    try:
-        quote = await process_quote_from_email_data(
-            db=db,
-            rfq_id=rfq.id,
-            rfq_item_name=rfq.item,
-            extracted_data=extracted_data,
-            raw_text=request.raw_text
-        )
-        
-        await db.commit()
 
+async def _extract_and_save_quote(
+    rfq_id: str, request: EmailExtractRequest, idempotency_key: Optional[str], fingerprint: str
+) -> tuple[dict, bool]:
+    """
+    The shared body of extract_and_save_quote. Runs in its own session, since it can outlive the request
+    that started it. Returns (response body, whether it was replayed from an earlier request).
+    """
+
+    async def extract_and_save(db: AsyncSession) -> dict:
+        # B. Verify the RFQ exists
+        rfq = await db.get(RFQModel, rfq_id)
+        if not rfq:
+            raise HTTPException(status_code=404, detail="RFQ not found")
+
+        # C. Read recognizable price sheets directly; the LLM only sees the normalized email and what's left unstructured
+        prepared = await prepare_extraction(request.raw_text, request.attachments, items=[rfq.item])
+        with llm_ledger.recording():  # The ledger books the LLM call against the quote saved from it
+            extracted_data = prepared.extracted or await extract_quote_data_from_email(prepared.llm_text)
+
+            # D. Call the business logic service; the stored response commits together with the quote
+            quote = await process_quote_from_email_data(
+                db=db,
+                rfq_id=rfq.id,
+                rfq_item_name=rfq.item,
+                extracted_data=extracted_data,
+                raw_text=request.raw_text,
+                input_tokens=prepared.input_tokens,
+                input_tokens_saved=prepared.input_tokens_saved,
+            )
+        await db.flush()
         await db.refresh(quote, ["supplier", "certifications"])
-        
-        response_data = RFQEmailResponse.model_validate(quote)
-        return response_data
-        
-    except ValueError as e:
-        await db.rollback()
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        await db.rollback()
-        # Log the full error for debugging on the server
-        print(f"An unexpected database transaction error occurred: {e}")
-        raise HTTPException(status_code=500, detail="An internal error occurred while saving the quote.")
\ No newline at end of file
+        return RFQEmailResponse.model_validate(quote).model_dump(mode="json")
+
+    return await _run_idempotent("extract-quote", idempotency_key, fingerprint, extract_and_save)
+
+
+@router.post("/extract-quotes-from-email", response_model=MultiQuoteEmailResponse)
+async def extract_and_save_quotes(
+    request: EmailExtractRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+):
+    """
+    Extracts every product quoted in one email with a single LLM call, matches each line item to
+    an open RFQ by item name, and saves all the resulting quotes in one transaction. Line items
+    without an open RFQ are returned under `unmatched` and not saved.
+
+    Idempotency-Key works as for /{rfq_id}/extract-quote-from-email.
+    """
+    fingerprint = request_fingerprint("*", request.raw_text, *(hashlib.sha256(a.data).hexdigest() for a in request.attachments))
+    flight_key = tenant_key(f"{idempotency_key}:{fingerprint}" if idempotency_key else fingerprint)
+    body, replayed = await extract_flights.run(flight_key, lambda: _extract_and_save_quotes(request, idempotency_key, fingerprint))
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return body
+
+
+async def _extract_and_save_quotes(request: EmailExtractRequest, idempotency_key: Optional[str], fingerprint: str) -> tuple[dict, bool]:
+
+    async def extract_and_save(db: AsyncSession) -> dict:
+        # B. One extraction for the whole email, told which items are open so it names products our way
+        open_rfqs = await RFQModel.find_open(db, datetime.datetime.now(datetime.UTC))
+        if not open_rfqs:
+            raise HTTPException(status_code=409, detail="There are no open RFQs to match quotes to.")
+        prepared = await prepare_extraction(request.raw_text, request.attachments)
+        with llm_ledger.recording():  # The ledger splits the call across the quotes saved from it
+            if prepared.extracted:
+                extraction = MultiItemExtractionSchema.from_single(prepared.extracted)
+            else:
+                extraction, _ = await extract_quote_items_from_email(prepared.llm_text, [rfq.item for rfq in open_rfqs])
+
+            # C. Match line items to RFQs and save them together
+            matches = match_line_items(extraction, open_rfqs)
+            quotes = await process_quote_items_from_email_data(
+                db=db,
+                matches=matches,
+                raw_text=request.raw_text,
+                input_tokens=prepared.input_tokens,
+                input_tokens_saved=prepared.input_tokens_saved,
+            )
+        await db.flush()
+        for quote in quotes:
+            await db.refresh(quote, ["supplier", "certifications"])
+        return MultiQuoteEmailResponse(
+            quotes=[RFQEmailResponse.model_validate(quote) for quote in quotes],
+            unmatched=[
+                UnmatchedLineItemSchema(product=match.extracted.product, price_per_pound=match.extracted.price_per_pound)
+                for match in matches if match.rfq is None
+            ],
+            llm_calls=0 if prepared.extracted else 1,
+        ).model_dump(mode="json")
+
+    return await _run_idempotent("extract-quotes", idempotency_key, fingerprint, extract_and_save)
+
+
+async def _run_idempotent(
+    scope: str, idempotency_key: Optional[str], fingerprint: str, work: Callable[[AsyncSession], Awaitable[dict]]
+) -> tuple[dict, bool]:
+    """
+    Runs `work` in its own session and transaction under the Idempotency-Key, if one was sent.
+    Returns (response body, whether it was replayed from an earlier request).
+    """
+    key = f"{scope}:{idempotency_key}" if idempotency_key else None
+    async with sessionmanager.session() as db:
+        # A. Claim the key, or replay what the earlier request with this key returned
+        if key:
+            record = await idempotency.claim(db, key, fingerprint)
+            if record:
+                return record.response_body, True
+
+        try:
+            body = await work(db)
+            if key:
+                await idempotency.complete(db, key, 200, body)
+            await db.commit()
+            return body, False
+
+        except Exception as e:
+            await db.rollback()
+            if key:
+                await idempotency.release(db, key)  # Let the client retry with the same key
+            if isinstance(e, HTTPException):
+                raise
+            if isinstance(e, ValueError):
+                raise HTTPException(status_code=400, detail=str(e))
+            # Log the full error for debugging on the server
+            print(f"An unexpected database transaction error occurred: {e}")
+            raise HTTPException(status_code=500, detail="An internal error occurred while saving the quote.")
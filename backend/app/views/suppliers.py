@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel, ConfigDict, EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models import ResourceVersion
 from app.models import Supplier as SupplierModel
 from app.services.database import get_db
+from app.services.http_cache import conditional_get
+from app.services.response_cache import response_cache
+from app.services.supplier_resolver import rank_suppliers
 
 router = APIRouter(prefix="/suppliers", tags=["Suppliers"])
 
@@ -27,6 +31,12 @@ class SupplierSchema(SupplierSchemaBase):
     id: str
     model_config = ConfigDict(from_attributes=True)
 
+class SupplierMatchSchema(BaseModel):
+    supplier: SupplierSchema
+    confidence: float
+    matched_on: str
+    model_config = ConfigDict(from_attributes=True)
+
 @router.post("", response_model=SupplierSchema, status_code=201)
 async def create_supplier(supplier_in: SupplierSchemaCreate, db: AsyncSession = Depends(get_db)):
     """Create a new supplier."""
@@ -34,17 +44,27 @@ async def create_supplier(supplier_in: SupplierSchemaCreate, db: AsyncSession =
     return supplier
 
 @router.get("", response_model=list[SupplierSchema])
-async def get_suppliers(db: AsyncSession = Depends(get_db)):
+async def get_suppliers(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """Retrieve a list of all suppliers."""
+    not_modified = await conditional_get(request, response, db, ResourceVersion.SUPPLIERS)
+    if not_modified:
+        return not_modified
     return await SupplierModel.get_all(db)
 
+@router.get("/matches", response_model=list[SupplierMatchSchema])
+async def match_suppliers(email: str | None = None, company_name: str | None = None, db: AsyncSession = Depends(get_db)):
+    """Existing suppliers that a sender with this email and/or company name may belong to, with a confidence for each."""
+    return await rank_suppliers(db, email, company_name)
+
 @router.put("/{supplier_id}", response_model=SupplierSchema)
 async def update_supplier(supplier_id: str, supplier_in: SupplierSchemaUpdate, db: AsyncSession = Depends(get_db)):
     """Update an existing supplier."""
     update_data = supplier_in.model_dump(exclude_unset=True)
     if not update_data:
         raise HTTPException(status_code=400, detail="No update data provided")
-        
+
+    # Every cached RFQ comparison embeds supplier details
+    response_cache.invalidate_on_commit(db, prefix="rfq:")
     supplier = await SupplierModel.update(db, id=supplier_id, **update_data)
     if not supplier:
         raise HTTPException(status_code=404, detail="Supplier not found")
@@ -0,0 +1,33 @@
+# scripts/archive_emails.py
+"""
+Moves cold emails out of the hot `emails` partitions; see app/services/email_archive.py.
+Safe to run repeatedly, e.g. nightly from cron:
+
+    python scripts/archive_emails.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import config  # noqa: E402
+from app.services.database import sessionmanager  # noqa: E402
+from app.services.email_archive import archive_emails  # noqa: E402
+
+
+async def main() -> None:
+    sessionmanager.init(config.DB_CONFIG)
+    try:
+        async with sessionmanager.session() as db:
+            report = await archive_emails(db)
+    finally:
+        await sessionmanager.close()
+
+    print(f"🧊 Archived {report.archived_emails} emails, deleted {report.deleted_bodies} orphaned bodies.")
+    for name in report.dropped_partitions:
+        print(f"🗑️  Detached and dropped partition {name}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+# scripts/benchmark_uuid_keys.py
+"""
+Compares hex varchar keys with native uuid keys on synthetic data.
+
+Builds the same suppliers -> quotes -> emails shape twice, once per key type,
+in throwaway schemas, then reports index sizes and join latency.
+
+    python scripts/benchmark_uuid_keys.py --rows 1000000 --runs 7
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+from pathlib import Path
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import config  # noqa: E402
+
+LAYOUTS = {
+    "bench_text": ("varchar", "replace(gen_random_uuid()::text, '-', '')"),
+    "bench_uuid": ("uuid", "gen_random_uuid()"),
+}
+
+JOIN_QUERY = """
+SELECT s.company_name, q.price_per_pound, count(e.id)
+FROM {schema}.quotes q
+JOIN {schema}.suppliers s ON s.id = q.supplier_id
+LEFT JOIN {schema}.emails e ON e.quote_id = q.id
+WHERE q.id = ANY($1)
+GROUP BY 1, 2
+"""
+
+
+async def build(conn: asyncpg.Connection, schema: str, key_type: str, new_key: str, rows: int) -> None:
+    suppliers = max(rows // 100, 1)
+    await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE; CREATE SCHEMA {schema}")
+    await conn.execute(f"""
+        CREATE TABLE {schema}.suppliers (id {key_type} PRIMARY KEY, company_name varchar NOT NULL);
+        CREATE TABLE {schema}.quotes (
+            id {key_type} PRIMARY KEY,
+            supplier_id {key_type} NOT NULL REFERENCES {schema}.suppliers (id),
+            price_per_pound numeric(10, 2)
+        );
+        CREATE TABLE {schema}.emails (id {key_type} PRIMARY KEY, quote_id {key_type} REFERENCES {schema}.quotes (id));
+    """)
+    await conn.execute(f"""
+        INSERT INTO {schema}.suppliers SELECT {new_key}, 'Supplier ' || n FROM generate_series(1, {suppliers}) n;
+        INSERT INTO {schema}.quotes
+            SELECT {new_key}, s.id, round((random() * 20)::numeric, 2)
+            FROM generate_series(1, {rows}) n
+            JOIN (SELECT id, row_number() OVER () AS rn FROM {schema}.suppliers) s ON s.rn = n % {suppliers} + 1;
+        INSERT INTO {schema}.emails SELECT {new_key}, id FROM {schema}.quotes;
+        CREATE INDEX ON {schema}.quotes (supplier_id);
+        CREATE INDEX ON {schema}.emails (quote_id);
+        ANALYZE {schema}.suppliers, {schema}.quotes, {schema}.emails;
+    """)
+
+
+async def measure(conn: asyncpg.Connection, schema: str, runs: int, sample: int) -> dict:
+    index_bytes = await conn.fetchval(
+        "SELECT sum(pg_relation_size(indexrelid)) FROM pg_index i JOIN pg_class c ON c.oid = i.indrelid "
+        "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = $1",
+        schema,
+    )
+    table_bytes = await conn.fetchval(
+        "SELECT sum(pg_relation_size(c.oid)) FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = $1 AND c.relkind = 'r'",
+        schema,
+    )
+    timings = []
+    for _ in range(runs):
+        ids = [row["id"] for row in await conn.fetch(f"SELECT id FROM {schema}.quotes TABLESAMPLE SYSTEM (1) LIMIT $1", sample)]
+        plan = await conn.fetchval(f"EXPLAIN (ANALYZE, FORMAT JSON) {JOIN_QUERY.format(schema=schema)}", ids)
+        timings.append(json.loads(plan)[0]["Execution Time"])
+    return {
+        "index_mb": round(index_bytes / 1024 / 1024, 2),
+        "table_mb": round(table_bytes / 1024 / 1024, 2),
+        "join_median_ms": round(statistics.median(timings), 3),
+    }
+
+
+async def main(rows: int, runs: int, sample: int, keep: bool) -> None:
+    url = make_url(config.DB_CONFIG).set(drivername="postgresql")
+    conn = await asyncpg.connect(url.render_as_string(hide_password=False))
+    try:
+        results = {}
+        for schema, (key_type, new_key) in LAYOUTS.items():
+            print(f"🏗️  Building {schema} ({rows} quotes)...")
+            await build(conn, schema, key_type, new_key, rows)
+            results[schema] = await measure(conn, schema, runs, sample)
+        print(json.dumps(results, indent=2))
+    finally:
+        if not keep:
+            for schema in LAYOUTS:
+                await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="Number of synthetic quotes (and emails)")
+    parser.add_argument("--runs", type=int, default=5, help="Join timings to take the median of")
+    parser.add_argument("--sample", type=int, default=500, help="Quote ids looked up per join")
+    parser.add_argument("--keep", action="store_true", help="Leave the benchmark schemas in place")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.runs, args.sample, args.keep))
@@ -0,0 +1,92 @@
+# scripts/create_tenant.py
+"""
+Registers a buyer organization (tenant) and prints its API key. Requests sent with the key
+(`Authorization: Bearer <key>`) see only that tenant's suppliers, RFQs, quotes and emails; see
+app/services/tenancy.py. Only a hash of the key is stored, so it is shown this once.
+
+    python scripts/create_tenant.py acme-foods "Acme Foods"
+    python scripts/create_tenant.py big-buyer "Big Buyer Inc" --llm-share 0.75 --db-share 0.5
+    python scripts/create_tenant.py acme-foods "Acme Foods" --webhook-url https://erp.acme.example/events
+
+Without a name it updates an existing tenant instead, changing only what is given:
+
+    python scripts/create_tenant.py default --new-key   # Replaces its API key
+    python scripts/create_tenant.py acme-foods --webhook-url https://bi.acme.example/events --webhook-url https://erp.acme.example/events
+    python scripts/create_tenant.py acme-foods --no-webhooks
+
+Shares are fractions of each worker's LLM concurrency and DB connections that the tenant's
+requests may hold at once (default: TENANT_LLM_SHARE / TENANT_DB_SHARE). Webhook URLs receive
+the tenant's quote and RFQ change events (app/services/outbox.py). Running workers pick up
+changes within TENANT_CACHE_SECONDS.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.exc import IntegrityError  # noqa: E402
+
+from app.config import config  # noqa: E402
+from app.models import Tenant  # noqa: E402
+from app.services.database import sessionmanager  # noqa: E402
+from app.services.tenancy import TENANT_ID, hash_api_key, new_api_key  # noqa: E402
+
+
+def share(value: str) -> float:
+    fraction = float(value)
+    if not 0 < fraction <= 1:
+        raise argparse.ArgumentTypeError("a share is a fraction in (0, 1]")
+    return fraction
+
+
+async def main(args: argparse.Namespace) -> int:
+    if not TENANT_ID.match(args.id):
+        print("❌ Tenant ids are lowercase letters, digits, '-' and '_' (up to 64), starting with a letter or digit.")
+        return 1
+
+    api_key = new_api_key() if args.new_key or args.name else None
+    webhook_urls = [] if args.no_webhooks else args.webhook_url
+    sessionmanager.init(config.DB_CONFIG)
+    try:
+        async with sessionmanager.session() as db:
+            if args.name:
+                await Tenant.create(
+                    db, id=args.id, name=args.name, api_key_hash=hash_api_key(api_key),
+                    llm_share=args.llm_share, db_share=args.db_share, webhook_urls=webhook_urls,
+                )
+            else:
+                tenant = await db.get(Tenant, args.id)
+                if tenant is None:
+                    print(f"❌ Unknown tenant: {args.id} (give a name to create it)")
+                    return 1
+                if api_key:
+                    tenant.api_key_hash = hash_api_key(api_key)
+                for field, value in {"llm_share": args.llm_share, "db_share": args.db_share, "webhook_urls": webhook_urls}.items():
+                    if value is not None:  # Not given: unchanged
+                        setattr(tenant, field, value)
+                await db.commit()
+    except IntegrityError:
+        print(f"❌ Tenant {args.id} already exists.")
+        return 1
+    finally:
+        await sessionmanager.close()
+
+    print(f"🏢 {'Created' if args.name else 'Updated'} tenant {args.id}.")
+    if api_key:
+        print(f"🔑 API key (shown only now): {api_key}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("id", help="the tenant's id, e.g. acme-foods")
+    parser.add_argument("name", nargs="?", help="the organization's display name (required for a new tenant)")
+    parser.add_argument("--new-key", action="store_true", help="issue a new API key for an existing tenant (new tenants always get one)")
+    parser.add_argument("--llm-share", type=share, help="fraction of each worker's LLM concurrency (default: TENANT_LLM_SHARE)")
+    parser.add_argument("--db-share", type=share, help="fraction of each worker's DB connections (default: TENANT_DB_SHARE)")
+    webhooks = parser.add_mutually_exclusive_group()
+    webhooks.add_argument("--webhook-url", action="append", help="an endpoint for the tenant's change events; repeat for several (replaces the current ones)")
+    webhooks.add_argument("--no-webhooks", action="store_true", help="stop sending the tenant's change events anywhere")
+    sys.exit(asyncio.run(main(parser.parse_args())))
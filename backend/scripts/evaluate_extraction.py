@@ -0,0 +1,69 @@
+# scripts/evaluate_extraction.py
+"""
+Runs a labeled corpus of supplier emails through an extraction backend and scores it
+per field, with latency percentiles and token counts. See app/services/extraction_eval.py.
+
+    python scripts/evaluate_extraction.py --backend rules
+    python scripts/evaluate_extraction.py --backend llm --output runs/llm.json --compare runs/rules.json
+
+Backends: "llm" (normalized email to the LLM, as in production), "llm-raw" (the email as
+received) and "rules" (regular expressions, no LLM). The JSON report holds every case and
+mismatch; --compare prints what changed against an earlier report.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import config  # noqa: E402
+from app.services import llm_client  # noqa: E402
+from app.services.extraction_eval import BACKENDS, LLM_BACKENDS, compare_reports, evaluate, load_corpus  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "extraction" / "corpus.jsonl"
+
+
+def print_summary(report: dict) -> None:
+    print(f"\n📊 {report['backend']}: {report['emails']} emails, {report['errors']} errors, exact match {report['exact_match_rate']:.0%}")
+    print(f"{'field':<24}{'precision':>10}{'recall':>10}{'f1':>8}")
+    for name, score in {**report["fields"], "overall": report["overall"]}.items():
+        print(f"{name:<24}{score['precision']:>10.3f}{score['recall']:>10.3f}{score['f1']:>8.3f}")
+    latency = report["latency_ms"]
+    print(f"latency ms: p50 {latency['p50']}, p90 {latency['p90']}, p95 {latency['p95']}, p99 {latency['p99']}, max {latency['max']}")
+    tokens = report["tokens"]
+    print(f"tokens: {tokens['input']} in, {tokens['output']} out ({tokens['input_per_email']} in per email)")
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.backend in LLM_BACKENDS:
+        llm_client.init_llm_client()
+        if llm_client.gemini_model is None:
+            print("❌ The LLM client is not configured; the LLM backends can't run.")
+            return 1
+        llm_client.llm_limiter.configure(args.concurrency)
+
+    report = await evaluate(load_corpus(args.corpus), args.backend, args.concurrency)
+    report["corpus"] = str(args.corpus)
+    print_summary(report)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"💾 Report written to {args.output}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        print(f"\n🔍 Against {args.compare}:")
+        print(json.dumps(compare_reports(baseline, report), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="llm")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="JSON-lines file of labeled emails")
+    parser.add_argument("--concurrency", type=int, default=config.LLM_WORKER_CONCURRENCY, help="cases extracted at once")
+    parser.add_argument("--output", type=Path, help="write the full JSON report here")
+    parser.add_argument("--compare", type=Path, help="an earlier JSON report to diff against")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,209 @@
+# scripts/index_audit.py
+"""
+Index audit: EXPLAINs every relationship lookup declared in app/models.py and
+every query the read endpoints in app/views/ issue, and flags plans that read
+a whole table to answer a filtered lookup or a join.
+
+Plans are taken with enable_seqscan = off, so a sequential scan only survives
+when no index can serve the query; the result doesn't depend on table size.
+Run it against a seeded database (python seed.py):
+
+    python scripts/index_audit.py
+
+Exits non-zero when anything is flagged, so it can gate CI.
+"""
+import asyncio
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, select
+from sqlalchemy.orm import configure_mappers
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import init_app  # noqa: E402
+from app.config import config  # noqa: E402
+from app.models import RFQ, Quote, Supplier  # noqa: E402
+from app.services.database import Base, DatabaseSessionManager, sessionmanager  # noqa: E402
+from app.services.response_cache import response_cache  # noqa: E402
+
+JOIN_NODES = {"Nested Loop", "Hash Join", "Merge Join"}
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+# Endpoints that stream forever or read whole tables by design
+SKIPPED_ENDPOINTS = {"/api/rfqs/{rfq_id}/quotes/events"}
+FULL_SCAN_ENDPOINTS = {"/api/emails/storage-report"}
+
+# Extra query strings to exercise each optional filter; "{item}" etc. are filled from sample data
+ENDPOINT_PARAMS = {
+    "/api/emails/search": [
+        {"q": "{item}"},
+        {"q": "{item}", "quote_id": "{quote_id}"},
+        {"q": "{item}", "rfq_id": "{rfq_id}"},
+        {"q": "{item}", "supplier_id": "{supplier_id}"},
+    ],
+    "/api/analytics/prices": [{}, {"item": "{item}"}, {"supplier_id": "{supplier_id}"}],
+    "/api/analytics/prices/trend": [{"item": "{item}"}],
+    "/api/suppliers/matches": [{"email": "{contact_email}", "company_name": "{company_name}"}],
+}
+
+
+LEADING_COLUMNS_SQL = """
+SELECT c.relname, a.attname
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = current_schema()
+"""
+
+
+@dataclass
+class CapturedQuery:
+    source: str
+    statement: str
+    parameters: tuple
+
+
+@dataclass
+class QueryRecorder:
+    """Collects the SELECTs an engine sends while `source` describes what is being exercised (None pauses it)."""
+    source: str | None = None
+    queries: list[CapturedQuery] = field(default_factory=list)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.source is not None and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.queries.append(CapturedQuery(self.source, statement, tuple(parameters or ())))
+
+
+@dataclass
+class Finding:
+    source: str
+    relation: str
+    detail: str
+    statement: str
+
+
+def find_full_scans(plan: dict, leading_columns: dict[str, str], under_join: bool = False):
+    """
+    Yields (relation, detail) for sequential scans that filter rows or feed a join, and for
+    index scans that can't use the index's leading column (Postgres then walks the whole index).
+    """
+    node = plan["Node Type"]
+    if node == "Seq Scan" and ("Filter" in plan or under_join):
+        yield plan["Relation Name"], f"sequential scan ({plan.get('Filter', 'feeding a join')})"
+    if node in INDEX_NODES:
+        leading = leading_columns.get(plan["Index Name"])
+        condition = plan.get("Index Cond", "")
+        if leading and (condition or "Filter" in plan) and not re.search(rf"\b{leading}\b", condition):
+            yield plan["Index Name"], f"used without its leading column {leading}"
+    for child in plan.get("Plans", []):
+        yield from find_full_scans(child, leading_columns, under_join or node in JOIN_NODES)
+
+
+async def _sample_values(manager: DatabaseSessionManager) -> dict[str, str]:
+    async with manager.session() as db:
+        row = (
+            await db.execute(
+                select(Quote.id, Quote.rfq_id, Quote.supplier_id, RFQ.item, Supplier.company_name, Supplier.contact_email)
+                .join(RFQ, RFQ.id == Quote.rfq_id)
+                .join(Supplier, Supplier.id == Quote.supplier_id)
+                .limit(1)
+            )
+        ).first()
+    if row is None:
+        raise RuntimeError("The audit needs at least one quote in the database; run seed.py first")
+    return {
+        "quote_id": row.id, "rfq_id": row.rfq_id, "supplier_id": row.supplier_id, "item": row.item,
+        "company_name": row.company_name, "contact_email": row.contact_email,
+    }
+
+
+async def _exercise_relationships(manager: DatabaseSessionManager, recorder: QueryRecorder) -> None:
+    """Issues the lookup each relationship's lazy load performs: rows on the remote side matching one local value."""
+    configure_mappers()
+    async with manager.session() as db:
+        for mapper in Base.registry.mappers:
+            for rel in mapper.relationships:
+                for local, remote in rel.local_remote_pairs:
+                    recorder.source = None  # Picking a sample value isn't part of the audit
+                    value = (await db.execute(select(local).where(local.is_not(None)).limit(1))).scalar()
+                    if value is None:
+                        continue
+                    recorder.source = f"{mapper.class_.__name__}.{rel.key} ({remote.table.name}.{remote.name})"
+                    await db.execute(select(remote.table).where(remote == value))
+
+
+async def _exercise_endpoints(app: FastAPI, samples: dict[str, str], recorder: QueryRecorder) -> list[str]:
+    """Calls every GET endpoint once per parameter variant. Returns descriptions of calls that failed."""
+    await response_cache.backend.clear()  # A cache hit would skip the queries being audited
+    failures = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://audit") as client:
+        for route in app.routes:
+            path = getattr(route, "path", "")
+            if "GET" not in getattr(route, "methods", ()) or not path.startswith("/api") or path in SKIPPED_ENDPOINTS:
+                continue
+            for params in ENDPOINT_PARAMS.get(path, [{}]):
+                url = path.format(**samples)
+                query = {key: value.format(**samples) for key, value in params.items()}
+                recorder.source = f"GET {path} {query or ''}".rstrip()
+                response = await client.get(url, params=query)
+                if response.status_code != 200:
+                    failures.append(f"{recorder.source} -> {response.status_code}")
+    return failures
+
+
+async def _explain(manager: DatabaseSessionManager, queries: list[CapturedQuery]) -> list[Finding]:
+    findings = []
+    async with manager.connect() as conn:
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        leading_columns = dict((await conn.exec_driver_sql(LEADING_COLUMNS_SQL)).all())
+        for query in queries:
+            if any(query.source.startswith(f"GET {path}") for path in FULL_SCAN_ENDPOINTS):
+                continue
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {query.statement}", query.parameters)
+            plan = result.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            for relation, detail in find_full_scans(plan[0]["Plan"], leading_columns):
+                findings.append(Finding(query.source, relation, detail, query.statement))
+    return findings
+
+
+async def run_audit(manager: DatabaseSessionManager, app: FastAPI) -> tuple[list[Finding], list[str]]:
+    """Runs the audit against whatever database `manager` points at. Returns (findings, failed endpoint calls)."""
+    recorder = QueryRecorder()
+    event.listen(manager._engine.sync_engine, "before_cursor_execute", recorder)
+    try:
+        samples = await _sample_values(manager)
+        await _exercise_relationships(manager, recorder)
+        failures = await _exercise_endpoints(app, samples, recorder)
+    finally:
+        event.remove(manager._engine.sync_engine, "before_cursor_execute", recorder)
+    return await _explain(manager, recorder.queries), failures
+
+
+async def main() -> int:
+    app = init_app(init_db=True)
+    try:
+        findings, failures = await run_audit(sessionmanager, app)
+    finally:
+        await sessionmanager.close()
+
+    for failure in failures:
+        print(f"⚠️  {failure}")
+    for finding in findings:
+        print(f"❌ {finding.source}: {finding.relation} {finding.detail}")
+        print(f"   {' '.join(finding.statement.split())}")
+    if not findings:
+        print("✅ Every audited query can use an index.")
+    return 1 if findings or failures else 0
+
+
+if __name__ == "__main__":
+    print(f"🔎 Auditing {config.DB_HOST}:{config.DB_PORT}/{config.DB_NAME}")
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,64 @@
+# scripts/ingest_mailbox.py
+"""
+Ingests supplier quote emails from a mailbox: an mbox file, a Maildir, or a
+directory of .eml files. See app/services/mailbox_ingest.py.
+
+    python scripts/ingest_mailbox.py ~/mail/quotes.mbox
+    python scripts/ingest_mailbox.py ~/Maildir/Quotes --rfq-id <id>
+    python scripts/ingest_mailbox.py ~/mail/acme.mbox --tenant acme-foods
+
+Progress is checkpointed per batch, so an interrupted run picks up where it left
+off; messages that failed (LLM or database errors) are retried on the next run.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import config  # noqa: E402
+from app.services import llm_client  # noqa: E402
+from app.services.database import sessionmanager  # noqa: E402
+from app.services.llm_ledger import llm_ledger  # noqa: E402
+from app.services.mailbox_ingest import Checkpoint, MailboxIngester  # noqa: E402
+from app.services.tenancy import tenant_registry, tenant_scope  # noqa: E402
+
+
+async def main(args: argparse.Namespace) -> int:
+    llm_client.init_llm_client()
+    if llm_client.gemini_model is None:
+        print("❌ The LLM client is not configured; nothing would be extracted.")
+        return 1
+    sessionmanager.init(config.DB_CONFIG)
+    if not await tenant_registry.exists(args.tenant):
+        print(f"❌ Unknown tenant: {args.tenant}")
+        await sessionmanager.close()
+        return 1
+    checkpoint = Checkpoint(args.checkpoint or args.source.with_name(f"{args.source.name}.ingest-checkpoint.jsonl"))
+    ingester = MailboxIngester(checkpoint, rfq_id=args.rfq_id, batch_size=args.batch_size, workers=args.workers)
+    llm_ledger.start()
+    try:
+        with tenant_scope(args.tenant):  # Suppliers, quotes and emails are saved as this tenant's
+            report = await ingester.run(args.source)
+    finally:
+        await llm_ledger.stop()
+        await sessionmanager.close()
+
+    print(
+        f"✅ {report.seen} messages: {report.saved} saved, {report.unrouted} without a matching RFQ, "
+        f"{report.rejected} rejected, {report.invalid} unparseable, {report.failed} failed, "
+        f"{report.already_done} already done. Checkpoint: {checkpoint.path}"
+    )
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", type=Path, help="mbox file, Maildir, .eml file or directory of .eml files")
+    parser.add_argument("--tenant", default=config.DEFAULT_TENANT_ID, help="the buyer organization the mailbox belongs to")
+    parser.add_argument("--rfq-id", help="attach every quote to this RFQ instead of routing by thread and product")
+    parser.add_argument("--checkpoint", type=Path, help="checkpoint file (default: <source>.ingest-checkpoint.jsonl)")
+    parser.add_argument("--batch-size", type=int, default=config.MAIL_INGEST_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=config.MAIL_INGEST_WORKERS, help="MIME parsing processes (0 = one per CPU)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
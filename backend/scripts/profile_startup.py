@@ -0,0 +1,93 @@
+# scripts/profile_startup.py
+"""
+Startup profile for init_app(): where the import time goes, and whether startup
+fits the budget. Every measurement runs in a fresh interpreter.
+
+    python scripts/profile_startup.py [--top 25] [--runs 3]
+
+Exits non-zero when init_app() is over STARTUP_BUDGET_SECONDS or pulls in a
+module that must load lazily; tests/unit/test_startup_budget.py checks the same in CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "2.0"))
+
+# Loaded by the lifespan or on first use, never by init_app()
+LAZY_MODULES = ("google.generativeai", "google.genai", "redis")
+
+INIT_APP_SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+from app import init_app
+init_app()
+print(json.dumps({"seconds": time.perf_counter() - started, "modules": sorted(sys.modules)}))
+"""
+
+
+class StartupRun(NamedTuple):
+    seconds: float
+    modules: list[str]
+
+    @property
+    def lazy_modules_loaded(self) -> list[str]:
+        return [name for name in LAZY_MODULES if name in self.modules]
+
+
+class ImportTiming(NamedTuple):
+    cumulative_us: int
+    self_us: int
+    module: str  # Indented by nesting depth, as -X importtime prints it
+
+
+def measure_init_app() -> StartupRun:
+    completed = subprocess.run([sys.executable, "-c", INIT_APP_SNIPPET], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return StartupRun(result["seconds"], result["modules"])
+
+
+def import_profile() -> list[ImportTiming]:
+    """Per-module import times for `from app import init_app; init_app()`, slowest (cumulative) first."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from app import init_app; init_app()"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|", 2)
+        timings.append(ImportTiming(int(cumulative_us), int(self_us), module.rstrip()))
+    return sorted(timings, reverse=True)
+
+
+def main(top: int, runs: int) -> int:
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for timing in import_profile()[:top]:
+        print(f"{timing.cumulative_us / 1000:>14.1f} {timing.self_us / 1000:>9.1f}  {timing.module}")
+
+    results = [measure_init_app() for _ in range(runs)]
+    median = statistics.median(run.seconds for run in results)
+    lazy_loaded = results[0].lazy_modules_loaded
+    print(f"\n⏱️  init_app(): median {median * 1000:.0f} ms over {runs} run(s), budget {STARTUP_BUDGET_SECONDS * 1000:.0f} ms")
+    if lazy_loaded:
+        print(f"❌ Imported at startup but should load lazily: {', '.join(lazy_loaded)}")
+    if median > STARTUP_BUDGET_SECONDS:
+        print("❌ Over the startup budget")
+    return 1 if lazy_loaded or median > STARTUP_BUDGET_SECONDS else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=25, help="How many of the slowest imports to list")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter init_app() timings to take the median of")
+    args = parser.parse_args()
+    sys.exit(main(args.top, args.runs))
@@ -0,0 +1,67 @@
+# scripts/publish_conversion_rates.py
+"""
+Publishes a new version of the price conversion table from a JSON file of FX rates (USD per
+one unit of each currency), and optionally re-converts stored quotes with it. See
+app/services/price_conversion.py.
+
+    {"source": "ECB reference rates 2026-10-19", "usd_per_unit": {"EUR": 1.0842, "CAD": 0.7315}}
+
+    python scripts/publish_conversion_rates.py rates.json --renormalize
+    python scripts/publish_conversion_rates.py --renormalize-only --tenant acme-foods --rfq-id <id>
+
+Conversion tables are shared by every tenant. Re-conversion is one set-based UPDATE plus a rollup
+rebuild per tenant, all committed together with the new version.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select  # noqa: E402
+
+from app.config import config  # noqa: E402
+from app.models import Tenant  # noqa: E402
+from app.services.database import sessionmanager  # noqa: E402
+from app.services.price_conversion import publish_table, renormalize_quotes  # noqa: E402
+from app.services.tenancy import tenant_scope  # noqa: E402
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.rates is None and not args.renormalize_only:
+        print("❌ Give a rates file, or --renormalize-only to re-convert with the newest published version.")
+        return 1
+
+    sessionmanager.init(config.DB_CONFIG)
+    try:
+        async with sessionmanager.session() as db:
+            version = None
+            if args.rates is not None:
+                rates = json.loads(args.rates.read_text(encoding="utf-8"))
+                version = await publish_table(db, rates["usd_per_unit"], rates.get("source") or args.rates.name)
+                print(f"📈 Published conversion table version {version} ({len(rates['usd_per_unit'])} currencies).")
+            if args.renormalize or args.renormalize_only:
+                tenants = [args.tenant] if args.tenant else (await db.execute(select(Tenant.id).order_by(Tenant.id))).scalars().all()
+                for tenant_id in tenants:
+                    with tenant_scope(tenant_id):
+                        converted = await renormalize_quotes(db, version, rfq_id=args.rfq_id)
+                    print(f"🔁 Re-converted {converted} quote(s){f' of RFQ {args.rfq_id}' if args.rfq_id else ''} for tenant {tenant_id}.")
+            await db.commit()
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        await sessionmanager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("rates", type=Path, nargs="?", help='JSON file: {"source": "...", "usd_per_unit": {"EUR": 1.08, ...}}')
+    parser.add_argument("--renormalize", action="store_true", help="re-convert stored quotes with the new version")
+    parser.add_argument("--renormalize-only", action="store_true", help="publish nothing; re-convert with the newest version")
+    parser.add_argument("--tenant", help="only re-convert this tenant's quotes (default: every tenant's)")
+    parser.add_argument("--rfq-id", help="only re-convert this RFQ's quotes (give its --tenant too)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -2,6 +2,7 @@
 import asyncio
 import datetime
 
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import config
@@ -9,14 +10,19 @@ from app.config import config
 # It's crucial to import your specific models and the session manager
 from app.models import (
     RFQ,
+    ArchivedEmail,
     Certification,
     Email,
+    EmailBody,
     Quote,
+    QuotePriceRollup,
+    ResourceVersion,
     Supplier,
     quote_certification_association,
     rfq_certification_association,
 )
 from app.services.database import sessionmanager
+from app.services.price_analytics import rebuild_price_rollups
 
 # You will need to configure the session manager with your database URL
 sessionmanager.init(config.DB_CONFIG)
@@ -28,12 +34,18 @@ async def clear_data(db: AsyncSession):
     await db.execute(quote_certification_association.delete())
     await db.execute(rfq_certification_association.delete())
     # Delete from tables with foreign keys
+    await db.execute(QuotePriceRollup.__table__.delete())
+    await db.execute(ArchivedEmail.__table__.delete())
     await db.execute(Email.__table__.delete())
+    await db.execute(EmailBody.__table__.delete())
     await db.execute(Quote.__table__.delete())
     # Delete from remaining tables
     await db.execute(RFQ.__table__.delete())
     await db.execute(Supplier.__table__.delete())
     await db.execute(Certification.__table__.delete())
+    # Bump every change counter so clients holding old ETags revalidate against the new data
+    await db.execute(update(ResourceVersion).values(version=ResourceVersion.version + 1))
+    await ResourceVersion.bump(db, ResourceVersion.SUPPLIERS, ResourceVersion.RFQS, ResourceVersion.QUOTES)
     await db.commit()
     print("✅ Cleared all existing data.")
 
@@ -167,44 +179,39 @@ async def seed_data():
         print("🌱 Staged 3 incomplete quotes.")
 
         # 6. Create Email logs for each Quote 📧
-        email1 = Email(
-            raw_text="Hello, here is our quote for Soy Protein...",
-            extracted_data={"price_per_pound": 2.55, "country_of_origin": "USA"},
-            quote=quote1,
-        )
-        email2 = Email(
-            raw_text="Hi there - responding to RFQ for soy isolate...",
-            extracted_data={"price_per_pound": 2.48, "country_of_origin": "Canada"},
-            quote=quote2,
-        )
-        email3 = Email(
-            raw_text="For the Organic Pea Protein, our price is $4.10/lb...",
-            extracted_data={"price_per_pound": 4.10, "country_of_origin": "USA"},
-            quote=quote3,
-        )
-        email4 = Email(
-            raw_text="Re: Whey Protein. Sourced from USA, MOQ 1000lbs. We have Non-GMO and Allergen Free certs.",
-            extracted_data={
-                "country_of_origin": "USA",
-                "min_order_quantity": 1000,
-                "certifications": ["Non-GMO", "Allergen Free"],
-            },
-            quote=quote4_missing_price,
-        )
-        email5 = Email(
-            raw_text="Hello - for the Whey, our price is $5.50 per pound from Ireland. We are Non-GMO certified.",
-            extracted_data={"price_per_pound": 5.50, "country_of_origin": "Ireland", "certifications": ["Non-GMO"]},
-            quote=quote5_missing_moq_and_cert,
-        )
-        email6 = Email(
-            raw_text="Hi, we can supply the Whey Protein Concentrate you requested. Let me know if you need more info.",
-            extracted_data={},  # Extracted nothing of value
-            quote=quote6_missing_everything,
-        )
-        db.add_all([email1, email2, email3, email4, email5, email6])
+        email_logs = [
+            (quote1, "Hello, here is our quote for Soy Protein...", {"price_per_pound": 2.55, "country_of_origin": "USA"}),
+            (quote2, "Hi there - responding to RFQ for soy isolate...", {"price_per_pound": 2.48, "country_of_origin": "Canada"}),
+            (quote3, "For the Organic Pea Protein, our price is $4.10/lb...", {"price_per_pound": 4.10, "country_of_origin": "USA"}),
+            (
+                quote4_missing_price,
+                "Re: Whey Protein. Sourced from USA, MOQ 1000lbs. We have Non-GMO and Allergen Free certs.",
+                {
+                    "country_of_origin": "USA",
+                    "min_order_quantity": 1000,
+                    "certifications": ["Non-GMO", "Allergen Free"],
+                },
+            ),
+            (
+                quote5_missing_moq_and_cert,
+                "Hello - for the Whey, our price is $5.50 per pound from Ireland. We are Non-GMO certified.",
+                {"price_per_pound": 5.50, "country_of_origin": "Ireland", "certifications": ["Non-GMO"]},
+            ),
+            (
+                quote6_missing_everything,
+                "Hi, we can supply the Whey Protein Concentrate you requested. Let me know if you need more info.",
+                {},  # Extracted nothing of value
+            ),
+        ]
+        for quote, raw_text, extracted_data in email_logs:
+            await Email.create(db, raw_text, extracted_data=extracted_data, quote=quote)
         print("🌱 Staged 6 email logs (3 complete, 3 incomplete).")
 
-        # 7. Final Commit 🚀
+        # 7. Build price analytics rollups from the seeded quotes 📈
+        await db.flush()
+        await rebuild_price_rollups(db)
+
+        # 8. Final Commit 🚀
         await db.commit()
         print("\n🎉 Successfully committed all data to the database!")
 
@@ -0,0 +1,151 @@
+# serve.py
+"""
+Production launcher. Pre-forks worker processes that share one listening socket:
+
+    python serve.py --host 0.0.0.0 --port 8000 [--workers N]
+
+- The app and the LLM SDK are loaded once in this process before forking, so workers
+  start without re-importing anything (and share those pages copy-on-write).
+- Each worker runs uvicorn on uvloop + httptools, with its even share of the
+  DB_MAX_CONNECTIONS (its quote event listener included) and LLM_MAX_CONCURRENCY budgets.
+- SIGTERM/SIGINT drain: workers report not-ready on /health/ready, stop
+  accepting connections and let in-flight requests (LLM calls included) finish
+  for up to SHUTDOWN_GRACE_SECONDS. A worker that dies unexpectedly is replaced.
+
+For local development keep using `uvicorn run:server --reload`.
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+from fastapi import FastAPI
+
+from app import init_app
+from app.config import config
+from app.services.llm_client import load_sdk
+
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+
+class DrainingServer(uvicorn.Server):
+    """Flips readiness off the moment shutdown starts, before uvicorn waits out in-flight requests."""
+
+    def __init__(self, app: FastAPI, uvicorn_config: uvicorn.Config):
+        super().__init__(uvicorn_config)
+        self.app = app
+
+    def handle_exit(self, sig, frame):
+        self.app.state.ready = False
+        super().handle_exit(sig, frame)
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app: FastAPI, sock: socket.socket) -> None:
+    # Undo the supervisor's handlers; uvicorn installs its own graceful ones
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    server = DrainingServer(
+        app,
+        uvicorn.Config(
+            app,
+            loop="uvloop",
+            http="httptools",
+            lifespan="on",
+            timeout_graceful_shutdown=config.SHUTDOWN_GRACE_SECONDS,
+            access_log=False,
+        ),
+    )
+    server.run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, app: FastAPI, sock: socket.socket, workers: int):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.children: dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(self.app, self.sock)
+            finally:
+                os._exit(0)
+        self.children[pid] = time.monotonic()
+
+    def stop(self, signum, frame) -> None:
+        if not self.stopping:
+            print(f"🛑 Received {signal.Signals(signum).name}, draining {len(self.children)} worker(s)...")
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"🚀 Serving on {self.sock.getsockname()} with {self.workers} worker(s)")
+
+        while self.children:
+            pid, status = os.wait()
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            print(f"⚠️ Worker {pid} exited ({os.waitstatus_to_exitcode(status)}), starting a replacement")
+            if time.monotonic() - started < RESPAWN_BACKOFF_SECONDS:
+                time.sleep(RESPAWN_BACKOFF_SECONDS)  # Don't spin if workers die on startup
+            self.spawn()
+        print("👋 All workers stopped.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=config.WEB_CONCURRENCY or os.cpu_count() or 1)
+    parser.add_argument("--backlog", type=int, default=2048)
+    args = parser.parse_args()
+
+    # Pool sizes must be settled before init_app() creates the engine that every worker inherits
+    config.size_for_workers(args.workers)
+    print(
+        f"⚙️  {args.workers} worker(s): {config.DB_POOL_SIZE} pooled DB connections (+{config.DB_CONNECTIONS_OUTSIDE_POOL} listener) "
+        f"and {config.LLM_WORKER_CONCURRENCY} LLM calls each"
+    )
+    if args.workers > 1 and config.RESPONSE_CACHE_URL.startswith("memory://"):
+        # Still correct (entries are checked against the current ETag), but each worker fills its own copy
+        print(
+            f"⚠️ RESPONSE_CACHE_URL is memory://: each of the {args.workers} workers keeps a separate response cache, "
+            "multiplying its memory and lowering the hit rate. Point it at Redis for a shared cache."
+        )
+
+    app = init_app()
+    try:
+        load_sdk()  # Imported once here so workers share it instead of each importing it in their lifespan
+    except ImportError:
+        pass  # init_llm_client reports it per worker
+    sock = bind_socket(args.host, args.port, args.backlog)
+    Supervisor(app, sock, args.workers).run()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
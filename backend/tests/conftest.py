@@ -0,0 +1,18 @@
+"""Fixtures shared by the unit and integration tests."""
+import random
+from typing import Callable
+
+import pytest
+
+SYLLABLES = ["al", "mon", "co", "ca", "si", "er", "ra", "val", "ley", "har", "vest", "gol", "den", "pra", "ri",
+             "sum", "mit", "or", "chard", "nor", "dic", "pa", "ci", "fic", "ma", "ple", "ce", "dar", "del", "ta"]
+
+
+@pytest.fixture
+def fake_company_names() -> Callable[[int, int], list[str]]:
+    """Returns a factory of made-up two-word company names ("Valleyhar Goldenri"), the same for the same seed."""
+    def make(count: int, seed: int) -> list[str]:
+        rng = random.Random(seed)
+        return [" ".join("".join(rng.choice(SYLLABLES) for _ in range(3)).title() for _ in range(2)) for _ in range(count)]
+
+    return make
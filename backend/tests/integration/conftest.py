@@ -1,58 +1,116 @@
+"""
+Integration test database setup.
+
+  A. Every test session has its own throwaway Postgres server (postgresql_proc is session-scoped,
+     and each pytest-xdist worker under `pytest -n auto` is a session of its own). The schema is
+     built once per session into a template database on that server, and the tests run against
+     a clone of it. Workers therefore share no rows, locks or server, at the cost of one server
+     start and one schema build per worker rather than per run.
+  B. Before each test every table is truncated in one statement, instead of dropping and
+     recreating the schema. Tests still commit for real, across as many connections as they
+     like (concurrent requests, NOTIFY on commit and the LLM ledger's background writes all
+     behave as in production), which per-test SAVEPOINT rollback could not offer.
+  C. Tests that change the schema itself (partitions, functions) are marked `alters_schema`;
+     the test database is re-cloned from the template after them.
+"""
+import os
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 from pytest_postgresql import factories
 from pytest_postgresql.janitor import DatabaseJanitor
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
 
 from app import (
     init_app,
     models,  # noqa: F401
 )
-from app.services.database import get_db, sessionmanager
+from app.models import DEFAULT_TENANT_DDL
+from app.services.database import Base, get_db, sessionmanager
+from app.services.price_conversion import conversion_tables
+from app.services.response_cache import response_cache
+from app.services.tenancy import hash_api_key, tenant_registry
 
 test_db = factories.postgresql_proc(port=None, dbname="test_db")
 
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")  # gw0, gw1, ... under pytest-xdist
+DEFAULT_API_KEY = "default-tenant-test-key"  # The `client` fixture's requests run as the default tenant
+TRUNCATE_SQL = text(f"TRUNCATE {', '.join(table.name for table in Base.metadata.sorted_tables)} RESTART IDENTITY CASCADE")
+
+
+def _janitor(test_db, dbname: str, template_dbname: str | None = None) -> DatabaseJanitor:
+    return DatabaseJanitor(
+        user=test_db.user, host=test_db.host, port=test_db.port, dbname=dbname,
+        template_dbname=template_dbname, version=test_db.version, password=test_db.password,
+    )
+
+
+def _connection_str(test_db, dbname: str) -> str:
+    return f"postgresql+asyncpg://{test_db.user}:{test_db.password}@{test_db.host}:{test_db.port}/{dbname}"
+
+
+@pytest.fixture(scope="session")
+async def worker_database(test_db):
+    """
+    Builds the template database on this session's server and clones the test database from it.
+    Yields the test database's janitor, which re-clones it on demand.
+    """
+    template = _janitor(test_db, f"{test_db.dbname}_template")
+    with template:
+        engine = create_async_engine(_connection_str(test_db, template.dbname))
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+        with _janitor(test_db, f"{test_db.dbname}_{WORKER}", template_dbname=template.dbname) as database:
+            yield database
+
 
 @pytest.fixture(scope="session", autouse=True)
-async def connection_test(test_db):
+async def connection_test(test_db, worker_database):
     """
     Creates the database connection and session manager once per test session.
     This async fixture will now correctly use the session-scoped event loop.
     """
-    pg_host = test_db.host
-    pg_port = test_db.port
-    pg_user = test_db.user
-    pg_db = test_db.dbname
-    pg_password = test_db.password
-
-    with DatabaseJanitor(
-        user=pg_user, host=pg_host, port=pg_port, dbname=pg_db,
-        version=test_db.version, password=pg_password,
-    ):
-        connection_str = f"postgresql+asyncpg://{pg_user}:{pg_password}@{pg_host}:{pg_port}/{pg_db}"
-        sessionmanager.init(connection_str)
-        yield
-        await sessionmanager.close()
+    sessionmanager.init(_connection_str(test_db, worker_database.dbname))
+    yield
+    await sessionmanager.close()
 
 
 @pytest.fixture(scope="function", autouse=True)
-async def create_tables(connection_test):
+async def clean_database(request, test_db, worker_database, connection_test):
     """
-    Creates and drops tables for each test function, ensuring a clean state.
+    Empties every table before each test, and re-clones the database after one that altered the schema.
     """
     async with sessionmanager.connect() as connection:
-        await sessionmanager.drop_all(connection)
-        await sessionmanager.create_all(connection)
+        await connection.execute(TRUNCATE_SQL)
+        await connection.execute(text(DEFAULT_TENANT_DDL))  # The tenants table is truncated too
+        await connection.execute(text("UPDATE tenants SET api_key_hash = :hash"), {"hash": hash_api_key(DEFAULT_API_KEY)})
+    # In-process caches would outlive the truncated rows
+    await response_cache.backend.clear()
+    conversion_tables.clear()
+    tenant_registry.clear()
+
+    yield
+
+    if request.node.get_closest_marker("alters_schema"):
+        await sessionmanager.close()  # Nothing may stay connected to a database being dropped
+        worker_database.drop()
+        worker_database.init()
+        sessionmanager.init(_connection_str(test_db, worker_database.dbname))
 
 
 @pytest.fixture(scope="function")
-def app(create_tables):
+def app(clean_database):
     _app = init_app(init_db=False)
     yield _app
 
 
 @pytest.fixture(scope="function")
 async def client(app):
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+    headers = {"Authorization": f"Bearer {DEFAULT_API_KEY}"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers=headers) as client:
         yield client
 
 
@@ -62,4 +120,4 @@ def session_override(app):
         async with sessionmanager.session() as session:
             yield session
 
-    app.dependency_overrides[get_db] = get_db_override
\ No newline at end of file
+    app.dependency_overrides[get_db] = get_db_override
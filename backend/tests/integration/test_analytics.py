@@ -0,0 +1,48 @@
+import pytest
+from httpx import AsyncClient
+
+from app.services.database import sessionmanager
+from app.services.llm_client import ExtractedDataSchema
+from app.services.quote_processor import process_quote_from_email_data
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+def _extracted(email: str, price: float, country: str) -> ExtractedDataSchema:
+    return ExtractedDataSchema(
+        product="Pea Protein",
+        price_per_pound=price,
+        country_of_origin=country,
+        minimum_order_quantity=1000,
+        company_name=None,
+        contact_name=None,
+        supplier_email=email,
+        supplier_phone=None,
+    )
+
+
+async def _submit(rfq_id: str, extracted: ExtractedDataSchema):
+    async with sessionmanager.session() as session:
+        await process_quote_from_email_data(session, rfq_id, "Pea Protein", extracted, raw_text="quote")
+        await session.commit()
+
+
+async def test_price_rollups_follow_quote_inserts_and_updates(client: AsyncClient):
+    """
+    Checks that the analytics endpoint reflects new quotes and moves an updated quote between groups.
+    """
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Pea Protein"})).json()["id"]
+
+    await _submit(rfq_id, _extracted("a@peas.com", 2.00, "Canada"))
+    await _submit(rfq_id, _extracted("b@peas.com", 3.00, "Canada"))
+    await _submit(rfq_id, _extracted("b@peas.com", 4.00, "France"))  # Same supplier + RFQ: updates the quote
+
+    response = await client.get("/api/analytics/prices", params=[("group_by", "item"), ("group_by", "country_of_origin")])
+    assert response.status_code == 200
+    by_country = {row["country_of_origin"]: row for row in response.json()}
+
+    assert by_country["Canada"]["quote_count"] == 1
+    assert by_country["Canada"]["maximum"] == 2.0
+    assert by_country["France"]["quote_count"] == 1
+    assert by_country["France"]["average"] == 4.0
@@ -1,6 +1,11 @@
+import uuid
+
 import pytest
 from httpx import AsyncClient
 
+from app.models import RFQ
+from app.services.database import sessionmanager
+
 # Mark the test file as requiring the asyncio test runner
 pytestmark = pytest.mark.asyncio
 
@@ -12,4 +17,92 @@ async def test_get_suppliers_on_clean_db(client: AsyncClient):
     response = await client.get("/api/suppliers")
 
     assert response.status_code == 200
-    assert response.json() == []
\ No newline at end of file
+    assert response.json() == []
+
+async def test_get_suppliers_conditional_get(client: AsyncClient):
+    """
+    Checks that list endpoints emit an ETag, answer a matching If-None-Match with 304,
+    and hand out a new ETag once a write changes the data.
+    """
+    first = await client.get("/api/suppliers")
+    etag = first.headers["etag"]
+
+    unchanged = await client.get("/api/suppliers", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+
+    await client.post("/api/suppliers", json={"company_name": "Etag Foods", "contact_email": "sales@etagfoods.com"})
+
+    changed = await client.get("/api/suppliers", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 1
+
+
+async def test_get_quotes_for_rfq_etag_is_per_rfq(client: AsyncClient):
+    """
+    Checks that creating one RFQ does not invalidate the comparison ETag of another.
+    """
+    rfq_res = await client.post("/api/rfqs", json={"item": "Pea Protein"})
+    rfq_id = rfq_res.json()["id"]
+
+    first = await client.get(f"/api/rfqs/{rfq_id}/quotes")
+    etag = first.headers["etag"]
+
+    await client.post("/api/rfqs", json={"item": "Oat Flour"})
+
+    response = await client.get(f"/api/rfqs/{rfq_id}/quotes", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+async def test_get_quotes_for_missing_rfq_is_404_despite_if_none_match(client: AsyncClient):
+    """
+    Checks that a matching If-None-Match doesn't turn a missing RFQ into a 304.
+    """
+    response = await client.get("/api/rfqs/00000000000000000000000000000000/quotes", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 404
+
+
+async def test_non_canonical_rfq_ids_are_404(client: AsyncClient):
+    """
+    Checks that a dashed or uppercase spelling of an existing RFQ's id is a 404, not an alias
+    whose ETag, cached comparison and event stream are keyed apart from the RFQ's own.
+    """
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Pea Protein"})).json()["id"]
+    dashed = str(uuid.UUID(rfq_id))
+
+    for alias in (dashed, rfq_id.upper()):
+        assert (await client.get(f"/api/rfqs/{alias}/quotes")).status_code == 404
+        assert (await client.get(f"/api/rfqs/{alias}/quotes/events")).status_code == 404
+    assert (await client.get(f"/api/rfqs/{rfq_id}/quotes")).status_code == 200
+
+
+async def test_get_rfqs_cache_never_serves_another_workers_stale_entry(client: AsyncClient):
+    """
+    Checks that a cached RFQ list isn't served once the RFQs changed without this process
+    invalidating it, as when another worker or replica commits the write.
+    """
+    await client.post("/api/rfqs", json={"item": "Almond Flour"})
+    assert len((await client.get("/api/rfqs")).json()) == 1
+
+    async with sessionmanager.session() as db:
+        await RFQ.create(db, item="Cocoa Butter")  # Bumps the version but leaves this process's cache alone
+
+    response = await client.get("/api/rfqs")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+async def test_get_rfqs_cache_invalidated_by_create(client: AsyncClient):
+    """
+    Checks that a cached RFQ list is dropped when a new RFQ is committed.
+    """
+    await client.post("/api/rfqs", json={"item": "Almond Flour"})
+    assert len((await client.get("/api/rfqs")).json()) == 1
+
+    await client.post("/api/rfqs", json={"item": "Cocoa Butter"})
+
+    response = await client.get("/api/rfqs")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
@@ -0,0 +1,34 @@
+import base64
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+PRICE_SHEET = Path(__file__).resolve().parent.parent / "fixtures" / "attachments" / "price_sheet.csv"
+
+
+async def test_price_sheet_attachment_is_saved_without_an_llm_call(client: AsyncClient, monkeypatch):
+    async def no_llm(email_text: str):
+        raise AssertionError("the LLM should not be called for a recognized price sheet")
+
+    monkeypatch.setattr("app.views.rfqs.extract_quote_data_from_email", no_llm)
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Almonds"})).json()["id"]
+
+    response = await client.post(f"/api/rfqs/{rfq_id}/extract-quote-from-email", json={
+        "raw_text": "Hi, our June prices are attached.\nAna Costa\nana@costanuts.com",
+        "attachments": [{
+            "filename": "prices.csv",
+            "content_type": "text/csv",
+            "data": base64.b64encode(PRICE_SHEET.read_bytes()).decode(),
+        }],
+    })
+
+    assert response.status_code == 200
+    quote = response.json()
+    assert quote["price_per_pound"] == pytest.approx(4.2003, abs=1e-4)
+    assert quote["country_of_origin"] == "USA"
+    assert quote["min_order_quantity"] == 2205
+    assert {c["name"] for c in quote["certifications"]} == {"Organic", "Kosher"}
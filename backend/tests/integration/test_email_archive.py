@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, text
+
+from app.models import ArchivedEmail, Email, EmailBody, Quote
+from app.services.database import sessionmanager
+from app.services.email_archive import add_months, archive_emails
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+NOW = datetime.datetime.now(datetime.UTC)
+
+
+async def _create_quote(client: AsyncClient, name: str, due_date: datetime.datetime, emails: list[tuple[str, datetime.datetime]]) -> str:
+    supplier_id = (await client.post("/api/suppliers", json={"company_name": name, "contact_email": f"sales@{name}.com"})).json()["id"]
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Oat Flour", "due_date": due_date.isoformat()})).json()["id"]
+    async with sessionmanager.session() as session:
+        quote = Quote(supplier_id=supplier_id, rfq_id=rfq_id)
+        session.add(quote)
+        for body, received_at in emails:
+            await Email.create(session, body, received_at=received_at, quote=quote)
+        await session.commit()
+        return quote.id
+
+
+async def test_closed_rfq_emails_move_to_archive_and_stay_in_the_audit_trail(client: AsyncClient):
+    """
+    Checks that a closed RFQ's emails leave the hot table (with their now-orphaned bodies)
+    while the quote's audit trail still returns them.
+    """
+    closed_quote = await _create_quote(client, "closed", NOW - datetime.timedelta(days=90), [("Oat flour at $0.80/lb", NOW)])
+    open_quote = await _create_quote(client, "open", NOW + datetime.timedelta(days=10), [("Oat flour at $0.75/lb", NOW)])
+
+    async with sessionmanager.session() as session:
+        report = await archive_emails(session, NOW)
+
+    assert report.archived_emails == 1
+    assert report.deleted_bodies == 1
+
+    trail = (await client.get(f"/api/quotes/{closed_quote}/emails")).json()
+    assert [(email["raw_text"], email["storage"]) for email in trail] == [("Oat flour at $0.80/lb", "archived")]
+    trail = (await client.get(f"/api/quotes/{open_quote}/emails")).json()
+    assert [email["storage"] for email in trail] == ["hot"]
+
+    async with sessionmanager.session() as session:
+        assert await session.scalar(select(func.count()).select_from(EmailBody)) == 1
+
+
+@pytest.mark.alters_schema
+async def test_partitions_past_the_hot_window_are_archived_and_dropped(client: AsyncClient):
+    """
+    Checks that a monthly partition older than EMAIL_HOT_MONTHS is copied to the archive,
+    detached and dropped, and that partitions ahead of time are created.
+    """
+    old_month = add_months(NOW.date().replace(day=1), -14)
+    async with sessionmanager.session() as session:
+        await session.execute(text("SELECT ensure_email_partitions(:month, :month)"), {"month": old_month})
+        await session.commit()
+    old_received = datetime.datetime.combine(old_month, datetime.time(12), tzinfo=datetime.UTC)
+    quote_id = await _create_quote(
+        client, "longterm", NOW + datetime.timedelta(days=365), [("First offer", old_received), ("Latest offer", NOW)]
+    )
+
+    async with sessionmanager.session() as session:
+        report = await archive_emails(session, NOW)
+        partitions = (
+            await session.execute(text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = 'emails'::regclass"))
+        ).scalars().all()
+        archived = (await session.execute(select(ArchivedEmail.quote_id))).scalars().all()
+
+    old_partition = f"emails_{old_month:%Y_%m}"
+    assert report.dropped_partitions == [old_partition]
+    assert old_partition not in partitions
+    assert f"emails_{add_months(NOW.date().replace(day=1), 3):%Y_%m}" in partitions
+    assert archived == [quote_id]
+
+    trail = (await client.get(f"/api/quotes/{quote_id}/emails")).json()
+    assert [(email["raw_text"], email["storage"]) for email in trail] == [("First offer", "archived"), ("Latest offer", "hot")]
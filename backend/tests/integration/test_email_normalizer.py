@@ -0,0 +1,45 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models import Email
+from app.services.database import sessionmanager
+from app.services.llm_client import ExtractedDataSchema
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+THREAD = """We can offer almonds at $4.10/lb, MOQ 500 lbs.
+
+Best regards,
+Ana Costa
+Costa Nuts Inc. | ana@costanuts.com
+
+On Mon, Jun 2, 2025 at 9:00 AM Buyer <buyer@waystation.example> wrote:
+> Please quote 5,000 lbs of almonds.
+> Our target is $3.90/lb.
+"""
+
+
+async def test_the_llm_reads_the_normalized_email_and_the_original_is_kept(client: AsyncClient, monkeypatch):
+    seen = []
+
+    async def fake_extract(email_text: str) -> ExtractedDataSchema:
+        seen.append(email_text)
+        return ExtractedDataSchema(
+            product="Almonds", price_per_pound=4.1, country_of_origin=None, certifications=[],
+            minimum_order_quantity=500, company_name="Costa Nuts Inc.", contact_name="Ana Costa",
+            supplier_email="ana@costanuts.com", supplier_phone=None,
+        )
+
+    monkeypatch.setattr("app.views.rfqs.extract_quote_data_from_email", fake_extract)
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Almonds"})).json()["id"]
+
+    response = await client.post(f"/api/rfqs/{rfq_id}/extract-quote-from-email", json={"raw_text": THREAD})
+
+    assert response.status_code == 200
+    assert "$3.90" not in seen[0] and "Signature:\nBest regards,\nAna Costa" in seen[0]
+    async with sessionmanager.session() as session:
+        email = (await session.execute(select(Email).where(Email.quote_id == response.json()["id"]))).scalar_one()
+    assert email.raw_text == THREAD
+    assert email.input_tokens > 0 and email.input_tokens_saved > 0
@@ -0,0 +1,81 @@
+import pytest
+from httpx import AsyncClient
+
+from app.models import Email, Quote
+from app.services.database import sessionmanager
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+async def _create_quote_with_emails(client: AsyncClient, email_suffix: str, bodies: list[str]) -> dict:
+    supplier_res = await client.post("/api/suppliers", json={
+        "company_name": f"Supplier {email_suffix}",
+        "contact_email": f"sales@{email_suffix}.com",
+    })
+    rfq_res = await client.post("/api/rfqs", json={"item": "Whey Protein Concentrate"})
+    supplier_id = supplier_res.json()["id"]
+    rfq_id = rfq_res.json()["id"]
+
+    async with sessionmanager.session() as session:
+        quote = Quote(supplier_id=supplier_id, rfq_id=rfq_id)
+        session.add(quote)
+        for body in bodies:
+            await Email.create(session, body, quote=quote)
+        await session.commit()
+        return {"quote_id": quote.id, "rfq_id": rfq_id, "supplier_id": supplier_id}
+
+
+async def test_search_emails_ranks_filters_and_highlights(client: AsyncClient):
+    """
+    Checks that search matches stemmed terms, highlights them, and honours the RFQ filter.
+    """
+    irish = await _create_quote_with_emails(client, "dairy-ie", ["Our Halal whey is sourced from Ireland at $5.50/lb."])
+    await _create_quote_with_emails(client, "dairy-us", ["Halal whey from the United States, $5.10/lb."])
+
+    response = await client.get("/api/emails/search", params={"q": "halal whey ireland"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 1
+    assert results[0]["quote_id"] == irish["quote_id"]
+    assert "<mark>Ireland</mark>" in results[0]["highlight"]
+
+    response = await client.get("/api/emails/search", params={"q": "halal whey", "rfq_id": irish["rfq_id"]})
+    assert [hit["rfq_id"] for hit in response.json()["results"]] == [irish["rfq_id"]]
+
+
+async def test_search_emails_keyset_pagination(client: AsyncClient):
+    """
+    Checks that following next_cursor walks every match exactly once.
+    """
+    await _create_quote_with_emails(client, "paging", [f"Almond quote revision {i}" for i in range(5)])
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "almond", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        body = (await client.get("/api/emails/search", params=params)).json()
+        seen.extend(hit["id"] for hit in body["results"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+async def test_identical_email_bodies_are_stored_once(client: AsyncClient):
+    """
+    Checks that repeated bodies share one stored row while every email keeps its own audit record.
+    """
+    body = "Re: Whey Protein. Sourced from USA, MOQ 1000lbs."
+    await _create_quote_with_emails(client, "dup-one", [body])
+    await _create_quote_with_emails(client, "dup-two", [body, body])  # Also twice within one transaction
+
+    report = (await client.get("/api/emails/storage-report")).json()
+
+    assert report["email_count"] == 3
+    assert report["unique_body_count"] == 1
+    assert report["logical_bytes"] == 3 * len(body)
+    assert report["deduplicated_bytes"] == len(body)
@@ -0,0 +1,19 @@
+import pytest
+from httpx import AsyncClient
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+async def test_readiness_follows_app_state(client: AsyncClient, app):
+    """
+    Checks that /health/ready fails until the lifespan marks the worker ready, and again once it drains.
+    """
+    assert (await client.get("/health/live")).status_code == 200
+    assert (await client.get("/health/ready")).status_code == 503
+
+    app.state.ready = True
+    assert (await client.get("/health/ready")).json() == {"status": "ready"}
+
+    app.state.ready = False
+    assert (await client.get("/health/ready")).status_code == 503
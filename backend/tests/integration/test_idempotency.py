@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.models import IdempotencyKey, Quote
+from app.services import idempotency
+from app.services.database import sessionmanager
+from app.services.llm_client import ExtractedDataSchema
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+EMAIL = "Hi, our almonds are $4.20/lb from Spain, MOQ 500 lbs. Organic certified.\n-- Ana, Costa Nuts, ana@costanuts.com"
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Replaces the LLM with a slow fake and records how often it was called."""
+    calls = []
+
+    async def fake_extract(raw_text: str) -> ExtractedDataSchema:
+        calls.append(raw_text)
+        await asyncio.sleep(0.05)
+        return ExtractedDataSchema(
+            product="Almonds", price_per_pound=4.2, country_of_origin="Spain", certifications=["Organic"],
+            minimum_order_quantity=500, company_name="Costa Nuts", contact_name="Ana",
+            supplier_email="ana@costanuts.com", supplier_phone=None,
+        )
+
+    monkeypatch.setattr("app.views.rfqs.extract_quote_data_from_email", fake_extract)
+    return calls
+
+
+async def _quote_count() -> int:
+    async with sessionmanager.session() as session:
+        return (await session.execute(select(func.count()).select_from(Quote))).scalar()
+
+
+async def test_concurrent_and_repeated_requests_extract_once(client: AsyncClient, llm_calls: list):
+    """
+    Checks that concurrent requests with the same Idempotency-Key share one LLM call,
+    and that a later retry replays the stored response.
+    """
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Almonds"})).json()["id"]
+    url = f"/api/rfqs/{rfq_id}/extract-quote-from-email"
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first, second = await asyncio.gather(
+        client.post(url, json={"raw_text": EMAIL}, headers=headers),
+        client.post(url, json={"raw_text": EMAIL}, headers=headers),
+    )
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert len(llm_calls) == 1
+
+    retry = await client.post(url, json={"raw_text": EMAIL}, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert len(llm_calls) == 1
+    assert await _quote_count() == 1
+
+
+async def test_key_reused_for_a_different_request_is_rejected(client: AsyncClient, llm_calls: list):
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Almonds"})).json()["id"]
+    url = f"/api/rfqs/{rfq_id}/extract-quote-from-email"
+    headers = {"Idempotency-Key": "retry-2"}
+
+    assert (await client.post(url, json={"raw_text": EMAIL}, headers=headers)).status_code == 200
+    response = await client.post(url, json={"raw_text": EMAIL + " Updated price."}, headers=headers)
+
+    assert response.status_code == 422
+    assert len(llm_calls) == 1
+
+
+async def test_failed_request_releases_its_key(client: AsyncClient, monkeypatch):
+    """
+    Checks that a request that fails leaves no claim behind, so the client can retry with the same key.
+    """
+    async def failing_extract(raw_text: str):
+        raise ValueError("Could not identify a supplier email in the text.")
+
+    monkeypatch.setattr("app.views.rfqs.extract_quote_data_from_email", failing_extract)
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Almonds"})).json()["id"]
+
+    response = await client.post(
+        f"/api/rfqs/{rfq_id}/extract-quote-from-email", json={"raw_text": EMAIL}, headers={"Idempotency-Key": "retry-3"}
+    )
+
+    assert response.status_code == 400
+    async with sessionmanager.session() as session:
+        assert (await session.execute(select(IdempotencyKey))).first() is None
+
+
+async def test_claim_retries_when_the_holder_releases_the_key_mid_claim():
+    """
+    Checks that a claim which loses the upsert to a request that then fails and releases the key
+    claims the key itself instead of erroring on the missing row.
+    """
+    async with sessionmanager.session() as holder:
+        holder.add(IdempotencyKey(key="extract-quote:retry-4", request_hash="fingerprint"))
+        await holder.commit()
+
+    async with sessionmanager.session() as db:
+        commit = db.commit
+        released = []
+
+        async def commit_then_holder_releases():
+            await commit()
+            if not released:  # The holder fails right after our upsert lost to its claim
+                released.append(True)
+                async with sessionmanager.session() as holder:
+                    await idempotency.release(holder, "extract-quote:retry-4")
+
+        db.commit = commit_then_holder_releases
+        assert await idempotency.claim(db, "extract-quote:retry-4", "fingerprint") is None
+
+    assert released
+    async with sessionmanager.session() as session:
+        record = (await session.execute(select(IdempotencyKey))).scalar_one()
+        assert record.status_code is None  # Now held by the retried claim
@@ -0,0 +1,37 @@
+import pytest
+from httpx import AsyncClient
+
+from app.services.database import sessionmanager
+from app.services.llm_client import ExtractedDataSchema
+from app.services.quote_processor import process_quote_from_email_data
+from scripts.index_audit import run_audit
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+async def test_relationship_and_view_queries_use_indexes(client: AsyncClient, app):
+    """
+    Runs the index audit over a small dataset; any query that needs a sequential scan
+    to answer a lookup or join (i.e. a missing index) fails the test.
+    """
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Pea Protein", "required_certifications": ["Organic"]})).json()["id"]
+    extracted = ExtractedDataSchema(
+        product="Pea Protein",
+        price_per_pound=2.5,
+        country_of_origin="Canada",
+        minimum_order_quantity=1000,
+        company_name="Peas Inc",
+        contact_name=None,
+        supplier_email="sales@peas.com",
+        supplier_phone=None,
+        certifications=["Organic"],
+    )
+    async with sessionmanager.session() as session:
+        await process_quote_from_email_data(session, rfq_id, "Pea Protein", extracted, raw_text="Pea protein at $2.50/lb")
+        await session.commit()
+
+    findings, failures = await run_audit(sessionmanager, app)
+
+    assert failures == []
+    assert [(f.source, f.relation, f.detail) for f in findings] == []
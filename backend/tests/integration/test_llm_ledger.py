@@ -0,0 +1,69 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.exc import DBAPIError
+
+from app.models import LLMCall
+from app.services import llm_ledger
+from app.services.database import sessionmanager
+from app.services.llm_client import ExtractedDataSchema
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+EMAIL = "Hi, our almonds are $4.20/lb from Spain, MOQ 500 lbs.\n-- Ana, Costa Nuts, ana@costanuts.com"
+
+
+@pytest.fixture
+async def ledger():
+    llm_ledger.llm_ledger.start()
+    yield llm_ledger.llm_ledger
+    await llm_ledger.llm_ledger.stop()
+
+
+@pytest.fixture(autouse=True)
+def fake_llm(monkeypatch):
+    """Replaces the LLM with a fake that books a call in the ledger the way llm_client does."""
+
+    async def fake_extract(raw_text: str) -> ExtractedDataSchema:
+        llm_ledger.record_call(llm_ledger.EXTRACT, "models/gemini-1.5-flash-8b", llm_ledger.SERVED, 800.0, 1200, 80, 0.0006)
+        return ExtractedDataSchema(
+            product="Almonds", price_per_pound=4.2, country_of_origin="Spain", certifications=[],
+            minimum_order_quantity=500, company_name="Costa Nuts", contact_name="Ana",
+            supplier_email="ana@costanuts.com", supplier_phone=None,
+        )
+
+    monkeypatch.setattr("app.views.rfqs.extract_quote_data_from_email", fake_extract)
+
+
+async def test_extraction_cost_is_reported_by_rfq_supplier_and_day(client: AsyncClient, ledger):
+    """
+    Checks that the calls behind saved quotes land in the ledger attributed to their quote,
+    and that the reporting endpoint aggregates them.
+    """
+    rfq_ids = [(await client.post("/api/rfqs", json={"item": "Almonds"})).json()["id"] for _ in range(2)]
+    quotes = [(await client.post(f"/api/rfqs/{rfq_id}/extract-quote-from-email", json={"raw_text": EMAIL})).json() for rfq_id in rfq_ids]
+    await ledger.flush()
+
+    by_rfq = (await client.get("/api/analytics/llm-costs", params=[("group_by", "rfq_id"), ("group_by", "supplier_id")])).json()
+    assert {row["rfq_id"] for row in by_rfq} == set(rfq_ids)
+    assert all(row["supplier_id"] == quotes[0]["supplier_id"] for row in by_rfq)
+    assert all(row["calls"] == 1 and row["input_tokens"] == 1200 for row in by_rfq)
+
+    by_model = (await client.get("/api/analytics/llm-costs", params={"group_by": "day"})).json()
+    assert len(by_model) == 1
+    assert by_model[0]["calls"] == 2
+    assert by_model[0]["cost_usd"] == pytest.approx(0.0012)
+    assert by_model[0]["latency_p50_ms"] == 800.0
+
+    supplier = (await client.get("/api/analytics/llm-costs", params={"group_by": "supplier_id", "sort": "cost", "limit": 1})).json()
+    assert supplier[0]["supplier_id"] == quotes[0]["supplier_id"]
+
+
+async def test_the_ledger_is_append_only(client: AsyncClient, ledger):
+    llm_ledger.record_call(llm_ledger.CLARIFY, "models/gemini-1.5-flash", llm_ledger.ERROR, 30000.0)
+    await ledger.flush()
+
+    async with sessionmanager.session() as session:
+        with pytest.raises(DBAPIError, match="append-only"):
+            await session.execute(update(LLMCall).values(outcome=llm_ledger.SERVED))
@@ -0,0 +1,95 @@
+from email.message import EmailMessage
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.models import Email, Quote
+from app.services.database import sessionmanager
+from app.services.llm_client import ExtractedDataSchema
+from app.services.mailbox_ingest import Checkpoint, MailboxIngester
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+MBOX = FIXTURES / "mail" / "quotes.mbox"
+PRICE_SHEET = FIXTURES / "attachments" / "price_sheet.csv"
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """A fake LLM that reads the price off the text; the reply names no product, so it must be routed by thread."""
+    calls = []
+
+    async def fake_extract(email_text: str) -> ExtractedDataSchema:
+        calls.append(email_text)
+        almonds = "almond" in email_text.lower()
+        return ExtractedDataSchema(
+            product="Almonds" if almonds and "$4.20" in email_text else None,
+            price_per_pound=4.2 if "$4.20" in email_text else 4.05 if "$4.05" in email_text else 5.1,
+            country_of_origin=None, certifications=[], minimum_order_quantity=None,
+            company_name=None, contact_name=None, supplier_email=None, supplier_phone=None,
+        )
+
+    monkeypatch.setattr("app.services.mailbox_ingest.extract_quote_data_from_email", fake_extract)
+    return calls
+
+
+async def _counts() -> tuple[int, int]:
+    async with sessionmanager.session() as session:
+        quotes = (await session.execute(select(func.count()).select_from(Quote))).scalar()
+        emails = (await session.execute(select(func.count()).select_from(Email))).scalar()
+    return quotes, emails
+
+
+@pytest.mark.alters_schema  # Creates the June 2025 email partition
+async def test_ingests_routes_by_product_and_thread_and_resumes(client: AsyncClient, llm_calls: list, tmp_path: Path):
+    await client.post("/api/rfqs", json={"item": "Almonds"})
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+
+    report = await MailboxIngester(Checkpoint(checkpoint_path), batch_size=2, workers=1).run(MBOX)
+
+    # The first quote matches the Almonds RFQ, the reply follows its thread and updates the same
+    # quote, the whey email has no RFQ, and the duplicate is skipped
+    assert (report.seen, report.saved, report.unrouted, report.already_done) == (4, 2, 1, 1)
+    assert len(llm_calls) == 3
+    assert await _counts() == (1, 2)
+    async with sessionmanager.session() as session:
+        quote = (await session.execute(select(Quote))).scalar_one()
+        received = sorted((await session.execute(select(Email.received_at))).scalars().all())
+    assert quote.price_per_pound == 4.05
+    assert received[0].isoformat() == "2025-06-03T07:15:00+00:00"
+
+    rerun = await MailboxIngester(Checkpoint(checkpoint_path), batch_size=2, workers=1).run(MBOX)
+
+    assert rerun.already_done == 4
+    assert len(llm_calls) == 3
+    assert await _counts() == (1, 2)
+
+
+async def test_routes_a_price_sheet_row_to_the_rfq_it_quotes(client: AsyncClient, llm_calls: list, tmp_path: Path):
+    """
+    Checks that a price-sheet row, whose product is the sheet's free text ("California Almonds,
+    Nonpareil 23/25"), is routed to the open Almonds RFQ and logged under the RFQ's item name.
+    """
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Almonds"})).json()["id"]
+    message = EmailMessage()
+    message["From"] = "Ana Costa <ana@costanuts.com>"
+    message["Subject"] = "June prices"
+    message["Message-ID"] = "<june-prices@costanuts.com>"
+    message.set_content("Hi, our June prices are attached.\nAna Costa")
+    message.add_attachment(PRICE_SHEET.read_bytes(), maintype="text", subtype="csv", filename="prices.csv")
+    source = tmp_path / "june.eml"
+    source.write_bytes(message.as_bytes())
+
+    report = await MailboxIngester(Checkpoint(tmp_path / "checkpoint.jsonl"), workers=1).run(source)
+
+    assert (report.saved, report.unrouted) == (1, 0)
+    assert llm_calls == []  # The row was read off the sheet
+    async with sessionmanager.session() as session:
+        quote = (await session.execute(select(Quote))).scalar_one()
+        email = (await session.execute(select(Email))).scalar_one()
+    assert quote.rfq_id == rfq_id
+    assert email.extracted_data["product"] == "Almonds"
@@ -0,0 +1,181 @@
+import asyncio
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.config import config
+from app.models import OutboxEvent, Tenant
+from app.services.database import sessionmanager
+from app.services.llm_client import ExtractedDataSchema
+from app.services.outbox import outbox_dispatcher
+from app.services.quote_processor import process_quote_from_email_data
+from app.services.tenancy import hash_api_key
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+class WebhookStub:
+    """A local HTTP endpoint that records each delivery and answers with scripted status codes (200 once they run out)."""
+
+    def __init__(self):
+        self.requests: list[dict] = []
+        self.statuses: list[int] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.requests.append({
+                    "encoding": self.headers["Content-Encoding"],
+                    "events": json.loads(gzip.decompress(body))["events"],
+                })
+                self.send_response(stub.statuses.pop(0) if stub.statuses else 200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/events"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def events(self) -> list[dict]:
+        return [event for request in self.requests for event in request["events"]]
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    stub = WebhookStub()
+    monkeypatch.setattr(config, "WEBHOOK_URLS", [stub.url])
+    monkeypatch.setattr(outbox_dispatcher, "poll_seconds", 0.05)
+    monkeypatch.setattr(outbox_dispatcher, "retry_base_seconds", 0.05)
+    monkeypatch.setattr(outbox_dispatcher, "_paused_until", {})
+    monkeypatch.setattr(outbox_dispatcher, "delivered", 0)
+    monkeypatch.setattr(outbox_dispatcher, "failed_deliveries", 0)
+    yield stub
+    stub.server.shutdown()
+
+
+@pytest.fixture
+async def dispatcher(webhook):
+    yield outbox_dispatcher
+    await outbox_dispatcher.stop()
+
+
+async def _until(condition, timeout: float = 5.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out waiting for webhook deliveries"
+        await asyncio.sleep(0.02)
+
+
+def _extracted(price: float) -> ExtractedDataSchema:
+    return ExtractedDataSchema(
+        product="Oat Flour", price_per_pound=price, country_of_origin="Finland", certifications=["Organic"],
+        minimum_order_quantity=2000, company_name="Nordic Oats", contact_name=None,
+        supplier_email="sales@nordicoats.com", supplier_phone=None,
+    )
+
+
+async def _submit(rfq_id: str, price: float) -> str:
+    async with sessionmanager.session() as session:
+        quote = await process_quote_from_email_data(session, rfq_id, "Oat Flour", _extracted(price), raw_text="quote")
+        quote_id = quote.id
+        await session.commit()
+        return quote_id
+
+
+async def _outbox_rows() -> int:
+    async with sessionmanager.session() as session:
+        return await session.scalar(select(func.count()).select_from(OutboxEvent))
+
+
+async def test_rfq_and_quote_changes_are_pushed_in_order(client: AsyncClient, webhook: WebhookStub, dispatcher):
+    """
+    Checks that creating an RFQ and then creating and updating a quote reaches the webhook as
+    gzip-compressed batches, in order, and that delivered events leave the outbox.
+    """
+    dispatcher.start()
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Oat Flour"})).json()["id"]
+    quote_id = await _submit(rfq_id, 0.80)
+    await _submit(rfq_id, 0.75)
+
+    await _until(lambda: sum(len(request["events"]) for request in webhook.requests) == 3)
+    events = [event for request in webhook.requests for event in request["events"]]
+
+    assert all(request["encoding"] == "gzip" for request in webhook.requests)
+    assert [event["type"] for event in events] == ["rfq.created", "quote.created", "quote.updated"]
+    assert [event["sequence"] for event in events] == sorted(event["sequence"] for event in events)
+    assert {event["rfq_id"] for event in events} == {rfq_id}
+    assert events[0]["data"]["item"] == "Oat Flour"
+    assert events[2]["data"]["quote_id"] == quote_id
+    assert events[2]["data"]["price_per_pound"] == 0.75
+    assert events[2]["data"]["certifications"] == ["Organic"]
+    await _until(lambda: dispatcher.delivered == 3)
+    assert await _outbox_rows() == 0
+
+
+async def test_failed_deliveries_are_retried_as_one_ordered_batch(client: AsyncClient, webhook: WebhookStub, dispatcher):
+    """
+    Checks that events queued while nothing delivers go out as one batch, and that a failing
+    endpoint gets the same batch again after backing off until it accepts it.
+    """
+    rfq_ids = [(await client.post("/api/rfqs", json={"item": "Oat Flour"})).json()["id"] for _ in range(2)]
+    for price in (0.80, 0.78):
+        for rfq_id in rfq_ids:
+            await _submit(rfq_id, price)
+    assert await _outbox_rows() == 6
+
+    webhook.statuses = [503, 500]
+    dispatcher.start()
+    await _until(lambda: dispatcher.delivered == 6)
+
+    assert len(webhook.requests) == 3
+    assert webhook.requests[0]["events"] == webhook.requests[2]["events"]
+    events = webhook.requests[2]["events"]
+    for rfq_id in rfq_ids:
+        assert [event["type"] for event in events if event["rfq_id"] == rfq_id] == ["rfq.created", "quote.created", "quote.updated"]
+    assert dispatcher.failed_deliveries == 2
+    assert await _outbox_rows() == 0
+
+
+async def test_rolled_back_changes_queue_no_events(client: AsyncClient, webhook: WebhookStub):
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Oat Flour"})).json()["id"]
+    async with sessionmanager.session() as session:
+        await process_quote_from_email_data(session, rfq_id, "Oat Flour", _extracted(0.80), raw_text="quote")
+        await session.rollback()
+
+    async with sessionmanager.session() as session:
+        types = (await session.execute(select(OutboxEvent.event_type))).scalars().all()
+    assert types == ["rfq.created"]
+
+
+async def test_each_tenants_events_go_only_to_its_own_endpoints(client: AsyncClient, webhook: WebhookStub, dispatcher):
+    """
+    Checks that a tenant's events reach only the endpoints it registered, never another tenant's
+    or the default tenant's (WEBHOOK_URLS), even when two tenants register the same URL.
+    """
+    acme_stub, shared_stub = WebhookStub(), WebhookStub()
+    async with sessionmanager.session() as session:
+        await Tenant.create(session, id="acme", name="Acme Foods", api_key_hash=hash_api_key("acme-key"), webhook_urls=[acme_stub.url, shared_stub.url])
+        await Tenant.create(session, id="globex", name="Globex Grocers", api_key_hash=hash_api_key("globex-key"), webhook_urls=[shared_stub.url])
+
+    dispatcher.start()
+    for key, item in (("acme-key", "Almonds"), ("globex-key", "Oat Flour")):
+        assert (await client.post("/api/rfqs", json={"item": item}, headers={"Authorization": f"Bearer {key}"})).status_code == 201
+    await _until(lambda: dispatcher.delivered == 3)
+
+    assert [(event["tenant_id"], event["data"]["item"]) for event in acme_stub.events()] == [("acme", "Almonds")]
+    assert sorted((event["tenant_id"], event["data"]["item"]) for event in shared_stub.events()) == [("acme", "Almonds"), ("globex", "Oat Flour")]
+    assert all(len({event["tenant_id"] for event in request["events"]}) == 1 for request in shared_stub.requests)
+    assert webhook.requests == []
+    for stub in (acme_stub, shared_stub):
+        stub.server.shutdown()
@@ -0,0 +1,86 @@
+import pytest
+from httpx import AsyncClient
+
+from app.services.database import sessionmanager
+from app.services.llm_client import ExtractedDataSchema
+from app.services.price_conversion import conversion_tables, publish_table, renormalize_quotes
+from app.services.quote_processor import process_quote_from_email_data
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+def _extracted(email: str, amount: float, currency: str, unit: str) -> ExtractedDataSchema:
+    return ExtractedDataSchema(
+        product="Cocoa Butter",
+        price_per_pound=None,
+        price_amount=amount,
+        price_currency=currency,
+        price_unit=unit,
+        country_of_origin="Ghana",
+        minimum_order_quantity=None,
+        company_name=None,
+        contact_name=None,
+        supplier_email=email,
+        supplier_phone=None,
+    )
+
+
+async def _submit(rfq_id: str, extracted: ExtractedDataSchema) -> dict:
+    async with sessionmanager.session() as session:
+        quote = await process_quote_from_email_data(session, rfq_id, "Cocoa Butter", extracted, raw_text="quote")
+        saved = {"id": quote.id, "price_per_pound": quote.price_per_pound, "conversion_version": quote.conversion_version}
+        await session.commit()
+        return saved
+
+
+async def _publish(usd_per_currency: dict, renormalize_rfq: str | None = None) -> tuple[int, int]:
+    async with sessionmanager.session() as session:
+        version = await publish_table(session, usd_per_currency, "test rates")
+        converted = await renormalize_quotes(session, version, rfq_id=renormalize_rfq) if renormalize_rfq else 0
+        await session.commit()
+        return version, converted
+
+
+async def test_foreign_prices_convert_once_a_rate_is_published(client: AsyncClient):
+    """
+    Checks that a EUR/MT quote is stored unconverted without a EUR rate, and that publishing one
+    and re-normalizing fills in its USD/lb price, the comparison view and the price rollups.
+    """
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Cocoa Butter"})).json()["id"]
+
+    usd = await _submit(rfq_id, _extracted("a@cocoa.com", 9.26, "USD", "kg"))
+    eur = await _submit(rfq_id, _extracted("b@cocoa.com", 8500, "€", "tonne"))
+    assert usd["price_per_pound"] == 4.2
+    assert eur["price_per_pound"] is None
+
+    version, converted = await _publish({"EUR": 1.0842}, renormalize_rfq=rfq_id)
+    assert converted == 2
+
+    comparison = {q["id"]: q for q in (await client.get(f"/api/rfqs/{rfq_id}/quotes")).json()}
+    assert comparison[eur["id"]]["price_per_pound"] == 4.18  # 8500 × 1.0842 / 2204.62
+    assert (comparison[eur["id"]]["price_amount"], comparison[eur["id"]]["price_currency"], comparison[eur["id"]]["price_unit"]) == (8500, "EUR", "mt")
+
+    stats = (await client.get("/api/analytics/prices", params={"group_by": "item"})).json()
+    assert stats[0]["quote_count"] == 2
+
+    # New quotes convert on the way in with the cached newest table
+    async with sessionmanager.session() as session:
+        assert (await conversion_tables.current(session)).version == version
+    assert (await _submit(rfq_id, _extracted("c@cocoa.com", 9000, "EUR", "mt")))["conversion_version"] == version
+
+
+async def test_renormalization_is_scoped_to_one_rfq(client: AsyncClient):
+    rfq_ids = [(await client.post("/api/rfqs", json={"item": "Cocoa Butter"})).json()["id"] for _ in range(2)]
+    await _publish({"EUR": 1.0})
+    quotes = [await _submit(rfq_id, _extracted("a@cocoa.com", 2.0, "EUR", "lb")) for rfq_id in rfq_ids]
+    assert all(quote["price_per_pound"] == 2.0 for quote in quotes)
+
+    version, converted = await _publish({"EUR": 1.5}, renormalize_rfq=rfq_ids[0])
+    assert converted == 1
+
+    prices = [
+        {q["id"]: q for q in (await client.get(f"/api/rfqs/{rfq_id}/quotes")).json()}[quote["id"]]["price_per_pound"]
+        for rfq_id, quote in zip(rfq_ids, quotes)
+    ]
+    assert prices == [3.0, 2.0]
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from app.models import RFQ
+from app.services.database import sessionmanager
+from app.services.quote_events import QUOTE_CREATED, publish_quote_event, quote_event_broker
+from app.views.rfqs import stream_quote_events
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+class ConnectedRequest:
+    """The part of a Request the SSE endpoint reads: a client that never disconnects."""
+
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+@pytest.fixture
+async def broker():
+    await quote_event_broker.start(sessionmanager._engine.url.render_as_string(hide_password=False))
+    await asyncio.wait_for(quote_event_broker.listening.wait(), timeout=5)
+    yield quote_event_broker
+    await quote_event_broker.stop()
+
+
+async def test_committed_notify_reaches_the_sse_stream(broker):
+    """
+    Checks the whole path of a quote event: a NOTIFY committed on one connection arrives
+    through the broker's LISTEN connection as an SSE frame for the RFQ's subscribers.
+    """
+    async with sessionmanager.session() as db:
+        rfq = await RFQ.create(db, item="Almonds")
+
+    response = await stream_quote_events(rfq.id, ConnectedRequest())
+    stream = response.body_iterator
+    assert await anext(stream) == "retry: 3000\n\n"  # Subscribed from here on
+
+    async with sessionmanager.session() as db:
+        await publish_quote_event(db, QUOTE_CREATED, rfq.id, "quote-1")
+        await db.commit()
+
+    frame = await asyncio.wait_for(anext(stream), timeout=5)
+    assert frame.startswith(f"event: {QUOTE_CREATED}\n")
+    assert '"quote_id": "quote-1"' in frame
+    await stream.aclose()
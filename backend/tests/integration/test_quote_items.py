@@ -0,0 +1,90 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.models import Email, Quote
+from app.services.database import sessionmanager
+from app.services.llm_client import LLMUsage, MultiItemExtractionSchema, QuoteLineItemSchema
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+EMAIL = """Hi,
+
+Our offer for this month:
+- Almonds, Nonpareil 23/25: $4.20/lb, MOQ 500 lbs
+- Organic Pea Protein: $4.10/lb, MOQ 2,000 lbs
+- Cashews W320: $6.00/lb
+
+Best,
+Ana Costa
+Costa Nuts Inc.
+ana@costanuts.com
+"""
+
+
+def _line(product: str, price: float) -> QuoteLineItemSchema:
+    return QuoteLineItemSchema(product=product, price_per_pound=price, country_of_origin=None, certifications=[], minimum_order_quantity=None)
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """A fake multi-item LLM call that records the open items it was told about."""
+    calls = []
+
+    async def fake_extract_items(email_text: str, open_items: list[str]):
+        calls.append(open_items)
+        extraction = MultiItemExtractionSchema(
+            items=[_line("Almonds", 4.2), _line("Organic Pea Protein", 4.1), _line("Cashews", 6.0)],
+            company_name="Costa Nuts Inc.", contact_name="Ana Costa", supplier_email="ana@costanuts.com", supplier_phone=None,
+        )
+        return extraction, LLMUsage(input_tokens=120, output_tokens=60)
+
+    monkeypatch.setattr("app.views.rfqs.extract_quote_items_from_email", fake_extract_items)
+    return calls
+
+
+async def _counts() -> tuple[int, int]:
+    async with sessionmanager.session() as session:
+        quotes = (await session.execute(select(func.count()).select_from(Quote))).scalar()
+        emails = (await session.execute(select(func.count()).select_from(Email))).scalar()
+    return quotes, emails
+
+
+async def test_one_call_saves_a_quote_per_matched_rfq(client: AsyncClient, llm_calls: list):
+    almonds = (await client.post("/api/rfqs", json={"item": "Almonds"})).json()["id"]
+    peas = (await client.post("/api/rfqs", json={"item": "Organic Pea Protein"})).json()["id"]
+
+    response = await client.post("/api/rfqs/extract-quotes-from-email", json={"raw_text": EMAIL})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(llm_calls) == 1 and sorted(llm_calls[0]) == ["Almonds", "Organic Pea Protein"]
+    assert body["llm_calls"] == 1
+    assert {quote["rfq_id"]: quote["price_per_pound"] for quote in body["quotes"]} == {almonds: 4.2, peas: 4.1}
+    assert len({quote["supplier_id"] for quote in body["quotes"]}) == 1
+    assert body["unmatched"] == [{"product": "Cashews", "price_per_pound": 6.0}]
+    assert await _counts() == (2, 2)
+
+
+async def test_quotes_from_one_email_are_saved_together_or_not_at_all(client: AsyncClient, llm_calls: list, monkeypatch):
+    await client.post("/api/rfqs", json={"item": "Almonds"})
+    await client.post("/api/rfqs", json={"item": "Organic Pea Protein"})
+
+    from app.services import quote_processor
+
+    record_price_change = quote_processor.record_price_change
+    calls = 0
+
+    async def fail_on_second_quote(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("database went away")
+        return await record_price_change(*args, **kwargs)
+
+    monkeypatch.setattr(quote_processor, "record_price_change", fail_on_second_quote)
+    response = await client.post("/api/rfqs/extract-quotes-from-email", json={"raw_text": EMAIL})
+
+    assert response.status_code == 500
+    assert await _counts() == (0, 0)
@@ -0,0 +1,68 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, insert, select
+
+from app.models import Supplier
+from app.services.database import sessionmanager
+from app.services.llm_client import ExtractedDataSchema
+from app.services.supplier_resolver import find_candidates
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+async def many_suppliers(fake_company_names) -> list[dict]:
+    """Three thousand suppliers with made-up names, plus Costa Nuts."""
+    rows = [{"company_name": "Costa Nuts Inc.", "contact_email": "ana@costanuts.com"}]
+    for i, name in enumerate(fake_company_names(3000, seed=11)):
+        rows.append({"company_name": f"{name} {i} Foods", "contact_email": f"sales@supplier{i}.com"})
+    async with sessionmanager.session() as session:
+        await session.execute(insert(Supplier), rows)
+        await session.commit()
+    return rows
+
+
+async def _supplier_count() -> int:
+    async with sessionmanager.session() as session:
+        return (await session.execute(select(func.count()).select_from(Supplier))).scalar()
+
+
+async def test_new_contact_is_matched_to_the_existing_supplier(client: AsyncClient, many_suppliers: list, monkeypatch):
+    """
+    Checks that a quote from a new salesperson at a known supplier lands on that supplier
+    instead of creating a duplicate.
+    """
+    async def fake_extract(raw_text: str) -> ExtractedDataSchema:
+        return ExtractedDataSchema(
+            product="Almonds", price_per_pound=4.1, country_of_origin="Spain", certifications=[],
+            minimum_order_quantity=None, company_name="Costa Nuts", contact_name="Luis",
+            supplier_email="luis@costanuts.com", supplier_phone=None,
+        )
+
+    monkeypatch.setattr("app.views.rfqs.extract_quote_data_from_email", fake_extract)
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Almonds"})).json()["id"]
+
+    response = await client.post(f"/api/rfqs/{rfq_id}/extract-quote-from-email", json={"raw_text": "Almonds $4.10/lb"})
+
+    assert response.status_code == 200
+    async with sessionmanager.session() as session:
+        costa = (await session.execute(select(Supplier).where(Supplier.contact_email == "ana@costanuts.com"))).scalar_one()
+    assert response.json()["supplier_id"] == costa.id
+    assert await _supplier_count() == len(many_suppliers)
+
+
+async def test_matches_endpoint_scores_a_small_candidate_set(client: AsyncClient, many_suppliers: list):
+    target = many_suppliers[1500]
+    misspelled = target["company_name"].replace(" Foods", " Food Co.")
+
+    response = await client.get("/api/suppliers/matches", params={"email": "buyer@gmail.com", "company_name": misspelled})
+
+    assert response.status_code == 200
+    best = response.json()[0]
+    assert best["supplier"]["company_name"] == target["company_name"]
+    assert best["matched_on"] == "name"
+    assert best["confidence"] > 0.8
+
+    async with sessionmanager.session() as session:
+        candidates = await find_candidates(session, "buyer@gmail.com", misspelled)
+    assert len(candidates) < 50
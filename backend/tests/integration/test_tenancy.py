@@ -0,0 +1,65 @@
+import pytest
+from httpx import AsyncClient
+
+from app.models import Tenant
+from app.services.database import sessionmanager
+from app.services.tenancy import hash_api_key
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+ACME = {"Authorization": "Bearer acme-key"}
+GLOBEX = {"Authorization": "Bearer globex-key"}
+
+
+@pytest.fixture
+async def tenants():
+    async with sessionmanager.session() as db:
+        await Tenant.create(db, id="acme", name="Acme Foods", api_key_hash=hash_api_key("acme-key"))
+        await Tenant.create(db, id="globex", name="Globex Grocers", api_key_hash=hash_api_key("globex-key"))
+
+
+async def test_tenants_only_see_their_own_rfqs(client: AsyncClient, tenants):
+    """
+    Checks that an RFQ created by one tenant is invisible to another, both in
+    listings and when fetched by id.
+    """
+    rfq_id = (await client.post("/api/rfqs", json={"item": "Almonds"}, headers=ACME)).json()["id"]
+
+    assert [rfq["id"] for rfq in (await client.get("/api/rfqs", headers=ACME)).json()] == [rfq_id]
+    assert (await client.get("/api/rfqs", headers=GLOBEX)).json() == []
+    assert (await client.get("/api/rfqs")).json() == []  # The client's own key is the default tenant's
+
+    assert (await client.get(f"/api/rfqs/{rfq_id}/quotes", headers=ACME)).status_code == 200
+    assert (await client.get(f"/api/rfqs/{rfq_id}/quotes", headers=GLOBEX)).status_code == 404
+
+
+async def test_supplier_names_are_unique_per_tenant(client: AsyncClient, tenants):
+    """
+    Checks that two tenants can each have a supplier of the same name and email,
+    and that each tenant's listing shows only its own.
+    """
+    supplier = {"company_name": "Costa Nuts", "contact_email": "ana@costanuts.com"}
+
+    assert (await client.post("/api/suppliers", json=supplier, headers=ACME)).status_code == 201
+    assert (await client.post("/api/suppliers", json=supplier, headers=GLOBEX)).status_code == 201
+
+    for headers in (ACME, GLOBEX):
+        suppliers = (await client.get("/api/suppliers", headers=headers)).json()
+        assert [s["company_name"] for s in suppliers] == ["Costa Nuts"]
+
+
+async def test_a_caller_cannot_pick_another_tenant(client: AsyncClient, tenants):
+    """
+    Checks that the tenant comes from the API key alone: naming another tenant in a header
+    changes nothing, and a request without a valid key is refused before reaching the API.
+    """
+    await client.post("/api/rfqs", json={"item": "Almonds"}, headers=GLOBEX)
+
+    spoofed = await client.get("/api/rfqs", headers={**ACME, "X-Tenant-ID": "globex"})
+    assert spoofed.status_code == 200 and spoofed.json() == []
+
+    for headers in ({"Authorization": ""}, {"Authorization": "Bearer not-a-key"}, {"Authorization": "", "X-Tenant-ID": "globex"}):
+        response = await client.get("/api/rfqs", headers=headers)
+        assert response.status_code == 401
+        assert response.json()["detail"] in ("Missing API key", "Invalid API key")
@@ -0,0 +1,114 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from app.services.attachment_parsers import Attachment, parse_attachment, table_to_rows
+from app.services.attachments import prepare_extraction, product_matches
+from app.services.sandbox import ProcessSandbox, SandboxError, SandboxTimeout
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures" / "attachments"
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+# A main script with the web stack loaded, as serve.py has, that reports what a sandboxed child loaded
+HEAVY_MAIN_SCRIPT = """
+import asyncio, sys
+sys.path[:0] = [{backend!r}, {probe_dir!r}]
+import app.models  # noqa: F401
+from app.services.sandbox import ProcessSandbox
+import probe
+
+if __name__ == "__main__":
+    print(asyncio.run(ProcessSandbox(workers=1, timeout=30, memory_limit_mb=512).run(probe.web_stack_loaded)))
+"""
+
+
+def _csv_attachment() -> Attachment:
+    return Attachment("prices.csv", "text/csv", (FIXTURES / "price_sheet.csv").read_bytes())
+
+
+async def test_price_sheet_rows_are_recognized_and_converted_to_pounds():
+    rows = parse_attachment("prices.csv", "text/csv", (FIXTURES / "price_sheet.csv").read_bytes(), max_rows=100, max_pages=1)["rows"]
+
+    assert [row["product"] for row in rows] == ["California Almonds, Nonpareil 23/25", "Chilean Walnuts"]
+    assert rows[0]["price_per_pound"] == pytest.approx(4.2003, abs=1e-4)
+    assert rows[0]["minimum_order_quantity"] == 2205
+    assert rows[0]["certifications"] == ["Organic", "Kosher"]
+    assert rows[1]["certifications"] == []
+
+
+async def test_tables_without_a_price_unit_are_left_for_the_llm():
+    assert table_to_rows([["Item", "Price"], ["Cocoa", "3.50"]]) is None
+    assert table_to_rows([["Item", "Unit Price", "Unit"], ["Cocoa", "3.50", "lb"], ["Crates", "9", "box"]]) == [
+        {"product": "Cocoa", "price_per_pound": 3.5, "country_of_origin": None, "minimum_order_quantity": None, "certifications": []}
+    ]
+
+
+async def test_product_matching_is_word_based():
+    assert product_matches("California Almonds, Nonpareil", "Almond")
+    assert not product_matches("Almond Flour", "Walnuts")
+
+
+async def test_recognized_sheet_skips_the_llm():
+    prepared = await prepare_extraction("Please see attached.\n-- ana@costanuts.com", [_csv_attachment()], items=["Walnuts"])
+
+    assert prepared.extracted is not None
+    assert prepared.extracted.product == "Chilean Walnuts"
+    assert prepared.extracted.supplier_email == "ana@costanuts.com"
+    assert prepared.extracted.price_per_pound == pytest.approx(3.6287, abs=1e-4)
+
+
+async def test_unmatched_sheet_goes_to_the_llm_with_its_text():
+    prepared = await prepare_extraction("See attached.", [_csv_attachment()], items=["Cocoa Butter"])
+
+    assert prepared.extracted is None
+    assert "--- Attachment: prices.csv ---" in prepared.llm_text
+    assert "Chilean Walnuts" in prepared.llm_text
+
+
+async def test_sandbox_enforces_time_and_memory_limits():
+    sandbox = ProcessSandbox(workers=2, timeout=1, memory_limit_mb=256)
+
+    # Stdlib targets: a function from this module would have the child import it, and the app with it
+    assert await sandbox.run(divmod, 7, 2) == (3, 1)
+    with pytest.raises(SandboxTimeout):
+        await sandbox.run(time.sleep, 30)
+    with pytest.raises(SandboxError, match="memory"):
+        await sandbox.run(bytearray, 1024 * 1024 * 1024)
+
+
+async def test_sandboxed_children_do_not_load_the_web_stack(tmp_path: Path):
+    (tmp_path / "probe.py").write_text(
+        "import sys\n"
+        "def web_stack_loaded():\n"
+        "    return sorted(name for name in ('fastapi', 'sqlalchemy', 'app.models') if name in sys.modules)\n"
+    )
+    script = tmp_path / "main.py"
+    script.write_text(HEAVY_MAIN_SCRIPT.format(backend=str(BACKEND_DIR), probe_dir=str(tmp_path)))
+
+    completed = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, check=True, timeout=60)
+
+    assert completed.stdout.strip() == "[]"
+
+
+async def test_xlsx_price_sheet():
+    openpyxl = pytest.importorskip("openpyxl")
+    import io
+
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Item", "Country of Origin", "Price/lb", "MOQ (lbs)"])
+    sheet.append(["Cocoa Butter", "Ghana", 3.75, 2000])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    result = parse_attachment("prices.xlsx", "", buffer.getvalue(), max_rows=100, max_pages=1)
+
+    assert result["rows"] == [
+        {"product": "Cocoa Butter", "price_per_pound": 3.75, "country_of_origin": "Ghana", "minimum_order_quantity": 2000, "certifications": []}
+    ]
@@ -0,0 +1,88 @@
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=30, clock=FakeClock())
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # A success resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_lets_one_probe_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=30, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # Everyone else waits for the probe
+
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_a_failed_probe_reopens_for_another_cooldown():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=5, cooldown_seconds=30, clock=clock)
+    for _ in range(5):
+        breaker.record_failure()
+
+    clock.now = 31
+    probe = breaker.allow()
+    assert probe
+    breaker.record_failure(probe)
+
+    assert breaker.state == OPEN
+    clock.now = 60
+    assert not breaker.allow()
+    clock.now = 61
+    assert breaker.allow()
+
+
+def test_releasing_a_probe_lets_the_next_one_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=30, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 30
+    probe = breaker.allow()
+    assert probe
+    breaker.release(probe)  # The probe was cancelled: no outcome either way
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_only_the_probe_ends_the_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=30, clock=clock)
+    call = breaker.allow()  # Let through while closed, still running when the circuit opens
+    breaker.record_failure()
+
+    clock.now = 30
+    probe = breaker.allow()
+    assert probe
+    breaker.release(call)  # The earlier call is cancelled
+    assert not breaker.allow()  # The probe is still out
+    breaker.record_failure(call)  # Or fails late
+    assert breaker.state == HALF_OPEN and not breaker.allow()
+
+    breaker.record_failure(probe)
+    assert breaker.state == OPEN and breaker.opened_at == 30
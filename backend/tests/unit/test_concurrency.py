@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.config import Config
+from app.services.concurrency import ConcurrencyLimiter
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+async def test_limiter_caps_concurrent_calls():
+    limiter = ConcurrencyLimiter(2)
+    running, peak = 0, 0
+
+    async def call():
+        nonlocal running, peak
+        async with limiter:
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+async def test_drain_waits_for_in_flight_calls():
+    limiter = ConcurrencyLimiter(4)
+    finished = []
+
+    async def call():
+        async with limiter:
+            await asyncio.sleep(0.05)
+            finished.append(True)
+
+    task = asyncio.create_task(call())
+    await asyncio.sleep(0)
+
+    assert await limiter.drain(timeout=1) is True
+    assert finished == [True]
+    await task
+
+
+async def test_drain_gives_up_after_timeout():
+    limiter = ConcurrencyLimiter(1)
+    release = asyncio.Event()
+
+    async def call():
+        async with limiter:
+            await release.wait()
+
+    task = asyncio.create_task(call())
+    await asyncio.sleep(0)
+
+    assert await limiter.drain(timeout=0.01) is False
+    release.set()
+    await task
+
+
+async def test_budgets_are_split_across_workers(monkeypatch):
+    monkeypatch.setattr(Config, "DB_MAX_CONNECTIONS", 80)
+    monkeypatch.setattr(Config, "LLM_MAX_CONCURRENCY", 16)
+    for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "LLM_WORKER_CONCURRENCY"):
+        monkeypatch.setattr(Config, name, getattr(Config, name))
+
+    Config.size_for_workers(6)
+
+    assert Config.DB_POOL_SIZE == 12  # 13 each, less the quote event listener's own connection
+    assert 6 * (Config.DB_POOL_SIZE + Config.DB_CONNECTIONS_OUTSIDE_POOL) <= 80
+    assert Config.DB_MAX_OVERFLOW == 0
+    assert Config.LLM_WORKER_CONCURRENCY == 2
@@ -0,0 +1,79 @@
+import pytest
+
+from app.services.attachments import prepare_extraction
+from app.services.email_normalizer import estimate_tokens, normalize_email
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+THREAD = """Hi team,
+
+Thanks for the RFQ. We can offer Organic Pea Protein at $4.10/lb, origin Canada, MOQ 2,000 lbs.
+
+Best regards,
+Luis Ortega
+Sales Manager | Prairie Proteins Ltd.
+luis@prairieproteins.ca | +1 (306) 555-0142
+
+CONFIDENTIALITY NOTICE: This e-mail and any attachments are confidential and intended solely for the addressee.
+
+Sent from my iPhone
+
+On Mon, Jun 2, 2025 at 9:00 AM Buyer <buyer@waystation.example> wrote:
+> Hello, please quote 5,000 lbs of pea protein at $3.90/lb or better.
+> Thanks
+"""
+
+
+async def test_quoted_history_and_boilerplate_are_stripped_and_the_signature_is_kept():
+    normalized = normalize_email(THREAD)
+
+    assert normalized.body == (
+        "Hi team,\n\nThanks for the RFQ. We can offer Organic Pea Protein at $4.10/lb, origin Canada, MOQ 2,000 lbs."
+    )
+    assert normalized.signature.startswith("Best regards,\nLuis Ortega\nSales Manager | Prairie Proteins Ltd.")
+    assert (normalized.signature_email, normalized.signature_phone) == ("luis@prairieproteins.ca", "+1 (306) 555-0142")
+    assert "$3.90" not in normalized.text and "iPhone" not in normalized.text
+    assert normalized.tokens_saved == normalized.tokens_before - estimate_tokens(normalized.text) > 0
+
+
+async def test_outlook_replies_are_cut_but_a_leading_header_block_is_not():
+    reply = normalize_email("We can do $4.05/lb.\n\nFrom: Buyer\nSent: Monday\nTo: Ana\nSubject: RFQ\n\nPlease quote.")
+    pasted = normalize_email("From: Ana\nSent: Monday\nSubject: Almonds\n\nAlmonds $4.20/lb.")
+
+    assert reply.text == "We can do $4.05/lb."
+    assert "Almonds $4.20/lb." in pasted.text
+
+
+async def test_a_bare_forward_keeps_the_forwarded_quote():
+    forward = (
+        "FYI\n\n---------- Forwarded message ---------\nFrom: Ana <ana@costanuts.com>\nDate: Tue, Jun 3, 2025\n"
+        "Subject: Almonds\n\nAlmonds $4.20/lb.\n--\nAna Costa\nana@costanuts.com\n"
+    )
+    normalized = normalize_email(forward)
+
+    assert (normalized.body, normalized.signature) == ("Almonds $4.20/lb.", "Ana Costa\nana@costanuts.com")
+
+
+async def test_a_contact_block_without_a_sign_off_is_the_signature():
+    normalized = normalize_email("Hi,\nOur California almonds are $4.20/lb.\nAna Costa\nCosta Nuts Inc.\nana@costanuts.com")
+
+    assert normalized.body == "Hi,\nOur California almonds are $4.20/lb."
+    assert normalized.signature == "Ana Costa\nCosta Nuts Inc.\nana@costanuts.com"
+
+
+async def test_long_bodies_are_cut_to_the_token_budget_but_keep_their_signature():
+    normalized = normalize_email("Almonds $4.20/lb.\n" + "Lorem ipsum dolor sit amet. " * 2000 + "\nBest,\nAna\nana@costanuts.com", token_budget=200)
+
+    assert normalized.truncated
+    assert normalized.tokens_after <= 200
+    assert normalized.body.startswith("Almonds $4.20/lb.")
+    assert normalized.text.endswith("Signature:\nBest,\nAna\nana@costanuts.com")
+
+
+async def test_the_llm_reads_the_normalized_email():
+    prepared = await prepare_extraction(THREAD, [])
+
+    assert prepared.llm_text == normalize_email(THREAD).text
+    assert prepared.input_tokens == estimate_tokens(prepared.llm_text)
+    assert prepared.input_tokens_saved > 0
@@ -0,0 +1,91 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import extraction_eval
+from app.services.extraction_eval import BackendResult, compare_reports, evaluate, load_corpus, percentile, score_field
+from app.services.llm_client import ExtractedDataSchema
+from app.services.rule_extractor import extract_quote_data_by_rules
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+CORPUS = Path(__file__).resolve().parent.parent / "fixtures" / "extraction" / "corpus.jsonl"
+
+
+def _extracted(**fields) -> ExtractedDataSchema:
+    return ExtractedDataSchema(**{name: None for name in extraction_eval.FIELDS} | {"certifications": []} | fields)
+
+
+async def test_fields_score_right_missing_wrong_and_invented_values():
+    assert score_field("price_per_pound", 4.2, 4.2003) == (1, 0, 0)
+    assert score_field("price_per_pound", 4.2, None) == (0, 0, 1)
+    assert score_field("price_per_pound", 4.2, 3.9) == (0, 1, 1)
+    assert score_field("price_per_pound", None, 3.9) == (0, 1, 0)
+    assert score_field("country_of_origin", "USA", "United States") == (1, 0, 0)
+    assert score_field("company_name", "Costa Nuts Inc.", "COSTA NUTS, LLC") == (1, 0, 0)
+    assert score_field("supplier_phone", "+1 (306) 555-0142", "306-555-0142") == (1, 0, 0)
+    assert score_field("certifications", ["Organic", "Non-GMO"], ["non gmo", "Kosher"]) == (1, 1, 1)
+
+
+async def test_percentiles_interpolate_between_ranks():
+    assert percentile([10, 20, 30, 40], 0.5) == 25
+    assert percentile([5], 0.99) == 5
+    assert percentile([], 0.5) == 0.0
+
+
+async def test_rule_extractor_reads_prices_quantities_and_the_signature():
+    extracted = extract_quote_data_by_rules(
+        "Cocoa powder at USD 9.26 per kg, Ivory Coast origin. MOQ 1,000 kg. Fair Trade certified.\n\n"
+        "Kind regards,\nKwame Mensah\nCocoa Trade Ltd.\n+225 27 20 30 40 50\nkwame@cocoatrade.ci",
+        items=["Cocoa Powder"],
+    )
+
+    assert extracted.product == "Cocoa Powder"
+    assert extracted.price_per_pound == pytest.approx(4.2003, abs=1e-4)
+    assert (extracted.minimum_order_quantity, extracted.country_of_origin) == (2205, "Ivory Coast")
+    assert extracted.certifications == ["Fair Trade"]
+    assert (extracted.contact_name, extracted.company_name) == ("Kwame Mensah", "Cocoa Trade Ltd.")
+    assert (extracted.supplier_email, extracted.supplier_phone) == ("kwame@cocoatrade.ci", "+225 27 20 30 40 50")
+
+
+async def test_the_rules_baseline_scores_the_corpus():
+    report = await evaluate(load_corpus(CORPUS), "rules")
+
+    assert report["emails"] >= 14 and report["errors"] == 0
+    assert report["fields"]["price_per_pound"]["f1"] == 1.0
+    assert report["overall"]["precision"] == 1.0 and report["overall"]["recall"] > 0.8
+    assert report["tokens"]["input"] == 0
+
+
+async def test_cases_run_concurrently_and_failures_count_as_misses(monkeypatch):
+    corpus = load_corpus(CORPUS)[:6]
+    running = peak = 0
+
+    async def fake_llm(case) -> BackendResult:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        if case.id == corpus[0].id:
+            raise HTTPException(status_code=502, detail="upstream timeout")
+        return BackendResult(_extracted(**case.expected), input_tokens=100, output_tokens=20)
+
+    monkeypatch.setitem(extraction_eval.BACKENDS, "fake", fake_llm)
+    report = await evaluate(corpus, "fake", concurrency=3)
+
+    assert peak == 3
+    assert report["errors"] == 1
+    assert report["cases"][0]["error"] == "upstream timeout"
+    assert report["overall"]["precision"] == 1.0 and report["overall"]["recall"] < 1.0
+    assert report["exact_match_rate"] == pytest.approx(5 / 6, abs=1e-4)
+    assert report["tokens"] == {"input": 500, "output": 100, "input_per_email": pytest.approx(83.3)}
+    assert report["latency_ms"]["p50"] >= 20
+
+    baseline = await evaluate(corpus, "rules")
+    diff = compare_reports(baseline, report)
+    assert f"{corpus[0].id}.price_per_pound" in diff["newly_wrong"]
+    assert diff["input_tokens_per_email"] == pytest.approx(83.3)
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.hedging import CANCELLED, FAILED, WON, HedgeBudget, HedgeStats, hedged
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+class SlowThenFast:
+    """The first call takes `first_seconds`, later ones answer almost at once."""
+
+    def __init__(self, first_seconds: float = 5.0):
+        self.first_seconds = first_seconds
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self) -> str:
+        self.started += 1
+        attempt = self.started
+        try:
+            await asyncio.sleep(self.first_seconds if attempt == 1 else 0.01)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"attempt {attempt}"
+
+
+def _funded_budget() -> HedgeBudget:
+    budget = HedgeBudget(ratio=1.0)
+    budget.earn()
+    return budget
+
+
+async def test_a_slow_call_is_hedged_and_the_slower_attempt_cancelled():
+    call, stats = SlowThenFast(), HedgeStats(holdback=0)
+    started = time.perf_counter()
+
+    result = await hedged(call, 0.05, _funded_budget(), stats)
+
+    assert result == "attempt 2"
+    assert time.perf_counter() - started < 1
+    await asyncio.sleep(0)  # Let the cancellation land
+    assert call.cancelled == 1
+    assert (stats.calls, stats.hedged, stats.hedge_won) == (1, 1, 1)
+
+
+async def test_a_fast_call_is_not_hedged():
+    call, stats = SlowThenFast(first_seconds=0.01), HedgeStats(holdback=0)
+
+    assert await hedged(call, 0.5, _funded_budget(), stats) == "attempt 1"
+    assert call.started == 1 and stats.hedged == 0
+
+
+async def test_the_budget_bounds_hedges():
+    budget, stats = HedgeBudget(ratio=0.5, burst=1.0), HedgeStats(holdback=0)
+
+    for _ in range(4):
+        await hedged(SlowThenFast(first_seconds=0.1), 0.01, budget, stats)
+
+    # Every second call earns a hedge
+    assert (stats.hedged, stats.denied) == (2, 2)
+
+
+async def test_a_failed_attempt_waits_for_the_other():
+    calls = 0
+
+    async def flaky() -> str:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.05)
+            raise ConnectionError("reset")
+        await asyncio.sleep(0.1)
+        return "second"
+
+    assert await hedged(flaky, 0.01, _funded_budget(), HedgeStats(holdback=0)) == "second"
+
+    async def broken() -> str:
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        await hedged(broken, 0.01, _funded_budget(), HedgeStats(holdback=0))
+
+
+async def test_held_back_calls_are_the_baseline_for_the_p99_gain():
+    stats = HedgeStats(holdback=1.0)
+    call = SlowThenFast(first_seconds=0.1)
+
+    await hedged(call, 0.01, _funded_budget(), stats)
+
+    assert call.started == 1  # Never hedged
+    assert stats.report()["samples"] == {"hedged": 0, "holdback": 1}
+
+    stats.hedged_ms.extend([20.0] * 99 + [30.0])
+    stats.holdback_ms.extend([20.0] * 98 + [900.0])
+    report = stats.report()
+    assert report["p99_ms"]["gain"] == report["p99_ms"]["holdback"] - 30.0 > 0
+
+
+async def test_every_launched_attempt_is_reported():
+    reports = []
+
+    assert await hedged(SlowThenFast(), 0.05, _funded_budget(), HedgeStats(holdback=0), reports) == "attempt 2"
+    assert [(report.index, report.outcome) for report in reports] == [(0, CANCELLED), (1, WON)]
+    assert reports[0].latency_ms >= 50 and reports[1].result == "attempt 2"
+
+    async def broken() -> str:
+        raise ConnectionError("reset")
+
+    reports = []
+    with pytest.raises(ConnectionError):
+        await hedged(broken, None, _funded_budget(), HedgeStats(holdback=0), reports)
+    assert [(report.outcome, type(report.error)) for report in reports] == [(FAILED, ConnectionError)]
@@ -0,0 +1,37 @@
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.models import HexUUID, Quote, generate_uuid
+
+
+def test_hex_ids_round_trip_through_native_uuid():
+    column_type = HexUUID()
+    hex_id = generate_uuid()
+
+    bound = column_type.process_bind_param(hex_id, None)
+
+    assert bound.hex == hex_id
+    assert column_type.process_result_value(bound, None) == hex_id
+
+
+def test_uuid_values_are_accepted():
+    value = uuid4()
+
+    assert HexUUID().process_bind_param(value, None) == value
+
+
+def test_malformed_and_non_canonical_ids_bind_null():
+    value = uuid4()
+
+    for alias in ("nonexistent-id", str(value), value.hex.upper(), f"{{{value.hex}}}", f"urn:uuid:{value}", value.hex + "0"):
+        assert HexUUID().process_bind_param(alias, None) is None
+
+
+def test_key_columns_are_native_uuid():
+    ddl = str(CreateTable(Quote.__table__).compile(dialect=postgresql.dialect()))
+
+    assert "id UUID NOT NULL" in ddl
+    assert "supplier_id UUID NOT NULL" in ddl
+    assert "rfq_id UUID NOT NULL" in ddl
@@ -0,0 +1,25 @@
+from scripts.index_audit import find_full_scans
+
+LEADING = {"quotes_pkey": "id", "ix_quotes_rfq_id": "rfq_id", "quote_price_rollups_pkey": "item"}
+
+
+def test_filtered_seq_scan_is_flagged():
+    plan = {"Node Type": "Seq Scan", "Relation Name": "quotes", "Filter": "(rfq_id = $1)"}
+
+    assert list(find_full_scans(plan, LEADING)) == [("quotes", "sequential scan ((rfq_id = $1))")]
+
+
+def test_unfiltered_seq_scan_is_only_flagged_inside_a_join():
+    scan = {"Node Type": "Seq Scan", "Relation Name": "emails"}
+    join = {"Node Type": "Hash Join", "Plans": [{"Node Type": "Hash", "Plans": [scan]}]}
+
+    assert list(find_full_scans(scan, LEADING)) == []
+    assert list(find_full_scans(join, LEADING)) == [("emails", "sequential scan (feeding a join)")]
+
+
+def test_index_scan_without_leading_column_is_flagged():
+    good = {"Node Type": "Index Scan", "Index Name": "ix_quotes_rfq_id", "Index Cond": "(rfq_id = $1)"}
+    bad = {"Node Type": "Index Scan", "Index Name": "quote_price_rollups_pkey", "Index Cond": "(supplier_id = $1)"}
+
+    assert list(find_full_scans(good, LEADING)) == []
+    assert list(find_full_scans(bad, LEADING)) == [("quote_price_rollups_pkey", "used without its leading column item")]
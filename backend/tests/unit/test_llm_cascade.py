@@ -0,0 +1,223 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import llm_client, llm_ledger
+from app.services.hedging import HedgeBudget, HedgeStats
+from app.services.circuit_breaker import HALF_OPEN, OPEN, CircuitBreaker
+from app.services.llm_cascade import ModelTier, assess_extraction
+from app.services.llm_client import ExtractedDataSchema
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+EMAIL = "Almonds at $4.20/lb, MOQ 500 lbs.\n\nAna Ruiz\nana@costanuts.com"
+
+
+def _answer(**overrides) -> dict:
+    answer = {
+        "product": "Almonds", "price_per_pound": 4.2, "country_of_origin": None, "certifications": [],
+        "minimum_order_quantity": 500, "company_name": None, "contact_name": "Ana Ruiz",
+        "supplier_email": "ana@costanuts.com", "supplier_phone": None,
+    }
+    return {**answer, **overrides}
+
+
+class FakeModel:
+    def __init__(self, answer: dict | None = None, error: Exception | None = None, avg_logprobs: float | None = None):
+        self.answer, self.error, self.avg_logprobs = answer, error, avg_logprobs
+        self.calls = 0
+
+    async def generate_content_async(self, contents, generation_config=None):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return SimpleNamespace(
+            text=json.dumps(self.answer),
+            usage_metadata=SimpleNamespace(prompt_token_count=100, candidates_token_count=20),
+            candidates=[SimpleNamespace(avg_logprobs=self.avg_logprobs)],
+        )
+
+
+@pytest.fixture
+def use_tiers(monkeypatch):
+    def install(*models: FakeModel) -> list[ModelTier]:
+        names = ["models/gemini-1.5-flash-8b", "models/gemini-1.5-flash", "models/gemini-1.5-pro"]
+        tiers = [ModelTier(name, model, CircuitBreaker(2, 30)) for name, model in zip(names, models)]
+        monkeypatch.setattr(llm_client, "tiers", tiers)
+        monkeypatch.setattr(llm_client, "gemini_model", tiers[0].model)
+        return tiers
+
+    return install
+
+
+async def test_the_cheapest_tier_serves_a_sound_answer(use_tiers):
+    tiers = use_tiers(FakeModel(_answer()), FakeModel(_answer()))
+
+    extracted, usage = await llm_client.extract_quote_data_with_usage(EMAIL)
+
+    assert extracted.price_per_pound == 4.2
+    assert (usage.model, usage.tier) == ("models/gemini-1.5-flash-8b", 0)
+    assert tiers[1].model.calls == 0
+    assert tiers[0].stats.served == 1
+    assert usage.cost_usd == pytest.approx((100 * 0.0375 + 20 * 0.15) / 1_000_000)
+
+
+async def test_a_missed_price_escalates_to_the_next_tier(use_tiers):
+    tiers = use_tiers(FakeModel(_answer(price_per_pound=None)), FakeModel(_answer()))
+
+    extracted, usage = await llm_client.extract_quote_data_with_usage(EMAIL)
+
+    assert extracted.price_per_pound == 4.2
+    assert usage.tier == 1
+    assert (usage.input_tokens, usage.output_tokens) == (200, 40)  # Both attempts are paid for
+    assert tiers[0].stats.escalated == 1 and tiers[1].stats.served == 1
+
+
+async def test_low_confidence_escalates(use_tiers):
+    use_tiers(FakeModel(_answer(), avg_logprobs=-1.0), FakeModel(_answer(), avg_logprobs=-0.01))
+
+    _, usage = await llm_client.extract_quote_data_with_usage(EMAIL)
+
+    assert usage.tier == 1
+
+
+async def test_the_last_tier_falls_back_to_the_best_earlier_answer(use_tiers):
+    use_tiers(FakeModel(_answer(price_per_pound=None)), FakeModel(error=TimeoutError()))
+
+    extracted, usage = await llm_client.extract_quote_data_with_usage(EMAIL)
+
+    assert usage.tier == 0 and extracted.product == "Almonds"
+
+
+async def test_failures_open_the_circuit_and_later_calls_skip_the_tier(use_tiers):
+    tiers = use_tiers(FakeModel(error=ConnectionError("down")), FakeModel(_answer()))
+
+    for _ in range(3):
+        _, usage = await llm_client.extract_quote_data_with_usage(EMAIL)
+        assert usage.tier == 1
+
+    assert tiers[0].breaker.state == OPEN
+    assert tiers[0].model.calls == 2  # The third request didn't wait on the failing tier
+    assert tiers[0].stats.failed == 2 and tiers[0].stats.skipped_open == 1
+    assert tiers[0].report()["circuit"] == OPEN
+
+
+class HangingModel(FakeModel):
+    async def generate_content_async(self, contents, generation_config=None):
+        self.calls += 1
+        await asyncio.Event().wait()
+
+
+async def test_a_cancelled_probe_lets_the_next_call_probe(use_tiers):
+    tiers = use_tiers(HangingModel())
+    for _ in range(2):
+        tiers[0].breaker.record_failure()
+    tiers[0].breaker.cooldown_seconds = 0  # Half-open straight away
+
+    probe = asyncio.create_task(llm_client.extract_quote_data_with_usage(EMAIL))
+    while not tiers[0].model.calls:
+        await asyncio.sleep(0)
+    assert not tiers[0].breaker.allow()  # The probe is out
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert tiers[0].breaker.state == HALF_OPEN
+    assert tiers[0].breaker.allow()
+
+
+async def test_a_cancelled_call_from_before_the_circuit_opened_leaves_the_probe_alone(use_tiers):
+    tiers = use_tiers(HangingModel())
+    earlier = asyncio.create_task(llm_client.extract_quote_data_with_usage(EMAIL))
+    while not tiers[0].model.calls:
+        await asyncio.sleep(0)
+    for _ in range(2):
+        tiers[0].breaker.record_failure()
+    tiers[0].breaker.cooldown_seconds = 0  # Half-open straight away
+
+    probe = asyncio.create_task(llm_client.extract_quote_data_with_usage(EMAIL))
+    while tiers[0].model.calls < 2:
+        await asyncio.sleep(0)
+    earlier.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await earlier
+
+    assert tiers[0].breaker.state == HALF_OPEN
+    assert not tiers[0].breaker.allow()  # Still waiting on the probe, not letting a second one through
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert tiers[0].breaker.allow()
+
+async def test_every_circuit_open_is_a_503(use_tiers):
+    tiers = use_tiers(FakeModel(_answer()))
+    for _ in range(2):
+        tiers[0].breaker.record_failure()
+
+    with pytest.raises(HTTPException) as error:
+        await llm_client.extract_quote_data_with_usage(EMAIL)
+
+    assert error.value.status_code == 503
+
+
+async def test_assessment_flags_an_invented_supplier_email():
+    extracted = ExtractedDataSchema(**_answer(supplier_email="sales@example.com"))
+
+    assert assess_extraction(extracted, EMAIL) == ["supplier email not in the text"]
+    assert assess_extraction(ExtractedDataSchema(**_answer(price_per_pound=48000)), EMAIL) == ["implausible price"]
+
+
+async def test_every_attempt_is_recorded_with_its_outcome(use_tiers, monkeypatch):
+    ledger = llm_ledger.LLMLedger(batch_size=1000, flush_seconds=3600, max_pending=1000)
+    ledger.start()
+    monkeypatch.setattr(llm_ledger, "llm_ledger", ledger)
+    use_tiers(FakeModel(error=ConnectionError("down")), FakeModel(_answer(price_per_pound=None)), FakeModel(_answer()))
+
+    await llm_client.extract_quote_data_with_usage(EMAIL)
+    ledger._task.cancel()
+
+    assert [(row["model"], row["outcome"]) for row in ledger.pending] == [
+        ("models/gemini-1.5-flash-8b", llm_ledger.ERROR),
+        ("models/gemini-1.5-flash", llm_ledger.REJECTED),
+        ("models/gemini-1.5-pro", llm_ledger.SERVED),
+    ]
+    assert ledger.pending[2]["input_tokens"] == 100 and ledger.pending[2]["cost_usd"] > 0
+
+
+class SlowFirstModel(FakeModel):
+    """The first call hangs until cancelled; later ones answer at once."""
+
+    async def generate_content_async(self, contents, generation_config=None):
+        if self.calls == 0:
+            self.calls += 1
+            await asyncio.Event().wait()
+        return await super().generate_content_async(contents, generation_config)
+
+
+async def test_a_hedged_calls_cancelled_attempt_is_recorded_and_costed(use_tiers, monkeypatch):
+    ledger = llm_ledger.LLMLedger(batch_size=1000, flush_seconds=3600, max_pending=1000)
+    ledger.start()
+    monkeypatch.setattr(llm_ledger, "llm_ledger", ledger)
+    budget = HedgeBudget(ratio=1.0)
+    budget.earn()
+    monkeypatch.setattr(llm_client, "hedge_budget", budget)
+    monkeypatch.setattr(llm_client, "hedge_stats", HedgeStats(holdback=0))
+    monkeypatch.setattr(llm_client, "_hedge_delay", lambda tier: 0.01)
+    tiers = use_tiers(SlowFirstModel(_answer()))
+
+    _, usage = await llm_client.extract_quote_data_with_usage(EMAIL)
+    ledger._task.cancel()
+
+    # The hedge answered; the first attempt was cancelled, but its prompt was billed
+    assert tiers[0].model.calls == 2
+    assert sorted((row["outcome"], row["input_tokens"], row["output_tokens"]) for row in ledger.pending) == [
+        (llm_ledger.CANCELLED, 100, 0),
+        (llm_ledger.SERVED, 100, 20),
+    ]
+    assert (usage.input_tokens, usage.output_tokens) == (200, 20)
+    assert usage.cost_usd == pytest.approx((200 * 0.0375 + 20 * 0.15) / 1_000_000)
+    assert tiers[0].stats.input_tokens == 200 and tiers[0].stats.attempts == 1
@@ -0,0 +1,74 @@
+import pytest
+
+from app.services import llm_ledger
+from app.services.llm_ledger import CallGroup, LLMLedger
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def ledger(monkeypatch):
+    """A running ledger that never flushes, so the tests can read what it buffered."""
+    ledger = LLMLedger(batch_size=1000, flush_seconds=3600, max_pending=5)
+    ledger.start()
+    monkeypatch.setattr(llm_ledger, "llm_ledger", ledger)
+    yield ledger
+    ledger._task.cancel()
+
+
+def _call(**overrides):
+    llm_ledger.record_call(**{"operation": llm_ledger.EXTRACT, "model": "m", "outcome": llm_ledger.SERVED, "latency_ms": 10.0, **overrides})
+
+
+async def test_calls_are_booked_against_what_they_were_for(ledger):
+    with llm_ledger.recording():
+        _call(input_tokens=101, output_tokens=10, cost_usd=0.3)
+        llm_ledger.attribute(email_id="e1", quote_id="q1", rfq_id="r1", supplier_id="s1")
+        llm_ledger.attribute(email_id="e2", quote_id="q2", rfq_id="r2", supplier_id="s1")
+        assert ledger.pending == []  # Held until the work is done
+
+    rows = ledger.pending
+    assert [row["quote_id"] for row in rows] == ["q1", "q2"]
+    assert rows[0]["call_id"] == rows[1]["call_id"]
+    # An extraction feeding two quotes is split between them
+    assert [row["input_tokens"] for row in rows] == [51, 50]
+    assert sum(row["cost_usd"] for row in rows) == pytest.approx(0.3)
+
+
+async def test_unattributed_calls_are_still_recorded(ledger):
+    _call(outcome=llm_ledger.TIMEOUT)
+    with llm_ledger.recording():
+        _call()
+
+    assert [(row["outcome"], row["quote_id"]) for row in ledger.pending] == [(llm_ledger.TIMEOUT, None), (llm_ledger.SERVED, None)]
+
+
+async def test_a_group_can_span_separate_blocks(ledger):
+    group = CallGroup()
+    with llm_ledger.recording(group):
+        _call()
+    with llm_ledger.recording(group):
+        llm_ledger.attribute(quote_id="q1")
+    assert ledger.pending == []
+
+    group.close()
+    group.close()
+
+    assert [row["quote_id"] for row in ledger.pending] == ["q1"]
+
+
+async def test_the_buffer_drops_the_oldest_rows_past_its_limit(ledger):
+    for latency in range(7):
+        _call(latency_ms=float(latency))
+
+    assert [row["latency_ms"] for row in ledger.pending] == [2.0, 3.0, 4.0, 5.0, 6.0]
+    assert ledger.dropped == 2
+
+
+async def test_nothing_is_recorded_while_the_ledger_is_stopped():
+    stopped = LLMLedger(batch_size=10, flush_seconds=1, max_pending=10)
+
+    stopped.append([{"model": "m"}])
+
+    assert stopped.pending == []
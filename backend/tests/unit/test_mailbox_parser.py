@@ -0,0 +1,97 @@
+import datetime
+import mailbox
+from pathlib import Path
+
+import pytest
+
+from app.services.mailbox_ingest import FAILED, SAVED, Checkpoint
+from app.services.mailbox_parser import html_to_text, iter_raw_messages, parse_batch, parse_message
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures" / "mail"
+
+
+def _maildir(tmp_path: Path) -> Path:
+    box = mailbox.Maildir(tmp_path / "Maildir", create=True)
+    for path in sorted((FIXTURES / "eml").glob("*.eml")):
+        box.add(path.read_bytes())
+    box.close()
+    return tmp_path / "Maildir"
+
+
+async def test_every_source_kind_yields_the_same_messages(tmp_path: Path):
+    from_eml = {m.message_id for m in parse_batch(list(iter_raw_messages(FIXTURES / "eml")))}
+    from_maildir = {m.message_id for m in parse_batch(list(iter_raw_messages(_maildir(tmp_path))))}
+    from_mbox = [m.message_id for m in parse_batch(list(iter_raw_messages(FIXTURES / "quotes.mbox")))]
+
+    assert len(from_eml) == 3
+    assert from_maildir == from_eml
+    assert len(from_mbox) == 4  # The mbox repeats the first message
+    assert "<quote-001@costanuts.com>" in from_eml
+
+
+async def test_plain_text_message_headers_and_body():
+    message = parse_message((FIXTURES / "eml" / "01-quote.eml").read_bytes())
+
+    assert message.error is None
+    assert message.sender_email == "ana@costanuts.com"
+    assert message.sender_name == "Ana Costa"
+    assert message.subject == "Quote: Almonds"
+    assert message.received_at == datetime.datetime(2025, 6, 3, 7, 15, tzinfo=datetime.UTC)
+    assert "$4.20/lb" in message.body
+    assert message.extraction_text().startswith("From: Ana Costa <ana@costanuts.com>\nSubject: Quote: Almonds\n\n")
+
+
+async def test_html_only_reply_is_converted_and_threaded():
+    message = parse_message((FIXTURES / "eml" / "02-reply.eml").read_bytes())
+
+    assert message.body == "We can do $4.05/lb for 2,000 lbs.\n\nBest,\nAna"
+    assert message.thread_ids == ["<buyer-reply-001@waystation.example>", "<quote-001@costanuts.com>"]
+
+
+async def test_missing_message_id_gets_a_stable_one_and_charset_is_honoured():
+    raw = (FIXTURES / "eml" / "03-no-message-id.eml").read_bytes()
+
+    first, second = parse_message(raw), parse_message(raw)
+
+    assert first.message_id == second.message_id
+    assert first.message_id.endswith("@ingest.local>")
+    assert "España" in first.body
+
+
+async def test_broken_input_does_not_raise():
+    message = parse_message(b"\xff\xfe not an email at all")
+
+    assert message.message_id.endswith("@ingest.local>")
+    assert message.sender_email is None
+    assert message.body.endswith("not an email at all")
+
+
+async def test_html_to_text_drops_styles_and_keeps_paragraphs():
+    text = html_to_text("<style>p{}</style><p>Price:&nbsp;$3/lb</p><div>MOQ   100</div>")
+
+    assert text == "Price: $3/lb\n\nMOQ 100"
+
+
+async def test_checkpoint_resumes_skips_torn_lines_and_retries_failures(tmp_path: Path):
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = Checkpoint(path)
+    checkpoint.note({"message_id": "<a>", "status": SAVED, "rfq_id": "rfq-1"})
+    checkpoint.note({"message_id": "<b>", "status": FAILED, "error": "timeout"})
+    checkpoint.flush()
+    with path.open("a") as f:
+        f.write('{"message_id": "<c>", "sta')  # Crash mid-write
+
+    resumed = Checkpoint(path)
+
+    assert resumed.is_settled("<a>")
+    assert not resumed.is_settled("<b>")
+    assert not resumed.is_settled("<c>")
+    assert resumed.rfq_for_thread(["<unknown>", "<a>"]) == "rfq-1"
+
+    # New records after the torn line still read back
+    resumed.note({"message_id": "<b>", "status": SAVED})
+    resumed.flush()
+    assert Checkpoint(path).is_settled("<b>")
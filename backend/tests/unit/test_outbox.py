@@ -0,0 +1,68 @@
+import datetime
+import gzip
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services.outbox import OutboxDispatcher, batch_body, retry_delay
+
+
+def _dispatcher() -> OutboxDispatcher:
+    return OutboxDispatcher(batch_size=10, poll_seconds=1, timeout_seconds=1, retry_base_seconds=1, retry_max_seconds=60)
+
+
+def test_retry_delay_doubles_with_jitter_up_to_the_cap():
+    for attempts, full in [(1, 1), (2, 2), (4, 8), (7, 60), (30, 60)]:
+        delays = [retry_delay(attempts, 1, 60) for _ in range(50)]
+        assert all(full / 2 <= delay <= full for delay in delays)
+
+
+def test_batch_body_is_gzipped_json_of_the_events():
+    created = datetime.datetime(2026, 10, 20, 9, 30, tzinfo=datetime.UTC)
+    rows = [
+        SimpleNamespace(id=7, event_id="a" * 32, tenant_id="acme", event_type="rfq.created", rfq_id="r" * 32, created_at=created, payload={"item": "Oats"}),
+        SimpleNamespace(id=9, event_id="b" * 32, tenant_id="acme", event_type="quote.created", rfq_id="r" * 32, created_at=created, payload={"quote_id": "q"}),
+    ]
+
+    events = json.loads(gzip.decompress(batch_body(rows)))["events"]
+
+    assert [(event["sequence"], event["type"]) for event in events] == [(7, "rfq.created"), (9, "quote.created")]
+    assert events[0]["occurred_at"] == "2026-10-20T09:30:00+00:00"
+    assert events[0]["tenant_id"] == "acme"
+    assert events[1]["data"] == {"quote_id": "q"}
+
+
+@pytest.mark.asyncio
+async def test_deliver_reports_rejections_and_transport_errors():
+    dispatcher = _dispatcher()
+    seen = []
+
+    def respond(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["content-encoding"])
+        if request.url.path == "/down":
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(204 if request.url.path == "/events" else 503, text="busy")
+
+    dispatcher._client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+    body = batch_body([])
+
+    assert await dispatcher.deliver("http://erp.test/events", body) is None
+    assert await dispatcher.deliver("http://erp.test/busy", body) == "HTTP 503: busy"
+    assert (await dispatcher.deliver("http://erp.test/down", body)).startswith("ConnectError")
+    assert seen == ["gzip"] * 3
+    await dispatcher._client.aclose()
+
+
+def test_only_committed_enqueues_wake_the_dispatcher():
+    dispatcher = _dispatcher()
+    woken = []
+    dispatcher.wake = lambda: woken.append(True)
+
+    dispatcher._after_rollback(SimpleNamespace(info={"outbox.pending_wake": True}))
+    dispatcher._after_commit(SimpleNamespace(info={}))
+    assert woken == []
+
+    dispatcher._after_commit(SimpleNamespace(info={"outbox.pending_wake": True}))
+    assert woken == [True]
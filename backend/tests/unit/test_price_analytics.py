@@ -0,0 +1,49 @@
+import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.services.price_analytics import merge_rollups, observe_quote, price_bucket
+
+
+def _rollup(prices: list[str]) -> SimpleNamespace:
+    decimals = [Decimal(p) for p in prices]
+    histogram: dict[str, int] = {}
+    for price in decimals:
+        histogram[price_bucket(price)] = histogram.get(price_bucket(price), 0) + 1
+    return SimpleNamespace(
+        quote_count=len(decimals),
+        price_sum=sum(decimals),
+        price_min=min(decimals),
+        price_max=max(decimals),
+        price_histogram=histogram,
+    )
+
+
+def test_merge_rollups_combines_groups():
+    stats = merge_rollups([_rollup(["2.00", "2.50"]), _rollup(["3.00", "10.00"])])
+
+    assert stats.quote_count == 4
+    assert stats.average == 4.375
+    assert stats.minimum == 2.0
+    assert stats.maximum == 10.0
+
+
+def test_percentiles_are_within_bucket_error_and_observed_range():
+    prices = [f"{2 + i / 100:.2f}" for i in range(100)]  # 2.00 .. 2.99
+    stats = merge_rollups([_rollup(prices)])
+
+    assert abs(stats.p50 - 2.49) / 2.49 < 0.03
+    assert abs(stats.p90 - 2.89) / 2.89 < 0.03
+    assert 2.0 <= stats.p95 <= 2.99
+
+
+def test_observe_quote_skips_unpriced_and_buckets_by_utc_month():
+    submitted = datetime.datetime(2026, 3, 31, 23, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=-5)))
+    quote = SimpleNamespace(price_per_pound=2.555, date_submitted=submitted, country_of_origin=None, supplier_id="s1")
+
+    obs = observe_quote(quote, "Pea Protein")
+
+    assert obs.month == datetime.date(2026, 4, 1)
+    assert obs.price == Decimal("2.56")
+    assert obs.country_of_origin == ""
+    assert observe_quote(SimpleNamespace(price_per_pound=None, date_submitted=submitted), "Pea Protein") is None
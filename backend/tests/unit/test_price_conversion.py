@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from app.services.llm_client import ExtractedDataSchema, QuoteLineItemSchema
+from app.services.price_conversion import (
+    BUILTIN_TABLE,
+    POUNDS_PER_UNIT,
+    ConversionTable,
+    canonical_currency,
+    canonical_unit,
+    normalize_price,
+)
+
+TABLE = ConversionTable(version=3, usd_per_currency={"USD": Decimal("1"), "EUR": Decimal("1.0842")})
+
+
+def _extracted(**price) -> ExtractedDataSchema:
+    return ExtractedDataSchema(
+        product="Cocoa Butter", country_of_origin=None, minimum_order_quantity=None, company_name=None,
+        contact_name=None, supplier_email="a@cocoa.com", supplier_phone=None, **{"price_per_pound": None, **price},
+    )
+
+
+def test_codes_are_canonicalized():
+    assert canonical_unit("per Tonne") == "mt"
+    assert canonical_unit("/lbs.") == "lb"
+    assert canonical_unit("Short Tons") == "short_ton"
+    assert canonical_unit("bag") is None
+    assert canonical_currency("€") == "EUR"
+    assert canonical_currency(" Canadian dollars ") == "CAD"
+    assert canonical_currency("sek") == "SEK"  # Any ISO-looking code
+    assert canonical_currency("bitcoin") is None
+
+
+def test_convert_rounds_to_cents_like_the_database():
+    assert TABLE.convert(850, "EUR", "mt") == Decimal("0.42")  # 850 × 1.0842 / 2204.62…
+    assert TABLE.convert(9.26, "USD", "kg") == Decimal("4.20")
+    assert TABLE.convert(1, "GBP", "lb") is None
+    assert set(TABLE.pounds_per_unit) == set(POUNDS_PER_UNIT)
+
+
+def test_price_as_quoted_wins_and_defaults_to_usd_per_pound():
+    converted = normalize_price(_extracted(price_amount=850, price_currency="€", price_unit="tonne", price_per_pound=9.99), TABLE)
+    assert (converted.price_per_pound, converted.price_currency, converted.price_unit, converted.conversion_version) == (0.42, "EUR", "mt", 3)
+
+    bare = normalize_price(_extracted(price_amount=4.2), TABLE)
+    assert (bare.price_per_pound, bare.price_currency, bare.price_unit) == (4.2, "USD", "lb")
+
+
+def test_price_per_pound_alone_is_stored_as_usd_per_pound():
+    price = normalize_price(QuoteLineItemSchema(product="Cocoa Butter", price_per_pound=3.15, country_of_origin=None, minimum_order_quantity=None), BUILTIN_TABLE)
+    assert (price.price_per_pound, price.price_amount, price.price_currency, price.price_unit) == (3.15, 3.15, "USD", "lb")
+    assert price.conversion_version is None
+
+    assert normalize_price(_extracted(), TABLE).price_per_pound is None
+
+
+def test_unconvertible_prices_keep_their_raw_fields():
+    no_rate = normalize_price(_extracted(price_amount=3.8, price_currency="GBP", price_unit="kg"), TABLE)
+    assert (no_rate.price_per_pound, no_rate.price_amount, no_rate.price_currency, no_rate.price_unit) == (None, 3.8, "GBP", "kg")
+
+    unknown_unit = normalize_price(_extracted(price_amount=120, price_currency="USD", price_unit="Bag"), TABLE)
+    assert (unknown_unit.price_per_pound, unknown_unit.price_unit, unknown_unit.conversion_version) == (None, "bag", None)
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import asyncpg
+import pytest
+
+from app.services.quote_events import QUOTE_CREATED, RESYNC, QuoteEventBroker
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+def _payload(rfq_id: str, quote_id: str) -> str:
+    return json.dumps({"type": QUOTE_CREATED, "rfq_id": rfq_id, "quote_id": quote_id})
+
+
+async def test_dispatch_only_reaches_subscribers_of_the_rfq():
+    broker = QuoteEventBroker()
+    with broker.subscribe("rfq-1") as first, broker.subscribe("rfq-2") as second:
+        broker.dispatch(_payload("rfq-1", "quote-1"))
+
+        assert (await first.get())["quote_id"] == "quote-1"
+        assert second.empty()
+
+
+async def test_unsubscribe_removes_rfq_entry():
+    broker = QuoteEventBroker()
+    with broker.subscribe("rfq-1"):
+        pass
+
+    broker.dispatch(_payload("rfq-1", "quote-1"))  # No subscribers left; must not raise
+    assert broker._subscribers == {}
+
+
+async def test_full_queue_collapses_into_resync():
+    broker = QuoteEventBroker(queue_size=2)
+    with broker.subscribe("rfq-1") as queue:
+        for i in range(3):
+            broker.dispatch(_payload("rfq-1", f"quote-{i}"))
+
+        assert queue.qsize() == 1
+        assert (await queue.get())["type"] == RESYNC
+
+
+async def test_listener_reconnects_after_any_error(monkeypatch):
+    attempts = []
+
+    async def failing_connect(dsn):
+        attempts.append(dsn)
+        raise (asyncpg.InterfaceError("connection is closed") if len(attempts) == 1 else RuntimeError("unexpected"))
+
+    monkeypatch.setattr(asyncpg, "connect", failing_connect)
+    broker = QuoteEventBroker(reconnect_delay=0.001, max_reconnect_delay=0.002)
+    await broker.start("postgresql+asyncpg://user:secret@db/waystation")
+    while len(attempts) < 3:
+        await asyncio.sleep(0.001)
+
+    assert not broker._task.done()
+    await broker.stop()
@@ -0,0 +1,39 @@
+import pytest
+
+from app.models import RFQ
+from app.services.llm_client import ExtractedDataSchema, MultiItemExtractionSchema, QuoteLineItemSchema
+from app.services.quote_processor import match_line_items
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+def _line(product: str, price: float) -> QuoteLineItemSchema:
+    return QuoteLineItemSchema(product=product, price_per_pound=price, country_of_origin=None, certifications=[], minimum_order_quantity=None)
+
+
+def _extraction(*lines: QuoteLineItemSchema) -> MultiItemExtractionSchema:
+    return MultiItemExtractionSchema(
+        items=list(lines), company_name="Costa Nuts Inc.", contact_name="Ana", supplier_email="ana@costanuts.com", supplier_phone=None
+    )
+
+
+async def test_line_items_match_the_most_specific_open_rfq_once():
+    rfqs = [RFQ(id="r1", item="Pea Protein"), RFQ(id="r2", item="Organic Pea Protein"), RFQ(id="r3", item="Almonds")]
+    extraction = _extraction(
+        _line("Organic Pea Protein 80%", 4.1), _line("almonds", 4.2), _line("Almonds, Nonpareil", 4.3), _line("Cashews", 6.0)
+    )
+
+    matches = match_line_items(extraction, rfqs)
+
+    assert [match.rfq.id if match.rfq else None for match in matches] == ["r2", "r3", None, None]
+    assert matches[0].extracted.supplier_email == "ana@costanuts.com"  # Supplier details carry over to every line
+
+
+async def test_a_single_extraction_becomes_one_line_item():
+    single = ExtractedDataSchema(
+        product="Almonds", price_per_pound=4.2, country_of_origin="Spain", certifications=["Organic"], minimum_order_quantity=500,
+        company_name=None, contact_name=None, supplier_email="ana@costanuts.com", supplier_phone=None,
+    )
+
+    assert MultiItemExtractionSchema.from_single(single).to_quotes() == [single]
@@ -0,0 +1,86 @@
+import fnmatch
+
+import pytest
+
+from app.services.response_cache import LRUCacheBackend, RedisCacheBackend, ResponseCache
+from app.services.tenancy import tenant_key
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis.asyncio client surface the backend uses."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+
+async def test_lru_evicts_least_recently_used_entry():
+    backend = LRUCacheBackend(max_entries=2, max_bytes=1024, ttl_seconds=60)
+    await backend.set("a", b"1")
+    await backend.set("b", b"2")
+    await backend.get("a")  # "a" is now the most recently used
+    await backend.set("c", b"3")
+
+    assert await backend.get("b") is None
+    assert await backend.get("a") == b"1"
+    assert await backend.get("c") == b"3"
+
+
+async def test_lru_respects_byte_budget():
+    backend = LRUCacheBackend(max_entries=100, max_bytes=10, ttl_seconds=60)
+    await backend.set("a", b"x" * 6)
+    await backend.set("b", b"y" * 6)
+    await backend.set("too-big", b"z" * 11)
+
+    assert await backend.get("a") is None
+    assert await backend.get("b") == b"y" * 6
+    assert await backend.get("too-big") is None
+
+
+async def test_redis_backend_prefix_invalidation():
+    backend = RedisCacheBackend(FakeRedis(), ttl_seconds=60)
+    await backend.set("rfqs", b"list")
+    await backend.set("rfq:1", b"one")
+    await backend.set("rfq:2", b"two")
+
+    await backend.delete_prefix("rfq:")
+
+    assert await backend.get("rfqs") == b"list"
+    assert await backend.get("rfq:1") is None
+    assert await backend.get("rfq:2") is None
+
+
+async def test_cache_round_trips_etag_and_body():
+    cache = ResponseCache(RedisCacheBackend(FakeRedis(), ttl_seconds=60))
+    await cache.backend.set(tenant_key("rfqs"), b'"abc"\n[{"id": "1"}]')
+
+    cached = await cache.get("rfqs", '"abc"')
+
+    assert cached.etag == '"abc"'
+    assert cached.body == b'[{"id": "1"}]'
+
+
+async def test_cache_skips_entries_stored_at_an_older_etag():
+    """Another worker may have committed a change this process never heard about: its new ETag retires the entry."""
+    cache = ResponseCache(LRUCacheBackend(max_entries=10, max_bytes=1024, ttl_seconds=60))
+    await cache.backend.set(tenant_key("rfqs"), b'"v1"\n[]')
+
+    assert await cache.get("rfqs", '"v2"') is None
+    assert (await cache.get("rfqs", '"v1"')).body == b"[]"
@@ -0,0 +1,17 @@
+from sqlalchemy import DDL
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app import models
+
+# The DDL texts create_all runs after creating tables (e.g. EMAIL_BODY_COMPRESSION_DDL)
+SCHEMA_DDL = {name: value for name, value in vars(models).items() if name.endswith("_DDL") and isinstance(value, str)}
+
+
+def test_after_create_ddl_compiles_to_the_intended_sql():
+    """DDL() text is %-formatted when compiled, so a lone % (as in RAISE NOTICE) must be written %%."""
+    assert "EMAIL_BODY_COMPRESSION_DDL" in SCHEMA_DDL
+    for name, text in SCHEMA_DDL.items():
+        compiled = str(DDL(text).compile(dialect=asyncpg.dialect()))  # Raises on a lone %
+        assert compiled == text.replace("%%", "%"), name
+
+    assert "server default: %'" in str(DDL(models.EMAIL_BODY_COMPRESSION_DDL).compile(dialect=asyncpg.dialect()))
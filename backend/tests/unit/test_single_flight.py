@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+
+async def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flights.run("key", work) for _ in range(5)))
+
+    assert calls == 1
+    assert results == [1] * 5
+    assert not flights.in_flight("key")
+
+    # Once finished, the key runs afresh
+    assert await flights.run("key", work) == 2
+
+
+async def test_exception_reaches_every_waiter_and_other_keys_run_separately():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def succeed():
+        return "ok"
+
+    results = await asyncio.gather(flights.run("a", fail), flights.run("a", fail), flights.run("b", succeed), return_exceptions=True)
+
+    assert [type(r) for r in results[:2]] == [ValueError, ValueError]
+    assert results[2] == "ok"
+
+
+async def test_cancelled_caller_does_not_cancel_the_shared_work():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flights.run("key", work))
+    second = asyncio.create_task(flights.run("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
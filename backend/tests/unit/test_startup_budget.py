@@ -0,0 +1,12 @@
+from scripts.profile_startup import STARTUP_BUDGET_SECONDS, measure_init_app
+
+
+def test_init_app_does_not_import_lazy_modules():
+    assert measure_init_app().lazy_modules_loaded == []
+
+
+def test_init_app_stays_within_startup_budget():
+    # Best of three, so one slow run on a busy CI box doesn't fail the build
+    fastest = min(measure_init_app().seconds for _ in range(3))
+
+    assert fastest <= STARTUP_BUDGET_SECONDS, f"init_app() took {fastest:.2f}s (budget {STARTUP_BUDGET_SECONDS}s); run scripts/profile_startup.py"
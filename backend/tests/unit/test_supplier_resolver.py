@@ -0,0 +1,81 @@
+import pytest
+
+from app.models import Supplier
+from app.services.supplier_resolver import (
+    blocking_tokens,
+    email_domain,
+    name_similarity,
+    normalize_company_name,
+    rank_candidates,
+)
+
+# Mark the test file as requiring the asyncio test runner
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+def suppliers(fake_company_names) -> list[Supplier]:
+    """Five thousand suppliers with made-up names."""
+    return [
+        Supplier(company_name=f"{name} Foods Inc.", contact_email=f"sales@supplier{i}.com")
+        for i, name in enumerate(fake_company_names(5000, seed=7))
+    ]
+
+
+async def test_names_normalize_without_legal_suffixes():
+    assert normalize_company_name("Costa Nuts, Inc.") == normalize_company_name("COSTA NUTS LLC") == "costa nuts"
+    assert blocking_tokens("The Costa Nuts Trading Co.") == ["costa", "nuts"]
+    assert email_domain("Ana@CostaNuts.com") == "costanuts.com"
+    assert email_domain("not-an-email") is None
+
+
+async def test_similarity_tolerates_typos_but_not_different_companies():
+    assert name_similarity("Costa Nuts", "Costa Nutz Ltd") > 0.6
+    assert name_similarity("Costa Nuts", "Sierra Dairy") < 0.1
+    assert name_similarity("Costa Nuts", None) == 0.0
+
+
+async def test_new_contact_at_known_domain_matches_the_supplier():
+    known = Supplier(company_name="Costa Nuts Inc.", contact_email="ana@costanuts.com")
+    other = Supplier(company_name="Costa Dairy", contact_email="hi@costadairy.com")
+
+    best = rank_candidates([other, known], "luis@costanuts.com", "Costa Nuts")[0]
+
+    assert best.supplier is known
+    assert best.matched_on == "domain"
+    assert best.confidence == 1.0
+
+
+async def test_shared_mail_domains_fall_back_to_the_name():
+    known = Supplier(company_name="Costa Nuts Inc.", contact_email="ana@gmail.com")
+
+    best = rank_candidates([known], "luis@gmail.com", "Coasta Nuts")[0]
+
+    assert best.matched_on == "name"
+    assert 0 < best.confidence < 0.9
+
+
+async def test_exact_email_wins_among_thousands_of_candidates(suppliers: list[Supplier]):
+    target = suppliers[4321]
+
+    matches = rank_candidates(suppliers, target.contact_email, "Unrelated Name")
+
+    assert matches[0].supplier is target
+    assert matches[0].confidence == 1.0
+    assert [match.matched_on for match in matches].count("email") == 1
+
+
+async def test_blocking_tokens_shrink_the_candidate_set(suppliers: list[Supplier]):
+    """
+    Mirrors the blocking query in memory: only suppliers sharing a distinctive name token are scored,
+    and the right one still comes out on top.
+    """
+    target = suppliers[1234]
+    query_name = target.company_name.replace(" Foods Inc.", " Foods LLC")
+    tokens = set(blocking_tokens(query_name))
+
+    candidates = [s for s in suppliers if tokens & set(blocking_tokens(s.company_name))]
+    best = rank_candidates(candidates, "buyer@gmail.com", query_name)[0]
+
+    assert best.supplier is target
+    assert best.confidence > 0.9
+    assert len(candidates) < 50
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.models import RFQ, Quote, Supplier
+from app.services.tenancy import (
+    TenantLimits,
+    TenantMiddleware,
+    all_tenants,
+    current_tenant,
+    hash_api_key,
+    tenant_key,
+    tenant_limits,
+    tenant_registry,
+    tenant_scope,
+)
+
+
+def _executed_sql(statement) -> str:
+    """Runs `statement` through an ORM session and returns the SQL sent (the tables don't exist, so it fails)."""
+    engine = create_engine("sqlite://")
+    sent = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: sent.append(sql))
+    with Session(engine) as session:
+        with pytest.raises(OperationalError):
+            session.execute(statement)
+    return sent[0]
+
+
+def test_orm_queries_are_filtered_to_the_current_tenant():
+    with tenant_scope("acme"):
+        sql = _executed_sql(select(Quote).join(Quote.supplier))
+    assert "quotes.tenant_id = ?" in sql
+    assert "suppliers.tenant_id = ?" in sql
+
+    with tenant_scope("acme"):
+        assert "rfqs.tenant_id = ?" in _executed_sql(update(RFQ).values(item="Oats"))
+
+
+def test_all_tenants_lifts_the_filter():
+    with all_tenants():
+        assert "WHERE" not in _executed_sql(select(Supplier))
+        with pytest.raises(ValueError):
+            current_tenant()
+
+
+def test_new_rows_and_keys_belong_to_the_current_tenant():
+    assert current_tenant() == "default"
+    with tenant_scope("acme"):
+        assert RFQ.__table__.c.tenant_id.default.arg(None) == "acme"
+        assert tenant_key("rfqs") == "acme/rfqs"
+    assert tenant_key("rfqs") == "default/rfqs"
+
+
+@pytest.mark.asyncio
+async def test_db_slots_cap_each_tenant_and_are_reentrant():
+    limits = TenantLimits(llm_share=0.5, db_share=0.5)
+    limits.set_shares("acme", db_share=0.1)  # 2 of the default 15 connections
+    running, peak = 0, 0
+
+    async def request():
+        nonlocal running, peak
+        with tenant_scope("acme", limited=True):
+            async with limits.db_slot():
+                running += 1
+                peak = max(peak, running)
+                async with limits.db_slot():  # A second session in the same request doesn't wait
+                    await asyncio.sleep(0.01)
+                running -= 1
+
+    await asyncio.wait_for(asyncio.gather(*(request() for _ in range(6))), timeout=1)
+
+    assert limits.db_limit("acme") == 2
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_slots_are_free_outside_a_limited_scope():
+    limits = TenantLimits(llm_share=0.5, db_share=0.5)
+    with tenant_scope("acme"):
+        async with limits.llm_slot(), limits.db_slot():
+            pass
+    assert limits._llm == {} and limits._db == {}
+
+
+@pytest.mark.asyncio
+async def test_middleware_runs_requests_as_the_tenant_of_their_api_key(monkeypatch):
+    monkeypatch.setitem(tenant_registry._keys, hash_api_key("acme-key"), ("acme", float("inf")))
+    seen = []
+
+    async def handler(request):
+        seen.append(current_tenant())
+        async with tenant_limits.llm_slot():
+            return PlainTextResponse("ok")
+
+    app = TenantMiddleware(Starlette(routes=[Route("/api/whoami", handler)]))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/api/whoami", headers={"Authorization": "Bearer acme-key"})).status_code == 200
+        assert (await client.get("/api/whoami", params={"api_key": "acme-key"})).status_code == 200  # As EventSource sends it
+        missing = await client.get("/api/whoami", headers={"X-Tenant-ID": "acme"})  # Naming a tenant is not enough
+
+    assert seen == ["acme", "acme"]
+    assert missing.status_code == 401
+    assert missing.json() == {"detail": "Missing API key"}
+    assert missing.headers["www-authenticate"] == "Bearer"
@@ -1,5 +1,6 @@
 // src/api/rfq-api.ts
 import api from "utils/api";
+import { API_KEY, API_URL } from "config";
 import { RFQ, RFQCreatePayload } from "types/rfq";
 import { Quote } from "types/quote";
 
@@ -11,6 +12,15 @@ export const getQuotesForRfq = async (rfqId: string): Promise<Quote[]> => {
   return await api.get<Quote[]>(`/api/rfqs/${rfqId}/quotes`);
 };
 
+/**
+ * URL of the Server-Sent Events stream that pushes quote changes for an RFQ.
+ * EventSource can't send an Authorization header, so the API key goes in the query string.
+ * @param rfqId The ID of the RFQ to subscribe to.
+ */
+export const getQuoteEventsUrl = (rfqId: string): string => {
+  return `${API_URL}/api/rfqs/${rfqId}/quotes/events?api_key=${encodeURIComponent(API_KEY)}`;
+};
+
 export const createRFQ = async (rfqData: RFQCreatePayload): Promise<RFQ> => {
   return await api.post<RFQ>("/api/rfqs", rfqData);
 };
@@ -1,3 +1,4 @@
 const API_URL = "http://localhost:8000"; // Set default immediately
+const API_KEY: string = import.meta.env.VITE_API_KEY ?? ""; // The tenant's key; see backend/scripts/create_tenant.py
 
-export {API_URL}
\ No newline at end of file
+export {API_URL, API_KEY}
\ No newline at end of file
@@ -0,0 +1,27 @@
+// src/hooks/useQuoteEvents.ts
+import { useEffect, useRef } from "react";
+import { getQuoteEventsUrl } from "api/rfq-api";
+
+const QUOTE_EVENT_TYPES = ["quote.created", "quote.updated", "resync"];
+
+/**
+ * Subscribes to live quote events for an RFQ and calls `onChange` whenever a quote
+ * is created or updated, so the caller can refetch instead of polling.
+ * @param rfqId The RFQ to subscribe to. No subscription is opened while empty.
+ * @param onChange Called with the RFQ id on every event.
+ */
+export const useQuoteEvents = (rfqId: string, onChange: (rfqId: string) => void) => {
+  // Keep the latest callback without reopening the stream on every render
+  const onChangeRef = useRef(onChange);
+  onChangeRef.current = onChange;
+
+  useEffect(() => {
+    if (!rfqId) return;
+
+    const source = new EventSource(getQuoteEventsUrl(rfqId));
+    const handleEvent = () => onChangeRef.current(rfqId);
+    QUOTE_EVENT_TYPES.forEach((type) => source.addEventListener(type, handleEvent));
+
+    return () => source.close();
+  }, [rfqId]);
+};
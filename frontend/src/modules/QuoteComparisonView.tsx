@@ -1,6 +1,7 @@
 // src/modules/QuoteComparisonView.tsx
 import { useEffect, useMemo, useState } from "react";
 import { useGetQuotesForRfq } from "hooks/useGetQuotesForRfq";
+import { useQuoteEvents } from "hooks/useQuoteEvents";
 import { RFQ, Certification } from "types/rfq";
 import { Quote } from "types/quote";
 import { FaRegCopy, FaCheck } from "react-icons/fa";
@@ -89,6 +90,9 @@ export default function QuoteComparisonView({ rfq, onBack }: QuoteComparisonView
     fetchQuotes(rfq.id);
   }, [fetchQuotes, rfq.id]);
 
+  // Refetch when the server pushes a quote change for this RFQ
+  useQuoteEvents(rfq.id, fetchQuotes);
+
   const bestPrice = useMemo(() => {
     if (quotes.length === 0) return null;
     return Math.min(...quotes.map((q) => q.price_per_pound || Infinity));
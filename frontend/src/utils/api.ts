@@ -1,4 +1,4 @@
-import { API_URL } from "config";
+import { API_KEY, API_URL } from "config";
 
 // eslint-disable-next-line @typescript-eslint/no-empty-object-type
 interface IOptions extends RequestInit {}
@@ -37,6 +37,7 @@ class FetchJson {
 
         const headers: Record<string, string> = {
             accept: "application/json",
+            Authorization: `Bearer ${API_KEY}`,
         };
 
         if (data) {